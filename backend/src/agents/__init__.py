@@ -8,20 +8,48 @@ Five specialized AI agents for marketing automation:
 3. ComplianceAgent - Legal & regulatory compliance
 4. TrendScoutAgent - Viral trend detection
 5. CrisisManagerAgent - Reputation crisis management
+
+Orchestration:
+- AgentPipeline - Concurrent DAG of agents sharing preprocessing and HTTP pool
 """
 
-from .community_manager import CommunityManagerAgent
-from .seo_aio import SEO_AIO_Agent
-from .compliance import ComplianceAgent
-from .trend_scout import TrendScoutAgent
-from .crisis_manager import CrisisManagerAgent
-
-__all__ = [
-    'CommunityManagerAgent',
-    'SEO_AIO_Agent',
-    'ComplianceAgent',
-    'TrendScoutAgent',
-    'CrisisManagerAgent',
-]
+import importlib
+from typing import TYPE_CHECKING
+
+# Exported name -> submodule; loaded on first access so a worker that needs
+# one agent does not import the other four (see benchmarks/cold_start.py)
+_EXPORTS = {
+    'CommunityManagerAgent': 'community_manager',
+    'SEO_AIO_Agent': 'seo_aio',
+    'ComplianceAgent': 'compliance',
+    'TrendScoutAgent': 'trend_scout',
+    'CrisisManagerAgent': 'crisis_manager',
+    'AgentPipeline': 'pipeline',
+    'publish_gate_pipeline': 'pipeline',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
+
+
+if TYPE_CHECKING:
+    from .community_manager import CommunityManagerAgent
+    from .seo_aio import SEO_AIO_Agent
+    from .compliance import ComplianceAgent
+    from .trend_scout import TrendScoutAgent
+    from .crisis_manager import CrisisManagerAgent
+    from .pipeline import AgentPipeline, publish_gate_pipeline
 
 __version__ = '1.0.0'
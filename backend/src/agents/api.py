@@ -0,0 +1,399 @@
+"""
+Agents API
+==========
+Async HTTP service exposing the five agents to the TypeScript backend.
+
+Run with:
+    cd backend/src
+    python -m uvicorn agents.api:app --port 8001
+"""
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Optional
+import httpx
+import logging
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import ORJSONResponse, PlainTextResponse
+from pydantic import BaseModel
+
+from .base import BaseAgent
+from .batching import MicroBatcher, QueueFullError
+from .http_pool import ShardedHTTPClient
+from .memory import ThreadMemoryStore
+from .mentions import MentionRouter
+from .metrics import InMemoryMetrics, get_metrics, set_metrics
+from .registry import AGENT_TYPES, create_agent
+from .router import ModelRouter
+from .scheduling import PRIORITIES, DeadlineExceededError, LLMScheduler, request_priority
+from .tracing import configure_tracing, continue_trace
+from .transport import OpenRouterTransport
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# Request models (mirror each agent's run() signature)
+# ============================================================================
+
+class CommunityManagerRequest(BaseModel):
+    comment: str
+    platform: str
+    brand_context: Dict[str, Any] = {}
+    conversation_history: Optional[List[Dict[str, str]]] = None
+    thread_id: Optional[str] = None
+
+
+class ApprovedReplyRequest(BaseModel):
+    brand: str
+    comment: str
+    reply: str
+    sentiment: str = "neutral"
+    category: str = "question"
+    urgency: str = "low"
+    tags: List[str] = []
+
+
+class SEOAIORequest(BaseModel):
+    content: str
+    target_keywords: Optional[List[str]] = None
+    language: str = "fr"
+    content_type: str = "blog_post"
+
+
+class ComplianceRequest(BaseModel):
+    content: str
+    content_type: str
+    target_regions: Optional[List[str]] = None
+    contains_images: bool = False
+    contains_claims: bool = False
+
+
+class TrendScoutRequest(BaseModel):
+    industry: str
+    keywords: Optional[List[str]] = None
+    timeframe: str = "24h"
+    min_relevance: int = 70
+
+
+class CrisisManagerRequest(BaseModel):
+    brand_name: str
+    mentions: List[Dict[str, str]]
+    monitoring_period: str = "24h"
+    historical_sentiment: Optional[Dict[str, float]] = None
+
+
+class MonitoredBrandRequest(BaseModel):
+    name: str
+    aliases: List[str] = []
+    keywords: List[str] = []
+    monitoring_period: str = "1h"
+    historical_sentiment: Optional[Dict[str, float]] = None
+
+
+class MentionsRequest(BaseModel):
+    mentions: List[Dict[str, Any]]
+
+
+# ============================================================================
+# Service
+# ============================================================================
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+batchers: Dict[str, MicroBatcher] = {}
+router: Optional[ModelRouter] = None
+scheduler: Optional[LLMScheduler] = None
+replies = None  # ReplyLibrary when AGENTS_REPLY_INDEX is set
+mention_router = MentionRouter(
+    min_interval_s=float(os.getenv("AGENTS_MENTION_MIN_INTERVAL_S", "300")),
+)
+
+
+async def _assess_mentions(interval_s: float) -> None:
+    """Periodically run CrisisManager on brands whose mention windows changed."""
+    agent = batchers["crisis-manager"].agent
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            results = await mention_router.assess(
+                agent, max_concurrency=_env_int("AGENTS_MENTION_CONCURRENCY", 8)
+            )
+            if results:
+                logger.info(f"[AgentsAPI] Assessed {len(results)} brands from mentions")
+        except Exception as e:
+            logger.error(f"[AgentsAPI] Mention assessment round failed: {e}")
+
+
+async def _save_replies(directory: str, interval_s: float) -> None:
+    """Periodically snapshot the reply index (and drop the journal it covers)."""
+    while True:
+        await asyncio.sleep(interval_s)
+        try:
+            # Shielded: a shutdown mid-save waits for it instead of racing its thread
+            await asyncio.shield(replies.save_async(directory))
+        except Exception as e:
+            logger.error(f"[AgentsAPI] Reply index snapshot failed: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create agents, one shared connection pool and per-agent batchers."""
+    global router, replies, scheduler
+    if os.getenv("AGENTS_METRICS", "1") == "1":
+        set_metrics(InMemoryMetrics())
+    if os.getenv("AGENTS_TRACING") or os.getenv("AGENTS_PROFILE_RATE"):
+        configure_tracing(
+            exporter=os.getenv("AGENTS_TRACING") or None,
+            path=os.getenv("AGENTS_TRACE_FILE"),
+            profile_rate=float(os.getenv("AGENTS_PROFILE_RATE", "0")),
+            profile_dir=os.getenv("AGENTS_PROFILE_DIR", "agent-profiles"),
+        )
+
+    client = ShardedHTTPClient(
+        shards=_env_int("AGENTS_HTTP_SHARDS", 32),
+        connections_per_shard=_env_int("AGENTS_CONNECTIONS_PER_SHARD", 4),
+    )
+
+    if os.getenv("AGENTS_ROUTER", "0") == "1":
+        router = ModelRouter(state_path=os.getenv("AGENTS_ROUTER_STATE"))
+
+    if os.getenv("AGENTS_SCHEDULER", "0") == "1":
+        scheduler = LLMScheduler(
+            max_inflight=_env_int("AGENTS_SCHEDULER_INFLIGHT", 32),
+            degrade_depth=_env_int("AGENTS_SCHEDULER_DEGRADE_DEPTH", 16),
+            shed_depth=_env_int("AGENTS_SCHEDULER_SHED_DEPTH", 64),
+        )
+
+    reply_dir = os.getenv("AGENTS_REPLY_INDEX")
+    if reply_dir:
+        from .retrieval import ReplyLibrary  # needs NumPy
+        os.makedirs(reply_dir, exist_ok=True)
+        replies = ReplyLibrary(journal=os.path.join(reply_dir, "journal.jsonl"))
+        if os.path.exists(os.path.join(reply_dir, "brands.json")):
+            replies.load(reply_dir)
+        replies.replay_journal()
+
+    # With AGENTS_LLM_URL, only these slugs use it (empty = every agent)
+    llm_agents = {slug for slug in os.getenv("AGENTS_LLM_AGENTS", "").split(",") if slug}
+
+    for slug in AGENT_TYPES:
+        agent: BaseAgent = create_agent(slug)
+        if llm_agents and slug not in llm_agents:
+            agent.transport = OpenRouterTransport()
+        agent.http_client = client
+        agent.router = router
+        agent.scheduler = scheduler
+        agent.compact_output = os.getenv("AGENTS_COMPACT_OUTPUT", "0") == "1"
+        if slug == "community-manager" and _env_int("AGENTS_THREAD_MEMORY", 0) > 0:
+            agent.memory = ThreadMemoryStore(max_threads=_env_int("AGENTS_THREAD_MEMORY", 0))
+        if slug == "community-manager":
+            agent.replies = replies
+        batcher = MicroBatcher(
+            agent,
+            window_ms=float(os.getenv("AGENTS_BATCH_WINDOW_MS", "5")),
+            max_batch=_env_int("AGENTS_MAX_BATCH", 16),
+            max_queue=_env_int("AGENTS_QUEUE_SIZE", 256),
+            max_inflight=_env_int("AGENTS_MAX_INFLIGHT", 32),
+        )
+        batcher.start()
+        batchers[slug] = batcher
+
+    assessor = asyncio.create_task(
+        _assess_mentions(float(os.getenv("AGENTS_MENTION_INTERVAL_S", "30")))
+    )
+    snapshots = None
+    if replies is not None:
+        snapshots = asyncio.create_task(
+            _save_replies(reply_dir, float(os.getenv("AGENTS_REPLY_SAVE_INTERVAL_S", "300")))
+        )
+
+    logger.info(f"[AgentsAPI] Started {len(batchers)} agents")
+    try:
+        yield
+    finally:
+        assessor.cancel()
+        if snapshots is not None:
+            snapshots.cancel()
+        for batcher in batchers.values():
+            await batcher.stop()
+        batchers.clear()
+        await client.aclose()
+        if router is not None and router.state_path:
+            router.save()
+        if replies is not None:
+            await replies.save_async(reply_dir)
+
+
+app = FastAPI(
+    title="AstroMedia Agents",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
+)
+
+
+@app.get("/health")
+async def health() -> Dict[str, Any]:
+    """Liveness probe with queue depths."""
+    return {
+        "status": "ok",
+        "queues": {slug: b.queue.qsize() for slug, b in batchers.items()},
+    }
+
+
+@app.get("/stats")
+async def stats() -> Dict[str, Any]:
+    """Batching and backpressure counters per agent."""
+    return {slug: b.stats for slug, b in batchers.items()}
+
+
+@app.get("/router")
+async def router_stats() -> Dict[str, Any]:
+    """Model router statistics per agent and model (empty when disabled)."""
+    return router.snapshot() if router is not None else {}
+
+
+@app.get("/scheduler")
+async def scheduler_stats() -> Dict[str, Any]:
+    """LLM scheduler queue and per-class counters (empty when disabled)."""
+    return scheduler.snapshot() if scheduler is not None else {}
+
+
+@app.get("/metrics")
+async def metrics() -> PlainTextResponse:
+    """Prometheus scrape endpoint (per-phase latency, tokens, cost)."""
+    backend = get_metrics()
+    return PlainTextResponse(backend.render() if hasattr(backend, "render") else "")
+
+
+async def _run(
+    slug: str,
+    request: BaseModel,
+    traceparent: Optional[str],
+    priority: Optional[str] = None,
+    deadline_ms: Optional[float] = None
+) -> ORJSONResponse:
+    if priority is not None and priority not in PRIORITIES:
+        raise HTTPException(status_code=400, detail=f"X-Priority must be one of {PRIORITIES}")
+    try:
+        with continue_trace(traceparent), request_priority(
+            priority, deadline_ms / 1000 if deadline_ms is not None else None
+        ):
+            return ORJSONResponse(await batchers[slug].submit(request.model_dump()))
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail=f"{slug} is overloaded, retry later")
+    except DeadlineExceededError as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"Upstream LLM error: {e}")
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+
+
+@app.post("/agents/community-manager")
+async def community_manager(
+    request: CommunityManagerRequest, traceparent: Optional[str] = Header(None),
+    x_priority: Optional[str] = Header(None),
+    x_deadline_ms: Optional[float] = Header(None)
+) -> ORJSONResponse:
+    return await _run("community-manager", request, traceparent, x_priority, x_deadline_ms)
+
+
+@app.post("/agents/community-manager/replies")
+async def approve_reply(request: ApprovedReplyRequest) -> Dict[str, Any]:
+    """Add an approved reply to the brand's retrieval index."""
+    if replies is None:
+        raise HTTPException(status_code=404, detail="Reply index disabled (AGENTS_REPLY_INDEX)")
+    meta = request.model_dump(include={"sentiment", "category", "urgency", "tags"})
+    return {"id": await replies.add_async(request.brand, request.comment, request.reply, meta)}
+
+
+@app.get("/agents/community-manager/replies")
+async def reply_stats() -> Dict[str, Any]:
+    """Reply index counters and size per brand (empty when disabled)."""
+    return replies.snapshot() if replies is not None else {}
+
+
+@app.post("/agents/seo-aio")
+async def seo_aio(
+    request: SEOAIORequest, traceparent: Optional[str] = Header(None),
+    x_priority: Optional[str] = Header(None),
+    x_deadline_ms: Optional[float] = Header(None)
+) -> ORJSONResponse:
+    return await _run("seo-aio", request, traceparent, x_priority, x_deadline_ms)
+
+
+@app.post("/agents/compliance")
+async def compliance(
+    request: ComplianceRequest, traceparent: Optional[str] = Header(None),
+    x_priority: Optional[str] = Header(None),
+    x_deadline_ms: Optional[float] = Header(None)
+) -> ORJSONResponse:
+    return await _run("compliance", request, traceparent, x_priority, x_deadline_ms)
+
+
+@app.post("/agents/trend-scout")
+async def trend_scout(
+    request: TrendScoutRequest, traceparent: Optional[str] = Header(None),
+    x_priority: Optional[str] = Header(None),
+    x_deadline_ms: Optional[float] = Header(None)
+) -> ORJSONResponse:
+    return await _run("trend-scout", request, traceparent, x_priority, x_deadline_ms)
+
+
+@app.post("/agents/crisis-manager")
+async def crisis_manager(
+    request: CrisisManagerRequest, traceparent: Optional[str] = Header(None),
+    x_priority: Optional[str] = Header(None),
+    x_deadline_ms: Optional[float] = Header(None)
+) -> ORJSONResponse:
+    return await _run("crisis-manager", request, traceparent, x_priority, x_deadline_ms)
+
+
+@app.put("/mentions/brands/{brand_id}")
+async def monitor_brand(brand_id: str, request: MonitoredBrandRequest) -> Dict[str, Any]:
+    """Start or update monitoring of a brand's mentions."""
+    watch = mention_router.add_brand(brand_id, **request.model_dump())
+    return {"brand_id": brand_id, "terms": [" ".join(terms) for terms in watch.terms]}
+
+
+@app.delete("/mentions/brands/{brand_id}")
+async def unmonitor_brand(brand_id: str) -> Dict[str, Any]:
+    mention_router.remove_brand(brand_id)
+    return {"brand_id": brand_id}
+
+
+@app.get("/mentions/brands/{brand_id}")
+async def monitored_brand(brand_id: str) -> Dict[str, Any]:
+    """A brand's current window size and latest crisis assessment."""
+    watch = mention_router.brands.get(brand_id)
+    if watch is None:
+        raise HTTPException(status_code=404, detail=f"Brand {brand_id} is not monitored")
+    return {
+        "brand_id": brand_id,
+        "mentions_in_window": len(watch.window),
+        "new_mentions": watch.new_mentions,
+        "last_assessed": watch.last_assessed or None,
+        "last_result": watch.last_result,
+    }
+
+
+@app.post("/mentions")
+async def ingest_mentions(request: MentionsRequest) -> Dict[str, Any]:
+    """Route a batch of firehose mentions to the monitored brands."""
+    rejected = mention_router.stats["rejected"]
+    matched = mention_router.ingest_many(request.mentions)
+    return {
+        "received": len(request.mentions),
+        "matched": matched,
+        "rejected": mention_router.stats["rejected"] - rejected,
+    }
+
+
+@app.get("/mentions")
+async def mention_stats() -> Dict[str, Any]:
+    return mention_router.snapshot()
@@ -1,22 +1,52 @@
 """
 Base Agent Class
 ================
-Foundation for all AstroMedia AI agents with OpenRouter integration.
+Foundation for all AstroMedia AI agents with OpenRouter integration
+(or any OpenAI-compatible server, see transport.py).
 """
 
-import os
-import httpx
+import asyncio
+import contextvars
+import time
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Awaitable, Callable, Optional, List, TYPE_CHECKING
 from datetime import datetime
 import logging
 
+from .metrics import MetricsBackend, PhaseTrace, get_metrics
+from .schemas import CompactSchema
+from .tracing import get_tracer, run_started_ns, tracing_enabled
+from .transport import Transport, default_transport
+
+if TYPE_CHECKING:
+    import httpx
+
 logger = logging.getLogger(__name__)
 
+# Upstream statuses worth retrying (rate limits and transient server errors)
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Labels of the current task's latest call_llm(), read by parse_json_response()
+_call_labels: contextvars.ContextVar = contextvars.ContextVar("call_labels", default=None)
+
+# Per-task overrides of the model and system prompt (set by cascade.ModelCascade)
+_model_override: contextvars.ContextVar = contextvars.ContextVar("model_override", default=None)
+_prompt_suffix: contextvars.ContextVar = contextvars.ContextVar("prompt_suffix", default="")
+# Side effects of the current attempt, held back until the cascade keeps its result
+_deferred_writes: contextvars.ContextVar = contextvars.ContextVar("deferred_writes", default=None)
+
+# Per-task HTTP client, preferred over agent.http_client (set by pipeline.AgentPipeline)
+_http_client: contextvars.ContextVar = contextvars.ContextVar("http_client", default=None)
+
 
 class BaseAgent:
     """Base class for all AI agents with OpenRouter integration."""
 
+    # Required output keys -> type, or tuple of allowed string values
+    OUTPUT_SCHEMA: Dict[str, Any] = {}
+    # Short-key wire format the model can answer in (see schemas.py)
+    COMPACT_SCHEMA: Optional[CompactSchema] = None
+
     def __init__(
         self,
         name: str,
@@ -28,10 +58,26 @@ class BaseAgent:
         self.model = model
         self.temperature = temperature
         self.max_tokens = max_tokens
-        self.api_key = os.getenv("OPENROUTER_API_KEY")
-
-        if not self.api_key:
-            raise ValueError("OPENROUTER_API_KEY environment variable not set")
+        # Optional shared client (set by pipelines/services to reuse the pool)
+        self.http_client: Optional["httpx.AsyncClient"] = None
+        # Optional cross-process coordination (set by WorkerRuntime;
+        # response_cache.get()/set() are coroutines)
+        self.rate_limiter = None
+        self.response_cache = None
+        # Metrics backend (None = process-wide default from metrics.get_metrics())
+        self.metrics: Optional[MetricsBackend] = None
+        # Optional per-call model selection (router.ModelRouter)
+        self.router = None
+        # Optional priority/deadline queue shared across agents (scheduling.LLMScheduler)
+        self.scheduler = None
+        # Retries on 429/5xx; 0 keeps a single attempt
+        self.max_retries = 0
+        self.retry_backoff = 0.5
+        # Ask for COMPACT_SCHEMA answers and expand them in parse_json_response()
+        self.compact_output = False
+        # Where requests go (raises ValueError without OPENROUTER_API_KEY
+        # unless AGENTS_LLM_URL names another server)
+        self.transport: Transport = default_transport()
 
     async def call_llm(
         self,
@@ -41,7 +87,7 @@ class BaseAgent:
         max_tokens: Optional[int] = None
     ) -> Dict[str, Any]:
         """
-        Call OpenRouter API with the specified prompts.
+        Call the LLM through `self.transport` with the specified prompts.
 
         Args:
             system_prompt: System instructions for the LLM
@@ -52,17 +98,44 @@ class BaseAgent:
         Returns:
             Dict with 'content', 'model', 'cost', 'tokens' keys
         """
-        url = "https://openrouter.ai/api/v1/chat/completions"
+        if not tracing_enabled():
+            return await self._call_llm(system_prompt, user_message, temperature, max_tokens)
 
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "HTTP-Referer": os.getenv("APP_URL", "http://localhost:8000"),
-            "X-Title": "AstroMedia",
-            "Content-Type": "application/json"
-        }
+        tracer = get_tracer()
+        run_started = run_started_ns.get()
+        if run_started:
+            # Time between run() entry and the first LLM call is prompt building
+            tracer.start_span("agent.build_prompt", start_time=run_started).end()
+            run_started_ns.set(0)
+
+        with tracer.start_as_current_span(
+            "llm.call", attributes={"agent.name": self.name}
+        ) as span:
+            result = await self._call_llm(system_prompt, user_message, temperature, max_tokens)
+            span.set_attribute("llm.model", result["model"])
+            span.set_attribute("llm.prompt_tokens", result.get("prompt_tokens", 0))
+            span.set_attribute("llm.completion_tokens", result.get("completion_tokens", 0))
+            span.set_attribute("llm.cost_usd", result["cost"])
+            span.set_attribute("llm.cached", result.get("cached", False))
+            return result
+
+    async def _call_llm(
+        self,
+        system_prompt: str,
+        user_message: str,
+        temperature: Optional[float],
+        max_tokens: Optional[int]
+    ) -> Dict[str, Any]:
+        """Untraced body of call_llm()."""
+        model = _model_override.get()
+        if model is None:
+            model = self.router.choose(self.name, self.model) if self.router is not None else self.model
+        if self.compact_output and self.COMPACT_SCHEMA is not None:
+            system_prompt += self.COMPACT_SCHEMA.instruction()
+        system_prompt += _prompt_suffix.get()
 
         payload = {
-            "model": self.model,
+            "model": model,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
@@ -71,33 +144,105 @@ class BaseAgent:
             "max_tokens": max_tokens or self.max_tokens
         }
 
-        start_time = datetime.now()
+        metrics = self.metrics or get_metrics()
+        labels = {"agent": self.name, "model": model}
+        _call_labels.set(labels)
+
+        cache_key = None
+        if self.response_cache is not None:
+            # Keyed on the upstream model: a local model's answers are not Sonnet's
+            cache_key = self.response_cache.key(dict(payload, model=self.transport.upstream_model(model)))
+            cached = await self.response_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached, cost=0.0, latency_ms=0, cached=True)
+
+        queued_at = time.perf_counter()
+        if self.scheduler is None:
+            return await self._send(payload, labels, metrics, cache_key, queued_at)
 
+        with get_tracer().start_as_current_span("llm.schedule"):
+            grant = await self.scheduler.acquire(self.name)
         try:
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                data = response.json()
+            if grant.degraded:
+                payload = self.scheduler.degrade(payload)
+                labels = dict(labels, model=payload["model"])
+                _call_labels.set(labels)
+                cache_key = None  # not the answer the full request would get
+            return await self._send(payload, labels, metrics, cache_key, queued_at)
+        finally:
+            self.scheduler.release()
+
+    async def _send(
+        self,
+        payload: Dict[str, Any],
+        labels: Dict[str, str],
+        metrics: MetricsBackend,
+        cache_key: Optional[str],
+        queued_at: float
+    ) -> Dict[str, Any]:
+        """Rate-limit, send with retries, account and cache one call."""
+        # Deferred: importing httpx dominates the package's cold start
+        import httpx
 
-            end_time = datetime.now()
-            latency_ms = int((end_time - start_time).total_seconds() * 1000)
+        model = payload["model"]
+        if self.rate_limiter is not None:
+            with get_tracer().start_as_current_span("llm.queue_wait"):
+                await self.rate_limiter.acquire()
+
+        trace = PhaseTrace() if metrics.enabled else None
+        start_time = time.perf_counter()
+
+        try:
+            attempt = 0
+            while True:
+                try:
+                    client = _http_client.get() or self.http_client
+                    data = await self.transport.send(payload, client, trace)
+                    break
+                except httpx.HTTPError as e:
+                    status = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else None
+                    if status == 429 and self.rate_limiter is not None:
+                        retry_after = e.response.headers.get("Retry-After", "1")
+                        self.rate_limiter.penalize(
+                            float(retry_after) if retry_after.isdigit() else 1.0
+                        )
+                    if attempt >= self.max_retries or status not in RETRYABLE_STATUSES:
+                        raise
+                    attempt += 1
+                    metrics.inc("retries_total", 1, labels)
+                    await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+            end_time = time.perf_counter()
+            latency_ms = int((end_time - start_time) * 1000)
 
             # Extract response
             content = data["choices"][0]["message"]["content"]
 
-            # Calculate cost (OpenRouter provides usage info)
+            # Calculate cost (OpenAI-compatible servers report usage)
             usage = data.get("usage", {})
             prompt_tokens = usage.get("prompt_tokens", 0)
             completion_tokens = usage.get("completion_tokens", 0)
             total_tokens = usage.get("total_tokens", 0)
 
-            # Rough cost estimation (varies by model)
-            # Claude 3.5 Sonnet: ~$3/1M input, ~$15/1M output
-            estimated_cost = (prompt_tokens * 0.000003) + (completion_tokens * 0.000015)
+            # Prefer the billed cost when OpenRouter reports it
+            estimated_cost = usage.get("cost")
+            if estimated_cost is None:
+                estimated_cost = self.transport.estimate_cost(model, prompt_tokens, completion_tokens)
+
+            if metrics.enabled:
+                metrics.observe("queue_wait_seconds", start_time - queued_at, labels)
+                metrics.observe("connect_seconds", trace.connect_seconds, labels)
+                if trace.headers_received:
+                    metrics.observe("ttfb_seconds", trace.headers_received - start_time, labels)
+                metrics.observe("upstream_seconds", end_time - start_time, labels)
+                metrics.inc("calls_total", 1, dict(labels, status="ok"))
+                metrics.inc("prompt_tokens_total", prompt_tokens, labels)
+                metrics.inc("completion_tokens_total", completion_tokens, labels)
+                metrics.inc("cost_usd_total", estimated_cost, labels)
 
-            return {
+            result = {
                 "content": content,
-                "model": self.model,
+                "model": model,
                 "cost": round(estimated_cost, 6),
                 "tokens": total_tokens,
                 "prompt_tokens": prompt_tokens,
@@ -106,35 +251,97 @@ class BaseAgent:
                 "timestamp": datetime.now().isoformat()
             }
 
+            if self.router is not None:
+                self.router.record(self.name, model, latency_ms, estimated_cost, ok=True)
+            if cache_key is not None:
+                await self.response_cache.set(cache_key, result)
+
+            return result
+
         except httpx.HTTPError as e:
+            metrics.inc("calls_total", 1, dict(labels, status="http_error"))
+            if self.router is not None:
+                latency_ms = int((time.perf_counter() - start_time) * 1000)
+                self.router.record(self.name, model, latency_ms, 0.0, ok=False)
             logger.error(f"[{self.name}] HTTP error calling LLM: {e}")
             raise
         except Exception as e:
+            metrics.inc("calls_total", 1, dict(labels, status="error"))
             logger.error(f"[{self.name}] Error calling LLM: {e}")
             raise
 
-    def parse_json_response(self, content: str) -> Dict[str, Any]:
+    def parse_json_response(self, content: str, expand: bool = True) -> Dict[str, Any]:
         """
         Parse JSON from LLM response, handling markdown code blocks.
 
         Args:
             content: Raw LLM response content
+            expand: Expand a compact answer (set False for batch wrappers
+                and call expand_output() per item)
 
         Returns:
             Parsed JSON dict
         """
-        # Remove markdown code blocks if present
-        if "```json" in content:
-            content = content.split("```json")[1].split("```")[0].strip()
-        elif "```" in content:
-            content = content.split("```")[1].split("```")[0].strip()
+        metrics = self.metrics or get_metrics()
+        started = time.perf_counter() if metrics.enabled else 0.0
 
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError as e:
-            logger.error(f"[{self.name}] Failed to parse JSON: {e}")
-            logger.error(f"Content: {content[:500]}")
-            raise ValueError(f"Invalid JSON response from {self.name}")
+        with get_tracer().start_as_current_span("llm.parse_json"):
+            # Remove markdown code blocks if present
+            if "```json" in content:
+                content = content.split("```json")[1].split("```")[0].strip()
+            elif "```" in content:
+                content = content.split("```")[1].split("```")[0].strip()
+
+            labels = _call_labels.get() or {"agent": self.name, "model": self.model}
+            try:
+                parsed = json.loads(content)
+            except json.JSONDecodeError as e:
+                logger.error(f"[{self.name}] Failed to parse JSON: {e}")
+                logger.error(f"Content: {content[:500]}")
+                if self.router is not None:
+                    self.router.record_parse(self.name, labels["model"], ok=False)
+                raise ValueError(f"Invalid JSON response from {self.name}")
+
+            if expand:
+                parsed = self.expand_output(parsed)
+
+        if self.router is not None:
+            self.router.record_parse(self.name, labels["model"], ok=True)
+        if metrics.enabled:
+            metrics.observe("parse_seconds", time.perf_counter() - started, labels)
+        return parsed
+
+    def expand_output(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Verbose form of a compact answer (unchanged unless compact_output is on)."""
+        if self.compact_output and self.COMPACT_SCHEMA is not None:
+            return self.COMPACT_SCHEMA.expand(result)
+        return result
+
+    def validate_output(self, result: Dict[str, Any]) -> List[str]:
+        """
+        Check a parsed result against OUTPUT_SCHEMA.
+
+        Args:
+            result: Parsed (or run()) result
+
+        Returns:
+            Problems found; empty if the result is valid
+        """
+        problems = []
+        for key, expected in self.OUTPUT_SCHEMA.items():
+            if key not in result:
+                problems.append(f"missing {key}")
+                continue
+            value = result[key]
+            if isinstance(expected, tuple) and expected and isinstance(expected[0], str):
+                if value not in expected:
+                    problems.append(f"{key}={value!r} not in {expected}")
+            elif expected is float:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    problems.append(f"{key} is not a number")
+            elif not isinstance(value, expected):
+                problems.append(f"{key} is not {getattr(expected, '__name__', expected)}")
+        return problems
 
     async def run(self, **kwargs) -> Dict[str, Any]:
         """
@@ -144,3 +351,35 @@ class BaseAgent:
             Agent execution result
         """
         raise NotImplementedError("Subclasses must implement run() method")
+
+    async def run_batch(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Run the agent on several requests at once.
+
+        The default runs each request concurrently; agents that can fold
+        several inputs into a single LLM call override this.
+
+        Args:
+            requests: List of run() keyword arguments
+
+        Returns:
+            One result per request, or the exception it raised
+        """
+        return await asyncio.gather(
+            *(self.run(**kwargs) for kwargs in requests),
+            return_exceptions=True
+        )
+
+    async def _after_result(self, write: Callable[[], Awaitable[None]]) -> None:
+        """
+        Apply a side effect of a successful run (e.g. a memory write).
+
+        Runs `write` now, or queues it when the run is one attempt of a
+        cascade.ModelCascade, which applies only the writes of the result
+        it returns.
+        """
+        deferred = _deferred_writes.get()
+        if deferred is None:
+            await write()
+        else:
+            deferred.append(write)
@@ -0,0 +1,185 @@
+"""
+Micro-Batching
+==============
+Coalesces agent requests arriving within a few milliseconds into batches.
+"""
+
+import asyncio
+import contextvars
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from .base import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    """Raised when a batcher's bounded queue cannot accept more requests."""
+
+
+class MicroBatcher:
+    """
+    Per-agent request coalescer with a bounded queue.
+
+    Features:
+    - Collects requests for up to `window_ms` (or `max_batch` items)
+    - Dispatches each batch through agent.run_batch()
+    - Bounded queue: submit() fails fast when saturated (backpressure)
+    - Caps the number of batches in flight against the upstream
+    - Requests keep their caller's context (priority, deadline, trace
+      parent). Agents that fold a batch into one call (run_batch) get one
+      call per priority class, run in the context of its most urgent
+      request with the class's tightest deadline
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        window_ms: float = 5.0,
+        max_batch: int = 16,
+        max_queue: int = 256,
+        max_inflight: int = 32
+    ):
+        self.agent = agent
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._inflight = asyncio.Semaphore(max_inflight)
+        self._tasks: set = set()
+        self._collector: Optional[asyncio.Task] = None
+
+        self.stats = {"submitted": 0, "rejected": 0, "batches": 0, "batched_items": 0}
+
+    def start(self) -> None:
+        """Start the background collector (idempotent)."""
+        if self._collector is None:
+            self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self) -> None:
+        """Stop collecting and wait for in-flight batches."""
+        if self._collector is not None:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+            self._collector = None
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def submit(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a request and wait for its result.
+
+        Args:
+            kwargs: Keyword arguments for agent.run()
+
+        Returns:
+            Agent result
+
+        Raises:
+            QueueFullError: If the queue is saturated
+        """
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((kwargs, future, contextvars.copy_context()))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            raise QueueFullError(f"{self.agent.name} queue is full")
+
+        self.stats["submitted"] += 1
+        return await future
+
+    async def _collect(self) -> None:
+        """Form batches from the queue and dispatch them."""
+        while True:
+            batch: List[Tuple[Dict[str, Any], asyncio.Future, contextvars.Context]] = [
+                await self.queue.get()
+            ]
+            deadline = time.monotonic() + self.window
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._inflight.acquire()
+            task = asyncio.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(
+        self, batch: List[Tuple[Dict[str, Any], asyncio.Future, contextvars.Context]]
+    ) -> None:
+        """Run one batch and resolve its futures."""
+        try:
+            self.stats["batches"] += 1
+            self.stats["batched_items"] += len(batch)
+
+            try:
+                if type(self.agent).run_batch is BaseAgent.run_batch:
+                    results = await asyncio.gather(
+                        *(
+                            asyncio.create_task(self.agent.run(**kwargs), context=context)
+                            for kwargs, _, context in batch
+                        ),
+                        return_exceptions=True
+                    )
+                else:
+                    results = await self._run_folded(batch)
+            except Exception as e:
+                logger.error(f"[{self.agent.name}] Batch of {len(batch)} failed: {e}")
+                results = [e] * len(batch)
+
+            for (_, future, _), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            self._inflight.release()
+
+    async def _run_folded(
+        self, batch: List[Tuple[Dict[str, Any], asyncio.Future, contextvars.Context]]
+    ) -> List[Any]:
+        """
+        agent.run_batch() once per (priority, has deadline) group of the batch.
+
+        Each group runs in a copy of the context of its earliest-deadline
+        request, so the scheduler orders, sheds and expires it as that
+        request; the other requests' context (e.g. trace parent) is not
+        carried into the folded call.
+        """
+        from .scheduling import _request  # scheduling imports this module
+
+        groups: Dict[Tuple[Optional[str], bool], List[int]] = {}
+        for i, (_, _, context) in enumerate(batch):
+            priority, deadline = context.get(_request)
+            groups.setdefault((priority, deadline is None), []).append(i)
+
+        def urgency(i: int) -> float:
+            deadline = batch[i][2].get(_request)[1]
+            return deadline if deadline is not None else 0.0
+
+        tasks = []
+        for indices in groups.values():
+            leader = min(indices, key=urgency)
+            tasks.append(asyncio.create_task(
+                self.agent.run_batch([batch[i][0] for i in indices]),
+                context=batch[leader][2].copy(),
+            ))
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+
+        results: List[Any] = [None] * len(batch)
+        for indices, outcome in zip(groups.values(), outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"[{self.agent.name}] Batch of {len(indices)} failed: {outcome}")
+                outcome = [outcome] * len(indices)
+            for i, result in zip(indices, outcome):
+                results[i] = result
+        return results
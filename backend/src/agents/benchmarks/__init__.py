@@ -0,0 +1,5 @@
+"""
+Agent Benchmarks
+================
+Offline load tests and micro-benchmarks running against local stubs.
+"""
@@ -0,0 +1,253 @@
+"""
+Agent Load Generator
+====================
+Drives all five agents in-process at target request rates against the local
+LLM stub and reports throughput, latency percentiles, CPU per call and
+memory as JSON.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.agent_load --rps 50 200 --duration 10 \\
+        --latency-dist lognormal --latency-ms 300 --output bench.json
+    # Later release: fail if anything regressed by more than 10%
+    python -m agents.benchmarks.agent_load --rps 50 200 --duration 10 \\
+        --latency-dist lognormal --latency-ms 300 --baseline bench.json --tolerance 0.1
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+from ..http_pool import ShardedHTTPClient
+from ..registry import AGENT_TYPES, create_agent
+from .llm_stub import add_stub_arguments, stub_argv
+from .load_test import percentile, wait_ready
+
+AGENT_REQUESTS: Dict[str, Dict[str, Any]] = {
+    "community-manager": {
+        "comment": "Est-ce que vous livrez à Québec?",
+        "platform": "instagram",
+        "brand_context": {"brand_name": "Resto Québec", "tone": "chaleureux"},
+    },
+    "seo-aio": {
+        "content": "L'intelligence artificielle transforme le marketing des PME. " * 20,
+        "target_keywords": ["marketing IA", "PME"],
+    },
+    "compliance": {
+        "content": "Abonnez-vous à notre infolettre et recevez 20% de rabais!",
+        "content_type": "email",
+        "target_regions": ["CA", "EU"],
+    },
+    "trend-scout": {
+        "industry": "marketing",
+        "keywords": ["IA", "automatisation"],
+    },
+    "crisis-manager": {
+        "brand_name": "Resto Québec",
+        "mentions": [
+            {"platform": "twitter", "text": "Livraison en retard encore une fois"},
+            {"platform": "facebook", "text": "Service excellent comme toujours"},
+        ],
+    },
+}
+
+# Metrics compared against a baseline, and whether higher is better
+REGRESSION_KEYS = {
+    "throughput_rps": True,
+    "p50_ms": False,
+    "p95_ms": False,
+    "p99_ms": False,
+    "cpu_ms_per_call": False,
+}
+
+
+def latency_summary(samples: List[float]) -> Dict[str, float]:
+    return {
+        "p50_ms": round(percentile(samples, 50), 2),
+        "p95_ms": round(percentile(samples, 95), 2),
+        "p99_ms": round(percentile(samples, 99), 2),
+    }
+
+
+def rss_mb() -> float:
+    """Peak resident set size of this process in MB (Linux reports KB)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def run_level(
+    agents: Dict[str, Any],
+    rps: float,
+    duration: float,
+    rng: random.Random
+) -> Dict[str, Any]:
+    """Open-loop load: Poisson arrivals at `rps`, agents picked round-robin."""
+    slugs = list(agents)
+    latencies: Dict[str, List[float]] = {slug: [] for slug in slugs}
+    errors: Dict[str, Dict[str, int]] = {slug: {} for slug in slugs}
+    tasks = []
+
+    async def call(slug: str) -> None:
+        start = time.perf_counter()
+        try:
+            await agents[slug].run(**AGENT_REQUESTS[slug])
+            latencies[slug].append((time.perf_counter() - start) * 1000)
+        except Exception as e:
+            kind = type(e).__name__
+            errors[slug][kind] = errors[slug].get(kind, 0) + 1
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    next_at = start
+    max_lag = 0.0
+    sent = 0
+    while next_at - start < duration:
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            max_lag = max(max_lag, -delay)
+        tasks.append(asyncio.create_task(call(slugs[sent % len(slugs)])))
+        sent += 1
+        next_at += rng.expovariate(rps)
+
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    completed = sum(len(samples) for samples in latencies.values())
+    everything = [ms for samples in latencies.values() for ms in samples]
+    return {
+        "target_rps": rps,
+        "sent": sent,
+        "completed": completed,
+        "failed": sent - completed,
+        "throughput_rps": round(completed / elapsed, 1),
+        **latency_summary(everything),
+        "cpu_ms_per_call": round(cpu / max(sent, 1) * 1000, 3),
+        "max_schedule_lag_ms": round(max_lag * 1000, 2),
+        "peak_rss_mb": rss_mb(),
+        "agents": {
+            slug: {"completed": len(latencies[slug]), **latency_summary(latencies[slug]),
+                   "errors": errors[slug]}
+            for slug in slugs
+        },
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List metrics that regressed by more than `tolerance` versus a baseline."""
+    previous = {level["target_rps"]: level for level in baseline.get("levels", [])}
+    regressions = []
+    for level in report["levels"]:
+        before = previous.get(level["target_rps"])
+        if before is None:
+            continue
+        for key, higher_is_better in REGRESSION_KEYS.items():
+            old, new = before.get(key), level.get(key)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(
+                    f"rps={level['target_rps']:g} {key}: {old} -> {new} ({change:+.1%})"
+                )
+    return regressions
+
+
+async def run(args) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    client = ShardedHTTPClient(shards=args.shards)
+    agents = {}
+    for slug in args.agents:
+        agent = create_agent(slug)
+        agent.http_client = client
+        agent.max_retries = args.max_retries
+        agent.retry_backoff = 0.05
+        agents[slug] = agent
+
+    try:
+        # Warm up connections and code paths outside the measurement
+        await run_level(agents, min(args.rps), 1.0, rng)
+        levels = [await run_level(agents, rps, args.duration, rng) for rps in args.rps]
+    finally:
+        await client.aclose()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        },
+        "levels": levels,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Five-agent load generator")
+    parser.add_argument("--rps", type=float, nargs="+", default=[20, 100])
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    parser.add_argument("--agents", nargs="+", default=list(AGENT_TYPES), choices=AGENT_TYPES)
+    parser.add_argument("--max-retries", type=int, default=0)
+    parser.add_argument("--shards", type=int, default=32)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--output", help="Write the JSON report to this file")
+    parser.add_argument("--baseline", help="Previous JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="Allowed relative regression before exiting non-zero")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{args.stub_port}/chat/completions"
+
+    # The stub runs in its own process so CPU figures are the agents' alone
+    stub = subprocess.Popen([
+        sys.executable, "-m", "agents.benchmarks.llm_stub",
+        "--port", str(args.stub_port), *stub_argv(args),
+    ])
+    try:
+        asyncio.run(wait_ready(f"http://127.0.0.1:{args.stub_port}/health"))
+        report = asyncio.run(run(args))
+    finally:
+        stub.terminate()
+        stub.wait()
+
+    encoded = json.dumps(report, indent=2, ensure_ascii=False)
+    print(encoded)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as out:
+            out.write(encoded + "\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
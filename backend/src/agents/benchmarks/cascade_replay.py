@@ -0,0 +1,255 @@
+"""
+Cascade Replay
+==============
+Replays a labelled corpus through CommunityManager and CrisisManager, once
+Sonnet-only and once through ModelCascade, against a local stub that plays
+both models, and reports escalation rate, cost and latency savings and
+agreement with the Sonnet-only baseline.
+
+The stub's strong model always returns the corpus label; the cheap model
+is wrong more often on harder items and reports a confidence loosely
+correlated with being right (sometimes confidently wrong).
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.cascade_replay
+    python -m agents.benchmarks.cascade_replay --corpus comments.jsonl --min-confidence 0.85
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import time
+import zlib
+from typing import Dict, Any, List, Tuple
+
+import httpx
+
+from ..cascade import ModelCascade
+from ..community_manager import CommunityManagerAgent
+from ..crisis_manager import CrisisManagerAgent
+from .llm_stub import AGENT_CONTENT, LLMStub
+from .load_test import percentile
+
+STRONG_MODEL = "anthropic/claude-3.5-sonnet"
+CHEAP_MODEL = "openai/gpt-4o-mini"
+
+# (comment, sentiment, category, urgency, difficulty 0-1)
+COMMENTS: List[Tuple[str, str, str, str, float]] = [
+    ("Merci pour le service impeccable hier soir!", "positive", "compliment", "low", 0.05),
+    ("Super équipe, je recommande à 100%", "positive", "compliment", "low", 0.05),
+    ("Vous êtes ouverts le dimanche?", "neutral", "question", "low", 0.05),
+    ("Est-ce que vous livrez à Lévis?", "neutral", "question", "low", 0.1),
+    ("Quel est le prix du menu midi?", "neutral", "question", "low", 0.05),
+    ("Do you have vegan options?", "neutral", "question", "low", 0.1),
+    ("Gagnez un iPhone gratuit en cliquant ici bit.ly/xx", "spam", "spam", "low", 0.05),
+    ("Follow me for free followers!!!", "spam", "spam", "low", 0.1),
+    ("Commande arrivée froide, pas content", "negative", "complaint", "medium", 0.2),
+    ("Ça fait 2 semaines que j'attends mon remboursement", "negative", "complaint", "high", 0.3),
+    ("Le serveur était impoli avec ma mère", "negative", "complaint", "medium", 0.3),
+    ("Bon, c'était correct sans plus", "neutral", "other", "low", 0.5),
+    ("Wow, encore en retard, bravo...", "negative", "complaint", "medium", 0.7),
+    ("J'adore attendre 45 minutes pour une pizza 🙃", "negative", "complaint", "medium", 0.8),
+    ("Vous avez changé la recette? C'est différent", "neutral", "question", "low", 0.6),
+    ("Mon enfant a fait une réaction allergique après votre dessert", "negative", "complaint",
+     "critical", 0.4),
+    ("Je vais contacter un avocat", "negative", "complaint", "high", 0.5),
+    ("Pas mal mais le prix a monté", "neutral", "other", "low", 0.55),
+    ("Merci mais j'ai trouvé un cheveu dans ma soupe", "negative", "complaint", "medium", 0.65),
+    ("Vous embauchez pour l'été?", "neutral", "question", "low", 0.15),
+    ("Meilleure poutine en ville, point final", "positive", "compliment", "low", 0.1),
+    ("Allez vous faire voir, service de m****", "toxic", "complaint", "medium", 0.35),
+    ("Votre site ne fonctionne pas pour commander", "negative", "complaint", "medium", 0.3),
+    ("Est-ce que le stationnement est gratuit?", "neutral", "question", "low", 0.05),
+]
+
+# (brand, mentions, severity, crisis_detected, difficulty)
+CRISES: List[Tuple[str, List[str], str, bool, float]] = [
+    ("Resto Calme", ["Très bon repas", "Service rapide"], "normal", False, 0.05),
+    ("Resto Lent", ["Encore du retard", "Livraison en retard", "Attente longue"], "watch", False, 0.4),
+    ("Resto Viral", ["#BoycottRestoViral vidéo d'un rat en cuisine", "Partagé 20k fois",
+                     "Les médias en parlent"], "crisis", True, 0.2),
+    ("Resto Flou", ["Des rumeurs sur une intoxication?", "Quelqu'un confirme?"], "alert", True, 0.7),
+    ("Resto Mixte", ["Bon mais cher", "Pas fan du nouveau menu", "Toujours aussi bon"],
+     "normal", False, 0.5),
+]
+
+
+def _seed(*parts: str) -> int:
+    return zlib.crc32("|".join(parts).encode())
+
+
+class ReplayStub(LLMStub):
+    """LLMStub playing a strong and a cheap model over a labelled corpus."""
+
+    def __init__(self, latency_scale: float, malformed_rate: float = 0.03):
+        super().__init__(latency_ms=0)
+        self.latency_scale = latency_scale
+        self.malformed_rate = malformed_rate
+        self.comments = {c[0]: c for c in COMMENTS}
+        self.crises = {c[0]: c for c in CRISES}
+
+    def _answer(self, payload: Dict[str, Any]) -> Tuple[Dict[str, Any], float]:
+        """Return (JSON answer, difficulty) for the request's corpus item."""
+        system = payload["messages"][0]["content"]
+        user = payload["messages"][-1]["content"]
+
+        if "Crisis Manager" in system:
+            brand = user.split("MARQUE: ", 1)[1].split("\n", 1)[0]
+            _, _, severity, detected, difficulty = self.crises[brand]
+            score = {"normal": 15, "watch": 40, "alert": 65, "crisis": 90}[severity]
+            return dict(AGENT_CONTENT["crisis-manager"], severity=severity,
+                        crisis_detected=detected, crisis_score=score,
+                        escalation_required=severity == "crisis"), difficulty
+
+        comment = user.split('COMMENTAIRE À ANALYSER:\n"', 1)[1].rsplit('"', 1)[0]
+        _, sentiment, category, urgency, difficulty = self.comments[comment]
+        return dict(AGENT_CONTENT["community-manager"], sentiment=sentiment,
+                    category=category, urgency=urgency), difficulty
+
+    def _degrade(self, answer: Dict[str, Any], rng: random.Random) -> None:
+        """Turn a correct answer into a plausible wrong one."""
+        if "sentiment" in answer:
+            answer["sentiment"] = rng.choice(["positive", "neutral", "negative"])
+            answer["urgency"] = rng.choice(["low", "medium"])
+        else:
+            answer["severity"] = rng.choice(["normal", "watch"])
+            answer["crisis_detected"] = False
+            answer["crisis_score"] = 30
+
+    async def respond(self, payload: Dict[str, Any]):
+        model = payload.get("model")
+        system = payload["messages"][0]["content"]
+        rng = random.Random(_seed(model, payload["messages"][-1]["content"]))
+        answer, difficulty = self._answer(payload)
+
+        if model == STRONG_MODEL:
+            median_ms, completion_tokens = 1800, 220
+        else:
+            median_ms, completion_tokens = 450, 200
+            correct = rng.random() > difficulty * 0.8
+            if not correct:
+                self._degrade(answer, rng)
+            base = 0.97 - 0.35 * difficulty if correct else rng.uniform(0.5, 0.9)
+            answer["confidence"] = round(min(0.99, max(0.05, base + rng.gauss(0, 0.05))), 2)
+            if rng.random() < self.malformed_rate:
+                answer.pop(next(iter(answer)))
+
+        await asyncio.sleep(
+            rng.lognormvariate(math.log(median_ms), 0.35) / 1000 * self.latency_scale
+        )
+        content = json.dumps(answer, ensure_ascii=False)
+        prompt_tokens = (len(system) + len(payload["messages"][-1]["content"])) // 4
+        return 200, {
+            "id": f"replay-{self.requests}",
+            "object": "chat.completion",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+def _key(result: Dict[str, Any]) -> Tuple:
+    if "sentiment" in result:
+        return result.get("sentiment"), result.get("category"), result.get("urgency")
+    return result.get("severity"), result.get("crisis_detected")
+
+
+async def replay(agent, cascade: ModelCascade, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+    baseline = await asyncio.gather(*(agent.run(**kwargs) for kwargs in requests))
+    cascaded = await asyncio.gather(*(cascade.run(**kwargs) for kwargs in requests))
+
+    base_cost = sum(r["cost"] for r in baseline)
+    cascade_cost = sum(r["cost"] for r in cascaded)
+    base_latency = [r["latency_ms"] for r in baseline]
+    cascade_latency = [r["latency_ms"] for r in cascaded]
+    agree = sum(_key(b) == _key(c) for b, c in zip(baseline, cascaded))
+
+    return {
+        "items": len(requests),
+        "escalation_rate": round(cascade.escalation_rate(), 3),
+        "escalations": {k: v for k, v in cascade.stats.items() if k not in ("calls", "escalated")},
+        "agreement_with_baseline": round(agree / len(requests), 3),
+        "cost_usd": {"baseline": round(base_cost, 5), "cascade": round(cascade_cost, 5),
+                     "saving_pct": round((1 - cascade_cost / base_cost) * 100, 1)},
+        "latency_ms": {
+            "baseline_p50": percentile(base_latency, 50),
+            "cascade_p50": percentile(cascade_latency, 50),
+            "baseline_p95": percentile(base_latency, 95),
+            "cascade_p95": percentile(cascade_latency, 95),
+            "mean_saving_pct": round(
+                (1 - sum(cascade_latency) / sum(base_latency)) * 100, 1
+            ),
+        },
+    }
+
+
+def load_corpus(path: str) -> None:
+    """Replace the built-in comments with a JSONL corpus."""
+    COMMENTS.clear()
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                COMMENTS.append((item["comment"], item["sentiment"], item["category"],
+                                 item["urgency"], float(item.get("difficulty", 0.3))))
+
+
+async def run(args) -> Dict[str, Any]:
+    stub = ReplayStub(args.latency_scale, args.malformed_rate)
+    server = await stub.serve(port=args.stub_port)
+    os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{args.stub_port}/chat/completions"
+
+    client = httpx.AsyncClient(timeout=60.0, limits=httpx.Limits(max_connections=100))
+    try:
+        community = CommunityManagerAgent(model=STRONG_MODEL)
+        crisis = CrisisManagerAgent(model=STRONG_MODEL)
+        community.http_client = crisis.http_client = client
+        brand = {"brand_name": "Resto Québec"}
+        started = time.perf_counter()
+        report = {
+            "community_manager": await replay(
+                community,
+                ModelCascade(community, CHEAP_MODEL, min_confidence=args.min_confidence),
+                [{"comment": c[0], "platform": "instagram", "brand_context": brand}
+                 for c in COMMENTS],
+            ),
+            "crisis_manager": await replay(
+                crisis,
+                ModelCascade(crisis, CHEAP_MODEL, min_confidence=args.min_confidence),
+                [{"brand_name": c[0], "mentions": [{"platform": "twitter", "text": t} for t in c[1]]}
+                 for c in CRISES],
+            ),
+        }
+        report["wall_s"] = round(time.perf_counter() - started, 2)
+        report["latency_scale"] = args.latency_scale
+        return report
+    finally:
+        await client.aclose()
+        server.close()
+        await server.wait_closed()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Model cascade replay against a stub")
+    parser.add_argument("--corpus", help="JSONL with comment/sentiment/category/urgency[/difficulty]")
+    parser.add_argument("--min-confidence", type=float, default=0.8)
+    parser.add_argument("--malformed-rate", type=float, default=0.03)
+    parser.add_argument("--latency-scale", type=float, default=1.0,
+                        help="Multiply simulated model latencies (<1 for a quicker run)")
+    parser.add_argument("--stub-port", type=int, default=9101)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    if args.corpus:
+        load_corpus(args.corpus)
+    print(json.dumps(asyncio.run(run(args)), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Cold Start
+==========
+Measures, in fresh interpreters, how long the agents package takes to
+import and to complete a first call against the local LLM stub, and
+enforces a budget for CI.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.cold_start --runs 7
+    # CI: exit 1 if the medians exceed the budget
+    python -m agents.benchmarks.cold_start --check --import-budget-ms 50 --first-call-budget-ms 400
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Any, List
+
+from .llm_stub import LLMStub
+
+# Runs in a fresh interpreter; prints one JSON line of timings
+PROBE = r"""
+import sys, time
+t0 = time.perf_counter()
+# Every agent needs asyncio: timed apart so the agent budget covers our code
+import asyncio
+t_asyncio = time.perf_counter()
+import agents
+t_package = time.perf_counter()
+from agents.registry import get_agent_class
+cls = get_agent_class(sys.argv[1])
+t_agent = time.perf_counter()
+heavy_on_import = sorted(m for m in ("httpx", "numpy", "fastapi") if m in sys.modules)
+other_agents = sorted(
+    m for m in sys.modules
+    if m.startswith("agents.") and m.split(".")[1] in
+    ("community_manager", "seo_aio", "compliance", "trend_scout", "crisis_manager")
+    and m != cls.__module__
+)
+
+import json
+from agents.benchmarks.agent_load import AGENT_REQUESTS
+
+async def first_call():
+    agent = cls()
+    return await agent.run(**AGENT_REQUESTS[sys.argv[1]])
+
+asyncio.run(first_call())
+t_call = time.perf_counter()
+print(json.dumps({
+    "asyncio_import_ms": (t_asyncio - t0) * 1000,
+    "package_import_ms": (t_package - t_asyncio) * 1000,
+    "agent_import_ms": (t_agent - t_asyncio) * 1000,
+    "first_call_ms": (t_call - t0) * 1000,
+    "heavy_on_import": heavy_on_import,
+    "other_agents_imported": other_agents,
+}))
+"""
+
+
+def probe(slug: str, env: Dict[str, str]) -> Dict[str, Any]:
+    output = subprocess.check_output(
+        [sys.executable, "-c", PROBE, slug], env=env, text=True, cwd=os.getcwd()
+    )
+    return json.loads(output.strip().splitlines()[-1])
+
+
+async def measure(args) -> Dict[str, Any]:
+    server = await LLMStub(latency_ms=0).serve(port=args.stub_port)
+    env = dict(os.environ)
+    env.setdefault("OPENROUTER_API_KEY", "stub")
+    env["OPENROUTER_API_URL"] = f"http://127.0.0.1:{args.stub_port}/chat/completions"
+
+    try:
+        runs: List[Dict[str, Any]] = []
+        for _ in range(args.runs):
+            runs.append(await asyncio.to_thread(probe, args.agent, env))
+    finally:
+        server.close()
+        await server.wait_closed()
+
+    def median(key: str) -> float:
+        return round(statistics.median(run[key] for run in runs), 2)
+
+    return {
+        "agent": args.agent,
+        "runs": args.runs,
+        "asyncio_import_ms": median("asyncio_import_ms"),
+        "package_import_ms": median("package_import_ms"),
+        "agent_import_ms": median("agent_import_ms"),
+        "first_call_ms": median("first_call_ms"),
+        "heavy_on_import": runs[-1]["heavy_on_import"],
+        "other_agents_imported": runs[-1]["other_agents_imported"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agents cold-start timings")
+    parser.add_argument("--agent", default="compliance")
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--stub-port", type=int, default=9102)
+    parser.add_argument("--check", action="store_true", help="Exit 1 when over budget")
+    parser.add_argument("--import-budget-ms", type=float, default=50.0,
+                        help="Budget for importing one agent class (asyncio excluded)")
+    parser.add_argument("--first-call-budget-ms", type=float, default=400.0,
+                        help="Budget from interpreter start to the first completed call")
+    args = parser.parse_args()
+
+    report = asyncio.run(measure(args))
+    print(json.dumps(report, indent=2))
+
+    if args.check:
+        failures = []
+        if report["agent_import_ms"] > args.import_budget_ms:
+            failures.append(f"agent import {report['agent_import_ms']}ms > {args.import_budget_ms}ms")
+        if report["first_call_ms"] > args.first_call_budget_ms:
+            failures.append(f"first call {report['first_call_ms']}ms > {args.first_call_budget_ms}ms")
+        if report["heavy_on_import"]:
+            failures.append(f"imported eagerly: {', '.join(report['heavy_on_import'])}")
+        if report["other_agents_imported"]:
+            failures.append(f"other agents imported: {', '.join(report['other_agents_imported'])}")
+        for failure in failures:
+            print(f"OVER BUDGET {failure}", file=sys.stderr)
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
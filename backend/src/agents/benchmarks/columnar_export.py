@@ -0,0 +1,269 @@
+"""
+Columnar Export
+===============
+Bulk CommunityManager results (default 1M) written as JSON lines, Arrow
+IPC and Parquet, reporting per format:
+
+- write throughput (results/sec) and file size
+- time to load the file back and to aggregate it (sentiment counts,
+  mean latency, human escalations)
+- resident memory of all results held as parsed dicts vs the columnar
+  ResultBatchBuilder buffers
+
+Results are cycled from a pool of answers, each row getting its own
+reference number and timestamp (so text does not repeat verbatim); the
+time to generate them is measured once and subtracted from every writer.
+Columnar files are written with ColumnarSink.extend() (bulk), and the
+per-result append() cost is reported with the memory figures. Resident
+memory is read from /proc/self/statm (Linux).
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.columnar_export --rows 1000000
+    # CI: exit 1 if rows do not round-trip or buffers exceed --max-bytes-per-row
+    python -m agents.benchmarks.columnar_export --rows 100000 --check
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Dict, Any, List
+
+from ..columnar import ColumnarSink, ResultBatchBuilder, read_results
+from .compact_schemas import CORPUS
+
+AGENT = "community-manager"
+PLATFORMS = ["instagram", "facebook", "tiktok", "linkedin", "google"]
+MODELS = ["anthropic/claude-3.5-sonnet", "openai/gpt-4o-mini", "meta-llama/llama-3.1-70b-instruct"]
+
+
+def result_pool(size: int, seed: int) -> List[Dict[str, Any]]:
+    """Distinct CommunityManager results with per-call metadata."""
+    rng = random.Random(seed)
+    answers = CORPUS[AGENT]
+    pool = []
+    for i in range(size):
+        answer = answers[i % len(answers)]
+        pool.append(dict(
+            answer,
+            platform=rng.choice(PLATFORMS),
+            model_used=rng.choice(MODELS),
+            cost=round(rng.uniform(0.0005, 0.006), 6),
+            tokens=rng.randint(300, 900),
+            latency_ms=rng.randint(400, 4000),
+        ))
+    return pool
+
+
+def _results(pool: List[Dict[str, Any]], rows: int):
+    size = len(pool)
+    for i in range(rows):
+        result = pool[i % size]
+        yield dict(
+            result,
+            suggested_response=f"{result['suggested_response']} (réf. {i:07d})",
+            created_at=1_760_000_000_000 + i * 1000,
+        )
+
+
+def generate(pool, rows: int) -> float:
+    start = time.perf_counter()
+    for _ in _results(pool, rows):
+        pass
+    return time.perf_counter() - start
+
+
+def _rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def write_jsonl(path: str, pool, rows: int) -> float:
+    start = time.perf_counter()
+    with open(path, "w", encoding="utf-8") as f:
+        for result in _results(pool, rows):
+            f.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return time.perf_counter() - start
+
+
+def write_columnar(path: str, pool, rows: int, batch_size: int) -> float:
+    start = time.perf_counter()
+    with ColumnarSink(AGENT, path, batch_size=batch_size) as sink:
+        sink.extend(_results(pool, rows))
+    return time.perf_counter() - start
+
+
+def aggregate_dicts(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    sentiments = Counter(r["sentiment"] for r in results)
+    return {
+        "sentiment": dict(sentiments),
+        "mean_latency_ms": round(sum(r["latency_ms"] for r in results) / len(results), 1),
+        "requires_human": sum(r["requires_human"] for r in results),
+    }
+
+
+def aggregate_table(table) -> Dict[str, Any]:
+    import pyarrow.compute as pc
+
+    counts = pc.value_counts(table["sentiment"].combine_chunks().dictionary_decode())
+    return {
+        "sentiment": {c["values"].as_py(): c["counts"].as_py() for c in counts},
+        "mean_latency_ms": round(pc.mean(table["latency_ms"]).as_py(), 1),
+        "requires_human": pc.sum(table["requires_human"]).as_py(),
+    }
+
+
+def read_columnar(path: str) -> Dict[str, Any]:
+    rss = _rss_mb()
+    start = time.perf_counter()
+    table = read_results(path)
+    load_s = time.perf_counter() - start
+    start = time.perf_counter()
+    totals = aggregate_table(table)
+    aggregate_s = time.perf_counter() - start
+    rss_delta = _rss_mb() - rss
+    return {
+        "load_s": round(load_s, 3),
+        "aggregate_s": round(aggregate_s, 3),
+        "rss_delta_mb": round(rss_delta, 1),
+        "totals": totals,
+    }
+
+
+def round_trips(path: str, pool, rows: int) -> bool:
+    """The first rows read back equal the submitted results."""
+    sample = min(rows, 1000)
+    table = read_results(path).slice(0, sample)
+    for got, expected in zip(table.to_pylist(), _results(pool, sample)):
+        got["created_at"] = int(got["created_at"].timestamp() * 1000)
+        if any(got[key] != expected[key] for key in got):
+            return False
+    return True
+
+
+def builder_memory(pool, rows: int, generate_s: float) -> Dict[str, Any]:
+    gc.collect()
+    rss = _rss_mb()
+    builder = ResultBatchBuilder(AGENT)
+    start = time.perf_counter()
+    for result in _results(pool, rows):
+        builder.append(result)
+    append_s = time.perf_counter() - start
+    nbytes = builder.nbytes
+    rss_delta = _rss_mb() - rss
+    start = time.perf_counter()
+    batch = builder.to_batch()
+    to_batch_s = time.perf_counter() - start
+    report = {
+        "buffer_mb": round(nbytes / 2**20, 1),
+        "rss_delta_mb": round(rss_delta, 1),
+        "bytes_per_result": round(nbytes / rows, 1),
+        "append_us": round((append_s - generate_s) / rows * 1e6, 2),
+        "to_batch_s": round(to_batch_s, 3),
+        "record_batch_mb": round(batch.nbytes / 2**20, 1),
+    }
+    del builder, batch
+    return report
+
+
+def dict_memory(path: str, rows: int) -> Dict[str, Any]:
+    """Load the JSON lines file: every result as a parsed dict."""
+    gc.collect()
+    rss = _rss_mb()
+    start = time.perf_counter()
+    with open(path, encoding="utf-8") as f:
+        results = [json.loads(line) for line in f]
+    load_s = time.perf_counter() - start
+    rss_delta = _rss_mb() - rss
+    start = time.perf_counter()
+    totals = aggregate_dicts(results)
+    aggregate_s = time.perf_counter() - start
+    del results
+    return {
+        "load_s": round(load_s, 3),
+        "aggregate_s": round(aggregate_s, 3),
+        "rss_delta_mb": round(rss_delta, 1),
+        "bytes_per_result": round(rss_delta * 2**20 / rows, 1),
+        "totals": totals,
+    }
+
+
+def run(args, directory: str) -> Dict[str, Any]:
+    pool = result_pool(args.pool, args.seed)
+    paths = {
+        "jsonl": os.path.join(directory, f"{AGENT}.jsonl"),
+        "arrow": os.path.join(directory, f"{AGENT}.arrow"),
+        "parquet": os.path.join(directory, f"{AGENT}.parquet"),
+    }
+    writes = {
+        "jsonl": write_jsonl(paths["jsonl"], pool, args.rows),
+        "arrow": write_columnar(paths["arrow"], pool, args.rows, args.batch_size),
+        "parquet": write_columnar(paths["parquet"], pool, args.rows, args.batch_size),
+    }
+    generate_s = generate(pool, args.rows)
+    report: Dict[str, Any] = {"rows": args.rows, "generate_s": round(generate_s, 2), "formats": {}}
+    for fmt, seconds in writes.items():
+        seconds -= generate_s
+        report["formats"][fmt] = {
+            "write_s": round(seconds, 2),
+            "results_per_sec": round(args.rows / seconds),
+            "file_mb": round(os.path.getsize(paths[fmt]) / 2**20, 1),
+        }
+
+    # Columnar reads first: freed dicts would inflate the baselines after
+    report["formats"]["arrow"]["read"] = read_columnar(paths["arrow"])
+    report["formats"]["parquet"]["read"] = read_columnar(paths["parquet"])
+    report["round_trip"] = round_trips(paths["arrow"], pool, args.rows) and \
+        round_trips(paths["parquet"], pool, args.rows)
+    report["memory"] = {"columnar": builder_memory(pool, args.rows, generate_s)}
+    jsonl = dict_memory(paths["jsonl"], args.rows)
+    report["formats"]["jsonl"]["read"] = {k: jsonl[k] for k in ("load_s", "aggregate_s", "totals")}
+    report["memory"]["dicts"] = {k: jsonl[k] for k in ("rss_delta_mb", "bytes_per_result")}
+    report["totals_match"] = (
+        report["formats"]["arrow"]["read"]["totals"] == report["formats"]["jsonl"]["read"]["totals"]
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Arrow/Parquet export vs JSON lines")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--pool", type=int, default=10_000, help="Distinct results cycled through")
+    parser.add_argument("--batch-size", type=int, default=65536)
+    parser.add_argument("--dir", default=None, help="Keep the files here (default: temp dir)")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--max-bytes-per-row", type=float, default=256.0,
+                        help="Columnar buffer budget per result")
+    args = parser.parse_args()
+
+    if args.dir:
+        os.makedirs(args.dir, exist_ok=True)
+        report = run(args, args.dir)
+    else:
+        with tempfile.TemporaryDirectory() as directory:
+            report = run(args, directory)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+    if args.check:
+        per_row = report["memory"]["columnar"]["bytes_per_result"]
+        if not (report["round_trip"] and report["totals_match"]):
+            print("COLUMNAR EXPORT DIFFERS FROM THE SUBMITTED RESULTS", file=sys.stderr)
+            sys.exit(1)
+        if per_row > args.max_bytes_per_row:
+            print(f"OVER BUDGET {per_row} > {args.max_bytes_per_row} bytes/result", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""
+Compact Schema Savings
+======================
+Replays a corpus of complete agent answers through each agent twice, with
+the verbose format and with `compact_output`, against a local stub that
+generates at a fixed tokens/sec, and reports per agent:
+
+- completion tokens (approximate BPE count) and bytes of each wire format
+- end-to-end latency of run() in both modes
+- whether the compact run returns exactly the verbose run's output
+
+Verbose answers are emitted pretty-printed, the way models echo the
+prompt's multi-line format (`--verbose-style line` for single-line JSON).
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.compact_schemas --tokens-per-sec 60 --latency-ms 300
+    # CI: exit 1 if any compact answer expands to a different output
+    python -m agents.benchmarks.compact_schemas --check
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, Any, List
+
+import httpx
+
+from ..registry import create_agent
+from .agent_load import AGENT_REQUESTS
+from .llm_stub import COMPACT_MARKER, AGENT_MARKERS, LLMStub, compact_answer
+
+_PIECES = re.compile(r"[^\W\d_]+|\d+|[^\w\s]+|\s+")
+
+# Per-call metadata added by run(), not part of the model's answer
+METADATA = {"model_used", "cost", "tokens", "latency_ms", "platform", "language",
+            "content_type", "target_regions", "industry", "timeframe", "brand_name",
+            "mentions_analyzed", "monitoring_period"}
+
+CORPUS: Dict[str, List[Dict[str, Any]]] = {
+    "community-manager": [
+        {"sentiment": "neutral", "category": "question", "urgency": "low",
+         "suggested_response": "Bonjour! Oui, nous livrons à Lévis du mardi au dimanche, dès 11h. 🚚",
+         "requires_human": False, "tags": ["livraison"], "internal_notes": ""},
+        {"sentiment": "negative", "category": "complaint", "urgency": "high",
+         "suggested_response": "Nous sommes vraiment désolés pour cette attente. Pouvez-vous nous "
+                               "écrire en privé avec votre numéro de commande? Nous réglons ça "
+                               "aujourd'hui.",
+         "requires_human": True, "tags": ["retard", "remboursement"],
+         "internal_notes": "Client en attente de remboursement depuis 2 semaines"},
+        {"sentiment": "positive", "category": "compliment", "urgency": "low",
+         "suggested_response": "Merci mille fois! Toute l'équipe est ravie. À bientôt! ❤️",
+         "requires_human": False, "tags": [], "internal_notes": ""},
+    ],
+    "seo-aio": [
+        {
+            "seo": {
+                "primary_keywords": ["marketing IA", "automatisation marketing"],
+                "secondary_keywords": ["PME Québec", "outils IA"],
+                "meta_title": "Marketing IA pour PME: guide complet 2025",
+                "meta_description": "Découvrez comment l'IA automatise le marketing des PME "
+                                    "québécoises: outils, étapes et résultats mesurables.",
+                "url_slug": "marketing-ia-pme-guide",
+                "h1": "Marketing IA pour PME: le guide complet",
+                "h2_structure": ["Pourquoi l'IA change le marketing", "Par où commencer",
+                                 "Outils recommandés", "Mesurer les résultats"],
+                "internal_links": [{"anchor": "automatisation", "target": "/automatisation"},
+                                   {"anchor": "étude de cas", "target": "/cas/resto-quebec"}],
+                "image_alt_texts": ["Tableau de bord marketing IA", "Équipe PME au travail"],
+            },
+            "aio": {
+                "citation_ready_facts": [
+                    {"fact": "72% des PME canadiennes prévoient adopter l'IA d'ici 2026.",
+                     "source": "BDC", "date": "2024-10-01"},
+                ],
+                "qa_pairs": [
+                    {"question": "L'IA est-elle utile aux PME?",
+                     "answer": "Oui: elle automatise la création et la planification de contenu."},
+                    {"question": "Combien coûte un outil de marketing IA?",
+                     "answer": "De 20 $ à 500 $ par mois selon le volume."},
+                ],
+                "entities": {"people": [], "organizations": ["BDC", "AstroMedia"],
+                             "locations": ["Québec"]},
+                "factual_accuracy_score": 92,
+                "authority_signals": {"experience": "Études de cas clients",
+                                      "expertise": "Auteur spécialiste marketing",
+                                      "authoritativeness": "Citations BDC",
+                                      "trustworthiness": "Sources datées"},
+                "schema_suggestions": [{"type": "Article", "properties": {
+                    "headline": "Marketing IA pour PME", "author": "AstroMedia",
+                    "datePublished": "2025-01-15"}}],
+            },
+            "voice_search_optimization": ["Comment utiliser l'IA en marketing?",
+                                          "Quel outil IA pour une PME?"],
+            "featured_snippet_target": "L'IA aide les PME à automatiser la création, la "
+                                       "diffusion et l'analyse de leur contenu marketing.",
+            "overall_score": 86,
+            "recommendations": ["Ajouter des sources datées", "Ajouter une FAQ structurée"],
+        },
+    ],
+    "compliance": [
+        {"compliance_status": "compliant", "overall_risk": "low",
+         "checks_performed": ["CASL", "RGPD", "Copyright", "FTC"], "violations": [],
+         "required_mentions": [], "safe_to_publish": True, "corrected_version": ""},
+        {"compliance_status": "major_issues", "overall_risk": "high",
+         "checks_performed": ["CASL", "RGPD", "Copyright", "FTC"],
+         "violations": [
+             {"severity": "critical", "law": "CASL", "issue": "Aucun lien de désabonnement",
+              "article": "Art. 11", "recommendation": "Ajouter un lien de désabonnement visible",
+              "risk": "Amende jusqu'à 10 M$"},
+             {"severity": "minor", "law": "FTC", "issue": "Partenariat non divulgué",
+              "article": "16 CFR 255", "recommendation": "Ajouter #partenariat",
+              "risk": "Avertissement"},
+         ],
+         "required_mentions": ["Lien de désabonnement", "Adresse postale de l'expéditeur"],
+         "safe_to_publish": False,
+         "corrected_version": "Profitez de 20% sur votre prochaine commande! "
+                              "[Se désabonner] — Resto Québec, 123 rue Saint-Jean, Québec"},
+    ],
+    "trend-scout": [
+        {
+            "trends": [
+                {"title": "Recherche conversationnelle", "description": "Les requêtes vocales "
+                 "en français progressent fortement", "source": "google_trends",
+                 "hashtags": ["#IA", "#SEO"], "virality_score": 78, "velocity": "1200/h",
+                 "volume": "45K", "engagement_rate": "6.2%", "durability": "long-term",
+                 "relevance_score": 82,
+                 "opportunity": {"angle": "Guide pratique pour PME", "format": "carousel",
+                                 "timing": "this_week", "estimated_reach": "100K",
+                                 "difficulty": "easy"},
+                 "risks": [], "examples": []},
+                {"title": "Défi #PoutineChallenge", "description": "Vidéos de recettes revisitées",
+                 "source": "tiktok", "hashtags": ["#PoutineChallenge"], "virality_score": 91,
+                 "velocity": "8000/h", "volume": "1.2M", "engagement_rate": "11%",
+                 "durability": "ephemeral", "relevance_score": 74,
+                 "opportunity": {"angle": "Version signature du chef", "format": "video",
+                                 "timing": "now", "estimated_reach": "1M+",
+                                 "difficulty": "medium"},
+                 "risks": ["Saturation rapide"], "examples": []},
+            ],
+            "top_recommendation": {"trend_index": 1, "reasoning": "Fenêtre courte mais forte"},
+            "industry_insights": "La restauration locale capte l'attention sur TikTok",
+            "competitive_analysis": "Deux concurrents déjà présents sur la tendance",
+        },
+    ],
+    "crisis-manager": [
+        {"crisis_detected": False, "crisis_score": 18, "severity": "normal",
+         "crisis_type": "other",
+         "sentiment_analysis": {"positive": 45, "neutral": 42, "negative": 13, "trend": "stable"},
+         "key_issues": [], "amplifiers": [], "recommended_actions": [], "statement_draft": "",
+         "escalation_required": False,
+         "estimated_impact": {"reputation_damage": "low", "financial_risk": "low",
+                              "recovery_time": "days"},
+         "monitoring_plan": {"frequency": "daily", "platforms": ["twitter", "instagram"],
+                             "keywords": ["resto québec"]}},
+        {"crisis_detected": True, "crisis_score": 88, "severity": "crisis",
+         "crisis_type": "product",
+         "sentiment_analysis": {"positive": 5, "neutral": 15, "negative": 80, "trend": "worsening"},
+         "key_issues": ["Vidéo d'un rongeur en cuisine", "Appel au boycott"],
+         "amplifiers": [{"type": "influencer", "name": "@foodiemtl", "reach": "250K",
+                         "sentiment": "negative"},
+                        {"type": "hashtag", "name": "#BoycottResto", "reach": "1.1M",
+                         "sentiment": "negative"}],
+         "recommended_actions": [
+             {"priority": "immediate", "action": "Publier une déclaration", "owner": "pr",
+              "deadline": "1h"},
+             {"priority": "immediate", "action": "Inspection sanitaire indépendante",
+              "owner": "ceo", "deadline": "24h"},
+             {"priority": "high", "action": "Vérifier l'exposition légale", "owner": "legal",
+              "deadline": "48h"},
+         ],
+         "statement_draft": "Nous avons vu la vidéo et fermons la cuisine dès maintenant pour une "
+                            "inspection complète. Votre santé passe avant tout.",
+         "escalation_required": True,
+         "estimated_impact": {"reputation_damage": "severe", "financial_risk": "high",
+                              "recovery_time": "months"},
+         "monitoring_plan": {"frequency": "15min", "platforms": ["twitter", "tiktok"],
+                             "keywords": ["resto québec", "#BoycottResto"]}},
+    ],
+}
+
+
+def approx_tokens(text: str) -> int:
+    """Approximate BPE token count: short words and punctuation runs ~1 token."""
+    return sum(
+        max(1, (len(piece) + 3) // 4) if piece[0].isalpha() else
+        (len(piece) + 2) // 3 if piece[0].isdigit() else
+        0 if piece.isspace() and len(piece) == 1 else 1
+        for piece in _PIECES.findall(text)
+    )
+
+
+def wire_formats(slug: str, answer: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "verbose_pretty": json.dumps(answer, ensure_ascii=False, indent=2),
+        "verbose_line": json.dumps(answer, ensure_ascii=False),
+        "compact": json.dumps(compact_answer(slug, answer), ensure_ascii=False,
+                              separators=(",", ":")),
+    }
+
+
+class CorpusStub(LLMStub):
+    """LLMStub answering with the current corpus item and counting approx tokens."""
+
+    def __init__(self, verbose_style: str, **kwargs):
+        super().__init__(**kwargs)
+        self.verbose_style = verbose_style
+        self.answer: Dict[str, Any] = {}
+
+    def agent_answer(self, slug: str, messages: List[Dict[str, str]]) -> Any:
+        return self.answer
+
+    def agent_content(self, messages: List[Dict[str, str]]) -> str:
+        system = messages[0]["content"]
+        slug = next(s for marker, s in AGENT_MARKERS.items() if marker in system)
+        formats = wire_formats(slug, self.answer)
+        if COMPACT_MARKER in system:
+            return formats["compact"]
+        return formats["verbose_pretty" if self.verbose_style == "pretty" else "verbose_line"]
+
+    def completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        body = super().completion(payload)
+        usage = body["usage"]
+        usage["completion_tokens"] = approx_tokens(body["choices"][0]["message"]["content"])
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        return body
+
+
+def _strip(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in result.items() if k not in METADATA}
+
+
+async def run(args) -> Dict[str, Any]:
+    stub = CorpusStub(args.verbose_style, latency_ms=args.latency_ms,
+                      tokens_per_sec=args.tokens_per_sec)
+    server = await stub.serve(port=args.stub_port)
+    os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{args.stub_port}/chat/completions"
+
+    report: Dict[str, Any] = {"tokens_per_sec": args.tokens_per_sec,
+                              "verbose_style": args.verbose_style, "agents": {}}
+    client = httpx.AsyncClient(timeout=60.0)
+    try:
+        for slug, answers in CORPUS.items():
+            agent = create_agent(slug)
+            agent.http_client = client
+            sizes = {"verbose_pretty": [0, 0], "verbose_line": [0, 0], "compact": [0, 0]}
+            latency = {"verbose": 0.0, "compact": 0.0}
+            identical = True
+            for answer in answers:
+                for name, text in wire_formats(slug, answer).items():
+                    sizes[name][0] += approx_tokens(text)
+                    sizes[name][1] += len(text.encode())
+
+                stub.answer = answer
+                results = {}
+                for mode in ("verbose", "compact"):
+                    agent.compact_output = mode == "compact"
+                    started = time.perf_counter()
+                    results[mode] = await agent.run(**AGENT_REQUESTS[slug])
+                    latency[mode] += (time.perf_counter() - started) * 1000
+                identical &= _strip(results["verbose"]) == _strip(results["compact"])
+
+            n = len(answers)
+            verbose_key = "verbose_pretty" if args.verbose_style == "pretty" else "verbose_line"
+            report["agents"][slug] = {
+                "answers": n,
+                "completion_tokens": {name: round(t / n) for name, (t, _) in sizes.items()},
+                "bytes": {name: round(b / n) for name, (_, b) in sizes.items()},
+                "token_reduction_pct": round(
+                    (1 - sizes["compact"][0] / sizes[verbose_key][0]) * 100, 1),
+                "latency_ms": {mode: round(ms / n, 1) for mode, ms in latency.items()},
+                "latency_reduction_pct": round(
+                    (1 - latency["compact"] / latency["verbose"]) * 100, 1),
+                "identical_output": identical,
+                "instruction_prompt_tokens": approx_tokens(agent.COMPACT_SCHEMA.instruction()),
+            }
+    finally:
+        await client.aclose()
+        server.close()
+        await server.wait_closed()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compact vs verbose response formats")
+    parser.add_argument("--tokens-per-sec", type=float, default=60.0)
+    parser.add_argument("--latency-ms", type=float, default=300.0,
+                        help="Time to first token")
+    parser.add_argument("--verbose-style", choices=("pretty", "line"), default="pretty")
+    parser.add_argument("--stub-port", type=int, default=9103)
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 if compact and verbose outputs differ")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+    mismatched = [slug for slug, r in report["agents"].items() if not r["identical_output"]]
+    if args.check and mismatched:
+        print(f"COMPACT OUTPUT MISMATCH: {', '.join(mismatched)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,362 @@
+"""
+LLM Stub Server
+===============
+Minimal OpenAI/OpenRouter-compatible chat completions server for benchmarks.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.llm_stub --port 9100 --latency-ms 50
+    python -m agents.benchmarks.llm_stub --latency-dist lognormal --latency-ms 300 \\
+        --tokens-per-sec 80 --error-rate 0.02 --malformed-rate 0.01
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import random
+from http import HTTPStatus
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTENT = {
+    "sentiment": "neutral",
+    "category": "question",
+    "urgency": "low",
+    "suggested_response": "Merci pour votre message!",
+    "requires_human": False,
+    "tags": ["stub"],
+    "internal_notes": "",
+}
+
+# Canned answers keyed by agent slug, matching each agent's output format
+AGENT_CONTENT = {
+    "community-manager": DEFAULT_CONTENT,
+    "seo-aio": {
+        "seo": {
+            "primary_keywords": ["marketing IA", "automatisation"],
+            "secondary_keywords": ["PME Québec"],
+            "meta_title": "Marketing IA pour PME: guide complet 2025",
+            "meta_description": "Découvrez comment l'IA automatise le marketing des PME québécoises.",
+            "url_slug": "marketing-ia-pme",
+            "h1": "Marketing IA pour PME",
+            "h2_structure": ["Pourquoi l'IA", "Par où commencer", "Résultats"],
+            "internal_links": [{"anchor": "automatisation", "target": "/automatisation"}],
+            "image_alt_texts": ["Tableau de bord marketing IA"],
+        },
+        "aio": {
+            "citation_ready_facts": [],
+            "qa_pairs": [{"question": "L'IA est-elle utile aux PME?", "answer": "Oui."}],
+            "entities": {"people": [], "organizations": ["AstroMedia"], "locations": ["Québec"]},
+            "factual_accuracy_score": 90,
+        },
+        "voice_search_optimization": ["Comment utiliser l'IA en marketing?"],
+        "featured_snippet_target": "L'IA automatise la création et la diffusion de contenu.",
+        "overall_score": 85,
+        "recommendations": ["Ajouter des sources datées"],
+    },
+    "compliance": {
+        "compliance_status": "compliant",
+        "overall_risk": "low",
+        "checks_performed": ["CASL", "RGPD", "Copyright", "FTC"],
+        "violations": [],
+        "required_mentions": [],
+        "safe_to_publish": True,
+        "corrected_version": "",
+    },
+    "trend-scout": {
+        "trends": [{
+            "title": "Recherche conversationnelle",
+            "description": "Les requêtes vocales progressent",
+            "source": "google_trends",
+            "hashtags": ["#IA"],
+            "virality_score": 78,
+            "relevance_score": 82,
+            "opportunity": {"angle": "Guide pratique", "format": "carousel",
+                            "timing": "today", "estimated_reach": "100K",
+                            "difficulty": "easy"},
+            "risks": [],
+        }],
+        "top_recommendation": {"trend_index": 0, "reasoning": "Forte pertinence"},
+        "industry_insights": "Adoption rapide de l'IA",
+        "competitive_analysis": "Peu de concurrents positionnés",
+    },
+    "crisis-manager": {
+        "crisis_detected": False,
+        "crisis_score": 22,
+        "severity": "normal",
+        "crisis_type": "other",
+        "sentiment_analysis": {"positive": 40, "neutral": 45, "negative": 15, "trend": "stable"},
+        "key_issues": [],
+        "amplifiers": [],
+        "recommended_actions": [],
+        "statement_draft": "",
+        "escalation_required": False,
+    },
+}
+
+# System prompt fragment identifying each agent
+AGENT_MARKERS = {
+    "Community Manager AI": "community-manager",
+    "AI Overview Optimization": "seo-aio",
+    "Agent Compliance": "compliance",
+    "Trend Scout": "trend-scout",
+    "Crisis Manager": "crisis-manager",
+}
+
+# Heading of schemas.CompactSchema.instruction(): answer in the compact format
+COMPACT_MARKER = "# FORMAT COMPACT"
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+def compact_answer(slug: str, answer: Any) -> Any:
+    """What a model following the agent's COMPACT_SCHEMA would emit."""
+    from ..registry import get_agent_class
+
+    schema = get_agent_class(slug).COMPACT_SCHEMA
+    if isinstance(answer, dict) and "audits" in answer:
+        return {"audits": [schema.compact(audit) for audit in answer["audits"]]}
+    return schema.compact(answer)
+
+
+class LLMStub:
+    """
+    Tiny HTTP/1.1 keep-alive server answering /chat/completions.
+
+    Features:
+    - Latency drawn from a fixed, uniform, exponential or lognormal
+      distribution (`latency_ms` is the median)
+    - Optional generation time at `tokens_per_sec` completion tokens/sec
+    - Error injection: HTTP errors (`error_statuses`) and malformed JSON
+      content, each at its own rate
+    - Canned per-agent JSON, recognised from the system prompt (including
+      the compliance agent's batched {"audits": [...]} requests)
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        content: Optional[Dict[str, Any]] = None,
+        latency_dist: str = "fixed",
+        latency_sigma: float = 0.5,
+        tokens_per_sec: float = 0.0,
+        error_rate: float = 0.0,
+        error_statuses: Tuple[int, ...] = (429, 500, 503),
+        malformed_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        if latency_dist not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_dist must be one of {LATENCY_DISTRIBUTIONS}")
+
+        self.latency = latency_ms / 1000
+        self.content = json.dumps(content) if content else None
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.error_statuses = tuple(error_statuses)
+        self.malformed_rate = malformed_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+
+    def sample_latency(self) -> float:
+        """Draw one upstream latency in seconds."""
+        if self.latency <= 0 or self.latency_dist == "fixed":
+            return self.latency
+        if self.latency_dist == "uniform":
+            return self.random.uniform(0.5 * self.latency, 1.5 * self.latency)
+        if self.latency_dist == "exponential":
+            return self.random.expovariate(1 / self.latency)
+        return self.random.lognormvariate(math.log(self.latency), self.latency_sigma)
+
+    def agent_content(self, messages: List[Dict[str, str]]) -> str:
+        """Canned JSON content for the agent that sent `messages`."""
+        if self.content is not None:
+            return self.content
+
+        system = messages[0].get("content", "") if messages else ""
+        slug = next(
+            (slug for marker, slug in AGENT_MARKERS.items() if marker in system),
+            "community-manager",
+        )
+        answer = self.agent_answer(slug, messages)
+
+        if COMPACT_MARKER in system:
+            return json.dumps(compact_answer(slug, answer), ensure_ascii=False, separators=(",", ":"))
+        return json.dumps(answer, ensure_ascii=False)
+
+    def agent_answer(self, slug: str, messages: List[Dict[str, str]]) -> Any:
+        """Verbose answer object for `slug` (overridden by corpus-driven stubs)."""
+        user = messages[-1].get("content", "") if messages else ""
+        if slug == "compliance" and '{"audits"' in user:
+            return {"audits": [AGENT_CONTENT["compliance"]] * user.count("=== CONTENU #")}
+        return AGENT_CONTENT[slug]
+
+    def completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the chat completion body for a request payload."""
+        messages = payload.get("messages", [])
+        content = self.agent_content(messages)
+        prompt_tokens = sum(len(m.get("content", "")) for m in messages) // 4 or 400
+        completion_tokens = len(content) // 4
+        return {
+            "id": f"stub-{self.requests}",
+            "object": "chat.completion",
+            "model": payload.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    async def respond(self, payload: Dict[str, Any]):
+        """Return (status, body) for a request; overridden by richer stubs."""
+        delay = self.sample_latency()
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            await asyncio.sleep(delay)
+            status = self.random.choice(self.error_statuses)
+            return status, {"error": {"message": "injected error", "code": status}}
+
+        body = self.completion(payload)
+        if self.tokens_per_sec:
+            delay += body["usage"]["completion_tokens"] / self.tokens_per_sec
+        if self.malformed_rate and self.random.random() < self.malformed_rate:
+            body["choices"][0]["message"]["content"] = "Voici l'analyse demandée: {incomplet"
+
+        await asyncio.sleep(delay)
+        return 200, body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                body = await reader.readexactly(length) if length else b"{}"
+
+                self.requests += 1
+                status, data = await self.respond(json.loads(body or b"{}"))
+                self.statuses[status] = self.statuses.get(status, 0) + 1
+                encoded = json.dumps(data).encode()
+                retry_after = "Retry-After: 1\r\n" if status == 429 else ""
+                writer.write(
+                    f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+                    f"Content-Type: application/json\r\n{retry_after}"
+                    f"Content-Length: {len(encoded)}\r\n\r\n".encode() + encoded
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 9100,
+        reuse_port: bool = False
+    ) -> asyncio.AbstractServer:
+        """Start listening and return the server."""
+        server = await asyncio.start_server(
+            self._handle, host, port, backlog=4096, reuse_port=reuse_port
+        )
+        logger.info(f"[LLMStub] Listening on http://{host}:{port}")
+        return server
+
+
+def _serve_forever(host: str, port: int, reuse_port: bool, options: Dict[str, Any]) -> None:
+    async def run() -> None:
+        server = await LLMStub(**options).serve(host, port, reuse_port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(run())
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """Register the stub's behaviour flags (shared with load generators)."""
+    parser.add_argument("--latency-ms", type=float, default=50.0,
+                        help="Median upstream latency")
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+    parser.add_argument("--latency-sigma", type=float, default=0.5,
+                        help="Lognormal shape (spread of the tail)")
+    parser.add_argument("--tokens-per-sec", type=float, default=0.0,
+                        help="Simulated generation speed (0 = instant)")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-statuses", type=int, nargs="+", default=[429, 500, 503])
+    parser.add_argument("--malformed-rate", type=float, default=0.0,
+                        help="Fraction of 200 answers with unparseable content")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+def stub_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """LLMStub keyword arguments from parsed stub flags."""
+    return {
+        "latency_ms": args.latency_ms,
+        "latency_dist": args.latency_dist,
+        "latency_sigma": args.latency_sigma,
+        "tokens_per_sec": args.tokens_per_sec,
+        "error_rate": args.error_rate,
+        "error_statuses": tuple(args.error_statuses),
+        "malformed_rate": args.malformed_rate,
+        "seed": args.seed,
+    }
+
+
+def stub_argv(args: argparse.Namespace) -> List[str]:
+    """Command-line flags reproducing `args` for a stub subprocess."""
+    argv = []
+    for key, value in stub_options(args).items():
+        if value is None:
+            continue
+        flag = "--" + key.replace("_", "-")
+        if key == "error_statuses":
+            argv += [flag, *map(str, value)]
+        else:
+            argv += [flag, str(value)]
+    return argv
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local chat completions stub")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Serve from N processes sharing the port (SO_REUSEPORT)")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    options = stub_options(args)
+    if args.processes <= 1:
+        _serve_forever(args.host, args.port, False, options)
+        return
+
+    processes = [
+        multiprocessing.Process(
+            target=_serve_forever,
+            args=(args.host, args.port, True, options),
+        )
+        for _ in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
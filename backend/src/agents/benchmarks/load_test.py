@@ -0,0 +1,182 @@
+"""
+Agents API Load Test
+====================
+Drives the agents service against a local LLM stub at several concurrency
+levels and reports requests/sec and latency percentiles.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.load_test --concurrency 1 8 32 128
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Any, List
+import httpx
+
+COMMUNITY_REQUEST = {
+    "comment": "Est-ce que vous livrez à Québec?",
+    "platform": "instagram",
+    "brand_context": {"brand_name": "Resto Québec", "tone": "chaleureux"},
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an unsorted list."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+async def wait_ready(url: str, timeout: float = 20.0) -> None:
+    """Poll a URL until it answers."""
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(url)
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} did not become ready")
+
+
+class KeepAliveClient:
+    """
+    Minimal HTTP/1.1 client holding one keep-alive connection.
+
+    httpx's pool does per-request bookkeeping proportional to pool size,
+    which dominates CPU at high concurrency; the load generator uses one
+    raw connection per worker so it measures the service, not itself.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def post(self, path: str, body: bytes):
+        """POST a JSON body and return (status, response body)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.split(b"\r\n")
+        status = int(lines[0].split()[1])
+        length = 0
+        for line in lines[1:]:
+            if line.lower().startswith(b"content-length:"):
+                length = int(line.split(b":", 1)[1])
+        return status, await self.reader.readexactly(length)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def run_level(
+    base_url: str,
+    path: str,
+    body: Dict[str, Any],
+    concurrency: int,
+    requests: int
+) -> Dict[str, Any]:
+    """Send `requests` requests with `concurrency` keep-alive workers."""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    remaining = requests
+    encoded = json.dumps(body).encode()
+    url = httpx.URL(base_url)
+
+    async def worker() -> None:
+        nonlocal remaining
+        client = KeepAliveClient(url.host, url.port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                start = time.perf_counter()
+                status, _ = await client.post(path, encoded)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "statuses": statuses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Agents API load test")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--api-port", type=int, default=8001)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("OPENROUTER_API_KEY", "stub")
+    env["OPENROUTER_API_URL"] = f"http://127.0.0.1:{args.stub_port}/chat/completions"
+
+    stub = subprocess.Popen([
+        sys.executable, "-m", "agents.benchmarks.llm_stub",
+        "--port", str(args.stub_port), "--latency-ms", str(args.stub_latency_ms),
+    ], env=env)
+    api = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "agents.api:app",
+        "--port", str(args.api_port), "--log-level", "warning", "--no-access-log",
+    ], env=env)
+
+    try:
+        base_url = f"http://127.0.0.1:{args.api_port}"
+        asyncio.run(wait_ready(f"{base_url}/health"))
+
+        results = []
+        for concurrency in args.concurrency:
+            result = asyncio.run(run_level(
+                base_url, "/agents/community-manager", COMMUNITY_REQUEST,
+                concurrency, args.requests
+            ))
+            results.append(result)
+            if not args.json:
+                print(
+                    f"c={result['concurrency']:<4} rps={result['rps']:<8} "
+                    f"p50={result['p50_ms']}ms p99={result['p99_ms']}ms "
+                    f"statuses={result['statuses']}"
+                )
+
+        if args.json:
+            print(json.dumps({"stub_latency_ms": args.stub_latency_ms, "levels": results}))
+    finally:
+        api.terminate()
+        stub.terminate()
+        api.wait()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
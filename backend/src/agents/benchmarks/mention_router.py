@@ -0,0 +1,139 @@
+"""
+Mention Router Throughput
+=========================
+Registers thousands of synthetic brands in a MentionRouter, streams a
+synthetic firehose through it on one core and reports mentions/sec, match
+accuracy on planted mentions, relink cost and scheduling cost.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.mention_router --brands 10000 --mentions 300000
+    # CI: exit 1 below the target rate
+    python -m agents.benchmarks.mention_router --check --min-rate 50000
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import Dict, Any, List, Tuple
+
+from ..mentions import MentionRouter
+
+SYLLABLES = ["ma", "to", "ri", "ka", "lu", "be", "no", "sa", "vi", "do", "re", "zu", "po", "la",
+             "mi", "ko", "ta", "ne", "gu", "fe", "xo", "qui", "bri", "tra", "plo", "stu", "vex"]
+SUFFIXES = ["", "", "", " Café", " Sport", " Tech", " Bistro", " Studio", " & Fils", " Inc"]
+WORDS = ("le la les un une des et à de du en pour avec sur dans pas très trop vraiment "
+         "service commande livraison retard prix qualité client merci bravo honte nul super "
+         "génial horrible attente remboursement produit magasin site appli bug panne "
+         "the a of and to in is it for on with this that was very so my our your love hate "
+         "order delivery price quality customer store app broken great awful waiting refund "
+         "today yesterday again never always still finally maybe really just like want need").split()
+
+
+def _name(rng: random.Random) -> str:
+    syllables = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+    return syllables.capitalize() + rng.choice(SUFFIXES)
+
+
+def brands(count: int, seed: int) -> List[Tuple[str, str, List[str], List[str]]]:
+    rng = random.Random(seed)
+    seen, out = set(), []
+    while len(out) < count:
+        name = _name(rng)
+        if name.lower() in seen:
+            continue
+        seen.add(name.lower())
+        aliases = ["@" + name.lower().replace(" ", "").replace("&", "")]
+        keywords = [f"{name.split()[0]} {rng.choice(['Pro', 'Max', 'Plus', 'Go', 'Box'])}"
+                    for _ in range(rng.randint(0, 2))]
+        out.append((f"brand-{len(out)}", name, aliases, keywords))
+    return out
+
+
+def firehose(count: int, catalog, mention_rate: float, seed: int) -> List[Tuple[Dict[str, Any], str]]:
+    """(mention, planted brand id or '') pairs."""
+    rng = random.Random(seed)
+    out = []
+    for i in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 30))]
+        planted = ""
+        if rng.random() < mention_rate:
+            brand_id, name, aliases, keywords = rng.choice(catalog)
+            words.insert(rng.randrange(len(words)), rng.choice([name, *aliases, *keywords]))
+            planted = brand_id
+        out.append(({"platform": rng.choice(["twitter", "instagram", "tiktok"]),
+                     "text": " ".join(words), "timestamp": 1_700_000_000 + i / 1000}, planted))
+    return out
+
+
+def run(args) -> Dict[str, Any]:
+    catalog = brands(args.brands, args.seed)
+    stream = firehose(args.mentions, catalog, args.mention_rate, args.seed + 1)
+
+    router = MentionRouter(min_interval_s=60)
+    start = time.perf_counter()
+    for brand_id, name, aliases, keywords in catalog:
+        router.add_brand(brand_id, name, aliases, keywords)
+    router.match("")  # first scan builds failure links
+    build_ms = (time.perf_counter() - start) * 1000
+
+    mentions = [mention for mention, _ in stream]
+    start = time.perf_counter()
+    routed = [router.ingest(mention) for mention in mentions]
+    ingest_s = time.perf_counter() - start
+
+    planted = [(brand_id, found) for (_, brand_id), found in zip(stream, routed) if brand_id]
+    hits = sum(brand_id in found for brand_id, found in planted)
+    spurious = sum(1 for (_, brand_id), found in zip(stream, routed) if found - {brand_id})
+
+    # Adding brands to a live router: trie insert + one relink on the next scan
+    extra = brands(args.brands + 100, args.seed)[args.brands:]
+    start = time.perf_counter()
+    for brand_id, name, aliases, keywords in extra:
+        router.add_brand(f"new-{brand_id}", name, aliases, keywords)
+    router.match("")
+    add_100_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    due = router.due(now=1_700_000_000 + args.mentions / 1000 + 60)
+    due_ms = (time.perf_counter() - start) * 1000
+
+    return {
+        "brands": args.brands,
+        "trie_nodes": router.snapshot()["trie_nodes"],
+        "build_ms": round(build_ms, 1),
+        "mentions": args.mentions,
+        "mentions_per_sec": round(args.mentions / ingest_s),
+        "us_per_mention": round(ingest_s / args.mentions * 1e6, 2),
+        "planted": len(planted),
+        "planted_recall": round(hits / max(1, len(planted)), 4),
+        "mentions_with_other_brands": spurious,
+        "add_100_brands_ms": round(add_100_ms, 1),
+        "due_brands": len(due),
+        "due_ms": round(due_ms, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MentionRouter throughput")
+    parser.add_argument("--brands", type=int, default=10000)
+    parser.add_argument("--mentions", type=int, default=300000)
+    parser.add_argument("--mention-rate", type=float, default=0.05,
+                        help="Share of mentions naming a monitored brand")
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--check", action="store_true", help="Exit 1 below --min-rate")
+    parser.add_argument("--min-rate", type=float, default=50000.0)
+    args = parser.parse_args()
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.check and report["mentions_per_sec"] < args.min_rate:
+        print(f"BELOW TARGET {report['mentions_per_sec']} < {args.min_rate} mentions/s",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
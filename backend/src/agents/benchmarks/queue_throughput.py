@@ -0,0 +1,126 @@
+"""
+Queue Worker Throughput
+=======================
+Drains N queued agent jobs through AgentQueueWorker and reports jobs/sec.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.queue_throughput --jobs 10000
+    python -m agents.benchmarks.queue_throughput --redis-url redis://localhost:6379/0
+    python -m agents.benchmarks.queue_throughput --agent community-manager  # via LLM stub
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Any
+
+from ..base import BaseAgent
+from ..queue_worker import AgentQueueWorker, InMemoryRedis, QueueKeys, enqueue_jobs
+from .load_test import wait_ready
+
+
+class EchoAgent(BaseAgent):
+    """Agent answering instantly, to isolate queue overhead."""
+
+    def __init__(self):
+        super().__init__(name="Echo")
+
+    async def run(self, **kwargs) -> Dict[str, Any]:
+        return {"echo": kwargs, "cost": 0.0}
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    if args.redis_url:
+        import redis.asyncio as aioredis
+        redis = aioredis.from_url(args.redis_url, decode_responses=True)
+    else:
+        redis = InMemoryRedis()
+
+    prefix = f"bench:{os.getpid()}"
+    keys = QueueKeys(prefix)
+    slug = "echo" if args.agent == "echo" else args.agent
+    factory = (lambda _: EchoAgent()) if args.agent == "echo" else None
+
+    jobs = [
+        (slug, {"comment": f"Livrez-vous à Québec? #{i}", "platform": "instagram",
+                "brand_context": {}})
+        for i in range(args.jobs)
+    ]
+    start = time.perf_counter()
+    await enqueue_jobs(redis, jobs, prefix)
+    enqueue_s = time.perf_counter() - start
+
+    if args.poison:
+        pipe = redis.pipeline(transaction=False)
+        for i in range(args.poison):
+            pipe.hset(keys.jobs, mapping={f"poison-{i}": "{not json"})
+            pipe.rpush(keys.queue, f"poison-{i}")
+        await pipe.execute()
+
+    worker = AgentQueueWorker(
+        redis,
+        prefix=prefix,
+        agent_factory=factory,
+        agents=[slug],
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+    )
+    start = time.perf_counter()
+    await worker.run(drain=True)
+    drain_s = time.perf_counter() - start
+
+    results = await redis.hlen(keys.results)
+    dead = await redis.llen(keys.dead)
+    if args.redis_url:
+        await redis.delete(*vars(keys).values())
+
+    return {
+        "backend": "redis" if args.redis_url else "in-memory",
+        "agent": args.agent,
+        "jobs": args.jobs,
+        "enqueue_jobs_per_sec": round(args.jobs / enqueue_s, 1),
+        "drain_jobs_per_sec": round(args.jobs / drain_s, 1),
+        "results": results,
+        "dead_lettered": dead,
+        "stats": dict(worker.stats),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="AgentQueueWorker throughput")
+    parser.add_argument("--jobs", type=int, default=10000)
+    parser.add_argument("--agent", default="echo",
+                        help="'echo' (no LLM) or an agent slug served by the LLM stub")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--poison", type=int, default=0, help="Malformed jobs to inject")
+    parser.add_argument("--redis-url", default=None)
+    parser.add_argument("--stub-latency-ms", type=float, default=20.0)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    stub = None
+    if args.agent != "echo":
+        os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{args.stub_port}/chat/completions"
+        stub = subprocess.Popen([
+            sys.executable, "-m", "agents.benchmarks.llm_stub",
+            "--port", str(args.stub_port), "--latency-ms", str(args.stub_latency_ms),
+        ])
+        asyncio.run(wait_ready(f"http://127.0.0.1:{args.stub_port}/"))
+
+    try:
+        print(json.dumps(asyncio.run(run_benchmark(args)), indent=2))
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+
+if __name__ == "__main__":
+    main()
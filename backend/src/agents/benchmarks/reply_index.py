@@ -0,0 +1,122 @@
+"""
+Reply Index Scale
+=================
+Builds a ReplyIndex over a synthetic corpus of approved (comment, reply)
+pairs and reports build time, memory, query latency and recall of the
+inverted-file search against an exact scan.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.reply_index --size 1000000
+"""
+
+import argparse
+import json
+import random
+import time
+import resource
+from typing import Dict, Any, List, Tuple
+
+import numpy as np
+
+from ..retrieval import ReplyIndex
+from .load_test import percentile
+
+QUESTIONS = [
+    "Est-ce que vous livrez à {place}?", "Vous livrez à {place} le {day}?",
+    "Quelles sont vos heures le {day}?", "Vous êtes ouverts le {day} à {place}?",
+    "Avez-vous des options {diet}?", "Le {item} est-il {diet}?",
+    "Combien coûte le {item}?", "Est-ce qu'il reste du {item} aujourd'hui?",
+    "Do you deliver to {place}?", "What time do you close on {day}?",
+    "Is the {item} {diet}?", "How much is the {item}?",
+    "Peut-on réserver pour {n} personnes le {day}?", "Vous acceptez les groupes de {n}?",
+    "Le stationnement est gratuit à {place}?", "Vous embauchez à {place}?",
+]
+PLACES = ["Lévis", "Québec", "Sainte-Foy", "Beauport", "Charlesbourg", "Limoilou", "Montréal",
+          "Laval", "Gatineau", "Sherbrooke", "Trois-Rivières", "Saguenay", "Rimouski", "Boucherville"]
+DAYS = ["lundi", "mardi", "mercredi", "jeudi", "vendredi", "samedi", "dimanche"]
+DIETS = ["végétarien", "végane", "sans gluten", "sans lactose", "halal", "casher"]
+ITEMS = ["poutine", "burger", "pizza", "menu midi", "brunch", "dessert", "tartare", "pâté chinois",
+         "club sandwich", "smoothie", "café", "bagel", "fish and chips", "soupe du jour"]
+FILLERS = ["", "", "Bonjour! ", "Allo, ", "Hey ", "Petite question: ", "Salut, "]
+SUFFIXES = ["", "", " Merci!", " svp", " 🙏", " merci d'avance", "??"]
+
+
+def _comment(rng: random.Random) -> str:
+    text = rng.choice(QUESTIONS).format(
+        place=rng.choice(PLACES), day=rng.choice(DAYS), diet=rng.choice(DIETS),
+        item=rng.choice(ITEMS), n=rng.randint(2, 40),
+    )
+    text = rng.choice(FILLERS) + text + rng.choice(SUFFIXES)
+    if rng.random() < 0.3:
+        # Typo: drop one character
+        i = rng.randrange(len(text))
+        text = text[:i] + text[i + 1:]
+    return text if rng.random() < 0.5 else text.lower()
+
+
+def corpus(size: int, seed: int) -> List[Tuple[str, str, Dict[str, Any]]]:
+    rng = random.Random(seed)
+    return [
+        (_comment(rng), f"Réponse approuvée #{i}", {"category": "question", "sentiment": "neutral"})
+        for i in range(size)
+    ]
+
+
+def run(args) -> Dict[str, Any]:
+    entries = corpus(args.size, args.seed)
+    queries = [_comment(random.Random(args.seed + 1 + i)) for i in range(args.queries)]
+
+    index = ReplyIndex(dim=args.dim, nprobe=args.nprobe)
+    start = time.perf_counter()
+    index.add_many(entries)
+    build_s = time.perf_counter() - start
+
+    timings, found = [], []
+    for query in queries:
+        start = time.perf_counter()
+        found.append(index.search(query, k=1)[0]["score"])
+        timings.append((time.perf_counter() - start) * 1000)
+
+    # Exact nearest neighbours (separate pass: a full scan evicts the cache)
+    vectors = index._vectors[:len(index)]
+    exact = np.concatenate([
+        np.max(vectors @ index.vectorizer.transform(queries[i:i + 32]).T, axis=0)
+        for i in range(0, len(queries), 32)
+    ])
+    recall = float(np.mean(np.array(found) >= exact - 1e-6))  # ties count as hits
+
+    start = time.perf_counter()
+    for query in queries:
+        index.vectorizer.transform([query])
+    embed_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    return {
+        "replies": len(index),
+        "dim": args.dim,
+        "cells": len(index.centroids) if index.centroids is not None else 0,
+        "nprobe": args.nprobe,
+        "build_s": round(build_s, 1),
+        "build_per_sec": round(len(index) / build_s),
+        "index_mb": round(index.nbytes / 2**20, 1),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "query_ms": {"p50": round(percentile(timings, 50), 3),
+                     "p99": round(percentile(timings, 99), 3),
+                     "embed_mean": round(embed_ms, 3)},
+        "recall_at_1": round(recall, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ReplyIndex build and query at scale")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--dim", type=int, default=128)
+    parser.add_argument("--nprobe", type=int, default=6)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(run(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Worker Runtime Scaling
+======================
+Measures WorkerRuntime throughput against worker count with a local stub.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.runtime_scaling --workers 1 2 4 8 --jobs 4000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, Any
+
+from ..runtime import WorkerRuntime
+from .load_test import wait_ready
+
+
+def run_level(workers: int, jobs: int, distinct: int, rate_limit: float) -> Dict[str, Any]:
+    """Push `jobs` CommunityManager jobs through a runtime of `workers` processes."""
+    with WorkerRuntime(workers=workers, rate_limit=rate_limit or None) as runtime:
+        # Warm up: spawn cost and agent construction stay out of the timing
+        for future in [runtime.submit("community-manager", comment="warmup", platform="x",
+                                      brand_context={}) for _ in range(workers * 4)]:
+            future.result()
+
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        futures = [
+            runtime.submit(
+                "community-manager",
+                comment=f"Est-ce que vous livrez? #{i % distinct}",
+                platform="instagram",
+                brand_context={"brand_name": "Resto Québec"},
+            )
+            for i in range(jobs)
+        ]
+        errors = 0
+        for future in futures:
+            try:
+                future.result()
+            except Exception:
+                errors += 1
+        elapsed = time.perf_counter() - start
+
+        cache = runtime.cache.stats() if runtime.cache else {}
+        return {
+            "workers": workers,
+            "jobs": jobs,
+            "jobs_per_sec": round(jobs / elapsed, 1),
+            "errors": errors,
+            "parent_cpu_s": round(time.process_time() - cpu_start, 2),
+            "cache": cache,
+            "distribution": dict(sorted(runtime.completed_by_worker.items())),
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="WorkerRuntime scaling benchmark")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--jobs", type=int, default=4000)
+    parser.add_argument("--distinct", type=int, default=0,
+                        help="Distinct inputs (default: all distinct, no cache hits)")
+    parser.add_argument("--rate-limit", type=float, default=0.0,
+                        help="Global requests/sec shared by all workers (0 = off)")
+    parser.add_argument("--stub-latency-ms", type=float, default=50.0)
+    parser.add_argument("--stub-processes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--stub-port", type=int, default=9100)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{args.stub_port}/chat/completions"
+
+    stub = subprocess.Popen([
+        sys.executable, "-m", "agents.benchmarks.llm_stub",
+        "--port", str(args.stub_port), "--latency-ms", str(args.stub_latency_ms),
+        "--processes", str(args.stub_processes),
+    ])
+    try:
+        asyncio.run(wait_ready(f"http://127.0.0.1:{args.stub_port}/"))
+
+        results = []
+        for workers in args.workers:
+            result = run_level(workers, args.jobs, args.distinct or args.jobs, args.rate_limit)
+            results.append(result)
+            if not args.json:
+                print(
+                    f"workers={result['workers']:<3} jobs/s={result['jobs_per_sec']:<8} "
+                    f"errors={result['errors']} cache={result['cache']} "
+                    f"distribution={result['distribution']}"
+                )
+
+        if args.json:
+            print(json.dumps({"cpus": os.cpu_count(), "levels": results}))
+    finally:
+        stub.terminate()
+        stub.wait()
+
+
+if __name__ == "__main__":
+    main()
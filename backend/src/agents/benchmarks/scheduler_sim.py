@@ -0,0 +1,176 @@
+"""
+Scheduler Simulation
+====================
+Mixed workload against a capacity-limited simulated upstream: a steady
+stream of CrisisManager and CommunityManager calls while SEO_AIO traffic
+ramps from light load to several times what the upstream can serve.
+Each SEO rate is run without a scheduler (FIFO at the provider) and with
+an LLMScheduler, reporting per-class latency percentiles and how much SEO
+work was degraded, shed or dropped past its deadline.
+
+The upstream holds `--capacity` concurrent calls; a call takes
+`--ttft-ms` plus `--ms-per-token` per max_tokens of budget (a degraded
+call on the cheaper model runs `--degraded-speedup` times as long).
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.scheduler_sim --seo-rates 10 30 60 120 --duration 5
+    # CI: exit 1 if crisis p99 under the heaviest SEO load exceeds --max-crisis-p99-ms
+    python -m agents.benchmarks.scheduler_sim --check --max-crisis-p99-ms 1000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, Any, List, Optional
+
+from ..registry import create_agent
+from ..scheduling import LLMScheduler, request_priority
+from ..transport import FakeTransport
+from .agent_load import AGENT_REQUESTS
+from .llm_stub import LLMStub
+from .load_test import percentile
+
+DEGRADED_MODEL = "openai/gpt-4o-mini"
+
+
+class UpstreamTransport(FakeTransport):
+    """FakeTransport with a provider-side concurrency limit (FIFO) and budget-based service time."""
+
+    def __init__(self, capacity: int, ttft_ms: float, ms_per_token: float, degraded_speedup: float):
+        super().__init__(LLMStub(latency_ms=0).completion)
+        self.slots = asyncio.Semaphore(capacity)
+        self.ttft = ttft_ms / 1000
+        self.per_token = ms_per_token / 1000
+        self.degraded_speedup = degraded_speedup
+
+    async def send(self, payload, client=None, trace=None):
+        service = self.ttft + payload["max_tokens"] * self.per_token
+        if payload["model"] == DEGRADED_MODEL:
+            service *= self.degraded_speedup
+        async with self.slots:
+            await asyncio.sleep(service)
+        return self.responder(payload)
+
+
+async def scenario(args, seo_rate: float, scheduled: bool) -> Dict[str, Any]:
+    transport = UpstreamTransport(args.capacity, args.ttft_ms, args.ms_per_token, args.degraded_speedup)
+    scheduler = LLMScheduler(
+        max_inflight=args.capacity,
+        degrade_depth=args.capacity * 2,
+        shed_depth=args.capacity * 8,
+        degraded_model=DEGRADED_MODEL,
+    ) if scheduled else None
+
+    workload = {
+        "crisis-manager": (args.crisis_rate, args.crisis_deadline_s),
+        "community-manager": (args.community_rate, args.community_deadline_s),
+        "seo-aio": (seo_rate, args.seo_deadline_s),
+    }
+    agents = {}
+    for slug in workload:
+        agent = create_agent(slug)
+        agent.transport = transport
+        agent.scheduler = scheduler
+        agents[slug] = agent
+
+    latencies: Dict[str, List[float]] = {slug: [] for slug in workload}
+    outcomes: Dict[str, Dict[str, int]] = {slug: {} for slug in workload}
+    started: Dict[asyncio.Task, tuple] = {}
+
+    async def call(slug: str, deadline_s: Optional[float]) -> None:
+        start = time.perf_counter()
+        try:
+            with request_priority(deadline_s=deadline_s if scheduled else None):
+                await agents[slug].run(**AGENT_REQUESTS[slug])
+            latencies[slug].append((time.perf_counter() - start) * 1000)
+            kind = "ok"
+        except Exception as e:
+            kind = type(e).__name__
+        outcomes[slug][kind] = outcomes[slug].get(kind, 0) + 1
+
+    async def arrivals(slug: str, rate: float, deadline_s: float, rng: random.Random) -> None:
+        end = time.perf_counter() + args.duration
+        while True:
+            await asyncio.sleep(rng.expovariate(rate))
+            if time.perf_counter() >= end:
+                return
+            task = asyncio.create_task(call(slug, deadline_s))
+            started[task] = (slug, time.perf_counter())
+            task.add_done_callback(lambda t: started.pop(t, None))
+
+    await asyncio.gather(*(
+        arrivals(slug, rate, deadline, random.Random(args.seed + i))
+        for i, (slug, (rate, deadline)) in enumerate(workload.items()) if rate > 0
+    ))
+    if started:
+        await asyncio.wait(list(started), timeout=args.drain_s)
+    now = time.perf_counter()
+    for task, (slug, at) in list(started.items()):
+        # Still queued after the drain: count its latency so far
+        latencies[slug].append((now - at) * 1000)
+        outcomes[slug]["unfinished"] = outcomes[slug].get("unfinished", 0) + 1
+        task.cancel()
+    await asyncio.sleep(0)
+
+    result: Dict[str, Any] = {}
+    for slug in workload:
+        timings = latencies[slug]
+        result[slug] = {
+            "p50_ms": round(percentile(timings, 50), 1) if timings else None,
+            "p99_ms": round(percentile(timings, 99), 1) if timings else None,
+            "outcomes": outcomes[slug],
+        }
+    if scheduler is not None:
+        result["degraded_seo"] = scheduler.stats["low"]["degraded"]
+    return result
+
+
+async def run(args) -> Dict[str, Any]:
+    report: Dict[str, Any] = {"capacity": args.capacity, "duration_s": args.duration, "seo_rates": {}}
+    for seo_rate in args.seo_rates:
+        report["seo_rates"][str(seo_rate)] = {
+            "fifo": await scenario(args, seo_rate, scheduled=False),
+            "scheduled": await scenario(args, seo_rate, scheduled=True),
+        }
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Priority scheduling under SEO overload")
+    parser.add_argument("--seo-rates", type=float, nargs="+", default=[10, 30, 60, 120],
+                        help="SEO_AIO calls/sec per scenario")
+    parser.add_argument("--crisis-rate", type=float, default=5.0)
+    parser.add_argument("--community-rate", type=float, default=20.0)
+    parser.add_argument("--crisis-deadline-s", type=float, default=2.0)
+    parser.add_argument("--community-deadline-s", type=float, default=5.0)
+    parser.add_argument("--seo-deadline-s", type=float, default=30.0)
+    parser.add_argument("--capacity", type=int, default=8, help="Concurrent upstream calls")
+    parser.add_argument("--ttft-ms", type=float, default=40.0)
+    parser.add_argument("--ms-per-token", type=float, default=0.05,
+                        help="Service time per max_tokens of budget")
+    parser.add_argument("--degraded-speedup", type=float, default=0.6)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of arrivals per scenario")
+    parser.add_argument("--drain-s", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--max-crisis-p99-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+
+    heaviest = report["seo_rates"][str(max(args.seo_rates))]["scheduled"]["crisis-manager"]["p99_ms"]
+    if args.check and (heaviest is None or heaviest > args.max_crisis_p99_ms):
+        print(f"CRISIS P99 {heaviest}ms > {args.max_crisis_p99_ms}ms under SEO overload",
+              file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Site Audit Throughput
+=====================
+Generates a synthetic site (topic clusters, internal links, planted
+orphans, near duplicates and cannibalized keywords), indexes it with
+SiteIndex and audits it through SEO_AIO_Agent against a local LLM stub.
+Reports indexing speed, memory, accuracy of the local facts, validity of
+the internal links in the agent's output and audit pages/hour.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.site_audit --pages 5000 --audit-pages 1000 --latency-ms 1000
+    # CI: exit 1 below the target pages/hour
+    python -m agents.benchmarks.site_audit --check --min-pages-per-hour 3000
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import resource
+import sys
+import time
+from typing import Dict, Any, Iterator, List
+
+import httpx
+
+from ..seo_aio import SEO_AIO_Agent
+from ..site_audit import SiteIndex
+from .llm_stub import LLMStub
+
+SYLLABLES = ["ma", "to", "ri", "ka", "lu", "be", "no", "sa", "vi", "do", "re", "zu", "po", "la",
+             "mi", "ko", "ta", "ne", "gu", "fe", "xo", "qui", "bri", "tra", "plo", "stu", "vex"]
+
+
+def _word(rng: random.Random) -> str:
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+class SyntheticSite:
+    """Deterministic site: `pages()` can be iterated any number of times."""
+
+    def __init__(self, pages: int, topic_size: int, seed: int):
+        rng = random.Random(seed)
+        self.count = pages
+        self.seed = seed
+        self.filler = [_word(rng) for _ in range(600)]
+        topics = max(1, pages // topic_size)
+        self.topic_words = [[_word(rng) for _ in range(10)] for _ in range(topics)]
+        self.topic_of = [rng.randrange(topics) for _ in range(pages)]
+        self.members: Dict[int, List[int]] = {}
+        for page, topic in enumerate(self.topic_of):
+            self.members.setdefault(topic, []).append(page)
+
+        self.orphans = set(rng.sample(range(1, pages), max(1, pages // 50)))
+        self.duplicate_of = {page: rng.choice(self.members[self.topic_of[page]])
+                             for page in rng.sample(range(1, pages), max(1, pages // 100))}
+        self.duplicate_of = {p: src for p, src in self.duplicate_of.items()
+                             if src != p and src not in self.duplicate_of}
+        self.cannibal_pairs = [tuple(rng.sample(self.members[t], 2))
+                               for t in rng.sample(sorted(self.members), min(len(self.members), pages // 100))
+                               if len(self.members[t]) >= 2]
+
+        # Each page links to up to 3 same-topic peers (never a planted orphan) and home
+        self.links: List[List[int]] = []
+        for page in range(pages):
+            peers = [p for p in self.members[self.topic_of[page]] if p != page and p not in self.orphans]
+            self.links.append(rng.sample(peers, min(3, len(peers))) + [0])
+        self.true_orphans = set(range(1, pages)).difference(*self.links)
+
+    def url(self, page: int) -> str:
+        return "/" if page == 0 else f"/blog/{self.topic_of[page]}/page-{page}"
+
+    def pages(self) -> Iterator[Dict[str, Any]]:
+        keywords = {}
+        for a, b in self.cannibal_pairs:
+            words = self.topic_words[self.topic_of[a]]
+            keywords[a] = keywords[b] = f"{words[0]} {words[1]}"
+        for page in range(self.count):
+            source = self.duplicate_of.get(page, page)
+            rng = random.Random(self.seed * 1_000_003 + source)
+            topic = self.topic_words[self.topic_of[source]]
+            own = [_word(rng) for _ in range(3)]
+            words = [rng.choice(topic) if rng.random() < 0.25 else
+                     rng.choice(own) if rng.random() < 0.05 else rng.choice(self.filler)
+                     for _ in range(rng.randint(400, 900))]
+            if source != page:
+                words[rng.randrange(len(words))] = "modifié"
+
+            links = [self.url(p) for p in self.links[page]]
+            body = " ".join(words)
+            html = body + "".join(f' <a href="https://client.com{link}">lire</a>' for link in links)
+            yield {
+                "url": self.url(page),
+                "title": f"{topic[0].capitalize()} {topic[1]} {own[0]}",
+                "content": html,
+                "target_keywords": [keywords[page]] if page in keywords else None,
+            }
+
+
+def accuracy(index: SiteIndex, site: SyntheticSite, sample: int) -> Dict[str, Any]:
+    """How well the local facts match the generated site."""
+    report = index.report(max_items=10**9)
+    orphans = set(report["orphan_pages"])
+    true_orphans = {site.url(p) for p in site.true_orphans}
+
+    duplicate_pairs = {frozenset(d[:2]) for d in report["duplicates"]}
+    planted_duplicates = [frozenset((site.url(p), site.url(src))) for p, src in site.duplicate_of.items()]
+
+    same_topic = total = 0
+    for page in range(0, site.count, max(1, site.count // sample)):
+        for candidate in index.facts(site.url(page))["link_candidates"]:
+            total += 1
+            target = candidate["target"]
+            same_topic += target != "/" and site.topic_of[int(target.rsplit("-", 1)[1])] == site.topic_of[page]
+
+    cannibal_found = sum(
+        site.url(b) in index.facts(site.url(a))["cannibalized_with"] for a, b in site.cannibal_pairs
+    )
+    return {
+        "orphan_recall": round(len(true_orphans & orphans) / max(1, len(true_orphans)), 3),
+        "orphan_precision": round(len(true_orphans & orphans) / max(1, len(orphans)), 3),
+        "duplicate_recall": round(sum(p in duplicate_pairs for p in planted_duplicates)
+                                  / max(1, len(planted_duplicates)), 3),
+        "cannibalization_recall": round(cannibal_found / max(1, len(site.cannibal_pairs)), 3),
+        "link_candidates_same_topic": round(same_topic / max(1, total), 3),
+    }
+
+
+async def audit(index: SiteIndex, site: SyntheticSite, args) -> Dict[str, Any]:
+    stub = LLMStub(latency_ms=args.latency_ms, latency_dist="lognormal", seed=1)
+    server = await stub.serve(port=args.stub_port)
+    os.environ["OPENROUTER_API_URL"] = f"http://127.0.0.1:{args.stub_port}/chat/completions"
+    known = set(index.urls)
+    links = {"total": 0, "on_site": 0}
+
+    def on_result(url: str, result: Dict[str, Any]) -> None:
+        for link in result["seo"]["internal_links"]:
+            links["total"] += 1
+            links["on_site"] += link["target"] in known
+
+    pages = itertools.islice(site.pages(), args.audit_pages)
+    try:
+        async with httpx.AsyncClient(timeout=60.0) as client:
+            agent = SEO_AIO_Agent()
+            agent.http_client = client
+            summary = await index.audit(agent, pages, args.concurrency, on_result=on_result)
+    finally:
+        server.close()
+        await server.wait_closed()
+    return {
+        "audited": summary["audited"],
+        "failed": len(summary["failed"]),
+        "elapsed_s": summary["elapsed_s"],
+        "pages_per_hour": summary["pages_per_hour"],
+        "internal_links_on_site": round(links["on_site"] / max(1, links["total"]), 3),
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    site = SyntheticSite(args.pages, args.topic_size, args.seed)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    index = SiteIndex(base_url="https://client.com")
+    start = time.perf_counter()
+    for page in site.pages():
+        index.add_page(**page)
+    index_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    report = index.report()
+    report_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for page in range(0, args.pages, 7):
+        index.facts(site.url(page))
+    facts_us = (time.perf_counter() - start) / len(range(0, args.pages, 7)) * 1e6
+
+    result = {
+        "pages": args.pages,
+        "index_s": round(index_s, 2),
+        "index_pages_per_sec": round(args.pages / index_s),
+        "report_s": round(report_s, 2),
+        "facts_us": round(facts_us, 1),
+        "index_rss_mb": round((resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before) / 1024, 1),
+        "orphans": report["orphans"],
+        "cannibalized_keywords": report["cannibalized_keywords"],
+        "duplicate_pairs": report["duplicate_pairs"],
+        "accuracy": accuracy(index, site, sample=500),
+    }
+    if args.audit_pages:
+        result["audit"] = asyncio.run(audit(index, site, args))
+    result["peak_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Site-wide SEO audit throughput")
+    parser.add_argument("--pages", type=int, default=5000)
+    parser.add_argument("--topic-size", type=int, default=20, help="Pages per topic cluster")
+    parser.add_argument("--audit-pages", type=int, default=1000,
+                        help="Pages sent through the agent (0 = index only)")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency-ms", type=float, default=1000.0, help="Median LLM latency")
+    parser.add_argument("--stub-port", type=int, default=9106)
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="Exit 1 below --min-pages-per-hour")
+    parser.add_argument("--min-pages-per-hour", type=float, default=3000.0)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    rate = report.get("audit", {}).get("pages_per_hour", 0)
+    if args.check and rate < args.min_pages_per_hour:
+        print(f"BELOW TARGET {rate} < {args.min_pages_per_hour} pages/hour", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Thread Memory Scale
+===================
+Fills a ThreadMemoryStore with many threads and reports memory per thread,
+append and render throughput, and LRU eviction behaviour.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.thread_memory --threads 200000 --turns 20
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from typing import Dict, Any
+
+from ..memory import ThreadMemoryStore, estimate_tokens
+
+TURN = "Bonjour, ma commande #{n} n'est toujours pas arrivée. Pouvez-vous vérifier? Merci."
+
+
+async def run(args) -> Dict[str, Any]:
+    store = ThreadMemoryStore(max_threads=args.max_threads or args.threads)
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    for turn in range(args.turns):
+        role = "user" if turn % 2 == 0 else "assistant"
+        for thread in range(args.threads):
+            await store.append("instagram", f"thread-{thread}", role, TURN.format(n=turn))
+    append_s = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    renders = min(args.threads, 20000)
+    start = time.perf_counter()
+    longest = 0
+    for thread in range(args.threads - renders, args.threads):
+        longest = max(longest, estimate_tokens(store.render("instagram", f"thread-{thread}")))
+    render_s = time.perf_counter() - start
+
+    appends = args.threads * args.turns
+    return {
+        "threads_written": args.threads,
+        "threads_kept": len(store),
+        "turns_per_thread": args.turns,
+        "bytes_per_thread": round(current / len(store)),
+        "appends_per_sec": round(appends / append_s),
+        "render_us": round(render_s / renders * 1e6, 2),
+        "max_rendered_tokens": longest,
+        "token_budget": store.token_budget,
+        "stats": store.snapshot(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ThreadMemoryStore at scale")
+    parser.add_argument("--threads", type=int, default=200000)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--max-threads", type=int, default=0,
+                        help="LRU capacity (default: keep every thread)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Tracing Overhead
+================
+Measures the per-call cost of the tracing hooks with an in-process
+upstream, so the agent's own CPU time is all that is timed.
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.tracing_overhead --calls 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Any
+
+import httpx
+
+from .. import tracing
+from ..community_manager import CommunityManagerAgent
+from .llm_stub import LLMStub
+
+
+class InstantClient:
+    """http_client stand-in answering immediately with a stub completion."""
+
+    def __init__(self):
+        self.stub = LLMStub(latency_ms=0)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return httpx.Response(
+            200, json=self.stub.completion(kwargs["json"]), request=httpx.Request("POST", url)
+        )
+
+
+async def time_calls(agent: CommunityManagerAgent, calls: int) -> float:
+    """Return microseconds per sequential agent.run()."""
+    for _ in range(100):
+        await agent.run(comment="warmup", platform="instagram", brand_context={})
+
+    start = time.perf_counter()
+    for i in range(calls):
+        await agent.run(comment=f"Livrez-vous? #{i}", platform="instagram",
+                        brand_context={"brand_name": "Resto Québec"})
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def noop_span_ns(iterations: int = 1_000_000) -> float:
+    """Cost of entering and leaving one disabled span."""
+    tracer = tracing.get_tracer()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with tracer.start_as_current_span("noop"):
+            pass
+    return (time.perf_counter() - start) / iterations * 1e9
+
+
+async def run(args) -> Dict[str, Any]:
+    os.environ.setdefault("OPENROUTER_API_KEY", "bench")
+    agent = CommunityManagerAgent()
+    agent.http_client = InstantClient()
+
+    tracing.set_tracer(None)
+    tracing.set_profile_hook(None)
+    disabled_us = await time_calls(agent, args.calls)
+    span_ns = noop_span_ns()
+
+    exporter = tracing.InMemorySpanExporter()
+    tracing.set_tracer(tracing.Tracer(exporter))
+    enabled_us = await time_calls(agent, args.calls)
+    spans = len(exporter.spans)
+    tracing.set_tracer(None)
+
+    # Disabled runs enter two no-op spans (llm.http, llm.parse_json); run()
+    # and call_llm() only check a flag
+    return {
+        "calls": args.calls,
+        "disabled_us_per_call": round(disabled_us, 2),
+        "enabled_us_per_call": round(enabled_us, 2),
+        "spans_per_call": round(spans / (args.calls + 100), 1),
+        "noop_span_ns": round(span_ns, 1),
+        "disabled_overhead_pct": round(2 * span_ns / 1000 / disabled_us * 100, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tracing overhead per agent call")
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
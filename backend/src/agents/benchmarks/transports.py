@@ -0,0 +1,134 @@
+"""
+Transport Latency
+=================
+Runs CommunityManagerAgent end to end through each transport and reports
+latency percentiles, throughput and per-call overhead over the upstream's
+own latency:
+
+- openrouter: OpenRouterTransport -> local stub (plus `--wan-ms`, the
+  extra round trip to a hosted API)
+- openai-compatible: OpenAICompatibleTransport with a model map -> a
+  second local stub standing in for a LAN inference server
+- fake: FakeTransport in process (no sockets)
+
+Run with:
+    cd backend/src
+    python -m agents.benchmarks.transports --calls 2000 --concurrency 16 --latency-ms 20 --wan-ms 120
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Dict, Any, List
+
+import httpx
+
+from ..community_manager import CommunityManagerAgent
+from ..transport import FakeTransport, OpenAICompatibleTransport, OpenRouterTransport, Transport
+from .llm_stub import LLMStub
+from .load_test import percentile
+
+LOCAL_MODEL = "llama-3.1-8b-instruct"
+
+
+class RecordingStub(LLMStub):
+    """LLMStub remembering which model names it was asked for."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.models = set()
+
+    def completion(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        self.models.add(payload.get("model"))
+        return super().completion(payload)
+
+
+async def measure(transport: Transport, args, upstream_ms: float) -> Dict[str, Any]:
+    agent = CommunityManagerAgent()
+    agent.transport = transport
+    async with httpx.AsyncClient(
+        timeout=60.0, limits=httpx.Limits(max_connections=args.concurrency)
+    ) as client:
+        agent.http_client = client
+        semaphore = asyncio.Semaphore(args.concurrency)
+        timings: List[float] = []
+        outputs = set()
+
+        async def one(i: int) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                result = await agent.run(comment=f"Livrez-vous à Lévis? #{i}", platform="instagram",
+                                         brand_context={"brand_name": "Resto Québec"})
+                timings.append((time.perf_counter() - start) * 1000)
+                outputs.add(result["suggested_response"])
+
+        await asyncio.gather(*(one(i) for i in range(min(50, args.calls))))  # warm connections
+        timings.clear()
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.calls)))
+        wall_s = time.perf_counter() - start
+
+    p50 = percentile(timings, 50)
+    return {
+        "p50_ms": round(p50, 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+        "calls_per_sec": round(args.calls / wall_s),
+        "overhead_p50_ms": round(p50 - upstream_ms, 2),
+        "outputs": sorted(outputs),
+    }
+
+
+async def run(args) -> Dict[str, Any]:
+    remote = LLMStub(latency_ms=args.latency_ms + args.wan_ms)
+    local = RecordingStub(latency_ms=args.latency_ms)
+    servers = [await remote.serve(port=args.stub_port), await local.serve(port=args.stub_port + 1)]
+    responder = LLMStub(latency_ms=0)
+
+    transports = {
+        "openrouter": (OpenRouterTransport(
+            api_key="stub", api_url=f"http://127.0.0.1:{args.stub_port}/chat/completions"
+        ), args.latency_ms + args.wan_ms),
+        "openai-compatible": (OpenAICompatibleTransport(
+            f"http://127.0.0.1:{args.stub_port + 1}/v1",
+            model_map={"anthropic/claude-3.5-sonnet": LOCAL_MODEL}, price=(0.0, 0.0),
+        ), args.latency_ms),
+        "fake": (FakeTransport(responder.completion, latency_ms=args.latency_ms), args.latency_ms),
+    }
+
+    report: Dict[str, Any] = {"calls": args.calls, "concurrency": args.concurrency,
+                              "latency_ms": args.latency_ms, "wan_ms": args.wan_ms,
+                              "transports": {}}
+    try:
+        for name, (transport, upstream_ms) in transports.items():
+            report["transports"][name] = await measure(transport, args, upstream_ms)
+    finally:
+        for server in servers:
+            server.close()
+            await server.wait_closed()
+
+    outputs = {tuple(r.pop("outputs")) for r in report["transports"].values()}
+    report["identical_outputs"] = len(outputs) == 1
+    report["local_server_models"] = sorted(local.models)
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end latency per LLM transport")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, default=20.0,
+                        help="Upstream latency of every transport")
+    parser.add_argument("--wan-ms", type=float, default=0.0,
+                        help="Extra round trip added to the OpenRouter stub")
+    parser.add_argument("--stub-port", type=int, default=9104,
+                        help="OpenRouter stub port (the local server uses the next one)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
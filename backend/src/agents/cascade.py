@@ -0,0 +1,142 @@
+"""
+Model Cascade
+=============
+Answer with a cheap model first; escalate to the agent's strong model only
+when the cheap answer is not trustworthy:
+
+    from agents.cascade import ModelCascade
+    cascade = ModelCascade(CommunityManagerAgent())
+    result = await cascade.run(comment=..., platform=..., brand_context=...)
+    result["cascade"]   # {"escalated": False, "confidence": 0.93, ...}
+"""
+
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+import logging
+
+from .base import BaseAgent, _deferred_writes, _model_override, _prompt_suffix
+from .batching import QueueFullError
+from .scheduling import DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+CONFIDENCE_INSTRUCTION = """
+
+# Confiance
+Ajoute au JSON une clé "confidence": nombre entre 0 et 1 indiquant ta certitude
+que l'analyse est correcte (0.5 = incertain, 0.9+ = cas évident)."""
+
+# Results that always deserve the strong model, keyed by BaseAgent.name
+HIGH_STAKES: Dict[str, Callable[[Dict[str, Any]], bool]] = {
+    "CommunityManager": lambda r: r.get("urgency") in ("high", "critical"),
+    "CrisisManager": lambda r: bool(r.get("crisis_detected")) or r.get("crisis_score", 0) > 50,
+}
+
+
+class ModelCascade:
+    """
+    Two-stage cascade around an agent.
+
+    Escalates to the strong model when the cheap answer:
+    - errors out or is not valid JSON ("error")
+    - fails the agent's OUTPUT_SCHEMA ("schema")
+    - reports confidence below `min_confidence` ("low_confidence")
+    - is high-stakes for the agent, per HIGH_STAKES ("high_stakes")
+
+    Results that did not come from the LLM (a reused approved reply) are
+    returned as is.
+
+    The returned result carries the total cost and latency of both stages
+    and a "cascade" dict describing what happened. Load shedding and
+    expired deadlines (QueueFullError, DeadlineExceededError) are raised
+    as is: escalating would only add load when the system is overloaded.
+    Side effects of a run (e.g. CommunityManager thread memory) are applied
+    once, for the result returned.
+    """
+
+    def __init__(
+        self,
+        agent: BaseAgent,
+        cheap_model: str = "openai/gpt-4o-mini",
+        strong_model: Optional[str] = None,
+        min_confidence: float = 0.8,
+        high_stakes: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ):
+        self.agent = agent
+        self.cheap_model = cheap_model
+        self.strong_model = strong_model or agent.model
+        self.min_confidence = min_confidence
+        self.high_stakes = high_stakes or HIGH_STAKES.get(agent.name)
+
+        self.stats = {"calls": 0, "escalated": 0, "error": 0, "schema": 0,
+                      "low_confidence": 0, "high_stakes": 0}
+
+    def _escalation_reason(self, result: Dict[str, Any]) -> Optional[str]:
+        # Agents that catch their own parse failures return a fallback flagged "error"
+        if result.get("error"):
+            return "error"
+        # Not an LLM answer (CommunityManager reusing an approved reply): the
+        # strong model would return the same reuse
+        if result.get("reused_reply"):
+            return None
+        if self.agent.validate_output(result):
+            return "schema"
+        confidence = result.get("confidence")
+        if not isinstance(confidence, (int, float)) or confidence < self.min_confidence:
+            return "low_confidence"
+        if self.high_stakes is not None and self.high_stakes(result):
+            return "high_stakes"
+        return None
+
+    async def _run_with(
+        self, model: str, suffix: str, kwargs: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], List[Callable[[], Awaitable[None]]]]:
+        writes: List[Callable[[], Awaitable[None]]] = []
+        model_token = _model_override.set(model)
+        suffix_token = _prompt_suffix.set(suffix)
+        writes_token = _deferred_writes.set(writes)
+        try:
+            return await self.agent.run(**kwargs), writes
+        finally:
+            _model_override.reset(model_token)
+            _prompt_suffix.reset(suffix_token)
+            _deferred_writes.reset(writes_token)
+
+    async def run(self, **kwargs: Any) -> Dict[str, Any]:
+        """Run the agent through the cascade (same arguments as agent.run())."""
+        self.stats["calls"] += 1
+        cheap: Optional[Dict[str, Any]] = None
+        try:
+            cheap, writes = await self._run_with(self.cheap_model, CONFIDENCE_INSTRUCTION, kwargs)
+            reason = self._escalation_reason(cheap)
+        except (QueueFullError, DeadlineExceededError):
+            raise
+        except Exception as e:
+            logger.warning(f"[Cascade] {self.cheap_model} failed for {self.agent.name}: {e}")
+            reason = "error"
+
+        if reason is None:
+            for write in writes:
+                await write()
+            cheap["cascade"] = {"escalated": False, "confidence": cheap.get("confidence")}
+            return cheap
+
+        self.stats["escalated"] += 1
+        self.stats[reason] += 1
+        strong, writes = await self._run_with(self.strong_model, "", kwargs)
+        for write in writes:
+            await write()
+        strong["cascade"] = {
+            "escalated": True,
+            "reason": reason,
+            "confidence": cheap.get("confidence") if cheap else None,
+            "cheap_model": self.cheap_model,
+            "cheap_cost": cheap.get("cost", 0.0) if cheap else 0.0,
+        }
+        if cheap:
+            strong["cost"] = round(strong.get("cost", 0.0) + cheap.get("cost", 0.0), 6)
+            strong["tokens"] = strong.get("tokens", 0) + cheap.get("tokens", 0)
+            strong["latency_ms"] = strong.get("latency_ms", 0) + cheap.get("latency_ms", 0)
+        return strong
+
+    def escalation_rate(self) -> float:
+        return self.stats["escalated"] / self.stats["calls"] if self.stats["calls"] else 0.0
@@ -0,0 +1,646 @@
+"""
+Columnar Results
+================
+Typed, array-backed accumulation of agent results and export to Arrow IPC
+or Parquet files with one fixed schema per agent, for analytics over
+millions of results:
+
+    from agents.columnar import ColumnarExporter, read_results
+    exporter = ColumnarExporter("exports/")            # one file per agent
+    exporter.submit("community-manager", result)       # same call as ResultSink
+    exporter.close()
+    table = read_results("exports/community-manager.arrow")   # memory-mapped
+
+Rows are buffered in stdlib arrays laid out like Arrow buffers (UTF-8
+data + int32 offsets, int8 enum codes...), so building a record batch
+copies nothing. Writing and reading need pyarrow (optional dependency).
+"""
+
+import itertools
+import json
+import os
+import time
+from array import array
+from typing import Dict, Any, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Column -> (kind, path in the result); path defaults to (column,).
+# Kinds: str, enum (vocabulary from the agent's COMPACT_SCHEMA, unknown
+# values stored as null), bool, int, float, list (of strings), json
+# (nested value serialized), timestamp (ms, set at append time).
+AGENT_COLUMNS: Dict[str, List[Tuple[str, str, Tuple[str, ...]]]] = {
+    "community-manager": [
+        ("sentiment", "enum", ()),
+        ("category", "enum", ()),
+        ("urgency", "enum", ()),
+        ("suggested_response", "str", ()),
+        ("requires_human", "bool", ()),
+        ("tags", "list", ()),
+        ("internal_notes", "str", ()),
+        ("platform", "str", ()),
+    ],
+    "crisis-manager": [
+        ("crisis_detected", "bool", ()),
+        ("crisis_score", "float", ()),
+        ("severity", "enum", ()),
+        ("crisis_type", "enum", ()),
+        ("sentiment_positive", "float", ("sentiment_analysis", "positive")),
+        ("sentiment_neutral", "float", ("sentiment_analysis", "neutral")),
+        ("sentiment_negative", "float", ("sentiment_analysis", "negative")),
+        ("sentiment_trend", "enum", ("sentiment_analysis", "trend")),
+        ("key_issues", "list", ()),
+        ("amplifiers", "json", ()),
+        ("recommended_actions", "json", ()),
+        ("statement_draft", "str", ()),
+        ("escalation_required", "bool", ()),
+        ("reputation_damage", "enum", ("estimated_impact", "reputation_damage")),
+        ("brand_name", "str", ()),
+        ("monitoring_period", "str", ()),
+        ("mentions_analyzed", "int", ()),
+    ],
+    "compliance": [
+        ("compliance_status", "enum", ()),
+        ("overall_risk", "enum", ()),
+        ("checks_performed", "list", ()),
+        ("violations", "json", ()),
+        ("required_mentions", "list", ()),
+        ("safe_to_publish", "bool", ()),
+        ("corrected_version", "str", ()),
+        ("content_type", "str", ()),
+        ("target_regions", "list", ()),
+    ],
+    "seo-aio": [
+        ("overall_score", "float", ()),
+        ("meta_title", "str", ("seo", "meta_title")),
+        ("meta_description", "str", ("seo", "meta_description")),
+        ("url_slug", "str", ("seo", "url_slug")),
+        ("primary_keywords", "list", ("seo", "primary_keywords")),
+        ("factual_accuracy_score", "float", ("aio", "factual_accuracy_score")),
+        ("seo", "json", ()),
+        ("aio", "json", ()),
+        ("recommendations", "list", ()),
+        ("language", "str", ()),
+        ("content_type", "str", ()),
+    ],
+    "trend-scout": [
+        ("trends", "json", ()),
+        ("top_trend_index", "int", ("top_recommendation", "trend_index")),
+        ("industry_insights", "str", ()),
+        ("competitive_analysis", "str", ()),
+        ("industry", "str", ()),
+        ("timeframe", "str", ()),
+    ],
+}
+
+# Appended to every agent's columns
+COMMON_COLUMNS: List[Tuple[str, str, Tuple[str, ...]]] = [
+    ("model_used", "str", ()),
+    ("cost", "float", ()),
+    ("tokens", "int", ()),
+    ("latency_ms", "int", ()),
+    ("created_at", "timestamp", ()),
+]
+
+
+def _validity(nulls: Sequence[int], length: int):
+    """Arrow validity bitmap buffer (None when there are no nulls)."""
+    import pyarrow as pa
+
+    if not nulls:
+        return None
+    bitmap = bytearray(b"\xff" * ((length + 7) // 8))
+    for row in nulls:
+        bitmap[row >> 3] &= ~(1 << (row & 7))
+    return pa.py_buffer(bitmap)
+
+
+def _truncate_nulls(nulls: array, length: int) -> None:
+    """Drop null positions at or past `length` (positions are ascending)."""
+    while nulls and nulls[-1] >= length:
+        nulls.pop()
+
+
+class _StrColumn:
+    """UTF-8 bytes + int32 offsets (Arrow string layout)."""
+
+    __slots__ = ("data", "offsets", "nulls")
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array("i", [0])
+        self.nulls = array("i")
+
+    def append(self, value: Any) -> None:
+        data = self.data
+        if value.__class__ is str:
+            data += value.encode()
+        elif value is None:
+            self.nulls.append(len(self.offsets) - 1)
+        else:
+            data += str(value).encode()
+        self.offsets.append(len(data))
+
+    def extend(self, values: List[Any]) -> None:
+        try:
+            encoded = [value.encode() for value in values]
+        except AttributeError:  # None or non-string values
+            for value in values:
+                _StrColumn.append(self, value)  # not the JSON override: already serialized
+            return
+        if not encoded:
+            return
+        lengths = list(map(len, encoded))
+        lengths[0] += len(self.data)
+        self.data += b"".join(encoded)
+        self.offsets.extend(itertools.accumulate(lengths))
+
+    def truncate(self, length: int) -> None:
+        del self.data[self.offsets[length]:]
+        del self.offsets[length + 1:]
+        _truncate_nulls(self.nulls, length)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data) + self.offsets.itemsize * len(self.offsets) + 4 * len(self.nulls)
+
+    def finish(self, pa_type=None):
+        import pyarrow as pa
+
+        n = len(self)
+        return pa.Array.from_buffers(
+            pa.string(), n,
+            [_validity(self.nulls, n), pa.py_buffer(self.offsets), pa.py_buffer(self.data)],
+            null_count=len(self.nulls),
+        )
+
+
+class _JsonColumn(_StrColumn):
+    """Nested values kept as JSON text."""
+
+    __slots__ = ()
+
+    def append(self, value: Any) -> None:
+        super().append(None if value is None else
+                       json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str))
+
+    def extend(self, values: List[Any]) -> None:
+        super().extend([
+            None if value is None else
+            json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+            for value in values
+        ])
+
+
+class _NumberColumn:
+    """Fixed-width numbers in an array('i' / 'q' / 'd')."""
+
+    __slots__ = ("values", "nulls", "cast")
+
+    def __init__(self, typecode: str):
+        self.values = array(typecode)
+        self.nulls = array("i")
+        self.cast = float if typecode == "d" else int
+
+    def append(self, value: Any) -> None:
+        try:
+            self.values.append(self.cast(value))
+        except (TypeError, ValueError, OverflowError):
+            self.nulls.append(len(self.values))
+            self.values.append(0)
+
+    def extend(self, values: List[Any]) -> None:
+        try:
+            chunk = array(self.values.typecode, values)
+        except (TypeError, OverflowError):  # None, strings or floats in an int column
+            for value in values:
+                self.append(value)
+            return
+        self.values += chunk
+
+    def truncate(self, length: int) -> None:
+        del self.values[length:]
+        _truncate_nulls(self.nulls, length)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.itemsize * len(self.values) + 4 * len(self.nulls)
+
+    def finish(self, pa_type):
+        import pyarrow as pa
+
+        n = len(self.values)
+        return pa.Array.from_buffers(
+            pa_type, n, [_validity(self.nulls, n), pa.py_buffer(self.values)],
+            null_count=len(self.nulls),
+        )
+
+
+class _TimestampColumn(_NumberColumn):
+    """Epoch milliseconds, defaulting to the append time."""
+
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__("q")
+
+    def append(self, value: Any) -> None:
+        super().append(int(time.time() * 1000) if value is None else value)
+
+
+class _BoolColumn:
+    """One byte per row (0, 1 or 2 = null, also for non-bool values), bit-packed on finish."""
+
+    __slots__ = ("values",)
+
+    def __init__(self):
+        self.values = bytearray()
+
+    def append(self, value: Any) -> None:
+        self.values.append(1 if value is True else 0 if value is False else 2)
+
+    def extend(self, values: List[Any]) -> None:
+        self.values += bytes(1 if value is True else 0 if value is False else 2 for value in values)
+
+    def truncate(self, length: int) -> None:
+        del self.values[length:]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.values)
+
+    def finish(self, pa_type=None):
+        import numpy as np
+        import pyarrow as pa
+
+        values = np.frombuffer(self.values, dtype=np.uint8)
+        mask = values == 2
+        return pa.array(values == 1, type=pa.bool_(), mask=mask if mask.any() else None)
+
+
+class _EnumColumn:
+    """int8 codes into a fixed vocabulary (Arrow dictionary<int8, string>); other values are null."""
+
+    __slots__ = ("vocabulary", "codes", "nulls", "_index")
+
+    def __init__(self, vocabulary: Sequence[str]):
+        self.vocabulary = tuple(vocabulary)
+        self._index = {value: code for code, value in enumerate(self.vocabulary)}
+        self.codes = array("b")
+        self.nulls = array("i")
+
+    def append(self, value: Any) -> None:
+        code = self._index.get(value) if value.__class__ is str else None
+        if code is None:
+            self.nulls.append(len(self.codes))
+            code = 0
+        self.codes.append(code)
+
+    def extend(self, values: List[Any]) -> None:
+        try:
+            codes = list(map(self._index.get, values))
+        except TypeError:  # unhashable values (lists, dicts)
+            codes = [None]
+        if None in codes:
+            for value in values:
+                self.append(value)
+            return
+        self.codes.extend(codes)
+
+    def truncate(self, length: int) -> None:
+        del self.codes[length:]
+        _truncate_nulls(self.nulls, length)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.codes) + 4 * len(self.nulls)
+
+    def finish(self, pa_type=None):
+        import pyarrow as pa
+
+        n = len(self.codes)
+        indices = pa.Array.from_buffers(
+            pa.int8(), n, [_validity(self.nulls, n), pa.py_buffer(self.codes)],
+            null_count=len(self.nulls),
+        )
+        return pa.DictionaryArray.from_arrays(indices, pa.array(self.vocabulary, pa.string()))
+
+
+class _ListColumn:
+    """list<string>: int32 list offsets over a string child."""
+
+    __slots__ = ("offsets", "items", "nulls")
+
+    def __init__(self):
+        self.offsets = array("i", [0])
+        self.items = _StrColumn()
+        self.nulls = array("i")
+
+    def append(self, value: Any) -> None:
+        if isinstance(value, (list, tuple)):
+            for item in value:
+                self.items.append(item if isinstance(item, str) or item is None else
+                                  json.dumps(item, ensure_ascii=False, default=str))
+        else:
+            self.nulls.append(len(self.offsets) - 1)
+        self.offsets.append(len(self.items))
+
+    def extend(self, values: List[Any]) -> None:
+        for value in values:
+            self.append(value)
+
+    def truncate(self, length: int) -> None:
+        self.items.truncate(self.offsets[length])
+        del self.offsets[length + 1:]
+        _truncate_nulls(self.nulls, length)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.itemsize * len(self.offsets) + self.items.nbytes + 4 * len(self.nulls)
+
+    def finish(self, pa_type=None):
+        import pyarrow as pa
+
+        n = len(self)
+        return pa.ListArray.from_buffers(
+            pa.list_(pa.string()), n,
+            [_validity(self.nulls, n), pa.py_buffer(self.offsets)],
+            null_count=len(self.nulls), children=[self.items.finish()],
+        )
+
+
+def _vocabulary(agent: str, path: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Enum values of a result path, from the agent's COMPACT_SCHEMA."""
+    from .registry import get_agent_class
+
+    schema = get_agent_class(agent).COMPACT_SCHEMA
+    field = None
+    for key in path:
+        field = schema.fields[key]
+        schema = field.schema or field.items
+    if field is None or field.enum is None:
+        raise ValueError(f"{agent}: {'.'.join(path)} has no enum in COMPACT_SCHEMA")
+    return field.enum
+
+
+class ResultBatchBuilder:
+    """
+    Accumulates one agent's results column by column.
+
+    Features:
+    - Fixed schema per agent (AGENT_COLUMNS + COMMON_COLUMNS): keys outside
+      it are not stored, missing or mistyped values become nulls (string
+      columns store str(value))
+    - append()/extend() are all-or-nothing: a failure rolls every column
+      back to the last complete row
+    - ~O(bytes of text) memory per row: no per-row dicts or Python objects
+    - to_batch() hands the buffers over to a pyarrow RecordBatch without
+      copying (except bit-packing booleans) and starts new ones
+    """
+
+    def __init__(self, agent: str):
+        if agent not in AGENT_COLUMNS:
+            raise ValueError(f"No columnar schema for agent: {agent}")
+        self.agent = agent
+        self.columns: List[Tuple[str, str, Tuple[str, ...]]] = [
+            (name, kind, path or (name,)) for name, kind, path in AGENT_COLUMNS[agent] + COMMON_COLUMNS
+        ]
+        self._vocabularies = {
+            name: _vocabulary(agent, path) for name, kind, path in self.columns if kind == "enum"
+        }
+        self._schema = None
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop buffered rows (after they were written)."""
+        self._builders = [self._new_builder(name, kind) for name, kind, _ in self.columns]
+        # (top-level key, nested keys, bound append) walked once per row
+        self._appenders = [
+            (path[0], path[1:], builder.append) for (_, _, path), builder in zip(self.columns, self._builders)
+        ]
+        self._rows = 0
+
+    def _new_builder(self, name: str, kind: str):
+        if kind == "str":
+            return _StrColumn()
+        if kind == "json":
+            return _JsonColumn()
+        if kind == "enum":
+            return _EnumColumn(self._vocabularies[name])
+        if kind == "bool":
+            return _BoolColumn()
+        if kind == "int":
+            return _NumberColumn("i")
+        if kind == "float":
+            return _NumberColumn("d")
+        if kind == "list":
+            return _ListColumn()
+        if kind == "timestamp":
+            return _TimestampColumn()
+        raise ValueError(f"Unknown column kind: {kind}")
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the buffered rows."""
+        return sum(builder.nbytes for builder in self._builders)
+
+    def append(self, result: Dict[str, Any]) -> None:
+        get = result.get
+        try:
+            for key, nested, append in self._appenders:
+                value = get(key)
+                for key in nested:
+                    value = value.get(key) if isinstance(value, dict) else None
+                append(value)
+        except BaseException:
+            self._rollback()
+            raise
+        self._rows += 1
+
+    def extend(self, results: List[Dict[str, Any]]) -> None:
+        """append() for many results, filled column by column (faster for bulk exports)."""
+        try:
+            for (_, _, path), builder in zip(self.columns, self._builders):
+                values = [result.get(path[0]) for result in results]
+                for key in path[1:]:
+                    values = [value.get(key) if isinstance(value, dict) else None for value in values]
+                builder.extend(values)
+        except BaseException:
+            self._rollback()
+            raise
+        self._rows += len(results)
+
+    def _rollback(self) -> None:
+        """Cut every column back to the rows counted so far."""
+        for builder in self._builders:
+            builder.truncate(self._rows)
+
+    @property
+    def schema(self):
+        """pyarrow schema of this agent's files."""
+        if self._schema is None:
+            import pyarrow as pa
+
+            types = {
+                "str": pa.string(), "json": pa.string(), "bool": pa.bool_(),
+                "int": pa.int32(), "float": pa.float64(), "list": pa.list_(pa.string()),
+                "timestamp": pa.timestamp("ms", tz="UTC"), "enum": pa.dictionary(pa.int8(), pa.string()),
+            }
+            self._schema = pa.schema(
+                [pa.field(name, types[kind]) for name, kind, _ in self.columns],
+                metadata={"agent": self.agent},
+            )
+        return self._schema
+
+    def to_batch(self):
+        """
+        The buffered rows as a pyarrow RecordBatch. The buffers are handed
+        to the batch without copying, and the builder starts over empty.
+        """
+        import pyarrow as pa
+
+        arrays = [
+            builder.finish(field.type)
+            for builder, field in zip(self._builders, self.schema)
+        ]
+        batch = pa.RecordBatch.from_arrays(arrays, schema=self.schema)
+        self.reset()
+        return batch
+
+
+class ColumnarSink:
+    """
+    Streams one agent's results to an Arrow IPC (.arrow) or Parquet
+    (.parquet) file in record batches of `batch_size` rows.
+    """
+
+    def __init__(
+        self,
+        agent: str,
+        path: str,
+        batch_size: int = 65536,
+        compression: Optional[str] = "zstd"
+    ):
+        self.path = path
+        self.format = "parquet" if path.endswith(".parquet") else "arrow"
+        self.batch_size = batch_size
+        self.compression = compression
+        self.builder = ResultBatchBuilder(agent)
+        self._writer = None
+        self.stats = {"rows": 0, "batches": 0}
+
+    def __enter__(self) -> "ColumnarSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def append(self, result: Dict[str, Any]) -> None:
+        self.builder.append(result)
+        if len(self.builder) >= self.batch_size:
+            self.flush()
+
+    def extend(self, results: Iterable[Dict[str, Any]]) -> None:
+        results = iter(results)
+        while True:
+            chunk = list(itertools.islice(results, self.batch_size - len(self.builder)))
+            if not chunk:
+                return
+            self.builder.extend(chunk)
+            if len(self.builder) >= self.batch_size:
+                self.flush()
+
+    def _open(self):
+        import pyarrow as pa
+
+        schema = self.builder.schema
+        if self.format == "parquet":
+            import pyarrow.parquet as pq
+
+            return pq.ParquetWriter(self.path, schema, compression=self.compression)
+        # Uncompressed IPC so readers can memory-map the buffers directly
+        return pa.ipc.new_file(pa.OSFile(self.path, "wb"), schema)
+
+    def flush(self) -> None:
+        """Write the buffered rows as one record batch."""
+        if not len(self.builder):
+            return
+        if self._writer is None:
+            self._writer = self._open()
+        batch = self.builder.to_batch()
+        self._writer.write_batch(batch)
+        self.stats["rows"] += batch.num_rows
+        self.stats["batches"] += 1
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is None:
+            self._writer = self._open()  # empty file with the schema
+        self._writer.close()
+        logger.info(f"[ColumnarSink] Wrote {self.stats['rows']} {self.builder.agent} rows to {self.path}")
+
+
+class ColumnarExporter:
+    """
+    One ColumnarSink per agent under `directory` ({slug}.arrow or
+    {slug}.parquet); submit() mirrors persistence.ResultSink.submit().
+    """
+
+    def __init__(self, directory: str, format: str = "arrow", **sink_options: Any):
+        if format not in ("arrow", "parquet"):
+            raise ValueError("format must be 'arrow' or 'parquet'")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.format = format
+        self.sink_options = sink_options
+        self.sinks: Dict[str, ColumnarSink] = {}
+
+    def submit(self, agent: str, result: Dict[str, Any]) -> None:
+        sink = self.sinks.get(agent)
+        if sink is None:
+            path = os.path.join(self.directory, f"{agent}.{self.format}")
+            sink = self.sinks[agent] = ColumnarSink(agent, path, **self.sink_options)
+        sink.append(result)
+
+    def close(self) -> None:
+        for sink in self.sinks.values():
+            sink.close()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {agent: dict(sink.stats, buffered=len(sink.builder)) for agent, sink in self.sinks.items()}
+
+
+def read_results(path: str, columns: Optional[List[str]] = None):
+    """
+    Load an exported file as a pyarrow Table.
+
+    Arrow IPC files are memory-mapped: columns are read from the page
+    cache without copying. Parquet is decoded (memory-mapped input).
+    """
+    import pyarrow as pa
+
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path, columns=columns, memory_map=True)
+    table = pa.ipc.open_file(pa.memory_map(path, "r")).read_all()
+    return table.select(columns) if columns else table
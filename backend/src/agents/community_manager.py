@@ -4,10 +4,17 @@ Community Manager Agent
 Analyzes social media comments and generates contextual responses.
 """
 
-from typing import Dict, Any, List
+import time
+from typing import TYPE_CHECKING, Dict, Any, List, Optional
 from .base import BaseAgent
+from .schemas import BOOL, CompactSchema, Field
+from .memory import ThreadMemoryStore
+from .tracing import get_tracer, traced_run
 import logging
 
+if TYPE_CHECKING:
+    from .retrieval import ReplyLibrary
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,6 +29,24 @@ class CommunityManagerAgent(BaseAgent):
     - Multi-language support (FR/EN)
     """
 
+    OUTPUT_SCHEMA = {
+        "sentiment": ("positive", "neutral", "negative", "spam", "toxic"),
+        "category": ("question", "complaint", "compliment", "spam", "other"),
+        "urgency": ("low", "medium", "high", "critical"),
+        "suggested_response": str,
+        "requires_human": bool,
+    }
+
+    COMPACT_SCHEMA = CompactSchema({
+        "sentiment": Field("s", enum=("positive", "neutral", "negative", "spam", "toxic")),
+        "category": Field("c", enum=("question", "complaint", "compliment", "spam", "other")),
+        "urgency": Field("u", enum=("low", "medium", "high", "critical"), default="low"),
+        "suggested_response": Field("r"),
+        "requires_human": Field("h", enum=BOOL),
+        "tags": Field("t", default=[]),
+        "internal_notes": Field("n", default=""),
+    })
+
     def __init__(self, model: str = "anthropic/claude-3.5-sonnet"):
         super().__init__(
             name="CommunityManager",
@@ -29,6 +54,10 @@ class CommunityManagerAgent(BaseAgent):
             temperature=0.8,  # More creative for social media
             max_tokens=500
         )
+        # Optional bounded thread memory, used when run() gets a thread_id
+        self.memory: Optional[ThreadMemoryStore] = None
+        # Optional approved-reply index (agents.retrieval, needs NumPy)
+        self.replies: Optional["ReplyLibrary"] = None
 
     def _build_system_prompt(self, brand_context: Dict[str, Any]) -> str:
         """Build system prompt with brand context."""
@@ -74,12 +103,14 @@ RÉPONSE FORMAT (JSON):
 }}
 """
 
+    @traced_run
     async def run(
         self,
         comment: str,
         platform: str,
         brand_context: Dict[str, Any],
-        conversation_history: List[Dict[str, str]] = None
+        conversation_history: List[Dict[str, str]] = None,
+        thread_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Analyze a comment and generate response.
@@ -89,6 +120,8 @@ RÉPONSE FORMAT (JSON):
             platform: Platform name (instagram, facebook, linkedin, tiktok, twitter)
             brand_context: Brand information (name, industry, tone, etc.)
             conversation_history: Previous messages in thread (optional)
+            thread_id: Thread identifier; with agent.memory set, the thread's
+                history is remembered and summarized across replies
 
         Returns:
             Analysis and suggested response
@@ -102,13 +135,45 @@ COMMENTAIRE À ANALYSER:
 "{comment}"
 """
 
-        if conversation_history:
+        use_memory = self.memory is not None and thread_id is not None
+        has_history = False
+        if use_memory:
+            if conversation_history and self.memory.get(platform, thread_id) is None:
+                # First sight of this thread: seed memory with the caller's history
+                await self.memory.extend(platform, thread_id, [
+                    (msg.get("role", "user"), msg.get("text", ""))
+                    for msg in conversation_history
+                ])
+            history = self.memory.render(platform, thread_id)
+            has_history = bool(history)
+            if history:
+                user_message += "\n\nHISTORIQUE CONVERSATION:\n" + history
+        elif conversation_history:
+            has_history = True
             user_message += "\n\nHISTORIQUE CONVERSATION:\n"
             for msg in conversation_history[-3:]:  # Last 3 messages only
                 role = msg.get("role", "user")
                 text = msg.get("text", "")
                 user_message += f"[{role}]: {text}\n"
 
+        if self.replies is not None:
+            started = time.perf_counter()
+            brand = brand_context.get("brand_id") or brand_context.get("brand_name", "")
+            with get_tracer().start_as_current_span("replies.lookup"):
+                # Mid-thread, an approved answer guides the reply but never replaces it
+                reuse, examples = self.replies.lookup(brand, comment, allow_reuse=not has_history)
+            if reuse is not None:
+                analysis = self._reuse_reply(reuse, platform, started)
+                if use_memory:
+                    await self._after_result(lambda: self._remember(
+                        platform, thread_id, comment, reuse["reply"]
+                    ))
+                return analysis
+            if examples:
+                user_message += "\n\nRÉPONSES APPROUVÉES SIMILAIRES (à adapter, pas à copier):\n"
+                for match in examples:
+                    user_message += f'- "{match["comment"]}" → "{match["reply"]}"\n'
+
         user_message += "\n\nGénère l'analyse complète au format JSON."
 
         # Call LLM
@@ -123,8 +188,14 @@ COMMENTAIRE À ANALYSER:
             analysis["platform"] = platform
             analysis["model_used"] = result["model"]
             analysis["cost"] = result["cost"]
+            analysis["tokens"] = result["tokens"]
             analysis["latency_ms"] = result["latency_ms"]
 
+            if use_memory:
+                await self._after_result(lambda: self._remember(
+                    platform, thread_id, comment, analysis.get("suggested_response", "")
+                ))
+
             return analysis
 
         except Exception as e:
@@ -141,6 +212,31 @@ COMMENTAIRE À ANALYSER:
                 "error": True
             }
 
+    async def _remember(self, platform: str, thread_id: str, comment: str, reply: str) -> None:
+        """Add the comment and the reply sent to the thread's memory."""
+        await self.memory.append(platform, thread_id, "user", comment)
+        await self.memory.append(platform, thread_id, "assistant", reply)
+
+    def _reuse_reply(self, match: Dict[str, Any], platform: str, started: float) -> Dict[str, Any]:
+        """Analysis built from an approved reply, without calling the LLM."""
+        logger.info(f"[CommunityManager] Reusing approved reply {match['id']} ({match['score']:.2f})")
+        meta = match["meta"]
+        return {
+            "sentiment": meta.get("sentiment", "neutral"),
+            "category": meta.get("category", "question"),
+            "urgency": meta.get("urgency", "low"),
+            "suggested_response": match["reply"],
+            "requires_human": False,
+            "tags": meta.get("tags", []),
+            "internal_notes": f"Réponse approuvée réutilisée (similarité {match['score']:.2f})",
+            "reused_reply": {"id": match["id"], "score": round(match["score"], 3)},
+            "platform": platform,
+            "model_used": "reply-index",
+            "cost": 0.0,
+            "tokens": 0,
+            "latency_ms": int((time.perf_counter() - started) * 1000),
+        }
+
 
 # Example usage
 async def test_community_manager():
@@ -4,8 +4,13 @@ Compliance Agent
 Validates legal compliance (CASL, RGPD, copyright) before publication.
 """
 
+import asyncio
 from typing import Dict, Any, List
 from .base import BaseAgent
+from .batching import QueueFullError
+from .scheduling import DeadlineExceededError
+from .schemas import BOOL, CompactSchema, Field
+from .tracing import traced_run
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +28,29 @@ class ComplianceAgent(BaseAgent):
     - Risk assessment
     """
 
+    # Max contents audited in a single batched LLM call
+    BATCH_SIZE = 4
+
+    # No defaults on the status/risk/publish verdicts: omitting them must not read as "safe"
+    COMPACT_SCHEMA = CompactSchema({
+        "compliance_status": Field("cs", enum=(
+            "compliant", "minor_issues", "major_issues", "critical"
+        )),
+        "overall_risk": Field("r", enum=("low", "medium", "high", "critical")),
+        "checks_performed": Field("cp"),
+        "violations": Field("v", default=[], items=CompactSchema({
+            "severity": Field("s", enum=("critical", "major", "minor")),
+            "law": Field("l", enum=("CASL", "RGPD", "Copyright", "FTC")),
+            "issue": Field("i"),
+            "article": Field("a"),
+            "recommendation": Field("rc"),
+            "risk": Field("k"),
+        })),
+        "required_mentions": Field("m", default=[]),
+        "safe_to_publish": Field("ok", enum=BOOL),
+        "corrected_version": Field("cv", default=""),
+    })
+
     def __init__(self, model: str = "openai/gpt-4o-mini"):
         super().__init__(
             name="Compliance",
@@ -98,6 +126,7 @@ Interdictions:
 }
 """
 
+    @traced_run
     async def run(
         self,
         content: str,
@@ -146,6 +175,7 @@ Effectue un audit complet et retourne le JSON de compliance."""
             audit["target_regions"] = target_regions
             audit["model_used"] = result["model"]
             audit["cost"] = result["cost"]
+            audit["tokens"] = result["tokens"]
             audit["latency_ms"] = result["latency_ms"]
 
             return audit
@@ -153,3 +183,82 @@ Effectue un audit complet et retourne le JSON de compliance."""
         except Exception as e:
             logger.error(f"[Compliance] Error parsing response: {e}")
             raise
+
+    async def run_batch(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """
+        Audit several contents with one LLM call per BATCH_SIZE items.
+
+        The long system prompt is sent once per chunk instead of once per
+        content. Chunks whose answer cannot be matched back to their items
+        fall back to individual run() calls; a chunk that was shed or
+        expired in the scheduler fails as a whole instead.
+
+        Args:
+            requests: List of run() keyword arguments
+
+        Returns:
+            One audit per request, or the exception it raised
+        """
+        if len(requests) <= 1:
+            return await super().run_batch(requests)
+
+        chunks = [
+            requests[i:i + self.BATCH_SIZE]
+            for i in range(0, len(requests), self.BATCH_SIZE)
+        ]
+        results = await asyncio.gather(*(self._run_chunk(chunk) for chunk in chunks))
+        return [audit for chunk_results in results for audit in chunk_results]
+
+    async def _run_chunk(self, requests: List[Dict[str, Any]]) -> List[Any]:
+        """Audit one chunk of contents in a single call."""
+        if len(requests) == 1:
+            return await super().run_batch(requests)
+
+        logger.info(f"[Compliance] Batch auditing {len(requests)} contents")
+
+        sections = []
+        for index, kwargs in enumerate(requests, start=1):
+            regions = kwargs.get("target_regions") or ["CA"]
+            sections.append(f"""=== CONTENU #{index} ===
+TYPE: {kwargs["content_type"]}
+RÉGIONS CIBLÉES: {', '.join(regions)}
+CONTIENT IMAGES: {kwargs.get("contains_images", False)}
+CONTIENT CLAIMS: {kwargs.get("contains_claims", False)}
+
+{kwargs["content"]}""")
+
+        user_message = f"""Audit de conformité légale de {len(requests)} contenus indépendants.
+
+{chr(10).join(sections)}
+
+Audite chaque contenu séparément et retourne {{"audits": [...]}} avec un JSON de compliance
+par contenu, dans le même ordre."""
+
+        try:
+            result = await self.call_llm(
+                self._build_system_prompt(),
+                user_message,
+                max_tokens=self.max_tokens * len(requests)
+            )
+            audits = self.parse_json_response(result["content"], expand=False).get("audits", [])
+            audits = [self.expand_output(audit) for audit in audits]
+            if len(audits) != len(requests):
+                raise ValueError(f"expected {len(requests)} audits, got {len(audits)}")
+        except (QueueFullError, DeadlineExceededError) as e:
+            logger.warning(f"[Compliance] Batch audit of {len(requests)} contents not run: {e}")
+            return [e] * len(requests)
+        except Exception as e:
+            logger.warning(f"[Compliance] Batch audit failed, auditing individually: {e}")
+            return await super().run_batch(requests)
+
+        share = round(result["cost"] / len(requests), 6)
+        for audit, kwargs in zip(audits, requests):
+            audit["content_type"] = kwargs["content_type"]
+            audit["target_regions"] = kwargs.get("target_regions") or ["CA"]
+            audit["model_used"] = result["model"]
+            audit["cost"] = share
+            audit["tokens"] = result["tokens"] // len(requests)
+            audit["latency_ms"] = result["latency_ms"]
+            audit["batch_size"] = len(requests)
+
+        return audits
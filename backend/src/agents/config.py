@@ -0,0 +1,73 @@
+"""
+Agent Configuration
+===================
+Environment settings read once per process instead of per agent.
+"""
+
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+
+class AgentConfig:
+    """Settings shared by every agent in the process."""
+
+    __slots__ = ("api_key", "api_url", "app_url", "llm_url", "llm_api_key", "llm_models", "llm_price")
+
+    def __init__(
+        self,
+        api_key: Optional[str],
+        api_url: str,
+        app_url: str,
+        llm_url: Optional[str] = None,
+        llm_api_key: Optional[str] = None,
+        llm_models: Optional[Dict[str, str]] = None,
+        llm_price: Optional[Tuple[float, float]] = None
+    ):
+        self.api_key = api_key
+        self.api_url = api_url
+        self.app_url = app_url
+        # Optional OpenAI-compatible server replacing OpenRouter (transport.py)
+        self.llm_url = llm_url
+        self.llm_api_key = llm_api_key
+        self.llm_models = llm_models or {}
+        self.llm_price = llm_price
+
+
+def _parse_models(value: str) -> Dict[str, str]:
+    """'openrouter/id=local-name,...' -> mapping."""
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {source.strip(): target.strip() for source, target in pairs}
+
+
+def _parse_price(value: str) -> Optional[Tuple[float, float]]:
+    """
+    'prompt,completion' USD per 1M tokens; empty = OpenRouter prices.
+
+    AGENTS_LLM_PRICE defaults to "0,0" (a self-hosted server is free per
+    call); set it to an empty string to price calls like OpenRouter.
+    """
+    if not value:
+        return None
+    prompt, completion = value.split(",")
+    return float(prompt), float(completion)
+
+
+@lru_cache(maxsize=1)
+def get_config() -> AgentConfig:
+    """Return the process-wide configuration (read from the environment once)."""
+    return AgentConfig(
+        api_key=os.getenv("OPENROUTER_API_KEY"),
+        api_url=os.getenv("OPENROUTER_API_URL", "https://openrouter.ai/api/v1/chat/completions"),
+        app_url=os.getenv("APP_URL", "http://localhost:8000"),
+        llm_url=os.getenv("AGENTS_LLM_URL"),
+        llm_api_key=os.getenv("AGENTS_LLM_API_KEY"),
+        llm_models=_parse_models(os.getenv("AGENTS_LLM_MODELS", "")),
+        llm_price=_parse_price(os.getenv("AGENTS_LLM_PRICE", "0,0")),
+    )
+
+
+def reload_config() -> AgentConfig:
+    """Re-read the environment (after changing it at runtime)."""
+    get_config.cache_clear()
+    return get_config()
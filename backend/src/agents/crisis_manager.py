@@ -6,6 +6,8 @@ Detects and manages reputation crises 24/7.
 
 from typing import Dict, Any, List
 from .base import BaseAgent
+from .schemas import BOOL, CompactSchema, Field
+from .tracing import traced_run
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +25,53 @@ class CrisisManagerAgent(BaseAgent):
     - Escalation alerts
     """
 
+    OUTPUT_SCHEMA = {
+        "crisis_detected": bool,
+        "crisis_score": float,
+        "severity": ("normal", "watch", "alert", "crisis"),
+        "escalation_required": bool,
+    }
+
+    COMPACT_SCHEMA = CompactSchema({
+        "crisis_detected": Field("d", enum=BOOL),
+        "crisis_score": Field("sc"),
+        "severity": Field("sv", enum=("normal", "watch", "alert", "crisis")),
+        "crisis_type": Field("ty", enum=(
+            "product", "service", "employee", "security", "advertising", "other"
+        )),
+        "sentiment_analysis": Field("sa", schema=CompactSchema({
+            "positive": Field("p"),
+            "neutral": Field("n"),
+            "negative": Field("ng"),
+            "trend": Field("t", enum=("improving", "stable", "worsening")),
+        })),
+        "key_issues": Field("ki", default=[]),
+        "amplifiers": Field("am", default=[], items=CompactSchema({
+            "type": Field("t", enum=("influencer", "media", "hashtag")),
+            "name": Field("n"),
+            "reach": Field("r"),
+            "sentiment": Field("s", enum=("positive", "neutral", "negative")),
+        })),
+        "recommended_actions": Field("ra", default=[], items=CompactSchema({
+            "priority": Field("p", enum=("immediate", "high", "medium")),
+            "action": Field("a"),
+            "owner": Field("o", enum=("team", "ceo", "legal", "pr")),
+            "deadline": Field("d"),
+        })),
+        "statement_draft": Field("st", default=""),
+        "escalation_required": Field("e", enum=BOOL),
+        "estimated_impact": Field("ei", schema=CompactSchema({
+            "reputation_damage": Field("rd", enum=("low", "medium", "high", "severe")),
+            "financial_risk": Field("fr", enum=("low", "medium", "high")),
+            "recovery_time": Field("rt", enum=("days", "weeks", "months")),
+        })),
+        "monitoring_plan": Field("mp", schema=CompactSchema({
+            "frequency": Field("f", enum=("15min", "1h", "4h", "daily")),
+            "platforms": Field("p"),
+            "keywords": Field("k"),
+        })),
+    })
+
     def __init__(self, model: str = "anthropic/claude-3.5-sonnet"):
         super().__init__(
             name="CrisisManager",
@@ -165,6 +214,7 @@ Tu surveilles la réputation et détectes/gères les crises AVANT qu'elles explo
 }
 """
 
+    @traced_run
     async def run(
         self,
         brand_name: str,
@@ -217,6 +267,7 @@ Effectue analyse complète et retourne JSON crisis management."""
             crisis["mentions_analyzed"] = len(mentions)
             crisis["model_used"] = result["model"]
             crisis["cost"] = result["cost"]
+            crisis["tokens"] = result["tokens"]
             crisis["latency_ms"] = result["latency_ms"]
 
             return crisis
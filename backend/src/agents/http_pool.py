@@ -0,0 +1,47 @@
+"""
+Sharded HTTP Pool
+=================
+Spreads high-concurrency upstream traffic across several small httpx pools.
+"""
+
+import asyncio
+import itertools
+from typing import Any, List
+import httpx
+
+
+class ShardedHTTPClient:
+    """
+    Drop-in replacement for httpx.AsyncClient.post() at high concurrency.
+
+    httpcore scans every pooled connection (and every queued request) on
+    each request, so one large pool burns CPU quadratically under load.
+    Several small pools, each gated by a semaphore so requests never queue
+    inside httpcore, keep the per-request cost flat.
+    """
+
+    def __init__(
+        self,
+        shards: int = 32,
+        connections_per_shard: int = 4,
+        timeout: float = 60.0
+    ):
+        limits = httpx.Limits(
+            max_connections=connections_per_shard,
+            max_keepalive_connections=connections_per_shard,
+        )
+        self.clients: List[httpx.AsyncClient] = [
+            httpx.AsyncClient(timeout=timeout, limits=limits) for _ in range(shards)
+        ]
+        self._gates = [asyncio.Semaphore(connections_per_shard) for _ in range(shards)]
+        self._next = itertools.cycle(range(shards))
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        """POST through the next shard (same signature as AsyncClient.post)."""
+        index = next(self._next)
+        async with self._gates[index]:
+            return await self.clients[index].post(url, **kwargs)
+
+    async def aclose(self) -> None:
+        """Close every shard."""
+        await asyncio.gather(*(client.aclose() for client in self.clients))
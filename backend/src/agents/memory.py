@@ -0,0 +1,194 @@
+"""
+Thread Memory
+=============
+Bounded per-thread conversation memory for CommunityManagerAgent.
+
+Recent turns are kept verbatim in a small ring buffer; turns leaving it
+are folded once into a rolling summary, so the rendered history fits a
+fixed token budget however long the thread gets:
+
+    from agents.memory import ThreadMemoryStore
+    agent.memory = ThreadMemoryStore(max_threads=1_000_000)
+    await agent.run(comment=..., platform="instagram", brand_context=...,
+                    thread_id="post-123:user-456")
+"""
+
+import re
+from collections import OrderedDict, deque
+from typing import Dict, Any, Awaitable, Callable, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (role, text)
+Turn = Tuple[str, str]
+
+Summarizer = Callable[[str, List[Turn]], Awaitable[str]]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?…])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class ExtractiveSummarizer:
+    """
+    Default summarizer: no LLM call.
+
+    Keeps the first sentence of each folded turn, always retains the
+    thread's opening fragment (usually the original issue) and drops the
+    oldest middle fragments beyond `max_chars`.
+    """
+
+    def __init__(self, max_chars: int = 600, fragment_chars: int = 160):
+        self.max_chars = max_chars
+        self.fragment_chars = fragment_chars
+
+    async def __call__(self, summary: str, turns: List[Turn]) -> str:
+        fragments = [summary] if summary else []
+        for role, text in turns:
+            first = _SENTENCE_END.split(text.strip(), 1)[0][:self.fragment_chars]
+            fragments.append(f"{role}: {first}")
+
+        merged = " | ".join(fragments)
+        if len(merged) <= self.max_chars:
+            return merged
+
+        opening = merged.split(" | ", 1)[0].split(" … ", 1)[0][:self.max_chars // 3]
+        tail = merged[-(self.max_chars - len(opening) - 3):]
+        return f"{opening} … {tail.split(' | ', 1)[-1]}"
+
+
+class ThreadState:
+    """Memory of one thread: summary, turns awaiting folding, recent turns."""
+
+    __slots__ = ("summary", "pending", "recent")
+
+    def __init__(self, recent_turns: int):
+        self.summary = ""
+        self.pending: List[Turn] = []
+        self.recent: deque = deque(maxlen=recent_turns)
+
+
+class ThreadMemoryStore:
+    """
+    LRU store of thread memories keyed by (platform, thread_id).
+
+    Features:
+    - At most `max_threads` threads; least recently used evicted first
+    - Per-thread memory bounded: `recent_turns` turns of at most
+      `max_turn_chars` characters plus a capped summary
+    - Turns leaving the ring buffer are folded into the summary in groups
+      of `fold_every` (each turn is summarized once, then reused)
+    - While the summarizer fails, at most `max_pending` unfolded turns are
+      kept per thread (oldest dropped first)
+    - render() fits summary + newest turns into `token_budget` tokens
+    """
+
+    def __init__(
+        self,
+        max_threads: int = 1_000_000,
+        recent_turns: int = 6,
+        token_budget: int = 400,
+        max_turn_chars: int = 600,
+        fold_every: int = 1,
+        max_pending: int = 24,
+        summarizer: Optional[Summarizer] = None
+    ):
+        self.max_threads = max_threads
+        self.recent_turns = recent_turns
+        self.token_budget = token_budget
+        self.max_turn_chars = max_turn_chars
+        self.fold_every = fold_every
+        self.max_pending = max(max_pending, fold_every)
+        # A third of the budget goes to the summary
+        self.summarizer = summarizer or ExtractiveSummarizer(max_chars=token_budget * 4 // 3)
+        self._threads: "OrderedDict[Tuple[str, str], ThreadState]" = OrderedDict()
+
+        self.stats = {"appends": 0, "folds": 0, "dropped_turns": 0, "evicted_threads": 0}
+
+    def __len__(self) -> int:
+        return len(self._threads)
+
+    def get(self, platform: str, thread_id: str) -> Optional[ThreadState]:
+        """Return a thread's memory (marking it recently used), or None."""
+        key = (platform, thread_id)
+        state = self._threads.get(key)
+        if state is not None:
+            self._threads.move_to_end(key)
+        return state
+
+    def _state(self, platform: str, thread_id: str) -> ThreadState:
+        state = self.get(platform, thread_id)
+        if state is None:
+            state = self._threads[(platform, thread_id)] = ThreadState(self.recent_turns)
+            if len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+                self.stats["evicted_threads"] += 1
+        return state
+
+    async def append(self, platform: str, thread_id: str, role: str, text: str) -> None:
+        """Add one turn to a thread."""
+        state = self._state(platform, thread_id)
+        if len(state.recent) == state.recent.maxlen:
+            state.pending.append(state.recent[0])
+        state.recent.append((role, text[:self.max_turn_chars]))
+        self.stats["appends"] += 1
+
+        if len(state.pending) >= self.fold_every:
+            pending, state.pending = state.pending, []
+            try:
+                state.summary = await self.summarizer(state.summary, pending)
+                self.stats["folds"] += 1
+            except Exception as e:
+                logger.warning(f"[ThreadMemory] Summarizer failed, keeping turns: {e}")
+                pending += state.pending
+                dropped = len(pending) - self.max_pending
+                if dropped > 0:
+                    del pending[:dropped]
+                    self.stats["dropped_turns"] += dropped
+                state.pending = pending
+
+    async def extend(self, platform: str, thread_id: str, turns: List[Turn]) -> None:
+        """Add several turns in order (e.g. a caller-supplied history)."""
+        for role, text in turns:
+            await self.append(platform, thread_id, role, text)
+
+    def render(self, platform: str, thread_id: str) -> str:
+        """
+        Thread context for a prompt, within the token budget.
+
+        Returns:
+            "RÉSUMÉ: ..." followed by the newest turns that fit, oldest
+            first; empty string for an unknown thread
+        """
+        state = self.get(platform, thread_id)
+        if state is None:
+            return ""
+
+        budget = self.token_budget
+        header = f"RÉSUMÉ: {state.summary}\n" if state.summary else ""
+        budget -= estimate_tokens(header)
+
+        lines: List[str] = []
+        for role, text in reversed([*state.pending, *state.recent]):
+            line = f"[{role}]: {text}\n"
+            cost = estimate_tokens(line)
+            if cost > budget:
+                if not lines and budget > 16:
+                    # Always keep (part of) the latest turn
+                    lines.append(line[:budget * 4 - 2] + "…\n")
+                break
+            lines.append(line)
+            budget -= cost
+
+        return header + "".join(reversed(lines))
+
+    def forget(self, platform: str, thread_id: str) -> None:
+        """Drop a thread's memory (e.g. thread closed or deleted)."""
+        self._threads.pop((platform, thread_id), None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, threads=len(self._threads))
@@ -0,0 +1,377 @@
+"""
+Mention Router
+==============
+Routes a social-media firehose to thousands of monitored brands in one
+pass, and schedules CrisisManager assessments only for brands whose
+mention windows changed:
+
+    from agents.mentions import MentionRouter
+    router = MentionRouter()
+    router.add_brand("resto-qc", "Resto Québec", aliases=["@restoquebec"],
+                     keywords=["poutine royale"])
+    for mention in firehose:
+        router.ingest(mention)                 # {"platform", "text"[, "timestamp"]}
+    results = await router.assess(CrisisManagerAgent())
+
+Matching is a token-level Aho-Corasick automaton over every brand's name,
+aliases and keywords: whole words only ("Gap" does not match "gapping"),
+case- and accent-insensitive, with multi-word names also matched as one
+hashtag ("#RestoQuebec").
+"""
+
+import asyncio
+import re
+import time
+import unicodedata
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_COMBINING = re.compile("[\u0300-\u036f]")
+
+PERIOD_SECONDS = {"1h": 3600, "4h": 4 * 3600, "24h": 24 * 3600}
+
+
+def to_epoch(value: Any) -> float:
+    """
+    Epoch seconds of a mention timestamp (number, numeric string, ISO 8601
+    string or datetime; naive values are taken as UTC).
+
+    Raises:
+        ValueError: The value is not a timestamp
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid timestamp: {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+        try:
+            value = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            raise ValueError(f"Invalid timestamp: {value!r}") from None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    raise ValueError(f"Invalid timestamp: {value!r}")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, accent-free word tokens ('#Resto-Québec' -> ['resto', 'quebec'])."""
+    text = text.lower()
+    if not text.isascii():
+        text = _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+    return _WORD.findall(text)
+
+
+class BrandWatch:
+    """One monitored brand: its terms, mention window and assessment state."""
+
+    __slots__ = (
+        "brand_id", "name", "terms", "monitoring_period", "historical_sentiment",
+        "window", "window_s", "new_mentions", "last_assessed", "last_result",
+    )
+
+    def __init__(
+        self,
+        brand_id: str,
+        name: str,
+        terms: List[Tuple[str, ...]],
+        monitoring_period: str,
+        historical_sentiment: Optional[Dict[str, float]],
+        max_mentions: int
+    ):
+        self.brand_id = brand_id
+        self.name = name
+        self.terms = terms
+        self.monitoring_period = monitoring_period
+        self.historical_sentiment = historical_sentiment
+        # (timestamp, mention), oldest first
+        self.window: deque = deque(maxlen=max_mentions)
+        self.window_s = PERIOD_SECONDS.get(monitoring_period, 3600)
+        self.new_mentions = 0
+        self.last_assessed = 0.0
+        self.last_result: Optional[Dict[str, Any]] = None
+
+    def prune(self, now: float) -> None:
+        """Drop mentions older than the monitoring period."""
+        horizon = now - self.window_s
+        window = self.window
+        while window and window[0][0] < horizon:
+            window.popleft()
+
+
+class MentionRouter:
+    """
+    Multi-brand mention matching, per-brand windows and assessment scheduling.
+
+    Features:
+    - One token-level Aho-Corasick scan per mention, whatever the number of
+      brands; tokens outside every brand's vocabulary reset the automaton
+      with a single set lookup
+    - Brands added/removed at any time: the trie is updated in place and
+      failure links are recomputed once, on the next scan
+    - Per-brand bounded window over the brand's monitoring period
+    - due()/assess() pick only brands with new mentions since their last
+      assessment, at most once per `min_interval_s`, busiest first
+    """
+
+    def __init__(
+        self,
+        min_interval_s: float = 300.0,
+        min_new_mentions: int = 1,
+        max_mentions: int = 100
+    ):
+        self.min_interval_s = min_interval_s
+        self.min_new_mentions = min_new_mentions
+        self.max_mentions = max_mentions
+        self.brands: Dict[str, BrandWatch] = {}
+
+        # Trie over tokens: node -> {token: child}, failure link, own and merged outputs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._own: List[Set[str]] = [set()]
+        self._out: List[Tuple[str, ...]] = [()]
+        self._vocab: Set[str] = set()
+        self._stale = False
+        self._changed: Set[str] = set()
+
+        self.stats = {"mentions": 0, "matched": 0, "routed": 0, "assessments": 0,
+                      "link_builds": 0, "rejected": 0}
+
+    # ------------------------------------------------------------------
+    # Brands
+    # ------------------------------------------------------------------
+
+    def add_brand(
+        self,
+        brand_id: str,
+        name: str,
+        aliases: Iterable[str] = (),
+        keywords: Iterable[str] = (),
+        monitoring_period: str = "1h",
+        historical_sentiment: Optional[Dict[str, float]] = None
+    ) -> BrandWatch:
+        """Start (or update) monitoring a brand; returns its watch."""
+        if brand_id in self.brands:
+            self.remove_brand(brand_id)
+
+        terms: Set[Tuple[str, ...]] = set()
+        for phrase in [name, *aliases, *keywords]:
+            tokens = tuple(tokenize(phrase))
+            if tokens:
+                terms.add(tokens)
+                if len(tokens) > 1:
+                    terms.add(("".join(tokens),))  # hashtag / handle form
+        watch = BrandWatch(
+            brand_id, name, sorted(terms), monitoring_period, historical_sentiment,
+            self.max_mentions
+        )
+        self.brands[brand_id] = watch
+        for tokens in watch.terms:
+            self._own[self._insert(tokens)].add(brand_id)
+        self._stale = True
+        return watch
+
+    def remove_brand(self, brand_id: str) -> None:
+        """Stop monitoring a brand (its trie nodes stay, without outputs)."""
+        watch = self.brands.pop(brand_id, None)
+        if watch is None:
+            return
+        for tokens in watch.terms:
+            node = self._find(tokens)
+            if node is not None:
+                self._own[node].discard(brand_id)
+        self._changed.discard(brand_id)
+        self._stale = True
+
+    def _insert(self, tokens: Tuple[str, ...]) -> int:
+        node = 0
+        for token in tokens:
+            child = self._goto[node].get(token)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][token] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append(set())
+                self._out.append(())
+                self._vocab.add(token)
+            node = child
+        return node
+
+    def _find(self, tokens: Tuple[str, ...]) -> Optional[int]:
+        node = 0
+        for token in tokens:
+            node = self._goto[node].get(token)
+            if node is None:
+                return None
+        return node
+
+    def _build_links(self) -> None:
+        """Breadth-first failure links and merged outputs."""
+        goto, fail, own, out = self._goto, self._fail, self._own, self._out
+        queue = deque()
+        for child in goto[0].values():
+            fail[child] = 0
+            out[child] = tuple(own[child])
+            queue.append(child)
+        while queue:
+            node = queue.popleft()
+            for token, child in goto[node].items():
+                state = fail[node]
+                while state and token not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(token, 0)
+                inherited = out[fail[child]]
+                out[child] = tuple(own[child].union(inherited)) if inherited else tuple(own[child])
+                queue.append(child)
+        self._stale = False
+        self.stats["link_builds"] += 1
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def match(self, text: str) -> Set[str]:
+        """Brand ids whose name, alias or keyword occurs in `text`."""
+        if self._stale:
+            self._build_links()
+        goto, fail, out, vocab = self._goto, self._fail, self._out, self._vocab
+        found: Set[str] = set()
+        state = 0
+        for token in tokenize(text):
+            if token not in vocab:
+                state = 0
+                continue
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+    def ingest(self, mention: Dict[str, Any], now: Optional[float] = None) -> Set[str]:
+        """
+        Route one mention to the windows of the brands it names.
+
+        Raises:
+            ValueError: Non-string text or a timestamp that is not a time
+        """
+        text = mention.get("text", "")
+        if not isinstance(text, str):
+            raise ValueError(f"Mention text must be a string, not {type(text).__name__}")
+        timestamp = mention.get("timestamp")
+        timestamp = to_epoch(timestamp) if timestamp is not None else now or time.time()
+
+        self.stats["mentions"] += 1
+        brand_ids = self.match(text)
+        if not brand_ids:
+            return brand_ids
+
+        self.stats["matched"] += 1
+        self.stats["routed"] += len(brand_ids)
+        for brand_id in brand_ids:
+            watch = self.brands[brand_id]
+            watch.window.append((timestamp, mention))
+            watch.new_mentions += 1
+            self._changed.add(brand_id)
+        return brand_ids
+
+    def ingest_many(self, mentions: Iterable[Dict[str, Any]], now: Optional[float] = None) -> int:
+        """Route a batch of mentions; returns how many matched a brand (invalid ones are skipped)."""
+        now = now or time.time()
+        matched = 0
+        for mention in mentions:
+            try:
+                matched += bool(self.ingest(mention, now))
+            except ValueError as e:
+                self.stats["rejected"] += 1
+                logger.debug(f"[MentionRouter] Rejected mention: {e}")
+        return matched
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def due(self, now: Optional[float] = None, limit: Optional[int] = None) -> List[BrandWatch]:
+        """
+        Brands needing a crisis assessment, busiest first.
+
+        A brand is due when it received at least `min_new_mentions` since
+        its last assessment and that assessment is `min_interval_s` old.
+        """
+        now = now or time.time()
+        watches = [self.brands.get(brand_id) for brand_id in self._changed]
+        ready = [
+            watch for watch in watches
+            if watch is not None
+            and watch.new_mentions >= self.min_new_mentions
+            and now - watch.last_assessed >= self.min_interval_s
+        ]
+        ready.sort(key=lambda watch: watch.new_mentions, reverse=True)
+        return ready[:limit] if limit is not None else ready
+
+    def mark_assessed(self, watch: BrandWatch, now: Optional[float] = None) -> None:
+        watch.last_assessed = now or time.time()
+        watch.new_mentions = 0
+        self._changed.discard(watch.brand_id)
+
+    async def assess(
+        self,
+        agent,
+        now: Optional[float] = None,
+        limit: Optional[int] = None,
+        max_concurrency: int = 8
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Run `agent` (a CrisisManagerAgent) on every due brand's window.
+
+        Returns:
+            brand_id -> crisis report (also kept on watch.last_result)
+        """
+        now = now or time.time()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        async def assess_one(watch: BrandWatch) -> None:
+            pending = watch.new_mentions
+            self.mark_assessed(watch, now)
+            async with semaphore:
+                try:
+                    watch.prune(now)
+                    report = await agent.run(
+                        brand_name=watch.name,
+                        mentions=[mention for _, mention in watch.window],
+                        monitoring_period=watch.monitoring_period,
+                        historical_sentiment=watch.historical_sentiment,
+                    )
+                except Exception as e:
+                    logger.warning(f"[MentionRouter] Assessment failed for {watch.brand_id}: {e}")
+                    # Retry after min_interval_s, unless the brand was removed meanwhile
+                    watch.new_mentions += pending
+                    if self.brands.get(watch.brand_id) is watch:
+                        self._changed.add(watch.brand_id)
+                    return
+            watch.last_result = report
+            results[watch.brand_id] = report
+            self.stats["assessments"] += 1
+
+        await asyncio.gather(*(assess_one(watch) for watch in self.due(now, limit)))
+        return results
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(
+            self.stats,
+            brands=len(self.brands),
+            trie_nodes=len(self._goto),
+            pending_brands=len(self._changed),
+        )
@@ -0,0 +1,229 @@
+"""
+Agent Metrics
+=============
+Pluggable per-phase latency, token and cost instrumentation for agents.
+
+The default backend is a no-op; install one with set_metrics():
+
+    from agents.metrics import InMemoryMetrics, set_metrics
+    metrics = set_metrics(InMemoryMetrics())
+    ...
+    print(metrics.render())   # Prometheus text exposition format
+"""
+
+import threading
+from time import perf_counter
+from typing import Dict, Any, Tuple
+
+PREFIX = "astromedia_agent_"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HISTOGRAMS = {
+    "queue_wait_seconds": "Time waiting for a rate-limit/scheduler slot",
+    "connect_seconds": "TCP/TLS connect time (0 on a reused connection)",
+    "ttfb_seconds": "Request sent to response headers received",
+    "upstream_seconds": "Total upstream time including retries",
+    "parse_seconds": "Time spent parsing the model's JSON output",
+}
+
+COUNTERS = {
+    "calls_total": "LLM calls by status",
+    "retries_total": "Retried LLM requests",
+    "prompt_tokens_total": "Prompt tokens consumed",
+    "completion_tokens_total": "Completion tokens produced",
+    "cost_usd_total": "Estimated cost in USD",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class MetricsBackend:
+    """No-op metrics backend; also the interface for real backends."""
+
+    # Callers skip timing work entirely when False
+    enabled = False
+
+    def observe(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        """Record a histogram sample."""
+
+    def inc(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        """Increment a counter."""
+
+
+class NoopMetrics(MetricsBackend):
+    """Default backend: records nothing."""
+
+
+class InMemoryMetrics(MetricsBackend):
+    """
+    Dependency-free Prometheus-style histograms and counters.
+
+    Features:
+    - Cumulative histogram buckets per (metric, labels)
+    - snapshot() for programmatic use (benchmarks, health endpoints)
+    - render() in the Prometheus text exposition format
+    """
+
+    enabled = True
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, LabelKey], list] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._histograms.get(key)
+            if series is None:
+                # [bucket counts..., sum, count]
+                series = self._histograms[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def inc(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counters and histogram summaries as plain dicts."""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in self._counters.items()
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": series[-1],
+                    "sum": series[-2],
+                    "buckets": dict(zip(self.buckets, series[:len(self.buckets)])),
+                }
+                for (name, labels), series in self._histograms.items()
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def render(self) -> str:
+        """Render all series in the Prometheus text exposition format."""
+        def fmt(labels: LabelKey, extra: str = "") -> str:
+            parts = [f'{k}="{v}"' for k, v in labels]
+            if extra:
+                parts.append(extra)
+            return "{" + ",".join(parts) + "}" if parts else ""
+
+        lines = []
+        with self._lock:
+            for name, help_text in COUNTERS.items():
+                series = [(k[1], v) for k, v in self._counters.items() if k[0] == name]
+                if not series:
+                    continue
+                lines.append(f"# HELP {PREFIX}{name} {help_text}")
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                for labels, value in series:
+                    lines.append(f"{PREFIX}{name}{fmt(labels)} {value}")
+
+            for name, help_text in HISTOGRAMS.items():
+                series = [(k[1], v) for k, v in self._histograms.items() if k[0] == name]
+                if not series:
+                    continue
+                lines.append(f"# HELP {PREFIX}{name} {help_text}")
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for labels, values in series:
+                    for bound, count in zip(self.buckets, values):
+                        le = 'le="%s"' % bound
+                        lines.append(f"{PREFIX}{name}_bucket{fmt(labels, le)} {count}")
+                    le = 'le="+Inf"'
+                    lines.append(f"{PREFIX}{name}_bucket{fmt(labels, le)} {values[-1]}")
+                    lines.append(f"{PREFIX}{name}_sum{fmt(labels)} {values[-2]}")
+                    lines.append(f"{PREFIX}{name}_count{fmt(labels)} {values[-1]}")
+
+        return "\n".join(lines) + "\n"
+
+
+class PrometheusClientMetrics(MetricsBackend):
+    """Backend registering metrics with the optional prometheus_client package."""
+
+    enabled = True
+
+    def __init__(self, registry=None, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        import prometheus_client
+
+        self._client = prometheus_client
+        self._registry = registry or prometheus_client.REGISTRY
+        self._buckets = buckets
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _metric(self, name: str, labels: Dict[str, str], histogram: bool):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    if histogram:
+                        metric = self._client.Histogram(
+                            PREFIX + name, HISTOGRAMS.get(name, name), sorted(labels),
+                            buckets=self._buckets, registry=self._registry,
+                        )
+                    else:
+                        metric = self._client.Counter(
+                            PREFIX + name.removesuffix("_total"), COUNTERS.get(name, name),
+                            sorted(labels), registry=self._registry,
+                        )
+                    self._metrics[name] = metric
+        return metric.labels(**labels)
+
+    def observe(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        self._metric(name, labels, True).observe(value)
+
+    def inc(self, name: str, value: float, labels: Dict[str, str]) -> None:
+        self._metric(name, labels, False).inc(value)
+
+
+_backend: MetricsBackend = NoopMetrics()
+
+
+def get_metrics() -> MetricsBackend:
+    """Return the process-wide metrics backend."""
+    return _backend
+
+
+def set_metrics(backend: MetricsBackend) -> MetricsBackend:
+    """Install a process-wide metrics backend and return it."""
+    global _backend
+    _backend = backend
+    return backend
+
+
+class PhaseTrace:
+    """
+    httpx trace hook capturing connect and time-to-first-byte.
+
+    Passed as `extensions={"trace": PhaseTrace()}`; only installed when the
+    metrics backend is enabled.
+    """
+
+    __slots__ = ("connect_started", "connect_seconds", "headers_received")
+
+    def __init__(self):
+        self.connect_started = 0.0
+        self.connect_seconds = 0.0
+        self.headers_received = 0.0
+
+    async def __call__(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.started":
+            self.connect_started = perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            self.connect_seconds = perf_counter() - self.connect_started
+        elif event_name in (
+            "http11.receive_response_headers.complete",
+            "http2.receive_response_headers.complete",
+        ):
+            self.headers_received = perf_counter()
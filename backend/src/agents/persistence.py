@@ -0,0 +1,318 @@
+"""
+Result Persistence
+==================
+Write-behind sink storing agent results in Postgres (Neon) with COPY.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = [
+    "id", "agent", "model_used", "cost", "tokens", "latency_ms", "created_at", "payload",
+]
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id          TEXT PRIMARY KEY,
+    agent       TEXT NOT NULL,
+    model_used  TEXT,
+    cost        DOUBLE PRECISION,
+    tokens      INTEGER,
+    latency_ms  INTEGER,
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT now(),
+    payload     JSONB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS {table}_agent_created_idx ON {table} (agent, created_at DESC);
+"""
+
+Row = Tuple[str, str, Optional[str], Optional[float], Optional[int], Optional[int], datetime, str]
+
+# SQLSTATE classes for rows Postgres rejects for their content (22: data
+# exception, 23: integrity constraint violation)
+DATA_ERROR_CLASSES = ("22", "23")
+
+
+def to_row(agent: str, result: Dict[str, Any]) -> Row:
+    """Flatten an agent result into a COPY row."""
+    return (
+        uuid.uuid4().hex,
+        agent,
+        result.get("model_used"),
+        result.get("cost"),
+        result.get("tokens"),
+        result.get("latency_ms"),
+        datetime.now(timezone.utc),
+        json.dumps(result, ensure_ascii=False, default=str),
+    )
+
+
+def is_data_error(error: BaseException) -> bool:
+    """True when COPY failed because of the rows themselves, not the connection."""
+    sqlstate = getattr(error, "sqlstate", None) or ""
+    # asyncpg's client-side encoding errors are ValueErrors
+    return sqlstate[:2] in DATA_ERROR_CLASSES or isinstance(error, (ValueError, TypeError))
+
+
+def _append_rows(path: str, rows: List[Row]) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps([*row[:6], row[6].isoformat(), row[7]]) + "\n")
+
+
+def _take_rows(path: str) -> List[Row]:
+    """
+    Read and remove a spill file (moved aside first so appends start a new one).
+
+    A ".replay" file left by a replay that crashed is taken alone first;
+    the spill file waits for the next call.
+    """
+    taken = f"{path}.replay"
+    if not os.path.exists(taken):
+        if not os.path.exists(path):
+            return []
+        os.replace(path, taken)
+    rows = []
+    with open(taken, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                # Torn last line of a spill interrupted by a crash
+                logger.error(f"[ResultSink] Skipping unreadable spilled row in {taken}")
+    os.remove(taken)
+    return [(*values[:6], datetime.fromisoformat(values[6]), values[7]) for values in rows]
+
+
+class ResultSink:
+    """
+    Buffered, asynchronous writer of agent results.
+
+    Features:
+    - submit() is synchronous and O(1): agents never wait on the database
+    - Batches flushed with COPY when `batch_size` rows are buffered or
+      every `flush_interval` seconds
+    - Bounded buffer; overflow goes to an optional local spill file
+      (replayed once the database catches up) or is dropped and counted
+    - Spill and quarantine files are written off the event loop
+      (asyncio.to_thread) by the flush loop
+    - Failed flushes are retried with the rows kept in order
+    - A batch Postgres rejects for its data is split in half until the bad
+      rows are isolated; those are quarantined (optional `quarantine_path`,
+      same format as the spill file) instead of being retried forever
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        table: str = "agent_results",
+        batch_size: int = 1000,
+        flush_interval: float = 1.0,
+        max_buffer: int = 100_000,
+        spill_path: Optional[str] = None,
+        quarantine_path: Optional[str] = None
+    ):
+        self.dsn = dsn or os.getenv("NEON_DATABASE_URL")
+        if not self.dsn:
+            raise ValueError("NEON_DATABASE_URL environment variable not set")
+
+        self.table = table
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self.spill_path = spill_path
+        self.quarantine_path = quarantine_path
+
+        self._buffer: deque = deque()
+        self._spill_pending: List[Row] = []
+        self._wakeup = asyncio.Event()
+        self._pool = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._closing = False
+
+        self.stats = {"submitted": 0, "written": 0, "flushes": 0, "spilled": 0,
+                      "dropped": 0, "quarantined": 0, "failed_flushes": 0}
+
+    async def start(self) -> "ResultSink":
+        """Connect, create the table if needed and start flushing."""
+        import asyncpg
+
+        self._pool = await asyncpg.create_pool(self.dsn, min_size=1, max_size=2)
+        async with self._pool.acquire() as conn:
+            await conn.execute(CREATE_TABLE.format(table=self.table))
+
+        self._flusher = asyncio.create_task(self._flush_loop())
+        logger.info(f"[ResultSink] Writing to {self.table}")
+        return self
+
+    def submit(self, agent: str, result: Dict[str, Any]) -> bool:
+        """
+        Queue a result for persistence without blocking.
+
+        Args:
+            agent: Agent name or slug
+            result: Dict returned by the agent's run()
+
+        Returns:
+            True if buffered, False if spilled to disk or dropped
+        """
+        self.stats["submitted"] += 1
+        row = to_row(agent, result)
+
+        if len(self._buffer) >= self.max_buffer:
+            self._overflow([row])
+            return False
+
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def _overflow(self, rows: List[Row]) -> None:
+        """Queue rows for the spill file (written by the flush loop) or drop them."""
+        room = self.max_buffer - len(self._spill_pending) if self.spill_path else 0
+        if room < len(rows):
+            self.stats["dropped"] += len(rows) - max(room, 0)
+            rows = rows[:max(room, 0)]
+        self._spill_pending.extend(rows)
+
+    async def _write_spill(self) -> None:
+        if not self._spill_pending:
+            return
+        rows, self._spill_pending = self._spill_pending, []
+        try:
+            await asyncio.to_thread(_append_rows, self.spill_path, rows)
+        except BaseException:
+            self._spill_pending[:0] = rows
+            raise
+        self.stats["spilled"] += len(rows)
+
+    async def _replay_spill(self) -> None:
+        """Move spilled rows back into the buffer once it has room."""
+        if not self.spill_path or len(self._buffer) > self.max_buffer // 2:
+            return
+
+        rows = await asyncio.to_thread(_take_rows, self.spill_path)
+        if not rows:
+            return
+        room = self.max_buffer - len(self._buffer)
+        self._buffer.extend(rows[:room])
+        if len(rows) > room:
+            self._overflow(rows[room:])
+        logger.info(f"[ResultSink] Replayed {min(room, len(rows))} spilled rows")
+
+    async def _quarantine(self, row: Row, error: Exception) -> None:
+        self.stats["quarantined"] += 1
+        logger.error(f"[ResultSink] Quarantined row {row[0]} ({row[1]}): {error}")
+        if self.quarantine_path:
+            try:
+                await asyncio.to_thread(_append_rows, self.quarantine_path, [row])
+            except OSError as e:
+                logger.error(f"[ResultSink] Could not write {self.quarantine_path}: {e}")
+
+    async def _flush_loop(self) -> None:
+        backoff = self.flush_interval
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), backoff)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self._write_spill()
+                await self.flush()
+                await self._replay_spill()
+                backoff = self.flush_interval
+            except Exception as e:
+                self.stats["failed_flushes"] += 1
+                backoff = min(backoff * 2, 30.0)
+                logger.error(f"[ResultSink] Flush failed, retrying in {backoff:.1f}s: {e}")
+
+    async def flush(self) -> int:
+        """
+        Write everything currently buffered.
+
+        Returns:
+            Number of rows written
+        """
+        written = 0
+        while self._buffer:
+            count = min(self.batch_size, len(self._buffer))
+            rows = [self._buffer.popleft() for _ in range(count)]
+            start = time.perf_counter()
+            copied = await self._copy(rows)
+            written += copied
+            self.stats["written"] += copied
+            self.stats["flushes"] += 1
+            logger.debug(
+                f"[ResultSink] Copied {copied} rows in {(time.perf_counter() - start) * 1000:.1f}ms"
+            )
+        return written
+
+    async def _copy(self, rows: List[Row]) -> int:
+        """COPY one batch, bisecting it when Postgres rejects its data."""
+        copied = 0
+        parts = [rows]  # still to write, next one last
+        try:
+            while parts:
+                part = parts.pop()
+                try:
+                    await self._pool.copy_records_to_table(
+                        self.table, records=part, columns=COLUMNS
+                    )
+                except Exception as e:
+                    if not is_data_error(e):
+                        parts.append(part)
+                        raise
+                    if len(part) == 1:
+                        await self._quarantine(part[0], e)
+                    else:
+                        middle = len(part) // 2
+                        parts += [part[middle:], part[:middle]]
+                    continue
+                copied += len(part)
+        except BaseException:
+            # Keep ordering: unwritten rows go back to the front
+            self.stats["written"] += copied
+            self._buffer.extendleft(row for part in parts for row in reversed(part))
+            while len(self._buffer) > self.max_buffer:
+                self._overflow([self._buffer.pop()])
+            raise
+        return copied
+
+    async def close(self) -> None:
+        """Flush remaining rows and close the pool."""
+        self._closing = True
+        self._wakeup.set()
+        if self._flusher is not None:
+            await asyncio.gather(self._flusher, return_exceptions=True)
+        try:
+            await self.flush()
+        except Exception as e:
+            logger.error(f"[ResultSink] Final flush failed: {e}")
+            self._overflow(list(self._buffer))
+            self._buffer.clear()
+        try:
+            await self._write_spill()
+        except Exception as e:
+            self.stats["dropped"] += len(self._spill_pending)
+            logger.error(f"[ResultSink] Could not spill {len(self._spill_pending)} rows: {e}")
+        if self._pool is not None:
+            await self._pool.close()
+
+    async def __aenter__(self) -> "ResultSink":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
@@ -0,0 +1,304 @@
+"""
+Agent Pipeline
+==============
+Runs several agents on the same content as a DAG of concurrent nodes.
+"""
+
+import asyncio
+import re
+import time
+from typing import Dict, Any, List, Optional, Callable
+import httpx
+import logging
+
+from .base import BaseAgent, _http_client
+
+logger = logging.getLogger(__name__)
+
+_ZERO_WIDTH = re.compile("[\u200b\u200c\u200d\ufeff]")
+_WHITESPACE = re.compile(r"[ \t]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def preprocess_content(content: str) -> Dict[str, Any]:
+    """
+    Normalize content once so every node sends the same compact text.
+
+    Args:
+        content: Raw content submitted to the pipeline
+
+    Returns:
+        Dict with normalized 'content' plus cheap shared facts
+    """
+    text = _ZERO_WIDTH.sub("", content or "")
+    text = _WHITESPACE.sub(" ", text)
+    text = _BLANK_LINES.sub("\n\n", text).strip()
+    words = text.split()
+
+    return {
+        "content": text,
+        "word_count": len(words),
+        "char_count": len(text),
+        "has_links": "http://" in text or "https://" in text,
+    }
+
+
+class PipelineNode:
+    """A single agent invocation inside an AgentPipeline."""
+
+    def __init__(
+        self,
+        name: str,
+        agent: BaseAgent,
+        inputs: Callable[[Dict[str, Any]], Dict[str, Any]],
+        depends_on: List[str] = None,
+        when: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        abort_if: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ):
+        self.name = name
+        self.agent = agent
+        self.inputs = inputs
+        self.depends_on = list(depends_on or [])
+        self.when = when
+        self.abort_if = abort_if
+
+
+class AgentPipeline:
+    """
+    DAG of agents sharing preprocessing and one HTTP connection pool.
+
+    The pool is passed to the agents through a context variable, not set on
+    them, so concurrent runs sharing agent instances stay independent.
+
+    Features:
+    - Independent nodes run concurrently (latency = critical path, not sum)
+    - Dependencies and conditions (e.g. SEO only if compliance passes)
+    - Early abort: a node can cancel everything still running
+    - Per-node timings and combined cost
+    """
+
+    def __init__(
+        self,
+        preprocess: Callable[[str], Dict[str, Any]] = preprocess_content,
+        max_connections: int = 20
+    ):
+        self.preprocess = preprocess
+        self.max_connections = max_connections
+        self.nodes: Dict[str, PipelineNode] = {}
+
+    def add(
+        self,
+        name: str,
+        agent: BaseAgent,
+        inputs: Callable[[Dict[str, Any]], Dict[str, Any]],
+        depends_on: List[str] = None,
+        when: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        abort_if: Optional[Callable[[Dict[str, Any]], bool]] = None
+    ) -> "AgentPipeline":
+        """
+        Declare a node.
+
+        Args:
+            name: Unique node name (key in the combined result)
+            agent: Agent instance to run
+            inputs: Builds run() kwargs from the context (content, facts, results)
+            depends_on: Nodes that must succeed before this one starts
+            when: Optional condition on the context; node is skipped if False
+            abort_if: Optional check on this node's result; if True, all other
+                running or pending nodes are cancelled
+
+        Returns:
+            The pipeline (for chaining)
+        """
+        if name in self.nodes:
+            raise ValueError(f"Duplicate pipeline node: {name}")
+        for dep in depends_on or []:
+            if dep not in self.nodes:
+                raise ValueError(f"Unknown dependency '{dep}' for node '{name}'")
+
+        self.nodes[name] = PipelineNode(name, agent, inputs, depends_on, when, abort_if)
+        return self
+
+    async def run(self, content: str, **extra: Any) -> Dict[str, Any]:
+        """
+        Execute the DAG on a piece of content.
+
+        Args:
+            content: Content shared by all nodes
+            **extra: Additional values exposed to every node's inputs()
+
+        Returns:
+            Combined result with per-node results, errors and timings
+        """
+        context: Dict[str, Any] = dict(extra)
+        context.update(self.preprocess(content))
+        context["results"] = {}
+
+        errors: Dict[str, str] = {}
+        skipped: List[str] = []
+        cancelled: List[str] = []
+        timings: Dict[str, Dict[str, int]] = {}
+        aborted_by: Optional[str] = None
+
+        pending = dict(self.nodes)
+        running: Dict[asyncio.Task, str] = {}
+        origin = time.perf_counter()
+
+        def elapsed_ms() -> int:
+            return int((time.perf_counter() - origin) * 1000)
+
+        limits = httpx.Limits(max_connections=self.max_connections)
+        async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+            # Node tasks copy the context when created
+            client_token = _http_client.set(client)
+            try:
+                while pending or running:
+                    # Launch every node whose dependencies are settled
+                    for name, node in list(pending.items()):
+                        deps = node.depends_on
+                        if any(d in pending or d in running.values() for d in deps):
+                            continue
+
+                        del pending[name]
+                        if any(d not in context["results"] for d in deps):
+                            skipped.append(name)
+                            continue
+                        if node.when is not None and not node.when(context):
+                            skipped.append(name)
+                            continue
+
+                        kwargs = node.inputs(context)
+                        timings[name] = {"started_ms": elapsed_ms()}
+                        running[asyncio.create_task(node.agent.run(**kwargs))] = name
+
+                    if not running:
+                        continue
+
+                    done, _ = await asyncio.wait(
+                        running.keys(), return_when=asyncio.FIRST_COMPLETED
+                    )
+
+                    for task in done:
+                        name = running.pop(task)
+                        timings[name]["finished_ms"] = elapsed_ms()
+                        timings[name]["duration_ms"] = (
+                            timings[name]["finished_ms"] - timings[name]["started_ms"]
+                        )
+
+                        if task.exception() is not None:
+                            logger.error(f"[Pipeline] Node {name} failed: {task.exception()}")
+                            errors[name] = str(task.exception())
+                            continue
+
+                        result = task.result()
+                        context["results"][name] = result
+
+                        abort_if = self.nodes[name].abort_if
+                        if aborted_by is None and abort_if is not None and abort_if(result):
+                            aborted_by = name
+                            logger.warning(f"[Pipeline] Aborted by {name}")
+
+                    if aborted_by is not None:
+                        for task, name in running.items():
+                            task.cancel()
+                            cancelled.append(name)
+                        await asyncio.gather(*running.keys(), return_exceptions=True)
+                        for name in running.values():
+                            timings[name]["finished_ms"] = elapsed_ms()
+                            timings[name]["duration_ms"] = (
+                                timings[name]["finished_ms"] - timings[name]["started_ms"]
+                            )
+                        running.clear()
+                        cancelled.extend(pending.keys())
+                        pending.clear()
+
+            finally:
+                for task in running:
+                    task.cancel()
+                _http_client.reset(client_token)
+
+        results = context["results"]
+        return {
+            "results": results,
+            "errors": errors,
+            "skipped": skipped,
+            "cancelled": cancelled,
+            "aborted_by": aborted_by,
+            "timings": timings,
+            "total_ms": elapsed_ms(),
+            "cost": round(sum(r.get("cost", 0) for r in results.values()), 6),
+        }
+
+
+def publish_gate_pipeline(
+    compliance: BaseAgent,
+    seo: BaseAgent,
+    community: Optional[BaseAgent] = None,
+    seo_after_compliance: bool = False
+) -> AgentPipeline:
+    """
+    Build the standard pre-publication gate.
+
+    Compliance and SEO run concurrently and SEO is cancelled as soon as
+    compliance reports a critical status. With seo_after_compliance=True,
+    SEO only starts once compliance has passed instead.
+
+    Args:
+        compliance: ComplianceAgent instance
+        seo: SEO_AIO_Agent instance
+        community: Optional CommunityManagerAgent to pre-screen the content
+        seo_after_compliance: Run SEO sequentially behind compliance
+
+    Returns:
+        Configured pipeline; call run(content, content_type=..., ...) on it
+    """
+    def is_critical(audit: Dict[str, Any]) -> bool:
+        return audit.get("compliance_status") == "critical"
+
+    pipeline = AgentPipeline()
+    pipeline.add(
+        "compliance",
+        compliance,
+        lambda ctx: {
+            "content": ctx["content"],
+            "content_type": ctx.get("content_type", "post"),
+            "target_regions": ctx.get("target_regions"),
+        },
+        abort_if=is_critical,
+    )
+
+    if seo_after_compliance:
+        pipeline.add(
+            "seo",
+            seo,
+            lambda ctx: {
+                "content": ctx["content"],
+                "target_keywords": ctx.get("target_keywords"),
+                "language": ctx.get("language", "fr"),
+            },
+            depends_on=["compliance"],
+            when=lambda ctx: ctx["results"]["compliance"].get("safe_to_publish", False),
+        )
+    else:
+        pipeline.add(
+            "seo",
+            seo,
+            lambda ctx: {
+                "content": ctx["content"],
+                "target_keywords": ctx.get("target_keywords"),
+                "language": ctx.get("language", "fr"),
+            },
+        )
+
+    if community is not None:
+        pipeline.add(
+            "community",
+            community,
+            lambda ctx: {
+                "comment": ctx["content"],
+                "platform": ctx.get("platform", "linkedin"),
+                "brand_context": ctx.get("brand_context", {}),
+            },
+        )
+
+    return pipeline
@@ -0,0 +1,37 @@
+"""
+Model Pricing
+=============
+Per-model token prices used to estimate the cost of each LLM call.
+"""
+
+from typing import Dict, Tuple
+
+# USD per 1M tokens: (prompt, completion)
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "anthropic/claude-3.5-sonnet": (3.00, 15.00),
+    "anthropic/claude-3-haiku": (0.25, 1.25),
+    "openai/gpt-4o": (2.50, 10.00),
+    "openai/gpt-4o-mini": (0.15, 0.60),
+    "perplexity/llama-3.1-sonar-huge-128k-online": (5.00, 5.00),
+    "perplexity/llama-3.1-sonar-large-128k-online": (1.00, 1.00),
+    "perplexity/llama-3.1-sonar-small-128k-online": (0.20, 0.20),
+}
+
+# Unknown models are priced like Claude 3.5 Sonnet (conservative)
+DEFAULT_PRICE: Tuple[float, float] = (3.00, 15.00)
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the USD cost of a call.
+
+    Args:
+        model: OpenRouter model id
+        prompt_tokens: Input tokens
+        completion_tokens: Output tokens
+
+    Returns:
+        Cost in USD
+    """
+    prompt_price, completion_price = MODEL_PRICES.get(model, DEFAULT_PRICE)
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
@@ -0,0 +1,609 @@
+"""
+Agent Queue Worker
+==================
+Consumes agent jobs from a Redis-protocol queue in batches.
+
+Layout (prefix defaults to "astromedia:agents"):
+- {prefix}:queue     LIST  pending job ids
+- {prefix}:jobs      HASH  job id -> {"agent": slug, "kwargs": {...}}
+- {prefix}:inflight  ZSET  job id -> visibility deadline (unix seconds)
+- {prefix}:attempts  HASH  job id -> failed attempts
+- {prefix}:results   HASH  job id -> agent result (JSON)
+- {prefix}:dead      LIST  dead-lettered job ids
+- {prefix}:errors    HASH  job id -> last error
+
+Delivery is at-least-once: ids are moved from the queue to the in-flight
+set by one Lua script, and a job whose visibility timeout expires is
+re-queued even if a slow worker later completes it (the re-queued copy
+is skipped if that worker acknowledged it first).
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Callable
+import logging
+
+from .base import BaseAgent
+
+logger = logging.getLogger(__name__)
+
+# Pop up to ARGV[1] ids from the queue and lease them until ARGV[2], atomically
+FETCH_SCRIPT = """
+local ids = redis.call('LPOP', KEYS[1], ARGV[1])
+if not ids then
+    return {}
+end
+for _, id in ipairs(ids) do
+    redis.call('ZADD', KEYS[2], ARGV[2], id)
+end
+return ids
+"""
+
+# Retry or dead-letter failed jobs still leased (ZREM succeeds), atomically so
+# the reaper and a slow worker failing the same id cannot both requeue it.
+# KEYS: inflight, queue, dead, attempts, errors
+# ARGV: max attempts, then (id, poison 0/1, error) per job
+FAIL_SCRIPT = """
+local retried, dead = {}, {}
+for i = 2, #ARGV, 3 do
+    local id = ARGV[i]
+    if redis.call('ZREM', KEYS[1], id) == 1 then
+        local count = redis.call('HINCRBY', KEYS[4], id, 1)
+        if ARGV[i + 1] == '1' or count >= tonumber(ARGV[1]) then
+            redis.call('HSET', KEYS[5], id, ARGV[i + 2])
+            redis.call('RPUSH', KEYS[3], id)
+            table.insert(dead, id)
+        else
+            redis.call('RPUSH', KEYS[2], id)
+            table.insert(retried, id)
+        end
+    end
+end
+return {retried, dead}
+"""
+
+# Put leased jobs back at the head of the queue (in ARGV order) on shutdown,
+# skipping any the reaper already reclaimed. KEYS: inflight, queue
+RELEASE_SCRIPT = """
+local released = 0
+for i = #ARGV, 1, -1 do
+    if redis.call('ZREM', KEYS[1], ARGV[i]) == 1 then
+        redis.call('LPUSH', KEYS[2], ARGV[i])
+        released = released + 1
+    end
+end
+return released
+"""
+
+
+def _text(value: Any) -> Any:
+    """Decode bytes returned by clients without decode_responses=True."""
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class QueueKeys:
+    """Key names for one queue prefix."""
+
+    def __init__(self, prefix: str = "astromedia:agents"):
+        self.queue = f"{prefix}:queue"
+        self.jobs = f"{prefix}:jobs"
+        self.inflight = f"{prefix}:inflight"
+        self.attempts = f"{prefix}:attempts"
+        self.results = f"{prefix}:results"
+        self.dead = f"{prefix}:dead"
+        self.errors = f"{prefix}:errors"
+
+
+async def enqueue_jobs(
+    redis,
+    jobs: List[Tuple[str, Dict[str, Any]]],
+    prefix: str = "astromedia:agents"
+) -> List[str]:
+    """
+    Queue agent jobs in one pipelined round trip.
+
+    Args:
+        redis: redis.asyncio.Redis (or InMemoryRedis)
+        jobs: (agent slug, run() kwargs) pairs
+        prefix: Queue key prefix
+
+    Returns:
+        Job ids, in order
+    """
+    keys = QueueKeys(prefix)
+    ids = [uuid.uuid4().hex for _ in jobs]
+
+    pipe = redis.pipeline(transaction=False)
+    pipe.hset(keys.jobs, mapping={
+        job_id: json.dumps({"agent": agent, "kwargs": kwargs})
+        for job_id, (agent, kwargs) in zip(ids, jobs)
+    })
+    pipe.rpush(keys.queue, *ids)
+    await pipe.execute()
+    return ids
+
+
+class AgentQueueWorker:
+    """
+    Batched, prefetching consumer for agent jobs.
+
+    Features:
+    - Pulls up to `batch_size` job ids per round trip, moving them to the
+      in-flight set in the same atomic step (Lua LPOP + ZADD)
+    - Keeps a local prefetch buffer so the executor never waits on Redis
+    - Acknowledges and writes results back in pipelined batches; a failed
+      write keeps them for the next flush
+    - Fetch and ack loops survive Redis errors (logged, exponential backoff)
+    - Visibility timeout: stalled jobs are re-queued by a reaper; a job is
+      retried once even if the reaper and a slow worker both fail it
+    - On shutdown, leased jobs not yet run (or interrupted) go back to the
+      head of the queue instead of waiting for their visibility timeout
+    - Dead-letters jobs failing `max_attempts` times or unparseable payloads
+    - Agents for `agents` (default: every registered slug) are built at
+      startup, so a configuration error stops run() instead of failing jobs
+    """
+
+    def __init__(
+        self,
+        redis,
+        prefix: str = "astromedia:agents",
+        agent_factory: Optional[Callable[[str], BaseAgent]] = None,
+        agents: Optional[Iterable[str]] = None,
+        concurrency: int = 64,
+        batch_size: int = 100,
+        prefetch: Optional[int] = None,
+        visibility_timeout: float = 120.0,
+        max_attempts: int = 3,
+        ack_interval: float = 0.05,
+        poll_interval: float = 0.1,
+        max_backoff: float = 5.0
+    ):
+        self.redis = redis
+        self.keys = QueueKeys(prefix)
+        self.agent_factory = agent_factory
+        self.agent_slugs = list(agents) if agents is not None else None
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.prefetch = prefetch or concurrency * 2
+        # Refetch once this much room has been freed in the local buffer
+        self._refill_at = max(1, min(batch_size, self.prefetch) // 2)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.ack_interval = ack_interval
+        self.poll_interval = poll_interval
+        self.max_backoff = max_backoff
+
+        self._agents: Dict[str, BaseAgent] = {}
+        self._buffer: asyncio.Queue = asyncio.Queue()
+        # Leased jobs being run, in fetch order (left here when cancelled)
+        self._running: Dict[str, None] = {}
+        self._acks: List[Tuple[str, Dict[str, Any]]] = []
+        self._failures: List[Tuple[str, str, bool]] = []
+        # Re-queued ids whose job was already acknowledged (payload gone)
+        self._skipped: List[str] = []
+        self._ack_ready = asyncio.Event()
+        self._low_water = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._http_client = None
+
+        self.stats = defaultdict(int)
+
+    def _build_agents(self) -> None:
+        """Instantiate every served agent (raises on configuration errors)."""
+        from .registry import AGENT_TYPES, create_agent
+
+        factory = self.agent_factory or create_agent
+        for slug in self.agent_slugs if self.agent_slugs is not None else AGENT_TYPES:
+            agent = factory(slug)
+            agent.http_client = self._http_client
+            self._agents[slug] = agent
+
+    def _backoff(self, errors: int) -> float:
+        return min(self.poll_interval * 2 ** errors, self.max_backoff)
+
+    # ------------------------------------------------------------------
+    # Fetching
+    # ------------------------------------------------------------------
+
+    async def _fetch(self) -> None:
+        """Keep the local buffer filled up to the prefetch target."""
+        errors = 0
+        while not self._stopping.is_set():
+            room = self.prefetch - self._buffer.qsize()
+            if room < self._refill_at:
+                self._low_water.clear()
+                try:
+                    await asyncio.wait_for(self._low_water.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                fetched = await self._fetch_batch(min(room, self.batch_size))
+                errors = 0
+            except Exception as e:
+                self.stats["fetch_errors"] += 1
+                logger.error(f"[QueueWorker] Fetch error: {e}")
+                await asyncio.sleep(self._backoff(errors))
+                errors += 1
+                continue
+            if not fetched:
+                await asyncio.sleep(self.poll_interval)
+
+    async def _fetch_batch(self, count: int) -> int:
+        """Lease up to `count` jobs into the local buffer; returns how many."""
+        deadline = time.time() + self.visibility_timeout
+        ids = await self.redis.eval(FETCH_SCRIPT, 2, self.keys.queue, self.keys.inflight, count, deadline)
+        if not ids:
+            return 0
+
+        # Leased: if this read fails, the reaper re-queues them
+        ids = [_text(job_id) for job_id in ids]
+        payloads = await self.redis.hmget(self.keys.jobs, ids)
+
+        self.stats["fetched"] += len(ids)
+        self.stats["fetch_batches"] += 1
+        for job_id, payload in zip(ids, payloads):
+            self._buffer.put_nowait((job_id, _text(payload)))
+        return len(ids)
+
+    # ------------------------------------------------------------------
+    # Execution
+    # ------------------------------------------------------------------
+
+    async def _execute(self) -> None:
+        """Run buffered jobs; one of `concurrency` executor tasks."""
+        while True:
+            job_id, payload = await self._buffer.get()
+            if self.prefetch - self._buffer.qsize() >= self._refill_at:
+                self._low_water.set()
+            if payload is None:
+                # Already acknowledged by the worker it was reaped from
+                self._skipped.append(job_id)
+                self.stats["skipped"] += 1
+                self._signal_ack()
+                continue
+            try:
+                job = json.loads(payload)
+                agent = self._agents[job["agent"]]
+                kwargs = job.get("kwargs", {})
+                if not isinstance(kwargs, dict):
+                    raise TypeError("kwargs must be an object")
+            except (LookupError, ValueError, TypeError, AttributeError) as e:
+                # Malformed job: retrying cannot help
+                self._failures.append((job_id, f"invalid job: {e}", True))
+                self._signal_ack()
+                continue
+
+            self._running[job_id] = None
+            try:
+                result = await agent.run(**kwargs)
+                self._acks.append((job_id, result))
+            except Exception as e:
+                self._failures.append((job_id, f"{type(e).__name__}: {e}", False))
+            self._running.pop(job_id, None)
+            self._signal_ack()
+
+    def _signal_ack(self) -> None:
+        if len(self._acks) + len(self._failures) + len(self._skipped) >= self.batch_size:
+            self._ack_ready.set()
+
+    # ------------------------------------------------------------------
+    # Acknowledgement
+    # ------------------------------------------------------------------
+
+    async def _ack_loop(self) -> None:
+        """Flush acks every `ack_interval` or as soon as a batch is full."""
+        errors = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._ack_ready.wait(), self.ack_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._ack_ready.clear()
+            try:
+                await self.flush()
+                errors = 0
+            except Exception as e:
+                self.stats["ack_errors"] += 1
+                logger.error(f"[QueueWorker] Ack error: {e}")
+                await asyncio.sleep(self._backoff(errors))
+                errors += 1
+
+    async def flush(self) -> None:
+        """
+        Write results and acknowledgements in pipelined batches.
+
+        Whatever could not be written is kept for the next flush.
+        """
+        acks, self._acks = self._acks, []
+        failures, self._failures = self._failures, []
+        skipped, self._skipped = self._skipped, []
+
+        try:
+            if acks:
+                ids = [job_id for job_id, _ in acks]
+                pipe = self.redis.pipeline(transaction=False)
+                pipe.hset(self.keys.results, mapping={
+                    job_id: json.dumps(result, default=str) for job_id, result in acks
+                })
+                pipe.zrem(self.keys.inflight, *ids)
+                pipe.hdel(self.keys.jobs, *ids)
+                pipe.hdel(self.keys.attempts, *ids)
+                await pipe.execute()
+                acks = []
+                self.stats["acked"] += len(ids)
+                self.stats["ack_batches"] += 1
+
+            if skipped:
+                await self.redis.zrem(self.keys.inflight, *skipped)
+                skipped = []
+
+            if failures:
+                await self._fail(failures)
+                failures = []
+        except BaseException:
+            self._acks[:0] = acks
+            self._skipped[:0] = skipped
+            self._failures[:0] = failures
+            raise
+
+    async def _fail(self, failures: List[Tuple[str, str, bool]]) -> int:
+        """
+        Retry or dead-letter failed jobs.
+
+        Jobs no longer leased (already reclaimed by the reaper or another
+        worker) are left alone.
+
+        Returns:
+            Number of jobs retried or dead-lettered
+        """
+        args: List[Any] = [self.max_attempts]
+        errors = {}
+        for job_id, error, poison in failures:
+            args += [job_id, int(poison), error]
+            errors[job_id] = error
+        retried, dead = await self.redis.eval(
+            FAIL_SCRIPT, 5, self.keys.inflight, self.keys.queue, self.keys.dead,
+            self.keys.attempts, self.keys.errors, *args
+        )
+
+        for job_id in dead:
+            job_id = _text(job_id)
+            logger.warning(f"[QueueWorker] Dead-lettering {job_id}: {errors[job_id]}")
+        self.stats["retried"] += len(retried)
+        self.stats["dead_lettered"] += len(dead)
+        return len(retried) + len(dead)
+
+    # ------------------------------------------------------------------
+    # Visibility timeout
+    # ------------------------------------------------------------------
+
+    async def reap(self) -> int:
+        """
+        Re-queue jobs whose visibility timeout expired.
+
+        Returns:
+            Number of jobs reclaimed by this worker
+        """
+        expired = await self.redis.zrangebyscore(self.keys.inflight, "-inf", time.time())
+        if not expired:
+            return 0
+
+        # Only jobs still leased when the script runs are retried by this worker
+        mine = await self._fail([(_text(job_id), "visibility timeout", False) for job_id in expired])
+        self.stats["reaped"] += mine
+        return mine
+
+    async def _reap_loop(self) -> None:
+        interval = max(self.visibility_timeout / 4, 0.05)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"[QueueWorker] Reaper error: {e}")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def run(self, drain: bool = False) -> None:
+        """
+        Consume jobs until stop() is called.
+
+        Args:
+            drain: Return once the queue and in-flight set are empty
+        """
+        from .http_pool import ShardedHTTPClient
+
+        self._http_client = ShardedHTTPClient(shards=max(1, self.concurrency // 4))
+        try:
+            self._build_agents()
+        except BaseException:
+            await self._http_client.aclose()
+            raise
+        tasks = [asyncio.create_task(self._fetch())]
+        tasks += [asyncio.create_task(self._execute()) for _ in range(self.concurrency)]
+        tasks += [asyncio.create_task(self._ack_loop()), asyncio.create_task(self._reap_loop())]
+
+        try:
+            while not self._stopping.is_set():
+                await asyncio.sleep(self.poll_interval)
+                if drain and await self._is_drained():
+                    break
+        finally:
+            self._stopping.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            try:
+                await self.flush()
+                await self._release_leased()
+            finally:
+                await self._http_client.aclose()
+
+    async def _release_leased(self) -> None:
+        """Return jobs leased by this worker but not run to the queue."""
+        ids = list(self._running)
+        acked = []
+        while not self._buffer.empty():
+            job_id, payload = self._buffer.get_nowait()
+            (ids if payload is not None else acked).append(job_id)
+        self._running.clear()
+
+        if acked:
+            await self.redis.zrem(self.keys.inflight, *acked)
+        if ids:
+            released = await self.redis.eval(RELEASE_SCRIPT, 2, self.keys.inflight, self.keys.queue, *ids)
+            self.stats["released"] += released
+            logger.info(f"[QueueWorker] Returned {released} leased jobs to the queue")
+
+    async def _is_drained(self) -> bool:
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.llen(self.keys.queue)
+        pipe.zcard(self.keys.inflight)
+        queued, inflight = await pipe.execute()
+        return queued == 0 and inflight == 0 and self._buffer.empty()
+
+    def stop(self) -> None:
+        """Ask run() to return after flushing pending acknowledgements."""
+        self._stopping.set()
+
+
+class _Pipeline:
+    """Command buffer for InMemoryRedis (mirrors redis.asyncio pipelines)."""
+
+    def __init__(self, redis: "InMemoryRedis"):
+        self._redis = redis
+        self._commands: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str):
+        def queue(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+        return queue
+
+    async def execute(self) -> List[Any]:
+        commands, self._commands = self._commands, []
+        return [await getattr(self._redis, name)(*args, **kwargs) for name, args, kwargs in commands]
+
+
+class InMemoryRedis:
+    """
+    In-process fake implementing the Redis commands used by the worker.
+
+    Behaves like redis.asyncio.Redis(decode_responses=True) for tests and
+    benchmarks that should not depend on a running server.
+    """
+
+    def __init__(self):
+        self.lists: Dict[str, List[str]] = defaultdict(list)
+        self.hashes: Dict[str, Dict[str, str]] = defaultdict(dict)
+        self.zsets: Dict[str, Dict[str, float]] = defaultdict(dict)
+
+    def pipeline(self, transaction: bool = True) -> _Pipeline:
+        return _Pipeline(self)
+
+    async def eval(self, script: str, numkeys: int, *keys_and_args):
+        """Runs the worker's Lua scripts (FETCH_SCRIPT, FAIL_SCRIPT, RELEASE_SCRIPT)."""
+        keys, args = keys_and_args[:numkeys], keys_and_args[numkeys:]
+        if script == FETCH_SCRIPT:
+            ids = await self.lpop(keys[0], int(args[0])) or []
+            await self.zadd(keys[1], {job_id: float(args[1]) for job_id in ids})
+            return ids
+
+        if script == FAIL_SCRIPT:
+            inflight, queue, dead_key, attempts, errors = keys
+            retried, dead = [], []
+            for i in range(1, len(args), 3):
+                job_id, poison, error = args[i:i + 3]
+                if not await self.zrem(inflight, job_id):
+                    continue
+                count = await self.hincrby(attempts, job_id, 1)
+                if str(poison) == "1" or count >= int(args[0]):
+                    await self.hset(errors, job_id, error)
+                    await self.rpush(dead_key, job_id)
+                    dead.append(job_id)
+                else:
+                    await self.rpush(queue, job_id)
+                    retried.append(job_id)
+            return [retried, dead]
+
+        if script == RELEASE_SCRIPT:
+            released = 0
+            for job_id in reversed(args):
+                if await self.zrem(keys[0], job_id):
+                    self.lists[keys[1]].insert(0, job_id)
+                    released += 1
+            return released
+
+        raise NotImplementedError("InMemoryRedis only runs the worker's scripts")
+
+    async def rpush(self, key: str, *values: str) -> int:
+        self.lists[key].extend(values)
+        return len(self.lists[key])
+
+    async def lpop(self, key: str, count: Optional[int] = None):
+        items = self.lists[key]
+        if not items:
+            return None
+        if count is None:
+            return items.pop(0)
+        popped, self.lists[key] = items[:count], items[count:]
+        return popped
+
+    async def llen(self, key: str) -> int:
+        return len(self.lists[key])
+
+    async def lrange(self, key: str, start: int, end: int) -> List[str]:
+        items = self.lists[key]
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    async def hset(self, key: str, field: str = None, value: str = None, mapping=None) -> int:
+        data = dict(mapping or {})
+        if field is not None:
+            data[field] = value
+        added = sum(1 for f in data if f not in self.hashes[key])
+        self.hashes[key].update({f: str(v) for f, v in data.items()})
+        return added
+
+    async def hget(self, key: str, field: str) -> Optional[str]:
+        return self.hashes[key].get(field)
+
+    async def hmget(self, key: str, fields: List[str]) -> List[Optional[str]]:
+        data = self.hashes[key]
+        return [data.get(field) for field in fields]
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        data = self.hashes[key]
+        return sum(1 for field in fields if data.pop(field, None) is not None)
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        value = int(self.hashes[key].get(field, 0)) + amount
+        self.hashes[key][field] = str(value)
+        return value
+
+    async def hlen(self, key: str) -> int:
+        return len(self.hashes[key])
+
+    async def zadd(self, key: str, mapping: Dict[str, float]) -> int:
+        added = sum(1 for member in mapping if member not in self.zsets[key])
+        self.zsets[key].update(mapping)
+        return added
+
+    async def zrem(self, key: str, *members: str) -> int:
+        data = self.zsets[key]
+        return sum(1 for member in members if data.pop(member, None) is not None)
+
+    async def zrangebyscore(self, key: str, low, high) -> List[str]:
+        low = float("-inf") if low == "-inf" else float(low)
+        high = float("inf") if high == "+inf" else float(high)
+        members = [(score, m) for m, score in self.zsets[key].items() if low <= score <= high]
+        return [m for _, m in sorted(members)]
+
+    async def zcard(self, key: str) -> int:
+        return len(self.zsets[key])
@@ -0,0 +1,42 @@
+"""
+Agent Registry
+==============
+Maps public agent slugs to their implementation classes.
+"""
+
+import importlib
+from typing import Dict, Tuple, Type
+
+from .base import BaseAgent
+
+# slug -> (module, class name); modules are imported on first use
+AGENT_TYPES: Dict[str, Tuple[str, str]] = {
+    "community-manager": ("community_manager", "CommunityManagerAgent"),
+    "seo-aio": ("seo_aio", "SEO_AIO_Agent"),
+    "compliance": ("compliance", "ComplianceAgent"),
+    "trend-scout": ("trend_scout", "TrendScoutAgent"),
+    "crisis-manager": ("crisis_manager", "CrisisManagerAgent"),
+}
+
+
+def get_agent_class(slug: str) -> Type[BaseAgent]:
+    """
+    Resolve an agent slug to its class.
+
+    Args:
+        slug: Agent slug (e.g. "community-manager")
+
+    Returns:
+        Agent class
+    """
+    if slug not in AGENT_TYPES:
+        raise ValueError(f"Unknown agent: {slug}")
+
+    module_name, class_name = AGENT_TYPES[slug]
+    module = importlib.import_module(f".{module_name}", __package__)
+    return getattr(module, class_name)
+
+
+def create_agent(slug: str, **kwargs) -> BaseAgent:
+    """Instantiate an agent by slug."""
+    return get_agent_class(slug)(**kwargs)
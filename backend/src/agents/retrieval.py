@@ -0,0 +1,572 @@
+"""
+Reply Retrieval
+===============
+Per-brand index of approved CommunityManager replies, so recurring
+questions ("vous livrez?", "vos heures?") reuse an approved answer instead
+of a fresh LLM call, or at least show the model how the brand answered.
+
+Comments are embedded as hashed word/character n-gram TF-IDF vectors
+(NumPy only, no model download) and searched with an inverted file:
+k-means cells over the vectors, each query scans the `nprobe` nearest.
+
+    from agents.retrieval import ReplyLibrary
+    agent.replies = ReplyLibrary()
+    agent.replies.add("resto-quebec", "Vous livrez à Lévis?", "Oui, du lundi au ...",
+                      {"sentiment": "neutral", "category": "question", "urgency": "low"})
+"""
+
+import asyncio
+import json
+import math
+import os
+import re
+import unicodedata
+import zlib
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+_COMBINING = re.compile("[\u0300-\u036f]")
+
+# crc32 seed keeping character trigrams apart from words in hash space
+_TRIGRAM_SEED = 0x9E3779B9
+
+_CHUNK = 8192
+
+
+@lru_cache(maxsize=1 << 16)
+def _word_features(word: str) -> Tuple[int, ...]:
+    """crc32 of a word and of its padded character trigrams (cached: words repeat a lot)."""
+    crc = zlib.crc32
+    padded = f"<{word}>".encode()
+    return (crc(word.encode()),) + tuple(
+        crc(padded[i:i + 3], _TRIGRAM_SEED) for i in range(len(padded) - 2)
+    )
+
+
+def hashed_features(text: str) -> List[int]:
+    """crc32 hashes of the words, word bigrams and character trigrams of `text`."""
+    words = _WORD.findall(_COMBINING.sub("", unicodedata.normalize("NFKD", text.lower())))
+    features = list(chain.from_iterable(map(_word_features, words)))
+    features += [zlib.crc32(f"{a} {b}".encode()) for a, b in zip(words, words[1:])]
+    return features
+
+
+class HashedTfidf:
+    """
+    Hashed TF-IDF embedding of short texts.
+
+    Features are folded into `dim` columns with a hash-derived sign (the
+    hashing trick, i.e. a sparse random projection), so vectors are
+    fixed-size float32 whatever the vocabulary. IDF is kept per hash
+    bucket and fitted on a sample of the indexed comments.
+    """
+
+    def __init__(self, dim: int = 128, buckets: int = 1 << 20):
+        self.dim = dim
+        self.buckets = buckets
+        self.idf: Optional[np.ndarray] = None
+
+    def _pairs(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Unique (document, feature hash) pairs of `texts` and their counts."""
+        features = [hashed_features(text) for text in texts]
+        lengths = np.fromiter(map(len, features), np.int64, len(texts))
+        hashes = np.fromiter(chain.from_iterable(features), np.int64, int(lengths.sum()))
+        docs = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        keys, counts = np.unique((docs << 32) | hashes, return_counts=True)
+        return keys >> 32, keys & 0xFFFFFFFF, counts
+
+    def fit(self, texts: List[str]) -> None:
+        """Compute IDF weights from `texts`."""
+        df = np.zeros(self.buckets, dtype=np.float64)
+        for start in range(0, len(texts), _CHUNK):
+            _, hashes, _ = self._pairs(texts[start:start + _CHUNK])
+            df += np.bincount(hashes % self.buckets, minlength=self.buckets)
+        self.idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+
+    def transform(self, texts: List[str], out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Unit-norm float32 vectors of shape (len(texts), dim), written to `out` if given."""
+        if out is None:
+            out = np.empty((len(texts), self.dim), dtype=np.float32)
+        for start in range(0, len(texts), _CHUNK):
+            chunk = texts[start:start + _CHUNK]
+            docs, hashes, counts = self._pairs(chunk)
+            weights = 1.0 + np.log(counts)
+            if self.idf is not None:
+                weights *= self.idf[hashes % self.buckets]
+            weights *= np.where(hashes & 1, 1.0, -1.0)
+            columns = (hashes >> 1) % self.dim
+            vectors = np.bincount(
+                docs * self.dim + columns, weights, minlength=len(chunk) * self.dim
+            ).reshape(len(chunk), self.dim)
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            out[start:start + len(chunk)] = vectors / np.maximum(norms, 1e-12)
+        return out
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """Index of the most similar centroid for each row (chunked to bound memory)."""
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), 16384):
+        labels[start:start + 16384] = np.argmax(vectors[start:start + 16384] @ centroids.T, axis=1)
+    return labels
+
+
+def _spherical_kmeans(
+    data: np.ndarray, k: int, rng: np.random.Generator, iterations: int = 10
+) -> np.ndarray:
+    """Unit-norm cluster centres of `data` under cosine similarity."""
+    centroids = data[rng.choice(len(data), size=k, replace=False)].copy()
+    for _ in range(iterations):
+        labels = _nearest(data, centroids)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, data)
+        empty = np.bincount(labels, minlength=k) == 0
+        if empty.any():
+            # Reseed empty cells with random points
+            sums[empty] = data[rng.choice(len(data), size=int(empty.sum()), replace=False)]
+        centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return centroids.astype(np.float32)
+
+
+class ReplyIndex:
+    """
+    Approved (comment, reply) pairs of one brand, searchable by comment.
+
+    Features:
+    - Brute-force scan below `min_train` entries
+    - Above it, ~sqrt(n) k-means cells: a query scores the centroids and
+      scans only the `nprobe` nearest cells
+    - Vectors stored contiguously per cell; new entries go to a tail that
+      is scanned too and merged into the cells once it reaches 10%
+    - IDF refitted and cells retrained whenever the index grows 4x
+    - Rebuilds (retrain or tail merge) computed by build() from a snapshot,
+      so they can run in a thread while search() and add() keep serving
+      the current layout; install() then swaps the result in
+    - add() skips near-duplicates of an existing pair
+    """
+
+    def __init__(
+        self,
+        dim: int = 128,
+        nprobe: int = 6,
+        min_train: int = 4096,
+        dedupe_threshold: float = 0.98,
+        seed: int = 0
+    ):
+        self.vectorizer = HashedTfidf(dim)
+        self.nprobe = nprobe
+        self.min_train = min_train
+        self.dedupe_threshold = dedupe_threshold
+        self._rng = np.random.default_rng(seed)
+
+        self.comments: List[str] = []
+        self.replies: List[str] = []
+        self.meta: List[Dict[str, Any]] = []
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._n = 0
+        self._next_id = 0
+
+        self.centroids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._indexed = 0  # rows [0, _indexed) are sorted by cell
+        self._trained_at = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the NumPy arrays (vectors, ids, centroids, IDF)."""
+        arrays = [self._vectors, self._ids, self.centroids, self.vectorizer.idf]
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def add(
+        self, comment: str, reply: str, meta: Optional[Dict[str, Any]] = None, rebuild: bool = True
+    ) -> int:
+        """Add one approved pair; returns its id (an existing id for a duplicate)."""
+        for match in self.search(comment, k=1):
+            if match["score"] >= self.dedupe_threshold and match["reply"] == reply:
+                return match["id"]
+        return self.add_many([(comment, reply, meta)], rebuild)[0]
+
+    def add_many(
+        self, entries: Iterable[Tuple[str, str, Optional[Dict[str, Any]]]], rebuild: bool = True
+    ) -> List[int]:
+        """
+        Bulk-add approved pairs (no duplicate check); returns their ids.
+
+        New pairs go to the tail with the current IDF. With rebuild=False,
+        a due retrain or merge is left to the caller (see rebuild_due()).
+        """
+        entries = list(entries)
+        start = self._n
+        comments = [comment for comment, _, _ in entries]
+        self.comments.extend(comments)
+        self.replies.extend(reply for _, reply, _ in entries)
+        self.meta.extend(meta or {} for _, _, meta in entries)
+
+        self._reserve(start + len(entries))
+        ids = np.arange(self._next_id, self._next_id + len(entries), dtype=np.int64)
+        self._ids[start:start + len(entries)] = ids
+        self._next_id += len(entries)
+        self._n += len(entries)
+
+        if rebuild and self.rebuild_due():
+            self.install(self.build(self._n, True))  # embeds everything with the refitted IDF
+        else:
+            self.vectorizer.transform(comments, out=self._vectors[start:self._n])
+            if rebuild:
+                self.rebuild()
+        return ids.tolist()
+
+    def _reserve(self, n: int) -> None:
+        if n <= len(self._ids):
+            return
+        capacity = max(n, 2 * len(self._ids), 1024)
+        vectors = np.zeros((capacity, self.vectorizer.dim), dtype=np.float32)
+        vectors[:self._n] = self._vectors[:self._n]
+        ids = np.zeros(capacity, dtype=np.int64)
+        ids[:self._n] = self._ids[:self._n]
+        self._vectors, self._ids = vectors, ids
+
+    def rebuild_due(self) -> Optional[bool]:
+        """True if a retrain is due, False if only a tail merge, None if neither."""
+        if self._n >= max(self.min_train, 4 * self._trained_at):
+            return True
+        if self.centroids is not None and self._n - self._indexed > max(1024, self._indexed // 10):
+            return False
+        return None
+
+    def rebuild(self) -> None:
+        """Retrain or merge the tail now, if due."""
+        retrain = self.rebuild_due()
+        if retrain is not None:
+            self.install(self.build(self._n, retrain))
+
+    def build(self, n: int, retrain: bool) -> Dict[str, Any]:
+        """
+        New layout of rows [0, n), computed without modifying the index.
+
+        Only reads rows that add() never rewrites, so it may run in a
+        thread; pass the result to install() from the index's own thread.
+        """
+        comments = self.comments[:n]
+        vectors = self._vectors[:n]
+        vectorizer = self.vectorizer
+        centroids, offsets, indexed = self.centroids, self._offsets, self._indexed
+        trained_at = self._trained_at
+        if retrain:
+            vectorizer = HashedTfidf(self.vectorizer.dim, self.vectorizer.buckets)
+            sample = self._rng.choice(n, size=min(n, 100_000), replace=False)
+            vectorizer.fit([comments[i] for i in sample])
+            vectors = vectorizer.transform(comments)
+
+            cells = max(1, min(4096, int(2 * math.sqrt(n))))
+            training = vectors[self._rng.choice(n, size=min(n, 64 * cells), replace=False)]
+            centroids = _spherical_kmeans(training, cells, self._rng)
+            indexed, trained_at = 0, n
+            logger.info(f"[ReplyIndex] Trained {cells} cells over {n} replies")
+
+        # Assign unsorted rows to cells and sort all rows by cell
+        cells = len(centroids)
+        labels = np.empty(n, dtype=np.int64)
+        if indexed:
+            labels[:indexed] = np.repeat(np.arange(cells), np.diff(offsets))
+        labels[indexed:n] = _nearest(vectors[indexed:n], centroids)
+        order = np.argsort(labels, kind="stable")
+        return {
+            "n": n,
+            "vectorizer": vectorizer,
+            "vectors": vectors[order],
+            "ids": self._ids[:n][order],
+            "comments": [comments[i] for i in order],
+            "replies": [self.replies[i] for i in order],
+            "meta": [self.meta[i] for i in order],
+            "centroids": centroids,
+            "offsets": np.concatenate(([0], np.cumsum(np.bincount(labels, minlength=cells)))),
+            "trained_at": trained_at,
+        }
+
+    def install(self, layout: Dict[str, Any]) -> None:
+        """Swap in a layout from build(); rows added since are kept in the tail."""
+        n = layout["n"]
+        self._vectors[:n] = layout["vectors"]
+        self._ids[:n] = layout["ids"]
+        self.comments[:n] = layout["comments"]
+        self.replies[:n] = layout["replies"]
+        self.meta[:n] = layout["meta"]
+        if layout["vectorizer"] is not self.vectorizer:
+            # Refitted IDF: re-embed the rows added during the build
+            self.vectorizer = layout["vectorizer"]
+            self.vectorizer.transform(self.comments[n:self._n], out=self._vectors[n:self._n])
+        self.centroids = layout["centroids"]
+        self._offsets = layout["offsets"]
+        self._indexed = n
+        self._trained_at = layout["trained_at"]
+
+    def search(self, text: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Closest approved comments to `text`.
+
+        Returns:
+            Up to k dicts (id, score, comment, reply, meta), best first;
+            score is the cosine similarity in [-1, 1]
+        """
+        if self._n == 0:
+            return []
+        query = self.vectorizer.transform([text])[0]
+
+        if self.centroids is None:
+            spans = [(0, self._n)]
+        else:
+            probe = min(self.nprobe, len(self.centroids))
+            cells = np.argpartition(self.centroids @ -query, probe - 1)[:probe]
+            spans = [(self._offsets[c], self._offsets[c + 1]) for c in cells]
+            spans.append((self._indexed, self._n))
+        scores = np.concatenate([self._vectors[lo:hi] @ query for lo, hi in spans])
+
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+
+        # Positions in the concatenated scores -> rows
+        ends = np.cumsum([hi - lo for lo, hi in spans])
+        matches = []
+        for position in top:
+            span = int(np.searchsorted(ends, position, side="right"))
+            row = int(spans[span][1] - (ends[span] - position))
+            matches.append({
+                "id": int(self._ids[row]),
+                "score": float(scores[position]),
+                "comment": self.comments[row],
+                "reply": self.replies[row],
+                "meta": self.meta[row],
+            })
+        return matches
+
+    def save(self, path: str, n: Optional[int] = None) -> None:
+        """
+        Write arrays to `path` (.npz) and entries to `path`.jsonl, atomically.
+
+        Args:
+            path: Destination of the arrays
+            n: Save only the first n rows (default: all); lets a thread save
+                a snapshot while add() appends
+        """
+        n = self._n if n is None else n
+        with open(f"{path}.tmp", "wb") as f:
+            np.savez(
+                f,
+                vectors=self._vectors[:n],
+                ids=self._ids[:n],
+                centroids=self.centroids if self.centroids is not None else np.zeros((0, 0)),
+                offsets=self._offsets if self._offsets is not None else np.zeros(0, np.int64),
+                idf=self.vectorizer.idf if self.vectorizer.idf is not None else np.zeros(0),
+                state=np.array([self._indexed, self._trained_at, self._next_id]),
+            )
+        with open(f"{path}.jsonl.tmp", "w", encoding="utf-8") as f:
+            for entry in zip(self.comments[:n], self.replies[:n], self.meta[:n]):
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(f"{path}.tmp", path)
+        os.replace(f"{path}.jsonl.tmp", f"{path}.jsonl")
+
+    def load(self, path: str) -> None:
+        """Replace the contents with an index written by save()."""
+        with np.load(path) as data:
+            self._vectors = data["vectors"].astype(np.float32)
+            self._ids = data["ids"]
+            self.centroids = data["centroids"] if data["centroids"].size else None
+            self._offsets = data["offsets"] if data["offsets"].size else None
+            self.vectorizer.idf = data["idf"] if data["idf"].size else None
+            self._indexed, self._trained_at, self._next_id = (int(v) for v in data["state"])
+        self._n = len(self._ids)
+        self.comments, self.replies, self.meta = [], [], []
+        with open(f"{path}.jsonl", encoding="utf-8") as f:
+            for line in f:
+                comment, reply, meta = json.loads(line)
+                self.comments.append(comment)
+                self.replies.append(reply)
+                self.meta.append(meta)
+
+
+def _append_journal(path: str, entry: List[Any]) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+class ReplyLibrary:
+    """
+    Approved-reply indexes per brand, plus the reuse policy.
+
+    lookup() returns an approved reply to send as-is when the closest
+    approved comment scores at least `reuse_threshold` and was answered
+    without a human (`reuse_categories` only); otherwise the matches
+    scoring at least `example_threshold`, to use as few-shot examples.
+
+    From asyncio code, add_async() and save_async() keep index rebuilds
+    and file writes off the event loop. With a `journal` path, every pair
+    added through add_async() is appended to it (JSON lines) until the
+    next save, so replay_journal() restores approvals made after the last
+    snapshot.
+    """
+
+    def __init__(
+        self,
+        reuse_threshold: float = 0.9,
+        example_threshold: float = 0.5,
+        examples: int = 3,
+        reuse_categories: Tuple[str, ...] = ("question", "compliment"),
+        journal: Optional[str] = None,
+        **index_options
+    ):
+        self.reuse_threshold = reuse_threshold
+        self.example_threshold = example_threshold
+        self.examples = examples
+        self.reuse_categories = reuse_categories
+        self.journal = journal
+        self.index_options = index_options
+        self.indexes: Dict[str, ReplyIndex] = {}
+        # Held while rebuilding or saving off the event loop
+        self._maintenance = asyncio.Lock()
+
+        self.stats = {"lookups": 0, "reused": 0, "with_examples": 0}
+
+    def index(self, brand: str) -> ReplyIndex:
+        """The brand's index (created empty on first use)."""
+        index = self.indexes.get(brand)
+        if index is None:
+            index = self.indexes[brand] = ReplyIndex(**self.index_options)
+        return index
+
+    def add(self, brand: str, comment: str, reply: str, meta: Optional[Dict[str, Any]] = None) -> int:
+        """Record an approved reply to `comment` (meta: sentiment, category, urgency, tags)."""
+        return self.index(brand).add(comment, reply, meta)
+
+    async def add_async(
+        self, brand: str, comment: str, reply: str, meta: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """add() for the event loop: the journal write and any rebuild run in threads."""
+        index = self.index(brand)
+        entry_id = index.add(comment, reply, meta, rebuild=False)
+        if self.journal:
+            await asyncio.to_thread(_append_journal, self.journal, [brand, comment, reply, meta])
+        if not self._maintenance.locked():  # else the running rebuild picks this row up
+            async with self._maintenance:
+                while (retrain := index.rebuild_due()) is not None:
+                    index.install(await asyncio.to_thread(index.build, len(index), retrain))
+        return entry_id
+
+    def lookup(
+        self, brand: str, comment: str, allow_reuse: bool = True
+    ) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Find approved replies for a new comment.
+
+        Args:
+            brand: Brand key the replies were added under
+            comment: The new comment
+            allow_reuse: False mid-thread, where a stored reply may only guide
+
+        Returns:
+            (match to reuse or None, few-shot matches)
+        """
+        self.stats["lookups"] += 1
+        index = self.indexes.get(brand)
+        if index is None:
+            return None, []
+
+        matches = index.search(comment, k=self.examples)
+        if matches:
+            best = matches[0]
+            meta = best["meta"]
+            if (allow_reuse
+                    and best["score"] >= self.reuse_threshold
+                    and meta.get("category") in self.reuse_categories
+                    and not meta.get("requires_human")):
+                self.stats["reused"] += 1
+                return best, []
+
+        examples = [m for m in matches if m["score"] >= self.example_threshold]
+        if examples:
+            self.stats["with_examples"] += 1
+        return None, examples
+
+    def save(self, directory: str, sizes: Optional[Dict[str, int]] = None) -> None:
+        """
+        Write every brand index into `directory`.
+
+        Args:
+            directory: Destination directory
+            sizes: Rows to save per brand (default: all); see save_async()
+        """
+        os.makedirs(directory, exist_ok=True)
+        manifest = {}
+        for brand, index in list(self.indexes.items()):
+            if sizes is not None and brand not in sizes:
+                continue
+            name = f"brand-{zlib.crc32(brand.encode()):08x}.npz"
+            index.save(os.path.join(directory, name), sizes[brand] if sizes else None)
+            manifest[brand] = name
+        tmp = os.path.join(directory, "brands.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        os.replace(tmp, os.path.join(directory, "brands.json"))
+
+    async def save_async(self, directory: str) -> None:
+        """
+        save() from a thread, then drop the journal it covers.
+
+        Snapshots the current size of each index and starts a new journal
+        first, so pairs added during the save are neither lost nor torn.
+        """
+        async with self._maintenance:
+            sizes = {brand: len(index) for brand, index in self.indexes.items()}
+            saving = f"{self.journal}.saving" if self.journal else None
+            # Kept as is when left by a failed save: its pairs are in this snapshot too
+            if saving and not os.path.exists(saving) and os.path.exists(self.journal):
+                os.replace(self.journal, saving)
+            await asyncio.to_thread(self.save, directory, sizes)
+            if saving and os.path.exists(saving):
+                os.remove(saving)
+
+    def replay_journal(self) -> int:
+        """Add the pairs journaled since the last save (after load()); returns their count."""
+        if not self.journal:
+            return 0
+        count = 0
+        # A ".saving" journal is left by a save that did not finish
+        for path in (f"{self.journal}.saving", self.journal):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        brand, comment, reply, meta = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line
+                    self.add(brand, comment, reply, meta)
+                    count += 1
+        if count:
+            logger.info(f"[ReplyLibrary] Replayed {count} journaled replies")
+        return count
+
+    def load(self, directory: str) -> None:
+        """Load the brand indexes written by save()."""
+        with open(os.path.join(directory, "brands.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        for brand, name in manifest.items():
+            self.index(brand).load(os.path.join(directory, name))
+        logger.info(f"[ReplyLibrary] Loaded {len(manifest)} brand indexes")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return dict(self.stats, replies={brand: len(i) for brand, i in self.indexes.items()})
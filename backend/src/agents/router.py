@@ -0,0 +1,326 @@
+"""
+Model Router
+============
+Latency- and cost-aware model selection per call for the Python agents.
+
+Python counterpart of services/llm/llmBandit.ts, driven by live statistics
+instead of static catalog scores:
+
+    from agents.router import ModelRouter
+    router = ModelRouter(state_path="router-state.json")
+    agent.router = router          # call_llm() now picks the model per call
+    ...
+    router.save()
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+from typing import Dict, Any, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class Objective:
+    """
+    What an agent optimises for, and the limits it will not cross.
+
+    Score = quality_weight * P(success)
+            - latency_weight * latency_tail / latency_target_ms
+            - cost_weight * cost / cost_target
+    """
+
+    def __init__(
+        self,
+        quality_weight: float = 1.0,
+        latency_weight: float = 0.3,
+        cost_weight: float = 0.3,
+        latency_target_ms: float = 10_000,
+        cost_target: float = 0.01,
+        max_latency_ms: Optional[float] = None,
+        max_cost: Optional[float] = None,
+        max_error_rate: float = 0.5
+    ):
+        self.quality_weight = quality_weight
+        self.latency_weight = latency_weight
+        self.cost_weight = cost_weight
+        self.latency_target_ms = latency_target_ms
+        self.cost_target = cost_target
+        self.max_latency_ms = max_latency_ms
+        self.max_cost = max_cost
+        self.max_error_rate = max_error_rate
+
+
+# Keyed by BaseAgent.name
+AGENT_OBJECTIVES: Dict[str, Objective] = {
+    # Crisis response is latency-bound: a fast good-enough answer wins
+    "CrisisManager": Objective(quality_weight=0.5, latency_weight=1.0, cost_weight=0.1,
+                               latency_target_ms=5_000, max_latency_ms=15_000),
+    "CommunityManager": Objective(quality_weight=0.7, latency_weight=0.5, cost_weight=0.5,
+                                  latency_target_ms=4_000, cost_target=0.005),
+    # SEO output is published: quality first, latency barely matters
+    "SEO_AIO": Objective(quality_weight=1.0, latency_weight=0.1, cost_weight=0.2,
+                         latency_target_ms=30_000, cost_target=0.05),
+    "Compliance": Objective(quality_weight=1.0, latency_weight=0.2, cost_weight=0.3),
+    "TrendScout": Objective(quality_weight=0.8, latency_weight=0.2, cost_weight=0.3,
+                            latency_target_ms=20_000),
+}
+
+DEFAULT_OBJECTIVE = Objective()
+
+# Candidate models per agent; the agent's own model is always a candidate
+MODEL_CANDIDATES: Dict[str, List[str]] = {
+    "CommunityManager": ["anthropic/claude-3.5-sonnet", "anthropic/claude-3-haiku",
+                         "openai/gpt-4o-mini"],
+    "SEO_AIO": ["anthropic/claude-3.5-sonnet", "openai/gpt-4o"],
+    "Compliance": ["openai/gpt-4o-mini", "anthropic/claude-3-haiku",
+                   "anthropic/claude-3.5-sonnet"],
+    # Trend scouting needs web access: online models only
+    "TrendScout": ["perplexity/llama-3.1-sonar-large-128k-online",
+                   "perplexity/llama-3.1-sonar-small-128k-online"],
+    "CrisisManager": ["anthropic/claude-3.5-sonnet", "openai/gpt-4o",
+                      "anthropic/claude-3-haiku"],
+}
+
+
+class ModelStats:
+    """Decayed online statistics for one (agent, model) arm."""
+
+    __slots__ = ("calls", "errors", "parse_ok", "parse_fail",
+                 "latency_ms", "latency_var", "cost")
+
+    FIELDS = __slots__
+
+    def __init__(self, **values: float):
+        for field in self.FIELDS:
+            setattr(self, field, float(values.get(field, 0.0)))
+
+    def decay(self, factor: float) -> None:
+        self.calls *= factor
+        self.errors *= factor
+        self.parse_ok *= factor
+        self.parse_fail *= factor
+
+    def observe_latency(self, latency_ms: float, cost: float, alpha: float) -> None:
+        if not self.latency_ms:
+            self.latency_ms = latency_ms
+            self.cost = cost
+            return
+        delta = latency_ms - self.latency_ms
+        self.latency_ms += alpha * delta
+        self.latency_var = (1 - alpha) * (self.latency_var + alpha * delta * delta)
+        self.cost += alpha * (cost - self.cost)
+
+    @property
+    def latency_tail_ms(self) -> float:
+        """Approximate p95 latency (mean + 1.645 standard deviations)."""
+        return self.latency_ms + 1.645 * math.sqrt(self.latency_var)
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls else 0.0
+
+    def sample_quality(self, rng: random.Random) -> float:
+        """Thompson sample of P(call succeeds and parses)."""
+        return rng.betavariate(self.parse_ok + 1, self.errors + self.parse_fail + 1)
+
+    def to_dict(self) -> Dict[str, float]:
+        return {field: round(getattr(self, field), 6) for field in self.FIELDS}
+
+
+class ModelRouter:
+    """
+    Thompson-sampling bandit choosing a model per (agent, call).
+
+    Features:
+    - Tracks latency (mean and tail), error rate, parse-success rate and
+      cost per (agent, model), decayed so old behaviour fades
+    - Per-agent Objective weights and hard latency/cost/error limits
+    - Each candidate is tried `min_samples` times before being scored;
+      excluded models are re-probed at `probe_rate`
+    - Deterministic fallback to the agent's own model when every candidate
+      is excluded; seedable for reproducible runs
+    - Statistics persisted as JSON (`state_path`), saved every `save_every`
+      updates (from a thread when called on an event loop) and on save()
+    """
+
+    def __init__(
+        self,
+        candidates: Optional[Dict[str, List[str]]] = None,
+        objectives: Optional[Dict[str, Objective]] = None,
+        state_path: Optional[str] = None,
+        min_samples: int = 5,
+        decay: float = 0.995,
+        alpha: float = 0.1,
+        probe_rate: float = 0.02,
+        save_every: int = 200,
+        seed: Optional[int] = None
+    ):
+        self.candidates = candidates if candidates is not None else MODEL_CANDIDATES
+        self.objectives = objectives if objectives is not None else AGENT_OBJECTIVES
+        self.state_path = state_path
+        self.min_samples = min_samples
+        self.decay = decay
+        self.alpha = alpha
+        self.probe_rate = probe_rate
+        self.save_every = save_every
+        self.rng = random.Random(seed)
+        self.stats: Dict[str, Dict[str, ModelStats]] = {}
+        self._updates = 0
+        self._saving: Optional[asyncio.Task] = None
+
+        if state_path and os.path.exists(state_path):
+            self.load(state_path)
+
+    def _stats(self, agent: str, model: str) -> ModelStats:
+        models = self.stats.setdefault(agent, {})
+        stats = models.get(model)
+        if stats is None:
+            stats = models[model] = ModelStats()
+        return stats
+
+    def _excluded(self, stats: ModelStats, objective: Objective) -> bool:
+        if stats.calls < self.min_samples:
+            return False
+        if stats.error_rate > objective.max_error_rate:
+            return True
+        if objective.max_latency_ms is not None and stats.latency_tail_ms > objective.max_latency_ms:
+            return True
+        return objective.max_cost is not None and stats.cost > objective.max_cost
+
+    def choose(self, agent: str, default: str) -> str:
+        """
+        Pick the model for one call.
+
+        Args:
+            agent: Agent name (BaseAgent.name)
+            default: The agent's configured model (deterministic fallback)
+
+        Returns:
+            OpenRouter model id
+        """
+        models = list(self.candidates.get(agent, ()))
+        if default not in models:
+            models.insert(0, default)
+        if len(models) == 1:
+            return default
+
+        objective = self.objectives.get(agent, DEFAULT_OBJECTIVE)
+        best, best_score = None, -math.inf
+        for model in models:
+            stats = self._stats(agent, model)
+            if stats.calls < self.min_samples:
+                # Explore in candidate order until every arm has data
+                return model
+            if self._excluded(stats, objective):
+                if self.rng.random() < self.probe_rate:
+                    return model
+                continue
+
+            score = (
+                objective.quality_weight * stats.sample_quality(self.rng)
+                - objective.latency_weight * stats.latency_tail_ms / objective.latency_target_ms
+                - objective.cost_weight * stats.cost / objective.cost_target
+            )
+            if score > best_score:
+                best, best_score = model, score
+
+        return best if best is not None else default
+
+    def record(self, agent: str, model: str, latency_ms: float, cost: float, ok: bool) -> None:
+        """Record the outcome of one upstream call."""
+        stats = self._stats(agent, model)
+        stats.decay(self.decay)
+        stats.calls += 1
+        if ok:
+            stats.observe_latency(latency_ms, cost, self.alpha)
+        else:
+            stats.errors += 1
+        self._updated()
+
+    def record_parse(self, agent: str, model: str, ok: bool) -> None:
+        """Record whether the model's answer parsed as the expected JSON."""
+        stats = self._stats(agent, model)
+        if ok:
+            stats.parse_ok += 1
+        else:
+            stats.parse_fail += 1
+        self._updated()
+
+    def _updated(self) -> None:
+        self._updates += 1
+        if not (self.state_path and self.save_every and self._updates % self.save_every == 0):
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            try:
+                self.save()
+            except OSError as e:
+                logger.error(f"[ModelRouter] Failed to save state: {e}")
+            return
+        # On the event loop: write from a thread, one save at a time
+        if self._saving is None or self._saving.done():
+            self._saving = asyncio.create_task(self._save_in_background())
+
+    async def _save_in_background(self) -> None:
+        try:
+            await self.save_async()
+        except OSError as e:
+            logger.error(f"[ModelRouter] Failed to save state: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-agent, per-model statistics as plain dicts."""
+        return {
+            agent: {
+                model: dict(stats.to_dict(),
+                            latency_tail_ms=round(stats.latency_tail_ms, 1),
+                            error_rate=round(stats.error_rate, 4))
+                for model, stats in models.items()
+            }
+            for agent, models in self.stats.items()
+        }
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Atomically write the statistics to `path` (default: state_path)."""
+        path = path or self.state_path
+        if not path:
+            raise ValueError("No state path configured")
+        _write_state(path, self._state())
+
+    async def save_async(self, path: Optional[str] = None) -> None:
+        """save() for the event loop: the statistics are copied, then written from a thread."""
+        path = path or self.state_path
+        if not path:
+            raise ValueError("No state path configured")
+        await asyncio.to_thread(_write_state, path, self._state())
+
+    def _state(self) -> Dict[str, Any]:
+        return {
+            "version": 1,
+            "stats": {
+                agent: {model: stats.to_dict() for model, stats in models.items()}
+                for agent, models in self.stats.items()
+            },
+        }
+
+    def load(self, path: str) -> None:
+        """Replace the statistics with those saved at `path`."""
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        self.stats = {
+            agent: {model: ModelStats(**values) for model, values in models.items()}
+            for agent, models in state.get("stats", {}).items()
+        }
+        logger.info(f"[ModelRouter] Loaded statistics for {len(self.stats)} agents")
+
+
+def _write_state(path: str, state: Dict[str, Any]) -> None:
+    """Atomically replace `path` with `state` as JSON."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
@@ -0,0 +1,403 @@
+"""
+Multi-Process Worker Runtime
+============================
+Runs agents in N worker processes (one event loop each) that share a
+global rate limit and response cache.
+"""
+
+import asyncio
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from multiprocessing.managers import BaseManager
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerError(Exception):
+    """An agent job failed inside a worker process."""
+
+
+class SharedRateLimiter:
+    """
+    Token bucket stored in shared memory, safe across worker processes.
+
+    Every process draws from the same bucket, so adding workers does not
+    multiply the request rate seen by the upstream. A 429 from any worker
+    pauses all of them for the Retry-After period.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: Optional[float] = None, ctx=None):
+        ctx = ctx or multiprocessing.get_context("spawn")
+        self.rate = rate_per_sec
+        self.burst = burst if burst is not None else max(1.0, rate_per_sec)
+        self._tokens = ctx.Value("d", self.burst, lock=False)
+        self._updated = ctx.Value("d", time.monotonic(), lock=False)
+        self._blocked_until = ctx.Value("d", 0.0, lock=False)
+        self._lock = ctx.Lock()
+
+    def _try_take(self) -> float:
+        """Take a token; return 0 on success or the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until.value:
+                return self._blocked_until.value - now
+
+            elapsed = now - self._updated.value
+            self._tokens.value = min(self.burst, self._tokens.value + elapsed * self.rate)
+            self._updated.value = now
+
+            if self._tokens.value >= 1.0:
+                self._tokens.value -= 1.0
+                return 0.0
+            return (1.0 - self._tokens.value) / self.rate
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        while True:
+            wait = self._try_take()
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def penalize(self, seconds: float) -> None:
+        """Pause every worker (e.g. after a 429 with Retry-After)."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            if until > self._blocked_until.value:
+                self._blocked_until.value = until
+                self._tokens.value = 0.0
+
+
+class _LRUStore:
+    """LRU + TTL store living inside the cache manager process."""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.data: "OrderedDict[str, Any]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.get_entry(key)
+        return entry[1] if entry is not None else None
+
+    def get_entry(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        """(expiry on the monotonic clock, value), or None."""
+        entry = self.data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+        self.data.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def set(self, key: str, value: Dict[str, Any]) -> float:
+        """Store `value`; returns its expiry (monotonic clock)."""
+        expires = time.monotonic() + self.ttl
+        self.put(key, (expires, value))
+        return expires
+
+    def put(self, key: str, entry: Tuple[float, Dict[str, Any]]) -> None:
+        self.data[key] = entry
+        self.data.move_to_end(key)
+        while len(self.data) > self.max_entries:
+            self.data.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self.data), "hits": self.hits, "misses": self.misses}
+
+
+class _CacheManager(BaseManager):
+    pass
+
+
+_CacheManager.register("LRUStore", _LRUStore)
+
+
+class SharedResponseCache:
+    """
+    Response cache shared by all workers through a manager process.
+
+    Lookups go over a local socket to a single LRU store, so a response
+    fetched by one worker is a hit for every other worker. Each worker
+    keeps the entries it has seen in a small local LRU (same expiry) in
+    front of it, and talks to the manager from a thread (asyncio.to_thread)
+    so a round trip never blocks the worker's event loop.
+    """
+
+    def __init__(self, store, local_entries: int = 1024):
+        self.store = store
+        # Copied into each worker process, then filled independently; entries
+        # keep the store's expiry (put() only, its own ttl is unused)
+        self.local = _LRUStore(local_entries, 0.0)
+
+    @staticmethod
+    def key(payload: Dict[str, Any]) -> str:
+        """Stable cache key for a chat completions payload."""
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode()
+        return hashlib.sha1(encoded).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.local.get_entry(key)
+        if entry is None:
+            # time.monotonic() is system-wide, so the store's expiry holds here too
+            entry = await asyncio.to_thread(self.store.get_entry, key)
+            if entry is None:
+                return None
+            self.local.put(key, entry)
+        return entry[1]
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        expires = await asyncio.to_thread(self.store.set, key, value)
+        self.local.put(key, (expires, value))
+
+    def stats(self) -> Dict[str, int]:
+        return self.store.stats()
+
+
+def _worker_main(
+    index: int,
+    jobs,
+    results,
+    limiter: Optional[SharedRateLimiter],
+    cache: Optional[SharedResponseCache],
+    concurrency: int,
+    use_uvloop: bool
+) -> None:
+    """Entry point of a worker process."""
+    if use_uvloop:
+        try:
+            import uvloop
+            uvloop.install()
+        except ImportError:
+            pass
+
+    asyncio.run(_worker_loop(index, jobs, results, limiter, cache, concurrency))
+
+
+async def _worker_loop(index, jobs, results, limiter, cache, concurrency) -> None:
+    from .http_pool import ShardedHTTPClient
+    from .registry import create_agent
+
+    loop = asyncio.get_running_loop()
+    client = ShardedHTTPClient(shards=max(1, concurrency // 4))
+    agents: Dict[str, Any] = {}
+    slots = asyncio.Semaphore(concurrency)
+    tasks: set = set()
+
+    async def handle(job_id: int, slug: str, kwargs: Dict[str, Any]) -> None:
+        try:
+            agent = agents.get(slug)
+            if agent is None:
+                agent = agents[slug] = create_agent(slug)
+                agent.http_client = client
+                agent.rate_limiter = limiter
+                agent.response_cache = cache
+            results.put((job_id, True, await agent.run(**kwargs), index))
+        except Exception as e:
+            results.put((job_id, False, f"{type(e).__name__}: {e}", index))
+        finally:
+            slots.release()
+
+    while True:
+        await slots.acquire()
+        job = await loop.run_in_executor(None, jobs.get)
+        if job is None:
+            break
+        task = asyncio.create_task(handle(*job))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    if tasks:
+        await asyncio.gather(*tasks, return_exceptions=True)
+    await client.aclose()
+
+
+class _Worker:
+    """One worker process with its own job and result queues."""
+
+    __slots__ = ("index", "process", "jobs", "results", "collector", "load")
+
+    def __init__(self, index: int, process, jobs, results):
+        self.index = index
+        self.process = process
+        self.jobs = jobs
+        self.results = results
+        self.collector: Optional[threading.Thread] = None
+        self.load = 0  # jobs dispatched and not yet resolved
+
+
+class WorkerRuntime:
+    """
+    Pool of agent worker processes.
+
+    Features:
+    - N processes, one asyncio loop each (uvloop when available)
+    - Each job dispatched to the worker with the fewest outstanding jobs
+    - Global token-bucket rate limit in shared memory
+    - Global LRU response cache in a manager process
+    - A worker that dies is replaced; the jobs dispatched to it fail with
+      WorkerError instead of never resolving (queues are per worker, so a
+      process killed mid-read cannot block the others)
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        concurrency: int = 64,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None,
+        cache_entries: int = 10000,
+        cache_ttl: float = 300.0,
+        use_uvloop: bool = True,
+        health_interval: float = 1.0
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.use_uvloop = use_uvloop
+        self.health_interval = health_interval
+
+        self._ctx = multiprocessing.get_context("spawn")
+        self.limiter = SharedRateLimiter(rate_limit, burst, self._ctx) if rate_limit else None
+
+        self.cache: Optional[SharedResponseCache] = None
+        self._manager: Optional[_CacheManager] = None
+        if cache_entries > 0:
+            self._manager = _CacheManager(ctx=self._ctx)
+            self._cache_args = (cache_entries, cache_ttl)
+
+        self._workers: List[_Worker] = []
+        self._futures: Dict[int, Tuple[Future, _Worker]] = {}
+        self._ids = itertools.count()
+        self._lock = threading.Lock()
+        self._stopping = False
+        self.completed_by_worker: Dict[int, int] = {}
+        self.restarted_workers = 0
+
+    def start(self) -> "WorkerRuntime":
+        """Start the cache manager and worker processes."""
+        if self._manager is not None:
+            self._manager.start()
+            self.cache = SharedResponseCache(self._manager.LRUStore(*self._cache_args))
+
+        self._stopping = False
+        self._workers = [self._spawn(index) for index in range(self.workers)]
+        logger.info(f"[Runtime] Started {self.workers} workers")
+        return self
+
+    def _spawn(self, index: int) -> _Worker:
+        jobs, results = self._ctx.Queue(), self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(index, jobs, results, self.limiter, self.cache,
+                  self.concurrency, self.use_uvloop),
+            daemon=True,
+        )
+        process.start()
+        worker = _Worker(index, process, jobs, results)
+        worker.collector = threading.Thread(target=self._collect, args=(worker,), daemon=True)
+        worker.collector.start()
+        return worker
+
+    def _collect(self, worker: _Worker) -> None:
+        """Resolve futures from one worker's results and watch it (runs in a thread)."""
+        while True:
+            try:
+                item = worker.results.get(timeout=self.health_interval)
+            except queue.Empty:
+                # Read everything a dead worker sent before failing its jobs
+                if worker.process.is_alive() or not worker.results.empty():
+                    continue
+                self._replace(worker)
+                return
+            if item is None:
+                return
+
+            job_id, ok, payload, index = item
+            self.completed_by_worker[index] = self.completed_by_worker.get(index, 0) + 1
+            with self._lock:
+                future, _ = self._futures.pop(job_id, (None, None))
+                if future is not None:
+                    worker.load -= 1
+            if future is None:
+                continue
+            if ok:
+                future.set_result(payload)
+            else:
+                future.set_exception(WorkerError(payload))
+
+    def _replace(self, worker: _Worker) -> None:
+        """Fail the jobs of a dead worker and start a replacement."""
+        with self._lock:
+            lost = [job_id for job_id, (_, owner) in self._futures.items() if owner is worker]
+            futures = [self._futures.pop(job_id)[0] for job_id in lost]
+            if not self._stopping:
+                self._workers[worker.index] = self._spawn(worker.index)
+                self.restarted_workers += 1
+        exitcode = worker.process.exitcode
+        logger.error(
+            f"[Runtime] Worker {worker.index} exited with code {exitcode}, "
+            f"failing {len(futures)} jobs"
+        )
+        for future in futures:
+            future.set_exception(WorkerError(
+                f"worker {worker.index} exited with code {exitcode} before finishing the job"
+            ))
+
+    def submit(self, agent: str, **kwargs: Any) -> Future:
+        """
+        Queue a job.
+
+        Args:
+            agent: Agent slug (see registry.AGENT_TYPES)
+            **kwargs: Arguments for the agent's run()
+
+        Returns:
+            concurrent.futures.Future resolving to the agent result
+        """
+        job_id = next(self._ids)
+        future: Future = Future()
+        with self._lock:
+            if not self._workers:
+                raise RuntimeError("WorkerRuntime is not running (call start())")
+            worker = min(self._workers, key=lambda w: w.load)
+            worker.load += 1
+            self._futures[job_id] = (future, worker)
+            worker.jobs.put((job_id, agent, kwargs))
+        return future
+
+    async def run(self, agent: str, **kwargs: Any) -> Dict[str, Any]:
+        """Queue a job and await its result from asyncio code."""
+        return await asyncio.wrap_future(self.submit(agent, **kwargs))
+
+    def stop(self) -> None:
+        """Drain in-flight jobs and stop all processes."""
+        with self._lock:
+            self._stopping = True
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.jobs.put(None)
+        for worker in workers:
+            worker.process.join()
+            worker.results.put(None)
+            worker.collector.join()
+
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    def __enter__(self) -> "WorkerRuntime":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -0,0 +1,220 @@
+"""
+LLM Scheduler
+=============
+Priority classes and deadlines in front of BaseAgent.call_llm(), shared by
+every agent competing for the same upstream capacity:
+
+    from agents.scheduling import LLMScheduler, request_priority
+    scheduler = LLMScheduler(max_inflight=32)
+    for agent in agents:
+        agent.scheduler = scheduler
+
+    with request_priority(deadline_s=2.0):     # class defaults to the agent's
+        report = await crisis_agent.run(...)
+
+Crisis assessments overtake queued SEO reports, expired requests are
+dropped before reaching the upstream, and low-priority work is degraded
+(cheaper model, smaller max_tokens) or shed when the queue grows.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import math
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import logging
+
+from .batching import QueueFullError
+
+logger = logging.getLogger(__name__)
+
+# Strictest first
+PRIORITIES = ("critical", "high", "normal", "low")
+
+# Default class per agent name
+AGENT_PRIORITIES: Dict[str, str] = {
+    "CrisisManager": "critical",
+    "Compliance": "high",
+    "CommunityManager": "normal",
+    "TrendScout": "low",
+    "SEO_AIO": "low",
+}
+
+# (priority, absolute time.monotonic() deadline) of the current request
+_request: contextvars.ContextVar = contextvars.ContextVar("llm_request", default=(None, None))
+
+
+class LoadShedError(QueueFullError):
+    """Raised when a low-priority request is rejected because the queue is long."""
+
+
+class DeadlineExceededError(Exception):
+    """Raised when a request's deadline passes before it reaches the upstream."""
+
+
+@contextmanager
+def request_priority(priority: Optional[str] = None, deadline_s: Optional[float] = None) -> Iterator[None]:
+    """
+    Set the priority class and/or deadline of the LLM calls made inside.
+
+    Args:
+        priority: One of PRIORITIES (None = the agent's default class)
+        deadline_s: Seconds from now after which the call is not worth making
+    """
+    if priority is not None and priority not in PRIORITIES:
+        raise ValueError(f"priority must be one of {PRIORITIES}")
+    deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+    token = _request.set((priority, deadline))
+    try:
+        yield
+    finally:
+        _request.reset(token)
+
+
+class Grant:
+    """A scheduler slot: the call may proceed, possibly degraded."""
+
+    __slots__ = ("priority", "degraded", "waited_s")
+
+    def __init__(self, priority: str, degraded: bool, waited_s: float):
+        self.priority = priority
+        self.degraded = degraded
+        self.waited_s = waited_s
+
+
+class LLMScheduler:
+    """
+    Deadline-aware priority queue in front of the upstream.
+
+    Features:
+    - At most `max_inflight` upstream calls across all agents using it
+    - Strict priority between classes, earliest deadline first within a
+      class (no deadline = last, FIFO among those)
+    - Requests are dropped (DeadlineExceededError) if their deadline has
+      passed on arrival, while waiting, or leaves less than
+      `min_time_left_s` when a slot frees
+    - Above `degrade_depth` waiting requests, `degrade_priorities` calls
+      run on `degraded_model` with `degraded_max_tokens` of their budget
+    - Above `shed_depth`, new `shed_priorities` requests are rejected
+      (LoadShedError, a QueueFullError: the API answers 503)
+    """
+
+    def __init__(
+        self,
+        max_inflight: int = 32,
+        degrade_depth: int = 16,
+        shed_depth: int = 64,
+        degrade_priorities: Tuple[str, ...] = ("normal", "low"),
+        shed_priorities: Tuple[str, ...] = ("low",),
+        degraded_model: Optional[str] = "openai/gpt-4o-mini",
+        degraded_max_tokens: float = 0.5,
+        min_time_left_s: float = 0.0,
+        agent_priorities: Optional[Dict[str, str]] = None
+    ):
+        self.max_inflight = max_inflight
+        self.degrade_depth = degrade_depth
+        self.shed_depth = shed_depth
+        self.degrade_priorities = degrade_priorities
+        self.shed_priorities = shed_priorities
+        self.degraded_model = degraded_model
+        self.degraded_max_tokens = degraded_max_tokens
+        self.min_time_left_s = min_time_left_s
+        self.agent_priorities = dict(AGENT_PRIORITIES, **(agent_priorities or {}))
+
+        self._inflight = 0
+        self._waiting = 0
+        # (class rank, deadline, seq, priority, future); cancelled entries are skipped
+        self._heap: List[Tuple[int, float, int, str, Any]] = []
+        self._seq = itertools.count()
+        self.stats: Dict[str, Dict[str, int]] = {
+            p: {"granted": 0, "degraded": 0, "shed": 0, "expired": 0} for p in PRIORITIES
+        }
+
+    def __len__(self) -> int:
+        return self._waiting
+
+    async def acquire(self, agent_name: str) -> Grant:
+        """
+        Wait for an upstream slot for one call of `agent_name`.
+
+        Raises:
+            LoadShedError: Low-priority request while the queue is too long
+            DeadlineExceededError: Deadline passed before a slot was free
+        """
+        priority, deadline = _request.get()
+        priority = priority or self.agent_priorities.get(agent_name, "normal")
+        stats = self.stats[priority]
+        now = time.monotonic()
+
+        if deadline is not None and deadline - now <= self.min_time_left_s:
+            stats["expired"] += 1
+            raise DeadlineExceededError(f"{agent_name} request expired before scheduling")
+        if priority in self.shed_priorities and self._waiting >= self.shed_depth:
+            stats["shed"] += 1
+            raise LoadShedError(f"{agent_name} shed: {self._waiting} LLM calls queued")
+
+        if self._inflight < self.max_inflight and not self._waiting:
+            self._inflight += 1
+            return self._grant(priority, 0.0)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (
+            PRIORITIES.index(priority),
+            deadline if deadline is not None else math.inf,
+            next(self._seq), priority, future,
+        ))
+        self._waiting += 1
+        try:
+            if deadline is None:
+                await future
+            else:
+                await asyncio.wait_for(future, deadline - now)
+        except asyncio.TimeoutError:
+            stats["expired"] += 1
+            raise DeadlineExceededError(f"{agent_name} request expired in the LLM queue")
+        except BaseException:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()  # granted and cancelled at the same time
+            raise
+        finally:
+            if not future.done() or future.cancelled():
+                self._waiting -= 1
+        return self._grant(priority, time.monotonic() - now)
+
+    def _grant(self, priority: str, waited_s: float) -> Grant:
+        degraded = priority in self.degrade_priorities and self._waiting >= self.degrade_depth
+        stats = self.stats[priority]
+        stats["granted"] += 1
+        if degraded:
+            stats["degraded"] += 1
+        return Grant(priority, degraded, waited_s)
+
+    def release(self) -> None:
+        """Free a slot and hand it to the most urgent live request."""
+        self._inflight -= 1
+        now = time.monotonic()
+        while self._heap and self._inflight < self.max_inflight:
+            _, deadline, _, priority, future = heapq.heappop(self._heap)
+            if future.done():
+                continue  # timed out or cancelled; already uncounted
+            self._waiting -= 1
+            if deadline - now <= self.min_time_left_s:
+                self.stats[priority]["expired"] += 1
+                future.set_exception(DeadlineExceededError("request expired in the LLM queue"))
+                continue
+            self._inflight += 1
+            future.set_result(None)
+
+    def degrade(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Payload of a degraded call: cheaper model, smaller completion budget."""
+        return dict(
+            payload,
+            model=self.degraded_model or payload["model"],
+            max_tokens=max(1, int(payload["max_tokens"] * self.degraded_max_tokens)),
+        )
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"inflight": self._inflight, "waiting": self._waiting, "classes": self.stats}
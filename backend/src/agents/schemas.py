@@ -0,0 +1,152 @@
+"""
+Compact Response Schemas
+========================
+Optional compact wire format for agent answers: short keys, integer enum
+codes, 0/1 booleans and omitted defaults. The model is prompted with the
+schema's instruction and the expander rebuilds the exact verbose dict the
+agent returns today, so callers see no difference:
+
+    agent = CommunityManagerAgent()
+    agent.compact_output = True     # prompt for, and expand, the compact format
+
+Keys the schema does not know (e.g. the cascade's "confidence") and
+verbose keys the model emits anyway are passed through unchanged.
+"""
+
+import copy
+from typing import Dict, Any, Optional, Tuple
+
+_MISSING = object()
+
+
+class Field:
+    """
+    One output key in the compact format.
+
+    Args:
+        short: Key used on the wire
+        enum: Allowed values; the model emits their index
+        default: Value restored when the model omits the key
+        schema: Schema of a nested object
+        items: Schema of each object in a list
+    """
+
+    __slots__ = ("short", "enum", "default", "schema", "items")
+
+    def __init__(
+        self,
+        short: str,
+        enum: Optional[Tuple[Any, ...]] = None,
+        default: Any = _MISSING,
+        schema: Optional["CompactSchema"] = None,
+        items: Optional["CompactSchema"] = None
+    ):
+        self.short = short
+        self.enum = enum
+        self.default = default
+        self.schema = schema
+        self.items = items
+
+
+BOOL = (False, True)
+
+
+class CompactSchema:
+    """Mapping between an agent's verbose JSON and its compact form."""
+
+    def __init__(self, fields: Dict[str, Field]):
+        self.fields = fields
+        self._instruction: Optional[str] = None
+        shorts = [f.short for f in fields.values()]
+        if len(set(shorts)) != len(shorts):
+            raise ValueError(f"Duplicate short keys in {shorts}")
+
+    def expand(self, wire: Dict[str, Any]) -> Dict[str, Any]:
+        """Rebuild the verbose dict from a compact answer."""
+        if not isinstance(wire, dict):
+            return wire
+        wire = dict(wire)
+        full: Dict[str, Any] = {}
+        for name, field in self.fields.items():
+            if field.short in wire:
+                value = wire.pop(field.short)
+            elif name in wire:
+                value = wire.pop(name)
+            elif field.default is not _MISSING:
+                full[name] = copy.copy(field.default)
+                continue
+            else:
+                continue
+
+            if field.enum is not None:
+                is_code = isinstance(value, int) and not isinstance(value, bool)
+                if is_code and 0 <= value < len(field.enum):
+                    value = field.enum[value]
+            elif field.schema is not None:
+                value = field.schema.expand(value)
+            elif field.items is not None and isinstance(value, list):
+                value = [field.items.expand(item) for item in value]
+            full[name] = value
+
+        full.update(wire)  # unknown keys pass through
+        return full
+
+    def compact(self, full: Dict[str, Any]) -> Dict[str, Any]:
+        """Compact form of a verbose dict (what a compliant model emits)."""
+        wire: Dict[str, Any] = {}
+        for name, value in full.items():
+            field = self.fields.get(name)
+            if field is None:
+                wire[name] = value
+                continue
+            if field.default is not _MISSING and value == field.default:
+                continue
+            if field.enum is not None:
+                # Match types too: 1 == True, but only True is encoded as 1 here
+                code = next((i for i, v in enumerate(field.enum)
+                             if type(v) is type(value) and v == value), None)
+                if code is not None:
+                    value = code
+            elif field.schema is not None and isinstance(value, dict):
+                value = field.schema.compact(value)
+            elif field.items is not None and isinstance(value, list):
+                value = [field.items.compact(item) for item in value]
+            wire[field.short] = value
+        return wire
+
+    def describe(self, indent: str = "") -> str:
+        """One line per key: short=verbose, codes, default, nested keys."""
+        lines = []
+        for name, field in self.fields.items():
+            line = f"{indent}{field.short}={name}"
+            if field.enum == BOOL:
+                line += ": 0/1"
+            elif field.enum is not None:
+                line += ": " + " ".join(f"{i}={v}" for i, v in enumerate(field.enum))
+            if field.default is not _MISSING:
+                default = field.default
+                if isinstance(default, bool):
+                    default = int(default)
+                line += f" (défaut {default!r}, à omettre)".replace("'", '"')
+            if field.schema is not None:
+                lines.append(line + " {")
+                lines.append(field.schema.describe(indent + "  "))
+                line = f"{indent}}}"
+            elif field.items is not None:
+                lines.append(line + " [{")
+                lines.append(field.items.describe(indent + "  "))
+                line = f"{indent}}}]"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def instruction(self) -> str:
+        """System prompt suffix asking for the compact format."""
+        if self._instruction is None:
+            self._instruction = (
+                "\n\n# FORMAT COMPACT (remplace le format JSON ci-dessus)\n"
+                "Réponds en JSON minifié avec ces clés courtes. Valeurs à choix: "
+                "donne le numéro. Booléens: 0/1. Omets les clés égales à leur défaut. "
+                "Textes inchangés.\n"
+                + self.describe()
+            )
+        return self._instruction
@@ -5,8 +5,10 @@ Optimizes content for both traditional search engines (SEO)
 and AI-powered search (AIO - ChatGPT, Claude, Perplexity).
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from .base import BaseAgent
+from .schemas import CompactSchema, Field
+from .tracing import traced_run
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,8 +23,58 @@ class SEO_AIO_Agent(BaseAgent):
     - AIO optimization (citation-readiness, factual accuracy)
     - E-E-A-T signals
     - Structured data recommendations
+    - Site-aware mode: with `site_context` (site_audit.SiteIndex.facts),
+      internal links come from the site's real pages
     """
 
+    COMPACT_SCHEMA = CompactSchema({
+        "seo": Field("s", schema=CompactSchema({
+            "primary_keywords": Field("pk"),
+            "secondary_keywords": Field("sk", default=[]),
+            "meta_title": Field("mt"),
+            "meta_description": Field("md"),
+            "url_slug": Field("u"),
+            "h1": Field("h1"),
+            "h2_structure": Field("h2", default=[]),
+            "internal_links": Field("il", default=[], items=CompactSchema({
+                "anchor": Field("a"),
+                "target": Field("t"),
+            })),
+            "image_alt_texts": Field("ia", default=[]),
+        })),
+        "aio": Field("a", schema=CompactSchema({
+            "citation_ready_facts": Field("cf", default=[], items=CompactSchema({
+                "fact": Field("f"),
+                "source": Field("s"),
+                "date": Field("d"),
+            })),
+            "qa_pairs": Field("qa", default=[], items=CompactSchema({
+                "question": Field("q"),
+                "answer": Field("a"),
+            })),
+            "entities": Field("e", schema=CompactSchema({
+                "people": Field("p", default=[]),
+                "organizations": Field("o", default=[]),
+                "locations": Field("l", default=[]),
+            })),
+            "factual_accuracy_score": Field("fs"),
+            "authority_signals": Field("as", schema=CompactSchema({
+                "experience": Field("ex"),
+                "expertise": Field("ep"),
+                "authoritativeness": Field("au"),
+                "trustworthiness": Field("tr"),
+            })),
+            "schema_suggestions": Field("ss", default=[], items=CompactSchema({
+                "type": Field("t"),
+                "properties": Field("p"),
+            })),
+        })),
+        "voice_search_optimization": Field("vs", default=[]),
+        "featured_snippet_target": Field("f"),
+        "overall_score": Field("o"),
+        "recommendations": Field("r", default=[]),
+    })
+
     def __init__(self, model: str = "anthropic/claude-3.5-sonnet"):
         super().__init__(
             name="SEO_AIO",
@@ -135,12 +187,14 @@ RÉPONSE FORMAT (JSON):
 }
 """
 
+    @traced_run
     async def run(
         self,
         content: str,
         target_keywords: List[str] = None,
         language: str = "fr",
-        content_type: str = "blog_post"
+        content_type: str = "blog_post",
+        site_context: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """
         Optimize content for SEO and AIO.
@@ -150,6 +204,7 @@ RÉPONSE FORMAT (JSON):
             target_keywords: Optional target keywords
             language: Content language
             content_type: Type (blog_post, product_page, landing_page, etc.)
+            site_context: Optional page facts from site_audit.SiteIndex
 
         Returns:
             Complete SEO/AIO optimization report
@@ -164,6 +219,9 @@ TYPE DE CONTENU: {content_type}
         if target_keywords:
             user_message += f"\nMOTS-CLÉS CIBLES: {', '.join(target_keywords)}\n"
 
+        if site_context:
+            user_message += self._site_block(site_context)
+
         user_message += f"""
 CONTENU À OPTIMISER:
 ---
@@ -181,12 +239,15 @@ Assure-toi que TOUS les faits sont citables et vérifiables.
         # Parse JSON response
         try:
             optimization = self.parse_json_response(result["content"])
+            if site_context:
+                self._apply_site_context(optimization, site_context)
 
             # Add metadata
             optimization["language"] = language
             optimization["content_type"] = content_type
             optimization["model_used"] = result["model"]
             optimization["cost"] = result["cost"]
+            optimization["tokens"] = result["tokens"]
             optimization["latency_ms"] = result["latency_ms"]
 
             return optimization
@@ -195,6 +256,46 @@ Assure-toi que TOUS les faits sont citables et vérifiables.
             logger.error(f"[SEO_AIO] Error parsing response: {e}")
             raise
 
+    def _site_block(self, site_context: Dict[str, Any]) -> str:
+        """Prompt section with the page's locally computed site facts."""
+        block = "\nCONTEXTE DU SITE (index interne):\n"
+        candidates = site_context.get("link_candidates") or []
+        if candidates:
+            block += "Liens internes possibles (utilise UNIQUEMENT ces URL pour internal_links):\n"
+            block += "".join(
+                f"- {c['target']} — {c['anchor']} (pertinence {c['score']})\n" for c in candidates
+            )
+        competing = site_context.get("cannibalized_with") or []
+        if competing:
+            block += (
+                f"Cannibalisation: {', '.join(competing[:5])} cible(nt) aussi "
+                f"\"{site_context.get('primary_keyword', '')}\". Différencie les mots-clés et l'angle.\n"
+            )
+        duplicates = site_context.get("duplicates") or []
+        if duplicates:
+            block += f"Contenu quasi identique à: {', '.join(duplicates[:5])}. Recommande canonical ou fusion.\n"
+        if site_context.get("orphan"):
+            block += "Page orpheline: aucune page du site n'y renvoie. Recommande des liens entrants.\n"
+        return block
+
+    def _apply_site_context(self, optimization: Dict[str, Any], site_context: Dict[str, Any]) -> None:
+        """Keep only internal links to real pages and attach the site facts."""
+        candidates = site_context.get("link_candidates") or []
+        allowed = {c["target"] for c in candidates}
+        seo = optimization.get("seo")
+        if isinstance(seo, dict):
+            links = [
+                link for link in seo.get("internal_links") or []
+                if isinstance(link, dict) and link.get("target") in allowed
+            ]
+            seo["internal_links"] = links or [
+                {"anchor": c["anchor"], "target": c["target"]} for c in candidates[:3]
+            ]
+        optimization["site"] = {
+            key: site_context.get(key)
+            for key in ("primary_keyword", "inbound_links", "orphan", "cannibalized_with", "duplicates")
+        }
+
 
 # Example usage
 async def test_seo_aio():
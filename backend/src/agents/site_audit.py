@@ -0,0 +1,396 @@
+"""
+Site Audit
+==========
+Site-wide SEO audit: a local index of every page (distinctive terms,
+internal link graph) provides the facts a single-page SEO_AIO call cannot
+know, then the per-page LLM calls run concurrently with those facts
+injected:
+
+    from agents.site_audit import SiteIndex
+    index = SiteIndex(base_url="https://client.com")
+    for page in pages:                      # {"url", "content"[, "title", "links", "target_keywords"]}
+        index.add_page(**page)
+    index.report()                          # orphans, cannibalized keywords, duplicates
+    summary = await index.audit(SEO_AIO_Agent(), pages, max_concurrency=16)
+
+Memory stays proportional to the number of pages: page content is not
+kept (`pages` can be a generator read twice), each page keeps its top
+`terms_per_page` weighted terms and posting lists are capped.
+"""
+
+import asyncio
+import heapq
+import math
+import re
+import time
+from collections import Counter
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set, Tuple
+import logging
+
+from .batching import QueueFullError
+from .mentions import tokenize
+from .scheduling import DeadlineExceededError
+
+logger = logging.getLogger(__name__)
+
+STOPWORDS = frozenset("""
+les des une est pas par pour sur dans avec aux que qui quoi dont ses son sont leur leurs nos
+notre vos votre vous nous ils elles elle cette ces cet mais plus moins tres tout tous toute
+toutes sans sous entre comme aussi bien fait faire peut etre avoir ont ete meme encore ainsi
+donc alors chez lors depuis selon afin the and for are with that this from your you our not
+but all can has have was were will its into more than also about which their they them what
+when how who www http https com html
+""".split())
+
+_HREF = re.compile(r"""href=["']([^"'#?]+)|\]\(([^)\s#?]+)""")
+
+
+def normalize_url(url: str, base_url: str = "") -> Optional[str]:
+    """Site-relative path ('/blog/post'), or None for external links."""
+    url = url.strip()
+    if base_url and url.startswith(base_url):
+        url = url[len(base_url):]
+    if "://" in url or url.startswith(("mailto:", "tel:", "//")):
+        return None
+    url = url.split("#", 1)[0].split("?", 1)[0].strip("/")
+    return "/" + url if url else "/"
+
+
+def extract_links(content: str, base_url: str = "") -> List[str]:
+    """Internal link targets of HTML (href) or Markdown ([..](..)) content."""
+    links = []
+    for match in _HREF.finditer(content):
+        url = normalize_url(match.group(1) or match.group(2), base_url)
+        if url is not None:
+            links.append(url)
+    return links
+
+
+def page_terms(text: str) -> List[str]:
+    """Content terms: words of 3+ letters outside STOPWORDS, plus their bigrams."""
+    words = [t for t in tokenize(text) if len(t) > 2 and t not in STOPWORDS and not t.isdigit()]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class SiteIndex:
+    """
+    Term index and internal link graph over a whole site.
+
+    Features:
+    - TF-IDF over words and bigrams; each page keeps its top terms only
+      (document frequency counts a term where it is among a page's
+      `raw_terms` most frequent)
+    - Internal-link candidates: most similar pages not already linked,
+      from capped posting lists of distinctive terms
+    - Keyword cannibalization (pages sharing a primary keyword), near
+      duplicates and orphan pages (no inbound internal link)
+    - audit() streams pages through SEO_AIO_Agent with bounded
+      concurrency and the page's facts as `site_context`
+    """
+
+    def __init__(
+        self,
+        base_url: str = "",
+        terms_per_page: int = 24,
+        raw_terms: int = 64,
+        candidates_per_page: int = 8,
+        max_posting: int = 200,
+        max_df: float = 0.2,
+        duplicate_threshold: float = 0.9
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.terms_per_page = terms_per_page
+        self.raw_terms = raw_terms
+        self.candidates_per_page = candidates_per_page
+        self.max_posting = max_posting
+        self.max_df = max_df
+        self.duplicate_threshold = duplicate_threshold
+
+        self.urls: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._titles: List[str] = []
+        self._keywords: List[str] = []
+        self._raw: List[List[Tuple[str, int]]] = []
+        self._link_urls: List[List[str]] = []
+        self._df: Counter = Counter()
+
+        # Built by _finalize()
+        self._vectors: List[Tuple[Tuple[str, float], ...]] = []
+        self._postings: Dict[str, List[Tuple[int, float]]] = {}
+        self._primary: List[str] = []
+        self._by_keyword: Dict[str, List[int]] = {}
+        self._outlinks: List[Set[int]] = []
+        self._inbound: List[int] = []
+        self._neighbours: Dict[int, List[Tuple[float, int]]] = {}
+        self._stale = False
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    # ------------------------------------------------------------------
+    # Indexing
+    # ------------------------------------------------------------------
+
+    def add_page(
+        self,
+        url: str,
+        content: str,
+        title: str = "",
+        links: Optional[Iterable[str]] = None,
+        target_keywords: Optional[Iterable[str]] = None,
+        **_: Any
+    ) -> None:
+        """
+        Index one page (re-adding a URL replaces it).
+
+        Args:
+            url: Page URL or site-relative path
+            content: Page text, HTML or Markdown
+            title: Page title (weighted 3x, used as link anchor)
+            links: Internal link targets; extracted from `content` if None
+            target_keywords: Keywords the page targets (first = primary)
+        """
+        url = normalize_url(url, self.base_url) or url
+        terms = page_terms(content)
+        title_terms = page_terms(title)
+        counts = Counter(terms)
+        for term in title_terms:
+            counts[term] += 3
+        raw = counts.most_common(self.raw_terms)
+
+        if links is None:
+            links = extract_links(content, self.base_url)
+        else:
+            normalized = (normalize_url(link, self.base_url) for link in links)
+            links = [link for link in normalized if link]
+        keywords = [" ".join(tokenize(k)) for k in (target_keywords or ())]
+
+        page_id = self._ids.get(url)
+        if page_id is None:
+            page_id = len(self.urls)
+            self._ids[url] = page_id
+            self.urls.append(url)
+            self._titles.append(title)
+            self._keywords.append(keywords[0] if keywords else "")
+            self._raw.append(raw)
+            self._link_urls.append(links)
+        else:
+            self._df.subtract(term for term, _ in self._raw[page_id])
+            self._titles[page_id] = title
+            self._keywords[page_id] = keywords[0] if keywords else ""
+            self._raw[page_id] = raw
+            self._link_urls[page_id] = links
+        self._df.update(term for term, _ in raw)
+        self._stale = True
+
+    def _finalize(self) -> None:
+        """Weighted page vectors, posting lists and the link graph."""
+        n = len(self.urls)
+        df = self._df
+        idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items() if count > 0}
+        common = max(2, int(self.max_df * n))
+
+        vectors, postings, primary = [], {}, []
+        for page_id, raw in enumerate(self._raw):
+            weighted = heapq.nlargest(
+                self.terms_per_page,
+                ((term, (1 + math.log(tf)) * idf[term]) for term, tf in raw),
+                key=lambda item: item[1],
+            )
+            norm = math.sqrt(sum(w * w for _, w in weighted)) or 1.0
+            vector = tuple((term, w / norm) for term, w in weighted)
+            vectors.append(vector)
+            for term, w in vector:
+                if df[term] <= common:
+                    postings.setdefault(term, []).append((page_id, w))
+
+            keyword = self._keywords[page_id]
+            if not keyword:
+                bigrams = [term for term, _ in vector if " " in term]
+                keyword = bigrams[0] if bigrams else (vector[0][0] if vector else "")
+            primary.append(keyword)
+
+        by_keyword: Dict[str, List[int]] = {}
+        for page_id, keyword in enumerate(primary):
+            if keyword:
+                by_keyword.setdefault(keyword, []).append(page_id)
+
+        for term, posting in postings.items():
+            if len(posting) > self.max_posting:
+                posting.sort(key=lambda item: item[1], reverse=True)
+                del posting[self.max_posting:]
+
+        outlinks = []
+        inbound = [0] * n
+        for page_id, links in enumerate(self._link_urls):
+            targets = {self._ids[url] for url in links if url in self._ids} - {page_id}
+            outlinks.append(targets)
+            for target in targets:
+                inbound[target] += 1
+
+        self._vectors, self._postings, self._primary = vectors, postings, primary
+        self._by_keyword = by_keyword
+        self._outlinks, self._inbound = outlinks, inbound
+        self._neighbours = {}
+        self._stale = False
+
+    def _similar(self, page_id: int) -> List[Tuple[float, int]]:
+        """(cosine, page) of the most similar pages, best first."""
+        neighbours = self._neighbours.get(page_id)
+        if neighbours is None:
+            scores: Dict[int, float] = {}
+            postings = self._postings
+            for term, weight in self._vectors[page_id]:
+                for other, other_weight in postings.get(term, ()):
+                    scores[other] = scores.get(other, 0.0) + weight * other_weight
+            scores.pop(page_id, None)
+            neighbours = heapq.nlargest(
+                self.candidates_per_page * 2, ((s, p) for p, s in scores.items())
+            )
+            self._neighbours[page_id] = neighbours
+        return neighbours
+
+    # ------------------------------------------------------------------
+    # Facts
+    # ------------------------------------------------------------------
+
+    def facts(self, url: str) -> Dict[str, Any]:
+        """Locally computed SEO facts for one indexed page (site_context)."""
+        if self._stale:
+            self._finalize()
+        url = normalize_url(url, self.base_url) or url
+        page_id = self._ids[url]
+        linked = self._outlinks[page_id]
+        neighbours = self._similar(page_id)
+
+        candidates = [
+            {"target": self.urls[other],
+             "anchor": self._titles[other] or self._primary[other],
+             "score": round(score, 3)}
+            for score, other in neighbours if other not in linked
+        ][:self.candidates_per_page]
+        keyword = self._primary[page_id]
+        competing = [self.urls[other] for other in self._by_keyword.get(keyword, ())
+                     if other != page_id][:self.candidates_per_page]
+        return {
+            "url": url,
+            "primary_keyword": keyword,
+            "inbound_links": self._inbound[page_id],
+            "orphan": self._inbound[page_id] == 0 and url != "/",
+            "link_candidates": candidates,
+            "cannibalized_with": competing,
+            "duplicates": [self.urls[other] for score, other in neighbours
+                           if score >= self.duplicate_threshold],
+        }
+
+    def report(self, max_items: int = 100) -> Dict[str, Any]:
+        """Site-wide findings: orphans, cannibalized keywords, near duplicates."""
+        if self._stale:
+            self._finalize()
+        cannibalized = {
+            keyword: [self.urls[page_id] for page_id in pages]
+            for keyword, pages in self._by_keyword.items() if len(pages) > 1
+        }
+
+        duplicates = []
+        for page_id in range(len(self.urls)):
+            for score, other in self._similar(page_id):
+                if score >= self.duplicate_threshold and page_id < other:
+                    duplicates.append((self.urls[page_id], self.urls[other], round(score, 3)))
+
+        orphans = [url for page_id, url in enumerate(self.urls)
+                   if self._inbound[page_id] == 0 and url != "/"]
+        return {
+            "pages": len(self.urls),
+            "internal_links": sum(len(links) for links in self._outlinks),
+            "orphans": len(orphans),
+            "orphan_pages": orphans[:max_items],
+            "cannibalized_keywords": len(cannibalized),
+            "cannibalization": dict(sorted(
+                cannibalized.items(), key=lambda item: len(item[1]), reverse=True
+            )[:max_items]),
+            "duplicate_pairs": len(duplicates),
+            "duplicates": sorted(duplicates, key=lambda d: d[2], reverse=True)[:max_items],
+        }
+
+    # ------------------------------------------------------------------
+    # Audit
+    # ------------------------------------------------------------------
+
+    async def audit(
+        self,
+        agent,
+        pages: Iterable[Dict[str, Any]],
+        max_concurrency: int = 16,
+        on_result: Optional[Callable[[str, Dict[str, Any]], Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Run `agent` (a SEO_AIO_Agent) on every page with its site facts.
+
+        Args:
+            agent: SEO_AIO_Agent
+            pages: Indexed pages, {"url", "content"[, "target_keywords",
+                "language", "content_type"]}; consumed lazily
+            max_concurrency: Pages in flight
+            on_result: Called with (url, result) as pages finish; results
+                are then not kept in the summary
+
+        Returns:
+            Summary with the site report, failures, pages shed or expired
+            by the scheduler (`shed`, worth retrying later) and throughput
+        """
+        if self._stale:
+            self._finalize()
+        semaphore = asyncio.Semaphore(max_concurrency)
+        results: Dict[str, Dict[str, Any]] = {}
+        failed: List[str] = []
+        shed: List[str] = []
+        audited = 0
+        pending: Set[asyncio.Task] = set()
+        started = time.perf_counter()
+
+        async def audit_one(page: Dict[str, Any]) -> None:
+            nonlocal audited
+            url = page["url"]
+            try:
+                result = await agent.run(
+                    content=page["content"],
+                    target_keywords=page.get("target_keywords"),
+                    language=page.get("language", "fr"),
+                    content_type=page.get("content_type", "blog_post"),
+                    site_context=self.facts(url),
+                )
+                audited += 1
+                if on_result is not None:
+                    on_result(url, result)
+                else:
+                    results[url] = result
+            except (QueueFullError, DeadlineExceededError) as e:
+                logger.info(f"[SiteIndex] Audit shed for {url}: {e}")
+                shed.append(url)
+            except Exception as e:
+                logger.warning(f"[SiteIndex] Audit failed for {url}: {e}")
+                failed.append(url)
+            finally:
+                semaphore.release()
+
+        for page in pages:
+            await semaphore.acquire()
+            task = asyncio.ensure_future(audit_one(page))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+
+        elapsed = time.perf_counter() - started
+        summary = {
+            "audited": audited,
+            "failed": failed,
+            "shed": shed,
+            "elapsed_s": round(elapsed, 1),
+            "pages_per_hour": round(audited / elapsed * 3600) if elapsed else 0,
+            "site": self.report(),
+        }
+        if on_result is None:
+            summary["results"] = results
+        return summary
@@ -0,0 +1,4 @@
+import os
+
+# Agents read their API key when constructed; tests never reach the network
+os.environ.setdefault("OPENROUTER_API_KEY", "test")
@@ -0,0 +1,148 @@
+"""MicroBatcher: flush triggers, per-request results and request context."""
+
+import asyncio
+import contextvars
+
+import pytest
+
+from agents.base import BaseAgent
+from agents.batching import MicroBatcher, QueueFullError
+from agents.scheduling import DeadlineExceededError, LLMScheduler, _request, request_priority
+
+_label: contextvars.ContextVar = contextvars.ContextVar("label", default=None)
+
+
+class EchoAgent(BaseAgent):
+    """Runs each request on its own; fails requests with `fail` set."""
+
+    def __init__(self):
+        super().__init__(name="Echo")
+        self.seen = []
+
+    async def run(self, n, fail=False):
+        self.seen.append((n, _label.get(), _request.get()))
+        if fail:
+            raise ValueError(f"bad {n}")
+        return {"n": n}
+
+
+class FoldingAgent(BaseAgent):
+    """Folds a batch into one scheduled call, like ComplianceAgent."""
+
+    def __init__(self, scheduler=None):
+        super().__init__(name="Compliance")
+        self.scheduler = scheduler
+        self.calls = []
+
+    async def run(self, n):
+        raise AssertionError("batches are folded")
+
+    async def run_batch(self, requests):
+        self.calls.append(([r["n"] for r in requests], _label.get(), _request.get()))
+        if self.scheduler is not None:
+            await self.scheduler.acquire(self.name)
+            self.scheduler.release()
+        return [{"n": r["n"]} for r in requests]
+
+
+async def submit_all(batcher, requests):
+    """Submit (kwargs, label, priority kwargs) tuples concurrently."""
+    async def one(kwargs, label, priority):
+        _label.set(label)
+        with request_priority(**priority):
+            return await batcher.submit(kwargs)
+
+    batcher.start()
+    try:
+        return await asyncio.gather(
+            *(one(*request) for request in requests), return_exceptions=True
+        )
+    finally:
+        await batcher.stop()
+
+
+def test_full_batch_is_dispatched_without_waiting_for_the_window():
+    agent = EchoAgent()
+    batcher = MicroBatcher(agent, window_ms=10_000, max_batch=3)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            submit_all(batcher, [({"n": i}, None, {}) for i in range(3)]), 2
+        )
+
+    results = asyncio.run(scenario())
+    assert results == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert batcher.stats["batches"] == 1
+
+
+def test_partial_batch_is_flushed_after_the_window():
+    agent = EchoAgent()
+    batcher = MicroBatcher(agent, window_ms=20, max_batch=16)
+
+    results = asyncio.run(submit_all(batcher, [({"n": i}, None, {}) for i in range(2)]))
+    assert results == [{"n": 0}, {"n": 1}]
+    assert batcher.stats == {"submitted": 2, "rejected": 0, "batches": 1, "batched_items": 2}
+
+
+def test_each_future_gets_its_own_result_or_exception():
+    agent = EchoAgent()
+    batcher = MicroBatcher(agent, window_ms=20)
+
+    results = asyncio.run(submit_all(batcher, [
+        ({"n": 0}, "a", {}),
+        ({"n": 1, "fail": True}, "b", {"priority": "low"}),
+        ({"n": 2}, "c", {}),
+    ]))
+    assert results[0] == {"n": 0} and results[2] == {"n": 2}
+    assert isinstance(results[1], ValueError) and str(results[1]) == "bad 1"
+    # Per-item runs keep each caller's context
+    labels = {n: (label, request[0]) for n, label, request in agent.seen}
+    assert labels == {0: ("a", None), 1: ("b", "low"), 2: ("c", None)}
+
+
+def test_folded_batches_run_per_priority_with_the_tightest_deadline():
+    agent = FoldingAgent()
+    batcher = MicroBatcher(agent, window_ms=20)
+
+    results = asyncio.run(submit_all(batcher, [
+        ({"n": 0}, "a", {}),
+        ({"n": 1}, "b", {"priority": "low", "deadline_s": 30}),
+        ({"n": 2}, "c", {"priority": "low", "deadline_s": 10}),
+        ({"n": 3}, "d", {}),
+    ]))
+    assert results == [{"n": i} for i in range(4)]
+
+    calls = {tuple(ns): (label, request) for ns, label, request in agent.calls}
+    assert set(calls) == {(0, 3), (1, 2)}
+    assert calls[(0, 3)] == ("a", (None, None))
+    label, (priority, deadline) = calls[(1, 2)]
+    # Runs as the request with the earliest deadline
+    assert (label, priority) == ("c", "low")
+    assert deadline is not None
+
+
+def test_expired_requests_in_a_folded_batch_reach_the_scheduler():
+    agent = FoldingAgent(LLMScheduler())
+    batcher = MicroBatcher(agent, window_ms=20)
+
+    results = asyncio.run(submit_all(batcher, [
+        ({"n": 0}, None, {}),
+        ({"n": 1}, None, {"priority": "high", "deadline_s": 0}),
+    ]))
+    assert results[0] == {"n": 0}
+    assert isinstance(results[1], DeadlineExceededError)
+    assert agent.scheduler.stats["high"]["expired"] == 1
+
+
+def test_saturated_queue_rejects_new_requests():
+    batcher = MicroBatcher(EchoAgent(), max_queue=1)
+
+    async def scenario():
+        first = asyncio.ensure_future(batcher.submit({"n": 0}))  # no collector: stays queued
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await batcher.submit({"n": 1})
+        first.cancel()
+
+    asyncio.run(scenario())
+    assert batcher.stats["rejected"] == 1
@@ -0,0 +1,146 @@
+"""ModelCascade and batched audits under load shedding."""
+
+import asyncio
+import json
+
+import pytest
+
+from agents.base import BaseAgent
+from agents.benchmarks.compact_schemas import CORPUS
+from agents.cascade import ModelCascade
+from agents.community_manager import CommunityManagerAgent
+from agents.compliance import ComplianceAgent
+from agents.memory import ThreadMemoryStore
+from agents.scheduling import DeadlineExceededError, LoadShedError
+from agents.transport import FakeTransport
+
+CHEAP = "openai/gpt-4o-mini"
+
+
+class RejectingScheduler:
+    """Scheduler that turns every call away with `error`."""
+
+    def __init__(self, error):
+        self.error = error
+        self.acquired = 0
+
+    async def acquire(self, agent_name):
+        self.acquired += 1
+        raise self.error
+
+
+class JsonAgent(BaseAgent):
+    def __init__(self, transport):
+        super().__init__(name="Json")
+        self.transport = transport
+
+    async def run(self, **_):
+        response = await self.call_llm("system", "user")
+        return dict(self.parse_json_response(response["content"]), cost=response["cost"])
+
+
+@pytest.mark.parametrize("error", [
+    LoadShedError("shed"),
+    DeadlineExceededError("expired"),
+])
+def test_shed_or_expired_cheap_call_is_raised_not_escalated(error):
+    transport = FakeTransport()
+    agent = JsonAgent(transport)
+    agent.scheduler = RejectingScheduler(error)
+    cascade = ModelCascade(agent, cheap_model=CHEAP)
+
+    with pytest.raises(type(error)):
+        asyncio.run(cascade.run())
+
+    assert agent.scheduler.acquired == 1
+    assert transport.calls == []
+    assert cascade.stats["escalated"] == 0
+
+
+def test_failed_cheap_call_escalates():
+    transport = FakeTransport(lambda payload: (
+        "not json" if payload["model"] == CHEAP else json.dumps({"answer": 42})
+    ))
+    cascade = ModelCascade(JsonAgent(transport), cheap_model=CHEAP)
+
+    result = asyncio.run(cascade.run())
+
+    assert result["answer"] == 42
+    assert result["cascade"]["reason"] == "error"
+    assert cascade.stats["error"] == 1
+
+
+def test_fallback_answer_of_the_cheap_model_counts_as_error():
+    answer = CORPUS["community-manager"][0]
+    agent = CommunityManagerAgent()
+    agent.transport = FakeTransport(lambda payload: (
+        "not json" if payload["model"] == CHEAP else json.dumps(answer)
+    ))
+    cascade = ModelCascade(agent, cheap_model=CHEAP)
+
+    result = asyncio.run(cascade.run(comment="Bonjour!", platform="instagram", brand_context={}))
+
+    assert result["suggested_response"] == answer["suggested_response"]
+    assert result["cascade"]["reason"] == "error"
+    assert cascade.stats["error"] == 1
+    assert cascade.stats["low_confidence"] == 0
+
+
+def test_reused_approved_reply_is_final():
+    pytest.importorskip("numpy")
+    from agents.retrieval import ReplyLibrary
+
+    agent = CommunityManagerAgent()
+    agent.replies = ReplyLibrary()
+    agent.replies.add("Resto Québec", "Êtes-vous ouverts le lundi?", "Oui, de 11h à 22h!",
+                      {"category": "question"})
+    agent.transport = FakeTransport()
+    cascade = ModelCascade(agent, cheap_model=CHEAP)
+
+    result = asyncio.run(cascade.run(
+        comment="Êtes-vous ouverts le lundi?", platform="instagram",
+        brand_context={"brand_name": "Resto Québec"},
+    ))
+
+    assert result["model_used"] == "reply-index"
+    assert result["cascade"]["escalated"] is False
+    assert agent.transport.calls == []
+    assert cascade.stats["escalated"] == cascade.stats["low_confidence"] == 0
+
+
+def test_shed_batch_audit_fails_without_individual_retries():
+    agent = ComplianceAgent()
+    agent.transport = FakeTransport()
+    agent.scheduler = RejectingScheduler(LoadShedError("shed"))
+    requests = [{"content": f"post {i}", "content_type": "post"} for i in range(5)]
+
+    results = asyncio.run(agent.run_batch(requests))
+
+    assert all(isinstance(result, LoadShedError) for result in results)
+    assert len(results) == 5
+    # One attempt per chunk (4 + 1), none per item
+    assert agent.scheduler.acquired == 2
+
+
+def test_thread_memory_written_once_for_the_returned_answer():
+    answer = CORPUS["community-manager"][0]
+    agent = CommunityManagerAgent()
+    agent.memory = ThreadMemoryStore()
+    agent.transport = FakeTransport(lambda payload: json.dumps(
+        dict(answer, confidence=0.2, suggested_response="cheap reply")
+        if payload["model"] == CHEAP else answer
+    ))
+    cascade = ModelCascade(agent, cheap_model=CHEAP)
+
+    result = asyncio.run(cascade.run(
+        comment="Vous livrez à Lévis?", platform="instagram", brand_context={}, thread_id="t1"
+    ))
+
+    assert result["cascade"]["reason"] == "low_confidence"
+    assert list(agent.memory.get("instagram", "t1").recent) == [
+        ("user", "Vous livrez à Lévis?"),
+        ("assistant", answer["suggested_response"]),
+    ]
+    # The strong attempt does not see the cheap attempt's turn as history
+    strong_prompt = agent.transport.calls[1]["messages"][-1]["content"]
+    assert "cheap reply" not in strong_prompt
@@ -0,0 +1,15 @@
+"""Cold-start budget: the benchmark's --check gate must pass."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[2]
+
+
+def test_cold_start_within_budget():
+    result = subprocess.run(
+        [sys.executable, "-m", "agents.benchmarks.cold_start", "--check", "--runs", "5"],
+        cwd=SRC, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
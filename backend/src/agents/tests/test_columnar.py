@@ -0,0 +1,144 @@
+"""Columnar export: round trips, nulls, mistyped values and batch boundaries."""
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from agents.columnar import ColumnarExporter, ColumnarSink, ResultBatchBuilder, read_results  # noqa: E402
+
+AGENT = "community-manager"
+
+
+def result(i, **overrides):
+    base = {
+        "sentiment": ["positive", "neutral", "negative"][i % 3],
+        "category": "question",
+        "urgency": "low",
+        "suggested_response": f"Bonjour! Réponse n° {i} 🚚",
+        "requires_human": i % 2 == 0,
+        "tags": ["livraison", f"t{i}"],
+        "internal_notes": "",
+        "platform": "instagram",
+        "model_used": "openai/gpt-4o-mini",
+        "cost": 0.001 * i,
+        "tokens": 100 + i,
+        "latency_ms": 900 + i,
+        "created_at": 1_760_000_000_000 + i,
+    }
+    base.update(overrides)
+    return base
+
+
+def as_plain(row):
+    row = dict(row)
+    row["created_at"] = int(row["created_at"].timestamp() * 1000)
+    return row
+
+
+@pytest.mark.parametrize("suffix", ["arrow", "parquet"])
+def test_round_trip(tmp_path, suffix):
+    rows = [result(i) for i in range(7)]
+    path = str(tmp_path / f"cm.{suffix}")
+    with ColumnarSink(AGENT, path, batch_size=3) as sink:
+        sink.append(rows[0])
+        sink.extend(rows[1:])
+
+    table = read_results(path)
+    assert table.num_rows == 7
+    assert sink.stats == {"rows": 7, "batches": 3}
+    assert [as_plain(row) for row in table.to_pylist()] == rows
+
+
+@pytest.mark.parametrize("suffix", ["arrow", "parquet"])
+def test_dictionary_columns_across_batches(tmp_path, suffix):
+    path = str(tmp_path / f"cm.{suffix}")
+    sentiments = ["negative", "negative", "positive", "neutral", None, "positive"]
+    with ColumnarSink(AGENT, path, batch_size=2) as sink:
+        for i, sentiment in enumerate(sentiments):
+            sink.append(result(i, sentiment=sentiment))
+
+    table = read_results(path)
+    assert pa.types.is_dictionary(table.schema.field("sentiment").type)
+    assert table.column("sentiment").to_pylist() == sentiments
+    if suffix == "arrow":
+        assert table.column("sentiment").num_chunks == 3  # one record batch per flush
+    else:
+        import pyarrow.parquet as pq
+
+        assert pq.ParquetFile(path).num_row_groups == 3
+
+
+def test_missing_and_mistyped_values_become_nulls():
+    builder = ResultBatchBuilder(AGENT)
+    builder.append({})
+    builder.append(result(
+        1,
+        sentiment=["positive"],       # unhashable in an enum column
+        category={"kind": "question"},
+        urgency="extreme",            # outside the vocabulary
+        requires_human="false",
+        tags="livraison",
+        cost="n/a",
+        tokens=[1],
+        latency_ms="950",
+    ))
+    empty, mistyped = builder.to_batch().to_pylist()
+
+    assert all(value is None for key, value in empty.items() if key != "created_at")
+    assert empty["created_at"] is not None  # defaults to the append time
+    for key in ("sentiment", "category", "urgency", "requires_human", "tags", "cost", "tokens"):
+        assert mistyped[key] is None, key
+    assert mistyped["latency_ms"] == 950
+    assert mistyped["suggested_response"] == "Bonjour! Réponse n° 1 🚚"
+
+
+def test_extend_matches_append_with_mistyped_values():
+    rows = [result(i) for i in range(4)] + [result(9, sentiment=["x"], tokens=None, tags=None)]
+    appended, extended = ResultBatchBuilder(AGENT), ResultBatchBuilder(AGENT)
+    for row in rows:
+        appended.append(row)
+    extended.extend(rows)
+    assert appended.to_batch().equals(extended.to_batch())
+
+
+class Unprintable:
+    def __str__(self):
+        raise RuntimeError("no text")
+
+
+def test_failed_append_leaves_no_partial_row():
+    builder = ResultBatchBuilder(AGENT)
+    builder.append(result(0))
+    with pytest.raises(RuntimeError):
+        builder.append(result(1, suggested_response=Unprintable()))
+    with pytest.raises(RuntimeError):
+        builder.extend([result(2), result(3, internal_notes=Unprintable())])
+    builder.append(result(4))
+
+    assert len(builder) == 2
+    batch = builder.to_batch()
+    assert [as_plain(row) for row in batch.to_pylist()] == [result(0), result(4)]
+
+
+def test_to_batch_hands_over_buffers():
+    builder = ResultBatchBuilder(AGENT)
+    builder.append(result(0))
+    first = builder.to_batch()
+    assert len(builder) == 0
+
+    builder.append(result(1))  # no BufferError: the batch owns the old buffers
+    second = builder.to_batch()
+    assert as_plain(first.to_pylist()[0]) == result(0)
+    assert as_plain(second.to_pylist()[0]) == result(1)
+
+
+def test_exporter_writes_one_file_per_agent(tmp_path):
+    exporter = ColumnarExporter(str(tmp_path), format="parquet")
+    exporter.submit(AGENT, result(0))
+    exporter.submit("compliance", {"compliance_status": "compliant", "violations": [{"law": "CASL"}]})
+    exporter.close()
+
+    assert read_results(str(tmp_path / f"{AGENT}.parquet")).num_rows == 1
+    compliance = read_results(str(tmp_path / "compliance.parquet")).to_pylist()[0]
+    assert compliance["compliance_status"] == "compliant"
+    assert compliance["violations"] == '[{"law":"CASL"}]'
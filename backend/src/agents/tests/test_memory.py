@@ -0,0 +1,47 @@
+"""ThreadMemoryStore: bounded memory when the summarizer fails."""
+
+import asyncio
+
+from agents.memory import ThreadMemoryStore
+
+
+async def failing_summarizer(summary, turns):
+    raise RuntimeError("summarizer unavailable")
+
+
+def test_unfolded_turns_are_capped_while_the_summarizer_fails():
+    store = ThreadMemoryStore(recent_turns=2, max_pending=3, summarizer=failing_summarizer)
+
+    async def scenario():
+        for i in range(10):
+            await store.append("instagram", "t1", "user", f"turn {i}")
+
+    asyncio.run(scenario())
+
+    state = store.get("instagram", "t1")
+    assert state.pending == [("user", f"turn {i}") for i in (5, 6, 7)]
+    assert list(state.recent) == [("user", "turn 8"), ("user", "turn 9")]
+    assert store.stats["dropped_turns"] == 5
+    assert "turn 9" in store.render("instagram", "t1")
+
+
+def test_pending_turns_folded_once_the_summarizer_recovers():
+    calls = []
+
+    async def flaky(summary, turns):
+        calls.append(list(turns))
+        if len(calls) == 1:
+            raise RuntimeError("timeout")
+        return " | ".join(text for _, text in turns)
+
+    store = ThreadMemoryStore(recent_turns=1, summarizer=flaky)
+
+    async def scenario():
+        for i in range(3):
+            await store.append("instagram", "t1", "user", f"turn {i}")
+
+    asyncio.run(scenario())
+
+    state = store.get("instagram", "t1")
+    assert state.summary == "turn 0 | turn 1"
+    assert state.pending == []
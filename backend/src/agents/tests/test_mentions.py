@@ -0,0 +1,117 @@
+"""MentionRouter: timestamp normalization and per-brand failure isolation."""
+
+import asyncio
+
+import pytest
+
+from agents.mentions import MentionRouter, to_epoch
+
+
+class StubCrisisAgent:
+    def __init__(self, fail_for=()):
+        self.fail_for = set(fail_for)
+        self.calls = []
+
+    async def run(self, brand_name, mentions, **kwargs):
+        self.calls.append(brand_name)
+        if brand_name in self.fail_for:
+            raise RuntimeError("upstream down")
+        return {"brand_name": brand_name, "mentions_analyzed": len(mentions)}
+
+
+def make_router():
+    router = MentionRouter(min_interval_s=0)
+    router.add_brand("resto", "Resto Québec")
+    router.add_brand("cafe", "Café Soleil")
+    return router
+
+
+def test_to_epoch_accepts_numbers_iso_strings_and_datetimes():
+    assert to_epoch(1760000000) == 1760000000.0
+    assert to_epoch("1760000000.5") == 1760000000.5
+    assert to_epoch("2025-10-09T08:53:20Z") == 1760000000.0
+    assert to_epoch("2025-10-09T04:53:20-04:00") == 1760000000.0
+    assert to_epoch("2025-10-09T08:53:20") == 1760000000.0  # naive = UTC
+
+
+@pytest.mark.parametrize("value", ["hier", True, [1], {"t": 1}])
+def test_to_epoch_rejects_non_timestamps(value):
+    with pytest.raises(ValueError):
+        to_epoch(value)
+
+
+def test_ingest_stores_iso_timestamps_as_epoch_seconds():
+    router = make_router()
+    router.ingest({"text": "Merci Resto Québec!", "timestamp": "2025-10-09T08:53:20Z"})
+    timestamp, _ = router.brands["resto"].window[0]
+    assert timestamp == 1760000000.0
+
+
+def test_invalid_mentions_are_rejected_without_touching_windows():
+    router = make_router()
+    with pytest.raises(ValueError):
+        router.ingest({"text": "Resto Québec", "timestamp": "la semaine passée"})
+    with pytest.raises(ValueError):
+        router.ingest({"text": 42})
+    assert not router.brands["resto"].window
+
+    matched = router.ingest_many([
+        {"text": "Resto Québec encore", "timestamp": "n/a"},
+        {"text": "Café Soleil", "timestamp": "2025-10-09T08:53:20+00:00"},
+    ], now=1760000100.0)
+    assert matched == 1
+    assert router.stats["rejected"] == 1  # counted by ingest_many only
+
+
+def test_iso_timestamps_do_not_break_assessment_rounds():
+    router = make_router()
+    now = 1760000100.0
+    router.ingest_many([
+        {"text": "Resto Québec", "timestamp": "2025-10-09T08:53:20Z"},
+        {"text": "Café Soleil", "timestamp": 1760000050},
+    ], now=now)
+    agent = StubCrisisAgent()
+    results = asyncio.run(router.assess(agent, now=now))
+    assert set(results) == {"resto", "cafe"}
+
+
+def test_a_failing_brand_does_not_fail_the_round():
+    router = make_router()
+    now = 1760000100.0
+    router.ingest_many([{"text": "Resto Québec"}, {"text": "Café Soleil"}], now=now)
+    # A window entry that cannot be compared fails pruning for this brand only
+    router.brands["cafe"].window.appendleft(("corrupt", {"text": "Café Soleil"}))
+
+    results = asyncio.run(router.assess(StubCrisisAgent(), now=now))
+    assert set(results) == {"resto"}
+    # The failed brand is scheduled again
+    assert [watch.brand_id for watch in router.due(now)] == ["cafe"]
+
+
+def test_brand_removed_during_a_failing_assessment_is_not_rescheduled():
+    router = make_router()
+    now = 1760000100.0
+    router.ingest_many([{"text": "Resto Québec"}, {"text": "Café Soleil"}], now=now)
+
+    class RemovingAgent(StubCrisisAgent):
+        async def run(self, brand_name, mentions, **kwargs):
+            if brand_name == "Café Soleil":
+                router.remove_brand("cafe")
+            return await super().run(brand_name, mentions, **kwargs)
+
+    results = asyncio.run(router.assess(RemovingAgent(fail_for={"Café Soleil"}), now=now))
+    assert set(results) == {"resto"}
+    assert "cafe" not in router._changed
+
+    # Later rounds keep assessing the remaining brands
+    router.ingest({"text": "Resto Québec encore"}, now=now + 1)
+    results = asyncio.run(router.assess(StubCrisisAgent(), now=now + 1))
+    assert set(results) == {"resto"}
+
+
+def test_due_skips_brands_that_are_no_longer_monitored():
+    router = make_router()
+    now = 1760000100.0
+    router.ingest_many([{"text": "Resto Québec"}, {"text": "Café Soleil"}], now=now)
+    router.brands.pop("cafe")
+    assert [watch.brand_id for watch in router.due(now)] == ["resto"]
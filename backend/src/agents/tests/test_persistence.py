@@ -0,0 +1,157 @@
+"""ResultSink: bisecting rejected batches, spill and replay."""
+
+import asyncio
+import json
+
+import pytest
+
+from agents.persistence import ResultSink
+
+
+class RowRejected(Exception):
+    sqlstate = "22P05"  # untranslatable character
+
+
+class FakePool:
+    """copy_records_to_table() that rejects batches holding a bad row."""
+
+    def __init__(self, bad=(), down=False):
+        self.bad = set(bad)
+        self.down = down
+        self.rows = []
+        self.copies = 0
+
+    async def copy_records_to_table(self, table, records, columns):
+        self.copies += 1
+        if self.down:
+            raise ConnectionError("connection refused")
+        if any(json.loads(row[7])["n"] in self.bad for row in records):
+            raise RowRejected("unsupported Unicode escape sequence")
+        self.rows.extend(records)
+
+
+def make_sink(pool, **kwargs):
+    sink = ResultSink(dsn="postgresql://test", **kwargs)
+    sink._pool = pool
+    return sink
+
+
+def submit(sink, numbers):
+    for n in numbers:
+        sink.submit("compliance", {"n": n})
+
+
+def numbers(rows):
+    return [json.loads(row[7])["n"] for row in rows]
+
+
+def test_rejected_batch_is_bisected_and_bad_rows_quarantined(tmp_path):
+    pool = FakePool(bad={3, 9})
+    quarantine = tmp_path / "quarantine"
+    sink = make_sink(pool, batch_size=8, quarantine_path=str(quarantine))
+    submit(sink, range(12))
+
+    written = asyncio.run(sink.flush())
+
+    assert written == 10
+    assert numbers(pool.rows) == [n for n in range(12) if n not in (3, 9)]
+    assert sink.stats["quarantined"] == 2
+    assert [json.loads(json.loads(line)[7])["n"] for line in quarantine.read_text().splitlines()] == [3, 9]
+    assert not sink._buffer
+
+
+def test_connection_error_keeps_rows_in_order_without_quarantine():
+    pool = FakePool(down=True)
+    sink = make_sink(pool, batch_size=4)
+    submit(sink, range(6))
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(sink.flush())
+
+    assert pool.copies == 1  # not bisected
+    assert numbers(sink._buffer) == list(range(6))
+    assert sink.stats["quarantined"] == 0
+
+
+def test_connection_lost_mid_bisection_requeues_only_unwritten_rows():
+    pool = FakePool(bad={0})
+    sink = make_sink(pool, batch_size=8)
+    submit(sink, range(8))
+    copy = pool.copy_records_to_table
+
+    async def copy_then_fail(table, records, columns):
+        await copy(table, records, columns)
+        if pool.rows:  # the first row written, then the link drops
+            pool.down = True
+
+    pool.copy_records_to_table = copy_then_fail
+
+    async def scenario():
+        # [0..7] rejected -> [0..3] rejected -> [0, 1] rejected -> [0] quarantined,
+        # [1] written, then the connection drops before [2, 3] and [4..7]
+        with pytest.raises(ConnectionError):
+            await sink.flush()
+
+    asyncio.run(scenario())
+
+    assert numbers(pool.rows) == [1]
+    assert numbers(sink._buffer) == [2, 3, 4, 5, 6, 7]
+    assert sink.stats["quarantined"] == 1
+    assert sink.stats["written"] == 1
+
+
+def test_overflow_spills_off_loop_and_replays(tmp_path):
+    spill = tmp_path / "spill"
+    pool = FakePool()
+    sink = make_sink(pool, batch_size=10, max_buffer=4, spill_path=str(spill))
+
+    async def scenario():
+        submit(sink, range(7))
+        assert not spill.exists()  # submit() never touches the file
+        await sink._write_spill()
+        assert len(spill.read_text().splitlines()) == 3
+        await sink.flush()
+        await sink._replay_spill()
+        await sink.flush()
+
+    asyncio.run(scenario())
+
+    assert numbers(pool.rows) == list(range(7))
+    assert sink.stats["spilled"] == 3
+    assert not spill.exists()
+
+
+def test_replay_left_by_a_crash_is_not_overwritten(tmp_path):
+    spill = tmp_path / "spill"
+    pool = FakePool()
+    sink = make_sink(pool, batch_size=10, max_buffer=10, spill_path=str(spill))
+
+    async def scenario():
+        # Rows 0-1 were being replayed when the process died; 2-3 spilled since
+        submit(sink, range(4))
+        sink._spill_pending = list(sink._buffer)
+        sink._buffer.clear()
+        await sink._write_spill()
+        lines = spill.read_text().splitlines(keepends=True)
+        (tmp_path / "spill.replay").write_text("".join(lines[:2]))
+        spill.write_text("".join(lines[2:]) + '["torn')
+
+        await sink._replay_spill()
+        assert spill.exists()  # taken on the next round
+        await sink._replay_spill()
+        await sink.flush()
+
+    asyncio.run(scenario())
+
+    assert numbers(pool.rows) == [0, 1, 2, 3]
+    assert not spill.exists()
+    assert not (tmp_path / "spill.replay").exists()
+
+
+def test_overflow_without_spill_file_is_dropped():
+    sink = make_sink(FakePool(), max_buffer=2)
+    submit(sink, range(5))
+
+    assert sink.stats["dropped"] == 3
+    assert sink._spill_pending == []
+
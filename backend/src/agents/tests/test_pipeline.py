@@ -0,0 +1,48 @@
+"""AgentPipeline: per-run HTTP clients with shared agent instances."""
+
+import asyncio
+
+from agents.base import BaseAgent
+from agents.pipeline import AgentPipeline
+from agents.transport import FakeTransport
+
+
+class ClientRecordingTransport(FakeTransport):
+    def __init__(self):
+        super().__init__(lambda payload: '{"ok": true}')
+        self.clients = []
+
+    async def send(self, payload, client=None, trace=None):
+        self.clients.append((client, client is not None and client.is_closed))
+        return await super().send(payload, client, trace)
+
+
+class SlowAgent(BaseAgent):
+    def __init__(self, transport):
+        super().__init__(name="Slow")
+        self.transport = transport
+
+    async def run(self, delay: float = 0.0, **_):
+        await asyncio.sleep(delay)
+        response = await self.call_llm("system", "user")
+        return {"cost": response["cost"]}
+
+
+def test_concurrent_runs_on_shared_agents_use_their_own_open_client():
+    transport = ClientRecordingTransport()
+    agent = SlowAgent(transport)
+    pipeline = AgentPipeline().add("slow", agent, lambda ctx: {"delay": ctx["delay"]})
+
+    async def scenario():
+        # The first run finishes (and closes its client) while the second waits
+        await asyncio.gather(pipeline.run("a", delay=0.0), pipeline.run("b", delay=0.05))
+        await pipeline.run("c", delay=0.0)
+
+    asyncio.run(scenario())
+
+    assert agent.http_client is None  # never mutated
+    assert len(transport.clients) == 3
+    clients = [client for client, _ in transport.clients]
+    assert all(client is not None for client in clients)
+    assert len({id(client) for client in clients}) == 3
+    assert not any(closed for _, closed in transport.clients)
@@ -0,0 +1,214 @@
+"""AgentQueueWorker against the in-process InMemoryRedis."""
+
+import asyncio
+
+import pytest
+
+from agents.queue_worker import AgentQueueWorker, InMemoryRedis, QueueKeys, enqueue_jobs
+
+PREFIX = "test:agents"
+KEYS = QueueKeys(PREFIX)
+
+
+class EchoAgent:
+    http_client = None
+
+    async def run(self, **kwargs):
+        return {"echo": kwargs}
+
+
+class FailingAgent:
+    http_client = None
+
+    async def run(self, **kwargs):
+        raise RuntimeError("upstream 500")
+
+
+def make_worker(redis, agent=None, **options):
+    agent = agent or EchoAgent()
+    options = dict(dict(
+        prefix=PREFIX, agents=["echo"], concurrency=4, batch_size=10,
+        poll_interval=0.01, ack_interval=0.01, max_backoff=0.05,
+    ), **options)
+    return AgentQueueWorker(redis, agent_factory=lambda slug: agent, **options)
+
+
+def drain(worker):
+    asyncio.run(asyncio.wait_for(worker.run(drain=True), timeout=10))
+
+
+def enqueue(redis, jobs):
+    return asyncio.run(enqueue_jobs(redis, jobs, PREFIX))
+
+
+def test_results_are_acknowledged():
+    redis = InMemoryRedis()
+    ids = enqueue(redis, [("echo", {"n": i}) for i in range(25)])
+    worker = make_worker(redis)
+    drain(worker)
+
+    assert set(redis.hashes[KEYS.results]) == set(ids)
+    assert redis.hashes[KEYS.results][ids[3]] == '{"echo": {"n": 3}}'
+    assert not redis.hashes[KEYS.jobs]
+    assert not redis.zsets[KEYS.inflight]
+    assert worker.stats["acked"] == 25
+
+
+def test_failing_job_is_retried_then_dead_lettered():
+    redis = InMemoryRedis()
+    [job_id] = enqueue(redis, [("echo", {})])
+    worker = make_worker(redis, agent=FailingAgent(), max_attempts=3)
+    drain(worker)
+
+    assert redis.lists[KEYS.dead] == [job_id]
+    assert redis.hashes[KEYS.errors][job_id] == "RuntimeError: upstream 500"
+    assert worker.stats["retried"] == 2
+    assert worker.stats["dead_lettered"] == 1
+    assert KEYS.results not in redis.hashes or not redis.hashes[KEYS.results]
+
+
+@pytest.mark.parametrize("payload", ["{not json", '{"agent": "unknown"}', '["echo"]',
+                                     '{"agent": "echo", "kwargs": [1]}'])
+def test_invalid_payload_is_dead_lettered_without_retry(payload):
+    redis = InMemoryRedis()
+    redis.hashes[KEYS.jobs]["bad"] = payload
+    redis.lists[KEYS.queue].append("bad")
+    worker = make_worker(redis)
+    drain(worker)
+
+    assert redis.lists[KEYS.dead] == ["bad"]
+    assert redis.hashes[KEYS.errors]["bad"].startswith("invalid job")
+    assert worker.stats["retried"] == 0
+
+
+def test_fetch_leases_jobs_and_reaper_requeues_expired_ones():
+    redis = InMemoryRedis()
+    ids = enqueue(redis, [("echo", {"n": i}) for i in range(3)])
+    worker = make_worker(redis, visibility_timeout=-1)  # leases expire immediately
+
+    async def scenario():
+        assert await worker._fetch_batch(10) == 3
+        assert not redis.lists[KEYS.queue]
+        assert set(redis.zsets[KEYS.inflight]) == set(ids)  # leased in the same step
+        return await worker.reap()
+
+    assert asyncio.run(scenario()) == 3
+    assert sorted(redis.lists[KEYS.queue]) == sorted(ids)
+    assert not redis.zsets[KEYS.inflight]
+    assert redis.hashes[KEYS.attempts] == {job_id: "1" for job_id in ids}
+
+
+def test_requeued_job_already_acknowledged_is_skipped():
+    redis = InMemoryRedis()
+    [job_id] = enqueue(redis, [("echo", {})])
+    # Reaped, then acknowledged by the slow worker: id queued again, payload gone
+    redis.hashes[KEYS.jobs].clear()
+    redis.hashes[KEYS.results][job_id] = '{"echo": {}}'
+    worker = make_worker(redis)
+    drain(worker)
+
+    assert worker.stats["skipped"] == 1
+    assert not redis.lists[KEYS.dead]
+    assert not redis.zsets[KEYS.inflight]
+    assert redis.hashes[KEYS.results][job_id] == '{"echo": {}}'
+
+
+class FlakyRedis(InMemoryRedis):
+    """Fails the first calls of some commands with a connection error."""
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = dict(failures)
+
+    def _maybe_fail(self, command):
+        if self.failures.get(command, 0) > 0:
+            self.failures[command] -= 1
+            raise ConnectionError(f"{command}: connection reset")
+
+    async def eval(self, *args):
+        self._maybe_fail("eval")
+        return await super().eval(*args)
+
+    async def hset(self, *args, **kwargs):
+        self._maybe_fail("hset")
+        return await super().hset(*args, **kwargs)
+
+
+def test_fetch_and_ack_loops_survive_redis_errors():
+    redis = FlakyRedis({})
+    ids = enqueue(redis, [("echo", {"n": i}) for i in range(20)])
+    redis.failures = {"eval": 2, "hset": 2}
+    worker = make_worker(redis)
+    drain(worker)
+
+    assert worker.stats["fetch_errors"] == 2
+    assert worker.stats["ack_errors"] == 2
+    assert set(redis.hashes[KEYS.results]) == set(ids)  # no ack lost
+    assert not redis.zsets[KEYS.inflight]
+
+
+def test_agent_configuration_errors_stop_the_worker():
+    def factory(slug):
+        raise ValueError("OPENROUTER_API_KEY environment variable not set")
+
+    redis = InMemoryRedis()
+    enqueue(redis, [("echo", {})])
+    worker = AgentQueueWorker(redis, prefix=PREFIX, agent_factory=factory, agents=["echo"])
+    with pytest.raises(ValueError):
+        drain(worker)
+    assert not redis.lists[KEYS.dead]
+    assert len(redis.lists[KEYS.queue]) == 1
+
+
+class BlockingAgent:
+    """Starts every job, finishes none."""
+
+    http_client = None
+
+    def __init__(self):
+        self.started = []
+
+    async def run(self, **kwargs):
+        self.started.append(kwargs["n"])
+        await asyncio.Event().wait()
+
+
+def test_stop_returns_leased_jobs_to_the_queue():
+    redis = InMemoryRedis()
+    ids = enqueue(redis, [("echo", {"n": i}) for i in range(12)])
+    agent = BlockingAgent()
+    worker = make_worker(redis, agent=agent, concurrency=2, prefetch=6, batch_size=6)
+
+    async def scenario():
+        run = asyncio.create_task(worker.run())
+        while len(agent.started) < 2 or worker._buffer.qsize() < 4:
+            await asyncio.sleep(0.01)
+        worker.stop()
+        await asyncio.wait_for(run, 5)
+
+    asyncio.run(scenario())
+
+    # Interrupted and buffered jobs back at the head, in their original order
+    assert redis.lists[KEYS.queue] == ids
+    assert not redis.zsets[KEYS.inflight]
+    assert not redis.hashes[KEYS.attempts]
+    assert worker.stats["released"] == 6
+
+
+def test_job_failed_by_reaper_and_slow_worker_is_requeued_once():
+    redis = InMemoryRedis()
+    [job_id] = enqueue(redis, [("echo", {})])
+    worker = make_worker(redis, visibility_timeout=-1)
+    slow = make_worker(redis, visibility_timeout=-1)  # its lease has expired
+
+    async def scenario():
+        await slow._fetch_batch(1)
+        assert await worker.reap() == 1
+        # The slow worker fails the job it no longer holds
+        return await slow._fail([(job_id, "RuntimeError: upstream 500", False)])
+
+    assert asyncio.run(scenario()) == 0
+    assert redis.lists[KEYS.queue] == [job_id]
+    assert redis.hashes[KEYS.attempts] == {job_id: "1"}
+    assert slow.stats["retried"] == 0
+
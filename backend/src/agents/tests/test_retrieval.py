@@ -0,0 +1,94 @@
+"""ReplyIndex rebuilds off the event loop and ReplyLibrary journaling."""
+
+import asyncio
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from agents.retrieval import ReplyIndex, ReplyLibrary  # noqa: E402
+
+TOPICS = ["livraison", "horaires", "réservation", "allergies", "stationnement", "cadeaux"]
+
+
+def pair(i):
+    topic = TOPICS[i % len(TOPICS)]
+    return f"Question {i} sur {topic} numéro {i * 7919}", f"Réponse {i} ({topic})"
+
+
+def assert_consistent(index, count):
+    for i in range(count):
+        comment, reply = pair(i)
+        assert index.search(comment, k=1)[0]["reply"] == reply
+
+
+def test_rows_added_during_a_build_survive_the_install():
+    index = ReplyIndex(min_train=60)
+    index.add_many([(*pair(i), None) for i in range(60)], rebuild=False)
+    assert index.rebuild_due() is True
+
+    layout = index.build(len(index), True)
+    index.add_many([(*pair(i), None) for i in range(60, 70)], rebuild=False)
+    assert_consistent(index, 70)  # still serving the old layout
+    index.install(layout)
+
+    assert index.centroids is not None
+    assert index.rebuild_due() is None
+    assert_consistent(index, 70)
+
+
+def test_add_async_rebuilds_in_a_thread():
+    library = ReplyLibrary(min_train=40)
+    index = library.index("resto")
+    threads = []
+    build = index.build
+    index.build = lambda n, retrain: threads.append(threading.get_ident()) or build(n, retrain)
+
+    async def scenario():
+        for i in range(45):
+            await library.add_async("resto", *pair(i))
+
+    asyncio.run(scenario())
+
+    assert threads and threading.get_ident() not in threads
+    assert index.centroids is not None
+    assert_consistent(index, 45)
+
+
+def test_journal_replayed_until_the_next_save(tmp_path):
+    journal = str(tmp_path / "journal.jsonl")
+    library = ReplyLibrary(journal=journal)
+
+    async def approve(start, stop):
+        for i in range(start, stop):
+            await library.add_async("resto", *pair(i), {"category": "question"})
+
+    asyncio.run(approve(0, 5))
+
+    restarted = ReplyLibrary(journal=journal)  # crashed before any save
+    assert restarted.replay_journal() == 5
+    assert_consistent(restarted.index("resto"), 5)
+
+    asyncio.run(library.save_async(str(tmp_path)))
+    asyncio.run(approve(5, 8))
+
+    restarted = ReplyLibrary(journal=journal)
+    restarted.load(str(tmp_path))
+    assert len(restarted.index("resto")) == 5
+    assert restarted.replay_journal() == 3
+    assert len(restarted.index("resto")) == 8
+    assert_consistent(restarted.index("resto"), 8)
+
+
+def test_save_snapshot_ignores_rows_added_after_it(tmp_path):
+    library = ReplyLibrary()
+    for i in range(6):
+        library.add("resto", *pair(i))
+
+    library.save(str(tmp_path), sizes={"resto": 4})
+
+    restored = ReplyLibrary()
+    restored.load(str(tmp_path))
+    assert len(restored.index("resto")) == 4
+    assert_consistent(restored.index("resto"), 4)
@@ -0,0 +1,110 @@
+"""ModelRouter: Thompson sampling, exclusions and persisted statistics."""
+
+import asyncio
+import threading
+from collections import Counter
+
+import agents.router as router_module
+from agents.router import ModelRouter, Objective
+
+AGENT = "Agent"
+QUALITY_ONLY = Objective(latency_weight=0.0, cost_weight=0.0)
+
+
+def make_router(**kwargs):
+    kwargs.setdefault("candidates", {AGENT: ["fast", "slow"]})
+    kwargs.setdefault("objectives", {AGENT: QUALITY_ONLY})
+    return ModelRouter(min_samples=3, probe_rate=0.0, seed=7, **kwargs)
+
+
+def train(router, model, calls, parse_ok):
+    for i in range(calls):
+        router.record(AGENT, model, latency_ms=1000, cost=0.001, ok=True)
+        router.record_parse(AGENT, model, ok=i < parse_ok)
+
+
+def choices(router, n=200):
+    return Counter(router.choose(AGENT, "fast") for _ in range(n))
+
+
+def test_arms_are_explored_in_candidate_order_first():
+    router = make_router()
+    assert router.choose(AGENT, "fast") == "fast"
+    train(router, "fast", 4, 4)  # decayed: 3 calls count a little less than 3
+    assert router.choose(AGENT, "fast") == "slow"
+
+
+def test_posterior_updates_shift_the_choice():
+    router = make_router()
+    train(router, "fast", 20, 19)
+    train(router, "slow", 20, 2)
+    assert choices(router).most_common(1)[0][0] == "fast"
+
+    # "fast" starts failing to parse, "slow" recovers
+    train(router, "fast", 60, 0)
+    train(router, "slow", 60, 60)
+    assert choices(router)["slow"] > 180
+
+
+def test_latency_and_cost_weigh_against_equal_quality():
+    router = make_router(objectives={AGENT: Objective(latency_weight=1.0, cost_weight=0.0,
+                                                      latency_target_ms=1000)})
+    for _ in range(20):
+        router.record(AGENT, "fast", 500, 0.001, ok=True)
+        router.record(AGENT, "slow", 5000, 0.001, ok=True)
+        router.record_parse(AGENT, "fast", ok=True)
+        router.record_parse(AGENT, "slow", ok=True)
+    assert choices(router)["fast"] == 200
+
+
+def test_excluded_models_are_skipped_and_the_default_is_the_last_resort():
+    router = make_router(objectives={AGENT: Objective(max_error_rate=0.2)})
+    for _ in range(5):
+        router.record(AGENT, "fast", 0, 0, ok=False)
+    train(router, "slow", 5, 5)
+    assert choices(router) == {"slow": 200}
+
+    for _ in range(5):
+        router.record(AGENT, "slow", 0, 0, ok=False)
+    # Every candidate excluded: deterministic fallback to the agent's model
+    assert router.choose(AGENT, "fast") == "fast"
+    assert router.choose(AGENT, "slow") == "slow"
+
+
+def test_agent_without_candidates_keeps_its_model():
+    router = make_router()
+    assert router.choose("Other", "own/model") == "own/model"
+
+
+def test_statistics_survive_a_save_and_load(tmp_path):
+    path = str(tmp_path / "router.json")
+    router = make_router(state_path=path)
+    train(router, "fast", 4, 3)
+    router.record(AGENT, "slow", 2500, 0.004, ok=False)
+    router.save()
+
+    restored = make_router(state_path=path)
+    assert restored.snapshot() == router.snapshot()
+
+
+def test_periodic_saves_run_off_the_event_loop(tmp_path, monkeypatch):
+    path = tmp_path / "router.json"
+    router = make_router(state_path=str(path), save_every=4)
+    writers = []
+    write_state = router_module._write_state
+
+    def recording_write(*args):
+        writers.append(threading.current_thread())
+        write_state(*args)
+
+    monkeypatch.setattr(router_module, "_write_state", recording_write)
+
+    async def scenario():
+        train(router, "fast", 2, 2)  # 4 updates
+        await router._saving
+
+    asyncio.run(scenario())
+
+    assert path.exists()
+    assert writers and threading.main_thread() not in writers
+    assert make_router(state_path=str(path)).snapshot() == router.snapshot()
@@ -0,0 +1,119 @@
+"""WorkerRuntime: worker-local response cache and dead worker detection."""
+
+import asyncio
+import queue
+import socket
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from agents.runtime import SharedResponseCache, WorkerError, WorkerRuntime, _LRUStore, _Worker
+
+
+def test_cache_serves_repeat_lookups_locally():
+    store = _LRUStore(max_entries=10, ttl=60.0)
+    cache = SharedResponseCache(store, local_entries=10)
+
+    async def scenario():
+        assert await cache.get("k") is None
+        await cache.set("k", {"content": "a"})
+        other = SharedResponseCache(store)  # another worker
+        assert await other.get("k") == {"content": "a"}
+        assert await other.get("k") == {"content": "a"}
+
+    asyncio.run(scenario())
+
+    assert store.stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+
+class CountingStore(_LRUStore):
+    """Store counting manager round trips."""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.round_trips = 0
+
+    def get_entry(self, key):
+        self.round_trips += 1
+        return super().get_entry(key)
+
+
+def test_cache_own_writes_hit_locally():
+    store = CountingStore(10, 60.0)
+    cache = SharedResponseCache(store)
+
+    async def scenario():
+        await cache.set("k", {"content": "a"})
+        assert await cache.get("k") == {"content": "a"}
+
+    asyncio.run(scenario())
+
+    assert store.round_trips == 0
+    expires, _ = cache.local.data["k"]
+    assert expires == store.data["k"][0]
+
+
+def test_cache_local_copy_keeps_the_shared_expiry():
+    store = _LRUStore(max_entries=10, ttl=60.0)
+    store.put("k", (time.monotonic() + 0.05, {"content": "a"}))
+    cache = SharedResponseCache(store)
+
+    async def scenario():
+        assert await cache.get("k") == {"content": "a"}
+        await asyncio.sleep(0.1)
+        assert await cache.get("k") is None
+
+    asyncio.run(scenario())
+
+
+class DeadProcess:
+    exitcode = -9
+
+    def is_alive(self):
+        return False
+
+
+def test_dead_worker_jobs_fail_and_worker_is_replaced(monkeypatch):
+    runtime = WorkerRuntime(workers=2, cache_entries=0, health_interval=0.01)
+    replacements = []
+    monkeypatch.setattr(runtime, "_spawn", lambda index: replacements.append(index) or "new")
+    healthy = _Worker(0, None, None, None)
+    dead = _Worker(1, DeadProcess(), None, queue.Queue())
+    dead.results.put((0, True, {"ok": True}, 1))  # sent before dying
+    runtime._workers = [healthy, dead]
+    futures = [Future() for _ in range(3)]
+    runtime._futures.update({0: (futures[0], dead), 1: (futures[1], dead), 2: (futures[2], healthy)})
+
+    runtime._collect(dead)
+
+    assert futures[0].result(timeout=0) == {"ok": True}
+    with pytest.raises(WorkerError, match="exited with code -9"):
+        futures[1].result(timeout=0)
+    assert not futures[2].done()
+    assert runtime._workers == [healthy, "new"]
+    assert replacements == [1] and runtime.restarted_workers == 1
+
+
+def test_killed_worker_fails_its_job_and_is_restarted(monkeypatch):
+    # Upstream that accepts connections and never answers
+    upstream = socket.socket()
+    upstream.bind(("127.0.0.1", 0))
+    upstream.listen()
+    monkeypatch.setenv("OPENROUTER_API_URL", f"http://127.0.0.1:{upstream.getsockname()[1]}/v1")
+
+    runtime = WorkerRuntime(workers=1, cache_entries=0, use_uvloop=False, health_interval=0.1)
+    with runtime:
+        future = runtime.submit("compliance", content="Promo!", content_type="post")
+        upstream.settimeout(60)
+        connection, _ = upstream.accept()  # the worker is now waiting on the upstream
+        runtime._workers[0].process.kill()
+
+        with pytest.raises(WorkerError, match="exited"):
+            future.result(timeout=30)
+        # The replacement worker takes new jobs
+        with pytest.raises(WorkerError, match="Unknown agent"):
+            runtime.submit("no-such-agent").result(timeout=60)
+        assert runtime.restarted_workers == 1
+    connection.close()
+    upstream.close()
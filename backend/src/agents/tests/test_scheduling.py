@@ -0,0 +1,148 @@
+"""LLMScheduler: deadline ordering, shedding, degrading and expiry."""
+
+import asyncio
+
+import pytest
+
+from agents.scheduling import DeadlineExceededError, LLMScheduler, LoadShedError, request_priority
+
+AGENT = "CommunityManager"  # "normal" class
+
+
+def waiter(scheduler, granted, name, priority=None, deadline_s=None):
+    """Task acquiring a slot (in its own request context) and recording the grant."""
+    async def run():
+        with request_priority(priority, deadline_s):
+            grant = await scheduler.acquire(AGENT)
+        granted.append((name, grant))
+        return grant
+
+    return asyncio.create_task(run())
+
+
+def test_queued_requests_are_dispatched_by_class_then_deadline():
+    async def scenario():
+        scheduler = LLMScheduler(max_inflight=1)
+        await scheduler.acquire(AGENT)
+        granted = []
+        tasks = [
+            waiter(scheduler, granted, "no-deadline"),
+            waiter(scheduler, granted, "late", deadline_s=30),
+            waiter(scheduler, granted, "soon", deadline_s=10),
+            waiter(scheduler, granted, "low", priority="low", deadline_s=1),
+            waiter(scheduler, granted, "critical", priority="critical"),
+        ]
+        await asyncio.sleep(0)
+        assert len(scheduler) == 5
+        for _ in tasks:
+            scheduler.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return [name for name, _ in granted]
+
+    assert asyncio.run(scenario()) == ["critical", "soon", "late", "no-deadline", "low"]
+
+
+def test_low_priority_is_shed_first_when_the_queue_is_long():
+    async def scenario():
+        scheduler = LLMScheduler(max_inflight=1, shed_depth=1)
+        await scheduler.acquire(AGENT)
+        granted = []
+        queued = waiter(scheduler, granted, "normal")
+        await asyncio.sleep(0)
+
+        with pytest.raises(LoadShedError), request_priority("low"):
+            await scheduler.acquire(AGENT)
+        # Other classes still queue
+        high = waiter(scheduler, granted, "high", priority="high")
+        await asyncio.sleep(0)
+        assert len(scheduler) == 2
+
+        scheduler.release()
+        scheduler.release()
+        await asyncio.gather(queued, high)
+        return scheduler, [name for name, _ in granted]
+
+    scheduler, order = asyncio.run(scenario())
+    assert order == ["high", "normal"]
+    assert scheduler.stats["low"]["shed"] == 1
+
+
+def test_normal_calls_are_degraded_while_the_queue_is_deep():
+    async def scenario():
+        scheduler = LLMScheduler(max_inflight=1, degrade_depth=1)
+        await scheduler.acquire(AGENT)
+        granted = []
+        tasks = [waiter(scheduler, granted, "first"), waiter(scheduler, granted, "second")]
+        await asyncio.sleep(0)
+        scheduler.release()
+        await tasks[0]
+        scheduler.release()
+        await tasks[1]
+        return scheduler, {name: grant.degraded for name, grant in granted}
+
+    scheduler, degraded = asyncio.run(scenario())
+    # "first" was granted while "second" still waited
+    assert degraded == {"first": True, "second": False}
+    payload = scheduler.degrade({"model": "anthropic/claude-3.5-sonnet", "max_tokens": 1000})
+    assert payload == {"model": "openai/gpt-4o-mini", "max_tokens": 500}
+
+
+def test_requests_expiring_in_the_queue_raise_deadline_exceeded():
+    async def scenario():
+        scheduler = LLMScheduler(max_inflight=1)
+        await scheduler.acquire(AGENT)
+        with pytest.raises(DeadlineExceededError), request_priority(deadline_s=0.02):
+            await scheduler.acquire(AGENT)
+        with pytest.raises(DeadlineExceededError), request_priority(deadline_s=0):
+            await scheduler.acquire(AGENT)  # expired on arrival
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert scheduler.stats["normal"]["expired"] == 2
+    assert len(scheduler) == 0
+    assert scheduler.snapshot()["inflight"] == 1
+
+
+def test_release_drops_requests_without_enough_time_left():
+    async def scenario():
+        scheduler = LLMScheduler(max_inflight=1, min_time_left_s=5.0)
+        await scheduler.acquire(AGENT)
+        granted = []
+        tight = waiter(scheduler, granted, "tight", deadline_s=5.5)
+        await asyncio.sleep(0.6)
+        scheduler.release()
+        with pytest.raises(DeadlineExceededError):
+            await tight
+        return scheduler
+
+    scheduler = asyncio.run(scenario())
+    assert scheduler.snapshot()["inflight"] == 0
+    assert scheduler.stats["normal"]["expired"] == 1
+
+
+def test_cancelled_waiters_keep_the_slot_accounting_exact():
+    async def scenario():
+        scheduler = LLMScheduler(max_inflight=1)
+        await scheduler.acquire(AGENT)
+        granted = []
+        waiting = waiter(scheduler, granted, "cancelled while waiting")
+        racing = waiter(scheduler, granted, "granted then cancelled")
+        last = waiter(scheduler, granted, "last")
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        assert len(scheduler) == 2
+
+        scheduler.release()  # hands the slot to `racing`...
+        racing.cancel()      # ...which is cancelled before it runs
+        await asyncio.gather(racing, return_exceptions=True)
+        await last  # the slot went on to the next waiter
+        scheduler.release()
+        return scheduler, [name for name, _ in granted]
+
+    scheduler, granted = asyncio.run(scenario())
+    assert granted == ["last"]
+    assert scheduler.snapshot()["inflight"] == 0
+    assert len(scheduler) == 0
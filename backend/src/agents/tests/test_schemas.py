@@ -0,0 +1,84 @@
+"""CompactSchema: the expander reproduces each agent's verbose answers."""
+
+import pytest
+
+from agents.benchmarks.compact_schemas import CORPUS
+from agents.registry import get_agent_class
+
+SAMPLES = [
+    pytest.param(slug, answer, id=f"{slug}-{i}")
+    for slug, answers in CORPUS.items()
+    for i, answer in enumerate(answers)
+]
+
+
+def schema(slug):
+    return get_agent_class(slug).COMPACT_SCHEMA
+
+
+def test_every_agent_has_a_compact_schema():
+    assert all(schema(slug) is not None for slug in CORPUS)
+
+
+@pytest.mark.parametrize("slug, answer", SAMPLES)
+def test_expand_reproduces_the_verbose_answer(slug, answer):
+    wire = schema(slug).compact(answer)
+    assert schema(slug).expand(wire) == answer
+    shorts = {field.short for field in schema(slug).fields.values()}
+    assert set(wire) <= shorts
+
+
+@pytest.mark.parametrize("slug, answer", SAMPLES)
+def test_verbose_answers_pass_through_expand(slug, answer):
+    assert schema(slug).expand(dict(answer)) == answer
+
+
+def test_omitted_defaults_are_restored_and_not_shared():
+    cm = schema("community-manager")
+    first = cm.expand({"s": 1, "c": 0, "r": "Merci!", "h": 0})
+    assert first == {
+        "sentiment": "neutral", "category": "question", "urgency": "low",
+        "suggested_response": "Merci!", "requires_human": False,
+        "tags": [], "internal_notes": "",
+    }
+    first["tags"].append("modifié")
+    assert cm.expand({})["tags"] == []
+
+
+def test_missing_required_keys_stay_missing():
+    expanded = schema("community-manager").expand({"r": "Merci!"})
+    assert "sentiment" not in expanded and "requires_human" not in expanded
+    assert expanded["suggested_response"] == "Merci!"
+
+
+@pytest.mark.parametrize("wire, expected", [
+    ({"s": 9}, 9),              # code out of range
+    ({"s": -1}, -1),
+    ({"s": True}, True),        # booleans are not codes
+    ({"s": "positive"}, "positive"),
+    ({"s": None}, None),
+])
+def test_invalid_enum_codes_are_kept_as_sent(wire, expected):
+    assert schema("community-manager").expand(wire)["sentiment"] == expected
+
+
+@pytest.mark.parametrize("wire", [None, "texte", 42, ["s", 1]])
+def test_non_object_answers_are_returned_unchanged(wire):
+    assert schema("community-manager").expand(wire) == wire
+
+
+def test_unknown_keys_pass_through_both_ways():
+    cm = schema("community-manager")
+    wire = cm.compact({"sentiment": "positive", "confidence": 0.9})
+    assert wire == {"s": 0, "confidence": 0.9}
+    assert cm.expand(wire) == {
+        "sentiment": "positive", "urgency": "low", "tags": [], "internal_notes": "", "confidence": 0.9,
+    }
+
+
+def test_malformed_nested_values_are_kept():
+    crisis = schema("crisis-manager")
+    expanded = crisis.expand({"sa": "inconnu", "am": "aucun", "ra": [None, {}]})
+    assert expanded["sentiment_analysis"] == "inconnu"
+    assert expanded["amplifiers"] == "aucun"
+    assert expanded["recommended_actions"][0] is None
@@ -0,0 +1,124 @@
+"""SiteIndex: orphans, cannibalization and the concurrent per-page audit."""
+
+import asyncio
+
+import pytest
+
+from agents.scheduling import DeadlineExceededError, LoadShedError
+from agents.site_audit import SiteIndex, extract_links, normalize_url
+
+PAGES = [
+    {"url": "https://resto.ca/", "title": "Resto Québec",
+     "content": '<a href="/menu">Menu</a> <a href="https://resto.ca/brunch">Brunch</a> '
+                '<a href="https://facebook.com/resto">Facebook</a>'},
+    {"url": "/menu", "title": "Menu", "content": "Poutine classique, tourtière maison et pouding chômeur. [Accueil](/)",
+     "target_keywords": ["menu québécois"]},
+    {"url": "/brunch", "title": "Brunch du dimanche", "content": "Brunch du dimanche: crêpes, fèves au lard, sirop d'érable.",
+     "target_keywords": ["brunch Québec"]},
+    {"url": "/blog/meilleur-brunch", "title": "Le meilleur brunch",
+     "content": "Notre brunch du dimanche: crêpes et sirop d'érable de la Beauce.",
+     "target_keywords": ["Brunch québec"]},
+    {"url": "/evenements", "title": "Événements privés", "content": "Salle privée pour vos réceptions."},
+]
+
+
+def make_index():
+    index = SiteIndex(base_url="https://resto.ca")
+    for page in PAGES:
+        index.add_page(**page)
+    return index
+
+
+class StubSEOAgent:
+    def __init__(self, errors=None, latency=0.0):
+        self.errors = errors or {}
+        self.latency = latency
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.contexts = {}
+
+    async def run(self, content, site_context, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            url = site_context["url"]
+            if url in self.errors:
+                raise self.errors[url]
+            self.contexts[url] = site_context
+            return {"url": url, "seo": {}}
+        finally:
+            self.in_flight -= 1
+
+
+def test_links_are_normalized_to_site_paths():
+    assert normalize_url("https://resto.ca/menu/?promo=1#haut", "https://resto.ca") == "/menu"
+    assert normalize_url("mailto:info@resto.ca") is None
+    assert extract_links(PAGES[0]["content"], "https://resto.ca") == ["/menu", "/brunch"]
+
+
+def test_pages_without_inbound_links_are_orphans():
+    index = make_index()
+    report = index.report()
+    assert report["orphan_pages"] == ["/blog/meilleur-brunch", "/evenements"]
+    assert report["internal_links"] == 3
+    assert index.facts("/menu")["orphan"] is False
+    assert index.facts("https://resto.ca/evenements")["orphan"] is True
+    assert index.facts("/")["orphan"] is False  # the home page is never an orphan
+
+
+def test_pages_sharing_a_primary_keyword_are_grouped():
+    index = make_index()
+    assert index.report()["cannibalization"] == {"brunch quebec": ["/brunch", "/blog/meilleur-brunch"]}
+    assert index.facts("/brunch")["cannibalized_with"] == ["/blog/meilleur-brunch"]
+    assert index.facts("/menu")["cannibalized_with"] == []
+
+
+def test_readding_a_page_replaces_it():
+    index = make_index()
+    index.add_page("/blog/meilleur-brunch", "Nos vins d'importation privée.", target_keywords=["vins"])
+    assert len(index) == len(PAGES)
+    assert index.report()["cannibalization"] == {}
+
+
+def test_audit_runs_pages_concurrently_within_the_limit():
+    index = make_index()
+    agent = StubSEOAgent(latency=0.01)
+    consumed = []
+
+    def pages():
+        for page in PAGES:
+            consumed.append(page["url"])
+            yield page
+
+    summary = asyncio.run(index.audit(agent, pages(), max_concurrency=2))
+
+    assert summary["audited"] == len(PAGES)
+    assert summary["failed"] == [] and summary["shed"] == []
+    assert agent.max_in_flight == 2
+    assert len(consumed) == len(PAGES)
+    assert set(summary["results"]) == {page["url"] for page in PAGES}
+    # Each call gets its own page's facts
+    assert agent.contexts["/brunch"]["cannibalized_with"] == ["/blog/meilleur-brunch"]
+
+
+def test_streamed_results_are_not_kept():
+    index = make_index()
+    streamed = {}
+    summary = asyncio.run(index.audit(
+        StubSEOAgent(), PAGES, on_result=lambda url, result: streamed.__setitem__(url, result)
+    ))
+    assert len(streamed) == len(PAGES)
+    assert "results" not in summary
+
+
+@pytest.mark.parametrize("error", [LoadShedError("shed"), DeadlineExceededError("expired")])
+def test_shed_pages_are_reported_apart_from_failures(error):
+    index = make_index()
+    agent = StubSEOAgent(errors={"/menu": error, "/evenements": ValueError("bad JSON")})
+
+    summary = asyncio.run(index.audit(agent, PAGES))
+
+    assert summary["audited"] == len(PAGES) - 2
+    assert summary["shed"] == ["/menu"]
+    assert summary["failed"] == ["/evenements"]
@@ -0,0 +1,75 @@
+"""traceparent propagation through the installed tracer."""
+
+import asyncio
+
+import pytest
+
+from agents.tracing import (
+    InMemorySpanExporter,
+    Tracer,
+    continue_trace,
+    current_traceparent,
+    get_tracer,
+    set_tracer,
+)
+
+TRACEPARENT = "00-0af7651916cd43dd8448eb211c80319c-b7ad6b7169203331-01"
+
+
+@pytest.fixture(autouse=True)
+def reset_tracer():
+    yield
+    set_tracer(None)
+
+
+def test_builtin_tracer_parents_spans_on_the_caller_trace():
+    exporter = InMemorySpanExporter()
+    set_tracer(Tracer(exporter))
+
+    with continue_trace(TRACEPARENT):
+        with get_tracer().start_as_current_span("child") as span:
+            outgoing = current_traceparent()
+
+    assert span.parent_id == "b7ad6b7169203331"
+    assert outgoing == f"00-0af7651916cd43dd8448eb211c80319c-{span.span_id}-01"
+    assert current_traceparent() is None
+
+
+def test_malformed_traceparent_is_ignored():
+    set_tracer(Tracer(InMemorySpanExporter()))
+
+    with continue_trace("not-a-traceparent"):
+        assert current_traceparent() is None
+
+
+def test_opentelemetry_tracer_uses_the_otel_context():
+    trace = pytest.importorskip("opentelemetry.trace")
+    set_tracer(trace.get_tracer("agents-tests"))
+
+    with continue_trace(TRACEPARENT):
+        assert trace.get_current_span().get_span_context().trace_id == 0x0AF7651916CD43DD8448EB211C80319C
+        assert current_traceparent() == TRACEPARENT
+
+    assert not trace.get_current_span().get_span_context().is_valid
+    assert current_traceparent() is None
+
+
+def test_default_tracer_forwards_the_callers_traceparent_upstream():
+    httpx = pytest.importorskip("httpx")
+    from agents.transport import OpenAICompatibleTransport
+
+    sent = []
+
+    def upstream(request):
+        sent.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={"choices": []})
+
+    async def scenario():
+        transport = OpenAICompatibleTransport("http://gpu:8000/v1")
+        async with httpx.AsyncClient(transport=httpx.MockTransport(upstream)) as client:
+            with continue_trace(TRACEPARENT):
+                await transport.send({"model": "m", "messages": []}, client)
+            await transport.send({"model": "m", "messages": []}, client)
+
+    asyncio.run(scenario())
+    assert sent == [TRACEPARENT, None]
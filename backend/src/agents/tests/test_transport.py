@@ -0,0 +1,164 @@
+"""OpenAICompatibleTransport: URLs, model mapping, headers, errors and pricing."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from agents.base import BaseAgent
+from agents.config import reload_config
+from agents.pricing import estimate_cost
+from agents.transport import OpenAICompatibleTransport, OpenRouterTransport, default_transport
+
+ANSWER = {
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "{}"}}],
+    "usage": {"prompt_tokens": 1000, "completion_tokens": 500, "total_tokens": 1500},
+}
+
+
+class Upstream:
+    """httpx.MockTransport handler recording requests and failing with `statuses` first."""
+
+    def __init__(self, statuses=()):
+        self.statuses = list(statuses)
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        if self.statuses:
+            return httpx.Response(self.statuses.pop(0), json={"error": "upstream"})
+        return httpx.Response(200, json=ANSWER)
+
+    def client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self))
+
+
+def send(transport, upstream, payload):
+    async def scenario():
+        async with upstream.client() as client:
+            return await transport.send(payload, client)
+
+    return asyncio.run(scenario())
+
+
+@pytest.fixture
+def env(monkeypatch):
+    yield monkeypatch
+    monkeypatch.undo()
+    reload_config()
+
+
+@pytest.mark.parametrize("base_url", [
+    "http://gpu:8000/v1",
+    "http://gpu:8000/v1/",
+    "http://gpu:8000/v1/chat/completions",
+])
+def test_chat_completions_url_is_derived_from_the_base(base_url):
+    assert OpenAICompatibleTransport(base_url).url == "http://gpu:8000/v1/chat/completions"
+
+
+def test_mapped_models_are_rewritten_on_the_wire_only():
+    transport = OpenAICompatibleTransport(
+        "http://gpu:8000/v1", model_map={"anthropic/claude-3.5-sonnet": "llama-3.1-8b-instruct"}
+    )
+    upstream = Upstream()
+    payload = {"model": "anthropic/claude-3.5-sonnet", "messages": []}
+
+    assert send(transport, upstream, payload) == ANSWER
+    send(transport, upstream, {"model": "openai/gpt-4o-mini", "messages": []})
+
+    sent = [json.loads(request.content)["model"] for request in upstream.requests]
+    assert sent == ["llama-3.1-8b-instruct", "openai/gpt-4o-mini"]
+    assert payload["model"] == "anthropic/claude-3.5-sonnet"
+    assert str(upstream.requests[0].url) == "http://gpu:8000/v1/chat/completions"
+
+
+def test_bearer_token_and_extra_headers_are_sent():
+    upstream = Upstream()
+    transport = OpenAICompatibleTransport("http://gpu:8000/v1", api_key="secret",
+                                          headers={"X-Team": "social"})
+    send(transport, upstream, {"model": "m", "messages": []})
+    send(OpenAICompatibleTransport("http://gpu:8000/v1"), upstream, {"model": "m", "messages": []})
+
+    with_key, without_key = (request.headers for request in upstream.requests)
+    assert with_key["authorization"] == "Bearer secret"
+    assert with_key["x-team"] == "social"
+    assert "authorization" not in without_key
+
+
+def test_openrouter_sends_attribution_headers():
+    upstream = Upstream()
+    send(OpenRouterTransport(api_key="or-key"), upstream, {"model": "m", "messages": []})
+
+    headers = upstream.requests[0].headers
+    assert headers["authorization"] == "Bearer or-key"
+    assert headers["x-title"] == "AstroMedia"
+    assert "http-referer" in headers
+
+
+@pytest.mark.parametrize("status", [400, 401, 429, 503])
+def test_error_statuses_raise_http_status_errors(status):
+    with pytest.raises(httpx.HTTPStatusError) as error:
+        send(OpenAICompatibleTransport("http://gpu:8000/v1"), Upstream([status]),
+             {"model": "m", "messages": []})
+    assert error.value.response.status_code == status
+
+
+class PlainAgent(BaseAgent):
+    def __init__(self, transport, client):
+        super().__init__(name="Plain")
+        self.transport = transport
+        self.http_client = client
+        self.max_retries = 2
+        self.retry_backoff = 0.0
+
+    async def run(self, **_):
+        return await self.call_llm("system", "user")
+
+
+@pytest.mark.parametrize("statuses, calls, fails", [
+    ([503, 429], 3, False),   # retryable: retried until success
+    ([400], 1, True),         # client error: raised at once
+    ([502, 502, 502], 3, True),
+])
+def test_agents_retry_only_retryable_statuses(statuses, calls, fails):
+    upstream = Upstream(statuses)
+
+    async def scenario():
+        async with upstream.client() as client:
+            return await PlainAgent(OpenAICompatibleTransport("http://gpu:8000/v1"), client).run()
+
+    if fails:
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(scenario())
+    else:
+        assert asyncio.run(scenario())["content"] == "{}"
+    assert len(upstream.requests) == calls
+
+
+def test_transport_price_overrides_the_pricing_table():
+    model = "anthropic/claude-3.5-sonnet"
+    assert OpenAICompatibleTransport("http://gpu/v1", price=(0.0, 0.0)).estimate_cost(model, 1000, 500) == 0
+    assert OpenAICompatibleTransport("http://gpu/v1", price=(1.0, 2.0)).estimate_cost(model, 1000, 500) == 0.002
+    assert OpenAICompatibleTransport("http://gpu/v1").estimate_cost(model, 1000, 500) == \
+        estimate_cost(model, 1000, 500)
+
+
+def test_default_transport_follows_the_environment(env):
+    env.setenv("AGENTS_LLM_URL", "http://gpu:8000/v1")
+    env.setenv("AGENTS_LLM_MODELS", "anthropic/claude-3.5-sonnet=llama, openai/gpt-4o-mini = qwen")
+    env.delenv("AGENTS_LLM_PRICE", raising=False)
+    reload_config()
+    transport = default_transport()
+    assert isinstance(transport, OpenAICompatibleTransport)
+    assert transport.model_map == {"anthropic/claude-3.5-sonnet": "llama", "openai/gpt-4o-mini": "qwen"}
+    assert transport.price == (0.0, 0.0)  # unset: free
+
+    env.setenv("AGENTS_LLM_PRICE", "")
+    reload_config()
+    assert default_transport().price is None  # empty: OpenRouter prices
+
+    env.delenv("AGENTS_LLM_URL")
+    reload_config()
+    assert isinstance(default_transport(), OpenRouterTransport)
@@ -0,0 +1,484 @@
+"""
+Agent Tracing
+=============
+Optional span tracing and sampling profiling of the agent hot path.
+
+The tracer API mirrors OpenTelemetry (start_as_current_span, start_span,
+set_attribute, record_exception), so an OpenTelemetry tracer can be
+installed directly:
+
+    from opentelemetry import trace
+    set_tracer(trace.get_tracer("astromedia.agents"))
+
+Without OpenTelemetry, the built-in tracer exports JSON lines to the
+console or a local file:
+
+    configure_tracing(exporter="file", path="/tmp/agent-spans.jsonl",
+                      profile_rate=0.01, profile_dir="/tmp/agent-profiles")
+
+Tracing is disabled by default: each stage then enters a shared no-op
+context manager (benchmarks/tracing_overhead.py measures the cost).
+"""
+
+import contextvars
+import functools
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Any, Optional, Iterator
+import logging
+
+logger = logging.getLogger(__name__)
+
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+# Start of the current agent.run() (ns), consumed by the build_prompt span
+run_started_ns: contextvars.ContextVar = contextvars.ContextVar("run_started_ns", default=0)
+
+
+# ============================================================================
+# Spans
+# ============================================================================
+
+class Span:
+    """A timed operation inside a trace."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_time", "end_time",
+                 "attributes", "status", "events", "_tracer")
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str],
+        attributes: Optional[Dict[str, Any]] = None,
+        start_time: Optional[int] = None
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent_id
+        self.start_time = start_time or time.time_ns()
+        self.end_time = 0
+        self.attributes = dict(attributes or {})
+        self.status = "OK"
+        self.events: list = []
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        self.events.append({"name": name, "time": time.time_ns(), "attributes": attributes or {}})
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.add_event("exception", {
+            "exception.type": type(exception).__name__,
+            "exception.message": str(exception),
+        })
+
+    def set_status(self, status: Any, description: Optional[str] = None) -> None:
+        self.status = str(getattr(status, "status_code", status))
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        if not self.end_time:
+            self.end_time = end_time or time.time_ns()
+            self._tracer.exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "duration_ms": round((self.end_time - self.start_time) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "events": self.events,
+            "service": self._tracer.service_name,
+        }
+
+
+class _RemoteParent:
+    """Parent span context received from a caller (W3C traceparent)."""
+
+    __slots__ = ("trace_id", "span_id")
+
+    def __init__(self, trace_id: str, span_id: str):
+        self.trace_id = trace_id
+        self.span_id = span_id
+
+
+class _NoopSpan:
+    """Span returned while tracing is disabled."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> None:
+        pass
+
+    def record_exception(self, exception: BaseException) -> None:
+        pass
+
+    def set_status(self, status: Any, description: Optional[str] = None) -> None:
+        pass
+
+    def end(self, end_time: Optional[int] = None) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_NOOP_CONTEXT = nullcontext(_NOOP_SPAN)
+
+
+# ============================================================================
+# Exporters
+# ============================================================================
+
+class ConsoleSpanExporter:
+    """Writes finished spans as JSON lines to a stream (stderr by default)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+
+    def shutdown(self) -> None:
+        self.stream.flush()
+
+
+class FileSpanExporter(ConsoleSpanExporter):
+    """Appends finished spans as JSON lines to a local file."""
+
+    def __init__(self, path: str):
+        super().__init__(open(path, "a", encoding="utf-8", buffering=1 << 16))
+
+    def shutdown(self) -> None:
+        self.stream.close()
+
+
+class InMemorySpanExporter:
+    """Keeps finished spans in a list (tests and benchmarks)."""
+
+    def __init__(self):
+        self.spans: list = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+    def shutdown(self) -> None:
+        pass
+
+
+# ============================================================================
+# Trace context propagation (W3C traceparent)
+# ============================================================================
+
+class _ContextPropagation:
+    """traceparent handling of the built-in tracers (the current_span context variable)."""
+
+    @contextmanager
+    def continue_trace(self, traceparent: Optional[str]) -> Iterator[None]:
+        parts = (traceparent or "").split("-")
+        if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+            yield
+            return
+
+        token = _current_span.set(_RemoteParent(parts[1], parts[2]))
+        try:
+            yield
+        finally:
+            _current_span.reset(token)
+
+    def current_traceparent(self) -> Optional[str]:
+        span = _current_span.get()
+        if span is None:
+            return None
+        return f"00-{span.trace_id}-{span.span_id}-01"
+
+
+class _OpenTelemetryPropagation:
+    """traceparent handling through OpenTelemetry's context and global propagator."""
+
+    def __init__(self):
+        from opentelemetry import context, propagate
+
+        self._context = context
+        self._propagate = propagate
+
+    @contextmanager
+    def continue_trace(self, traceparent: Optional[str]) -> Iterator[None]:
+        if not traceparent:
+            yield
+            return
+
+        token = self._context.attach(self._propagate.extract({"traceparent": traceparent}))
+        try:
+            yield
+        finally:
+            self._context.detach(token)
+
+    def current_traceparent(self) -> Optional[str]:
+        carrier: Dict[str, str] = {}
+        self._propagate.inject(carrier)
+        return carrier.get("traceparent")
+
+
+# ============================================================================
+# Tracers
+# ============================================================================
+
+class Tracer(_ContextPropagation):
+    """Built-in tracer with an OpenTelemetry-compatible subset of the API."""
+
+    def __init__(self, exporter, service_name: str = "astromedia-agents"):
+        self.exporter = exporter
+        self.service_name = service_name
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_time: Optional[int] = None
+    ) -> Span:
+        """Start a span (child of the current one) without activating it."""
+        parent = _current_span.get()
+        if parent is None:
+            return Span(self, name, os.urandom(16).hex(), None, attributes, start_time)
+        return Span(self, name, parent.trace_id, parent.span_id, attributes, start_time)
+
+    @contextmanager
+    def start_as_current_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        start_time: Optional[int] = None
+    ) -> Iterator[Span]:
+        """Start a span and make it the parent of spans opened inside."""
+        span = self.start_span(name, attributes, start_time)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            span.set_status("ERROR")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end()
+
+
+class NoopTracer(_ContextPropagation):
+    """Default tracer: creates nothing (a caller's traceparent is still passed on)."""
+
+    def start_span(self, name: str, attributes=None, start_time=None) -> _NoopSpan:
+        return _NOOP_SPAN
+
+    def start_as_current_span(self, name: str, attributes=None, start_time=None):
+        return _NOOP_CONTEXT
+
+
+_tracer: Any = NoopTracer()
+_propagation: Any = _tracer
+_enabled = False
+
+
+def get_tracer():
+    """Return the process-wide tracer."""
+    return _tracer
+
+
+def tracing_enabled() -> bool:
+    """True when a real tracer is installed."""
+    return _enabled
+
+
+def set_tracer(tracer) -> None:
+    """
+    Install a tracer (built-in Tracer, OpenTelemetry tracer or None).
+
+    Any other tracer has its traceparent propagated through OpenTelemetry's
+    context (falling back to the built-in context when it is not installed).
+    """
+    global _tracer, _propagation, _enabled
+    _tracer = tracer if tracer is not None else NoopTracer()
+    _enabled = not isinstance(_tracer, NoopTracer)
+    if isinstance(_tracer, _ContextPropagation):
+        _propagation = _tracer
+    else:
+        try:
+            _propagation = _OpenTelemetryPropagation()
+        except ImportError:
+            logger.warning("[Tracing] opentelemetry not installed, traceparent uses the built-in context")
+            _propagation = _ContextPropagation()
+
+
+def continue_trace(traceparent: Optional[str]):
+    """
+    Parent spans opened inside on a caller's W3C traceparent header.
+
+    Args:
+        traceparent: "00-<trace id>-<parent span id>-<flags>" or None
+
+    Returns:
+        Context manager, entered with `with`
+    """
+    return _propagation.continue_trace(traceparent)
+
+
+def current_traceparent() -> Optional[str]:
+    """W3C traceparent of the active span (of the installed tracer), for outgoing requests."""
+    return _propagation.current_traceparent()
+
+
+# ============================================================================
+# Sampling profiler
+# ============================================================================
+
+class SamplingProfiler:
+    """
+    Samples one thread's Python stack at a fixed interval.
+
+    Produces folded stacks ("frame;frame;frame count"), the input format of
+    flamegraph.pl and speedscope. The sampled thread is the event loop, so
+    concurrent calls on the same loop appear in the same profile.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.001):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def _sample(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str) -> None:
+        """Write folded stacks to a file."""
+        with open(path, "w", encoding="utf-8") as out:
+            for stack, count in self.samples.most_common():
+                out.write(f"{stack} {count}\n")
+
+
+class ProfileHook:
+    """Profiles a random fraction of agent runs (one at a time)."""
+
+    def __init__(self, rate: float, directory: str, interval: float = 0.001):
+        self.rate = rate
+        self.directory = directory
+        self.interval = interval
+        self._active = False
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def maybe_profile(self, name: str) -> Iterator[None]:
+        if self._active or random.random() >= self.rate:
+            yield
+            return
+
+        self._active = True
+        profiler = SamplingProfiler(interval=self.interval)
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            self._active = False
+            path = os.path.join(self.directory, f"{name}-{time.time_ns()}.folded")
+            profiler.dump(path)
+            logger.info(f"[Tracing] Wrote profile {path}")
+
+
+_profile_hook: Optional[ProfileHook] = None
+
+
+def set_profile_hook(hook: Optional[ProfileHook]) -> None:
+    """Install (or remove with None) the sampling profiler hook."""
+    global _profile_hook
+    _profile_hook = hook
+
+
+# ============================================================================
+# Configuration and decorators
+# ============================================================================
+
+def configure_tracing(
+    exporter: Optional[str] = "console",
+    path: Optional[str] = None,
+    profile_rate: float = 0.0,
+    profile_dir: str = "agent-profiles"
+) -> None:
+    """
+    Enable the built-in tracer and/or the sampling profiler.
+
+    Args:
+        exporter: "console", "file" or None (tracing off)
+        path: JSON lines file for the "file" exporter
+        profile_rate: Fraction of agent runs to profile (0 = off)
+        profile_dir: Directory receiving folded-stack profiles
+    """
+    if exporter == "console":
+        set_tracer(Tracer(ConsoleSpanExporter()))
+    elif exporter == "file":
+        set_tracer(Tracer(FileSpanExporter(path or "agent-spans.jsonl")))
+    else:
+        set_tracer(None)
+
+    set_profile_hook(ProfileHook(profile_rate, profile_dir) if profile_rate > 0 else None)
+
+
+def traced_run(run):
+    """Decorate an agent's run() with an agent.run span and the profiler hook."""
+    @functools.wraps(run)
+    async def wrapper(self, *args, **kwargs):
+        if not _enabled and _profile_hook is None:
+            return await run(self, *args, **kwargs)
+
+        token = run_started_ns.set(time.time_ns())
+        profiling = _profile_hook.maybe_profile(self.name) if _profile_hook else nullcontext()
+        try:
+            with _tracer.start_as_current_span("agent.run", attributes={"agent.name": self.name}):
+                with profiling:
+                    return await run(self, *args, **kwargs)
+        finally:
+            run_started_ns.reset(token)
+
+    return wrapper
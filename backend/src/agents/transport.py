@@ -0,0 +1,239 @@
+"""
+LLM Transports
+==============
+Where an agent's chat completions requests go. Every agent uses the
+process default (OpenRouter, or the OpenAI-compatible server named by
+AGENTS_LLM_URL); any agent can be pointed elsewhere:
+
+    from agents.transport import OpenAICompatibleTransport
+    agent = CommunityManagerAgent()
+    agent.transport = OpenAICompatibleTransport(
+        "http://10.0.0.5:8000/v1",
+        model_map={"anthropic/claude-3.5-sonnet": "llama-3.1-8b-instruct"},
+        price=(0.0, 0.0),
+    )
+
+Agents keep reasoning in OpenRouter model ids (routing, pricing, metrics
+labels); a transport's `model_map` only rewrites the id sent upstream.
+"""
+
+import asyncio
+import json
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from .config import get_config
+from .metrics import PhaseTrace
+from .pricing import estimate_cost
+from .tracing import current_traceparent, get_tracer
+
+if TYPE_CHECKING:
+    import httpx
+
+
+class Transport:
+    """Sends one chat completions payload and returns the decoded response body."""
+
+    name = "transport"
+
+    def __init__(
+        self,
+        model_map: Optional[Dict[str, str]] = None,
+        price: Optional[Tuple[float, float]] = None
+    ):
+        self.model_map = dict(model_map or {})
+        # USD per 1M (prompt, completion) tokens; None = pricing.MODEL_PRICES
+        self.price = price
+
+    def upstream_model(self, model: str) -> str:
+        return self.model_map.get(model, model)
+
+    def estimate_cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        if self.price is None:
+            return estimate_cost(model, prompt_tokens, completion_tokens)
+        prompt_price, completion_price = self.price
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    async def send(
+        self,
+        payload: Dict[str, Any],
+        client: Optional["httpx.AsyncClient"] = None,
+        trace: Optional[PhaseTrace] = None
+    ) -> Dict[str, Any]:
+        """
+        Deliver `payload` and return the chat completion body.
+
+        Raises:
+            httpx.HTTPError: Transport failure or non-2xx status (retried by
+                BaseAgent on RETRYABLE_STATUSES)
+        """
+        raise NotImplementedError
+
+
+class OpenAICompatibleTransport(Transport):
+    """
+    Any server speaking the OpenAI chat completions API (vLLM, llama.cpp,
+    Ollama, TGI, LM Studio, OpenAI itself).
+
+    Args:
+        base_url: Server root ("http://host:8000/v1") or the full
+            .../chat/completions URL
+        api_key: Bearer token, if the server wants one
+        headers: Extra request headers
+        model_map: OpenRouter model id -> server model name
+        price: USD per 1M (prompt, completion) tokens; (0, 0) for hardware
+            you already pay for, None to price like OpenRouter
+        timeout: Per-request timeout when the agent has no shared client
+    """
+
+    name = "openai-compatible"
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        model_map: Optional[Dict[str, str]] = None,
+        price: Optional[Tuple[float, float]] = None,
+        timeout: float = 60.0
+    ):
+        super().__init__(model_map, price)
+        base_url = base_url.rstrip("/")
+        self.url = base_url if base_url.endswith("/chat/completions") else f"{base_url}/chat/completions"
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+        self.timeout = timeout
+
+    async def send(
+        self,
+        payload: Dict[str, Any],
+        client: Optional["httpx.AsyncClient"] = None,
+        trace: Optional[PhaseTrace] = None
+    ) -> Dict[str, Any]:
+        if self.model_map:
+            payload = dict(payload, model=self.upstream_model(payload["model"]))
+        kwargs: Dict[str, Any] = {"headers": self.headers, "json": payload}
+        if trace is not None:
+            kwargs["extensions"] = {"trace": trace}
+
+        with get_tracer().start_as_current_span(
+            "llm.http", attributes={"llm.transport": self.name}
+        ) as span:
+            # Without a tracer, a caller's traceparent (continue_trace) is forwarded as is
+            traceparent = current_traceparent()
+            if traceparent:
+                kwargs["headers"] = dict(self.headers, traceparent=traceparent)
+
+            if client is not None:
+                response = await client.post(self.url, **kwargs)
+            else:
+                import httpx
+
+                async with httpx.AsyncClient(timeout=self.timeout) as own_client:
+                    response = await own_client.post(self.url, **kwargs)
+            span.set_attribute("http.status_code", response.status_code)
+            response.raise_for_status()
+            return response.json()
+
+
+class OpenRouterTransport(OpenAICompatibleTransport):
+    """OpenRouter with the app attribution headers (the historical default)."""
+
+    name = "openrouter"
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        api_url: Optional[str] = None,
+        model_map: Optional[Dict[str, str]] = None
+    ):
+        config = get_config()
+        api_key = api_key or config.api_key
+        if not api_key:
+            raise ValueError("OPENROUTER_API_KEY environment variable not set")
+        super().__init__(
+            api_url or config.api_url,
+            api_key=api_key,
+            headers={"HTTP-Referer": config.app_url, "X-Title": "AstroMedia"},
+            model_map=model_map,
+        )
+
+
+class FakeTransport(Transport):
+    """
+    In-process transport for tests: no sockets, no API key.
+
+    Args:
+        responder: payload -> content string, or a full chat completion body
+            (dict with "choices"); default answers "{}"
+        latency_ms: Simulated upstream latency
+        errors: HTTP statuses to fail the first calls with, in order
+            (e.g. [429, 503] to exercise retries)
+
+    Every payload received is kept in `calls`.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        responder: Optional[Callable[[Dict[str, Any]], Union[str, Dict[str, Any]]]] = None,
+        latency_ms: float = 0.0,
+        errors: Iterable[int] = (),
+        model_map: Optional[Dict[str, str]] = None,
+        price: Optional[Tuple[float, float]] = (0.0, 0.0)
+    ):
+        super().__init__(model_map, price)
+        self.responder = responder or (lambda payload: "{}")
+        self.latency = latency_ms / 1000
+        self.errors: List[int] = list(errors)
+        self.calls: List[Dict[str, Any]] = []
+
+    async def send(
+        self,
+        payload: Dict[str, Any],
+        client: Optional["httpx.AsyncClient"] = None,
+        trace: Optional[PhaseTrace] = None
+    ) -> Dict[str, Any]:
+        payload = dict(payload, model=self.upstream_model(payload["model"]))
+        self.calls.append(payload)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if trace is not None:
+            trace.headers_received = time.perf_counter()
+
+        if self.errors:
+            import httpx
+
+            status = self.errors.pop(0)
+            request = httpx.Request("POST", "fake://chat/completions")
+            response = httpx.Response(status, headers={"Retry-After": "0"}, request=request)
+            raise httpx.HTTPStatusError(f"Fake status {status}", request=request, response=response)
+
+        answer = self.responder(payload)
+        if isinstance(answer, dict) and "choices" in answer:
+            return answer
+        content = answer if isinstance(answer, str) else json.dumps(answer, ensure_ascii=False)
+        prompt_tokens = sum(len(m.get("content", "")) for m in payload.get("messages", [])) // 4
+        completion_tokens = len(content) // 4
+        return {
+            "model": payload["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+
+def default_transport() -> Transport:
+    """Transport new agents start with: AGENTS_LLM_URL if set, else OpenRouter."""
+    config = get_config()
+    if config.llm_url:
+        return OpenAICompatibleTransport(
+            config.llm_url,
+            api_key=config.llm_api_key,
+            model_map=config.llm_models,
+            price=config.llm_price,
+        )
+    return OpenRouterTransport()
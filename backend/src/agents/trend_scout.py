@@ -6,6 +6,8 @@ Detects emerging trends and viral opportunities in real-time.
 
 from typing import Dict, Any, List
 from .base import BaseAgent
+from .schemas import CompactSchema, Field
+from .tracing import traced_run
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,6 +25,36 @@ class TrendScoutAgent(BaseAgent):
     - Optimal timing suggestions
     """
 
+    COMPACT_SCHEMA = CompactSchema({
+        "trends": Field("t", items=CompactSchema({
+            "title": Field("t"),
+            "description": Field("d"),
+            "source": Field("s", enum=("twitter", "linkedin", "tiktok", "google_trends", "news")),
+            "hashtags": Field("h", default=[]),
+            "virality_score": Field("v"),
+            "velocity": Field("ve"),
+            "volume": Field("vo"),
+            "engagement_rate": Field("er"),
+            "durability": Field("du", enum=("ephemeral", "short-term", "long-term")),
+            "relevance_score": Field("r"),
+            "opportunity": Field("o", schema=CompactSchema({
+                "angle": Field("a"),
+                "format": Field("f", enum=("video", "carousel", "thread", "article")),
+                "timing": Field("t", enum=("now", "today", "this_week")),
+                "estimated_reach": Field("r", enum=("10K", "100K", "1M+")),
+                "difficulty": Field("d", enum=("easy", "medium", "hard")),
+            })),
+            "risks": Field("ri", default=[]),
+            "examples": Field("ex", default=[]),
+        })),
+        "top_recommendation": Field("tr", schema=CompactSchema({
+            "trend_index": Field("i"),
+            "reasoning": Field("r"),
+        })),
+        "industry_insights": Field("ii"),
+        "competitive_analysis": Field("ca"),
+    })
+
     def __init__(self, model: str = "perplexity/llama-3.1-sonar-huge-128k-online"):
         super().__init__(
             name="TrendScout",
@@ -120,6 +152,7 @@ Tu surveilles le web en continu pour identifier tendances émergentes et opportu
 }
 """
 
+    @traced_run
     async def run(
         self,
         industry: str,
@@ -170,6 +203,7 @@ Identifie 3-5 meilleures opportunités et retourne JSON complet."""
             trends["timeframe"] = timeframe
             trends["model_used"] = result["model"]
             trends["cost"] = result["cost"]
+            trends["tokens"] = result["tokens"]
             trends["latency_ms"] = result["latency_ms"]
 
             return trends